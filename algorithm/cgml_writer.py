@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import os
+import sys
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+
+# XML-Bibliotheken
+from lxml import etree
+
+# Plugin
+try:
+    from .compressed_io import CompressedIO
+except ImportError:
+    sys.path.insert(0, '..')
+    from algorithm.compressed_io import CompressedIO
+
+
+#####
+
+class CityGmlWriter:
+    """ Model-Klasse zum Schreiben der CityGML-Struktur, aufgeteilt in parallel serialisierte Fragmente
+
+    Jedes Kindelement des CityModel (v.a. cityObjectMember und featureMember) wird in einem Worker-Pool einzeln
+    serialisiert, lxml gibt dabei den GIL frei. Die Fragmente werden in ihrer Reihenfolge in die Datei geschrieben.
+    Bei gzip-Ausgabe (.gz) packen die Worker ihre Fragmente zusätzlich als eigene gzip-Blöcke, die aneinandergereiht
+    eine gültige gzip-Datei ergeben, sodass auch die Komprimierung parallel läuft.
+    """
+
+    # Anzahl der Fragmente je Aufgabe eines Workers
+    groupSize = 16
+
+    # Anzahl der Aufgaben je Worker, die gleichzeitig im Speicher gehalten werden
+    batchSize = 4
+
+    def __init__(self, pretty=True, workers=None, level=6):
+        """ Konstruktor der Model-Klasse zum Schreiben der CityGML-Struktur
+
+        Args:
+            pretty: Ob die Datei eingerückt geschrieben werden soll, als Boolean
+                Default: True
+            workers: Anzahl paralleler Worker, als Integer
+                Default: None (Anzahl der Prozessoren)
+            level: Komprimierungsstufe bei komprimierter Ausgabe von 1 (schnell) bis 9 (klein), als Integer
+                Default: 6
+        """
+        # Initialisierung von Attributen
+        self.pretty = pretty
+        self.level = level
+        self.workers = max(workers if workers is not None else (os.cpu_count() or 1), 1)
+
+    def shell(self, root):
+        """ Serialisiert das Wurzelelement ohne Kindelemente
+
+        Args:
+            root: XML-Element des CityModel
+
+        Returns:
+            Start- und End-Tag des Wurzelelements (inkl. Namespace-Deklarationen), als Tupel von Bytes
+        """
+        chShell = etree.Element(root.tag, attrib=dict(root.attrib), nsmap=root.nsmap)
+        chShell.text = "\n" if self.pretty else ""
+        data = etree.tostring(chShell, encoding="UTF-8")
+        ix = data.rindex(b"</")
+        return data[:ix], data[ix:]
+
+    def fragment(self, ch):
+        """ Serialisiert ein Kindelement des Wurzelelements
+
+        Die von lxml am Fragment wiederholten Namespace-Deklarationen des Wurzelelements werden entfernt. Beim
+        Einrücken wird das Fragment um eine Ebene eingerückt, außer es enthält mehrzeiligen Text, der sonst verändert
+        würde.
+
+        Args:
+            ch: Das Kindelement
+
+        Returns:
+            Das serialisierte Fragment, als Bytes
+        """
+        data = etree.tostring(ch, encoding="UTF-8", pretty_print=self.pretty, with_tail=False)
+        end = data.index(b">")
+        start = data[:end]
+        for prefix, uri in ch.getparent().nsmap.items():
+            decl = (' xmlns="' if prefix is None else ' xmlns:' + prefix + '="') + uri + '"'
+            start = start.replace(decl.encode("UTF-8"), b"", 1)
+        data = start + data[end:]
+        if not self.pretty or any("\n" in (chSub.text or "") + (chSub.tail or "") for chSub in ch.iterdescendants()):
+            return data
+        return b"  " + data.rstrip(b"\n").replace(b"\n", b"\n  ") + b"\n"
+
+    def group(self, chs, pack=False):
+        """ Serialisiert eine Gruppe von Kindelementen als zusammenhängenden Block
+
+        Args:
+            chs: Die Kindelemente, als Liste
+            pack: Ob der Block als gzip-Block gepackt werden soll, als Boolean
+                Default: False
+
+        Returns:
+            Der serialisierte Block, als Bytes
+        """
+        data = b"".join(self.fragment(ch) for ch in chs)
+        return gzip.compress(data, self.level, mtime=0) if pack else data
+
+    def fragments(self, root, pack=False):
+        """ Serialisiert die Kindelemente des Wurzelelements parallel, in Blöcken zur Begrenzung des Speicherbedarfs
+
+        Args:
+            root: XML-Element des CityModel
+            pack: Ob die Blöcke als gzip-Blöcke gepackt werden sollen, als Boolean
+                Default: False
+
+        Returns:
+            Die serialisierten Blöcke in ihrer Reihenfolge, als Generator von Bytes
+        """
+        children = [ch for ch in root if isinstance(ch.tag, str)]
+        groups = [children[i:i + self.groupSize] for i in range(0, len(children), self.groupSize)]
+        if self.workers == 1 or len(groups) < 2:
+            for chs in groups:
+                yield self.group(chs, pack)
+            return
+        size = self.workers * self.batchSize
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for i in range(0, len(groups), size):
+                for data in executor.map(lambda chs: self.group(chs, pack), groups[i:i + size]):
+                    yield data
+
+    def write(self, root, path):
+        """ Schreibt die CityGML-Struktur in eine ggf. komprimierte Datei (.gml, .gml.gz oder .zip)
+
+        Args:
+            root: XML-Element des CityModel
+            path: Pfad zur CityGML-Datei
+        """
+        if len(root) == 0:
+            start, end = etree.tostring(root, encoding="UTF-8", xml_declaration=True, pretty_print=self.pretty), b""
+        else:
+            start, end = self.shell(root)
+            start = b"<?xml version='1.0' encoding='UTF-8'?>\n" + start
+            end = end + b"\n" if self.pretty else end
+
+        # gzip: Komprimierung parallel in den Workern
+        if CompressedIO.compression(path) == "gzip":
+            with open(path, "wb") as file:
+                file.write(gzip.compress(start, self.level, mtime=0))
+                for data in self.fragments(root, True):
+                    file.write(data)
+                file.write(gzip.compress(end, self.level, mtime=0))
+            return
+
+        with CompressedIO.open(path, ".gml", self.level) as file:
+            file.write(start)
+            for data in self.fragments(root):
+                file.write(data)
+            file.write(end)
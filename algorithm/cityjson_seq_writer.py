@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import sys
+import json
+import gzip
+
+# XML-Bibliotheken
+# noinspection PyUnresolvedReferences
+from lxml.etree import QName
+
+# Plugin
+try:
+    from .cityjson_writer import CityJsonWriter
+    from .compressed_io import CompressedIO
+    from ..model.xmlns import XmlNs
+except ImportError:
+    sys.path.insert(0, '..')
+    from algorithm.cityjson_writer import CityJsonWriter
+    from algorithm.compressed_io import CompressedIO
+    from model.xmlns import XmlNs
+
+
+#####
+
+class CityJsonSeqWriter(CityJsonWriter):
+    """ Model-Klasse zum zeilenweisen Schreiben der Konverter-Ergebnisse als CityJSONSeq (CityJSON Text Sequence)
+
+    Die erste Zeile enthält Koordinatensystem und transform-Parameter, jede weitere Zeile ein fertiges Gebäude als
+    CityJSONFeature mit eigener Punktliste. Die Gebäude werden direkt nach ihrer Konvertierung geschrieben und aus der
+    CityGML-Struktur entfernt, sodass der Speicherbedarf nicht mit der Gebäudeanzahl wächst. ImplicitGeometries werden
+    ausmultipliziert, da Vorlagen im Kopf stehen müssten, der beim Streamen bereits geschrieben ist.
+    """
+
+    def __init__(self, path, epsg, translate, title=None, scale=0.001, level=6):
+        """ Konstruktor der Model-Klasse zum Schreiben von CityJSONSeq, schreibt direkt die Kopfzeile
+
+        Args:
+            path: Pfad zur CityJSONSeq-Datei
+            epsg: EPSG-Code des Koordinatensystems
+            translate: Verschiebung der quantisierten Punkte, als Liste der Länge 3 (z.B. die Datumsverschiebung)
+            title: Titel des Modells
+                Default: None
+            scale: Auflösung der quantisierten Punkte, als float
+                Default: 0.001
+            level: Komprimierungsstufe bei gzip-Ausgabe (.gz) von 1 (schnell) bis 9 (klein), als Integer
+                Default: 6
+        """
+        super().__init__(epsg, translate, scale)
+
+        # Initialisierung von Attributen
+        self.title = title
+        self.featureCount = 0
+        if CompressedIO.compression(path) == "gzip":
+            self.file = gzip.open(path, "wt", encoding="utf-8", compresslevel=level)
+        else:
+            self.file = open(path, "w", encoding="utf-8")
+        self.writeLine(self.header())
+
+    def header(self):
+        """ Erstellt die Kopfzeile
+
+        Returns:
+            Das CityJSON-Objekt ohne CityObjects und Punkte, als Dictionary
+        """
+        return {"type": "CityJSON", "version": self.version, "transform": self.transform(),
+                "metadata": self.metadata(), "CityObjects": {}, "vertices": []}
+
+    def writeLine(self, value):
+        """ Schreibt ein JSON-Objekt als Zeile und leert den Puffer, damit die Zeile sofort lesbar ist (bei gzip als
+        Sync-Flush, sodass auch der komprimierte Datenstrom bis hierhin entpackt werden kann)
+
+        Args:
+            value: Das JSON-Objekt, als Dictionary
+        """
+        self.file.write(json.dumps(value, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def implicitGeometry(self, chProp, lod, ids):
+        """ Wandelt eine ImplicitGeometry in eine MultiSurface mit Weltkoordinaten um
+
+        Args:
+            chProp: XML-Element der Eigenschaft (z.B. bldg:lod4ImplicitRepresentation)
+            lod: Level of Detail, als String
+            ids: Die XML-Elemente des Objekts nach GML-ID, als Dictionary
+
+        Returns:
+            Die MultiSurface, als Dictionary. None, falls unvollständig
+        """
+        chImpl = chProp.find(QName(XmlNs.core, "ImplicitGeometry"))
+        if chImpl is None:
+            return None
+        chMatrix = chImpl.find(QName(XmlNs.core, "transformationMatrix"))
+        chRel = chImpl.find(QName(XmlNs.core, "relativeGMLGeometry"))
+        chPos = chImpl.find(QName(XmlNs.core, "referencePoint").text + "//" + QName(XmlNs.gml, "pos").text)
+        if chRel is None or chPos is None:
+            return None
+        m = [float(value) for value in chMatrix.text.split()] if chMatrix is not None else \
+            [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0]
+        ref = [float(value) for value in chPos.text.split()[:3]]
+
+        def worldVertex(point):
+            return self.vertexIndex([m[4 * i] * point[0] + m[4 * i + 1] * point[1] + m[4 * i + 2] * point[2] +
+                                     m[4 * i + 3] + ref[i] for i in range(0, 3)])
+
+        polygons = self.boundaries(chRel, ids, worldVertex)
+        if len(polygons) == 0:
+            return None
+        return {"type": "MultiSurface", "lod": lod, "boundaries": polygons}
+
+    def addFeature(self, chObj):
+        """ Schreibt ein Gebäude samt untergeordneter Objekte als CityJSONFeature-Zeile
+
+        Args:
+            chObj: XML-Element des Gebäudes
+
+        Returns:
+            Die ID des CityJSONFeatures
+        """
+        objId = self.addObject(chObj)
+        self.writeLine({"type": "CityJSONFeature", "id": objId, "CityObjects": self.cityObjects,
+                        "vertices": self.vertices})
+        self.featureCount += 1
+        self.cityObjects, self.vertices, self.vertexIds = {}, [], {}
+        return objId
+
+    def addMember(self, root, chCOM, surfaces=None):
+        """ Schreibt ein fertig konvertiertes cityObjectMember und entfernt es aus der CityGML-Struktur
+
+        Die bis dahin angefügten geteilten Objekte (z.B. Konstruktionen der Energy ADE) werden zuvor eingelesen und
+        verbleiben in der Struktur, damit spätere Gebäude weiter auf sie verweisen können. Im Gebäude eingebettete
+        geteilte Objekte (z.B. Zeitpläne) werden vor dem Entfernen aufgelöst, nur ihr Wert wird behalten.
+
+        Args:
+            root: XML-Element des CityModel
+            chCOM: XML-Element des cityObjectMember
+            surfaces: Die Oberflächen des Gebäudes, als Liste von SurfaceArrays
+                Default: None (Geometrie aus der GML)
+        """
+        nested = self.addShared(root, chCOM)
+        self.addSurfaces(surfaces or [])
+        for chObj in chCOM:
+            if self.localName(chObj) in self.objectTypes:
+                self.addFeature(chObj)
+        self.surfaces = {}
+        for gmlId in nested:
+            self.sharedValue(gmlId)
+            del self.shared[gmlId]
+        root.remove(chCOM)
+
+    def close(self):
+        """ Schließt die CityJSONSeq-Datei """
+        if not self.file.closed:
+            self.file.close()
@@ -0,0 +1,689 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import re
+import sys
+import json
+import uuid
+import numpy as np
+
+# XML-Bibliotheken
+# noinspection PyUnresolvedReferences
+from lxml.etree import QName
+
+# Plugin
+try:
+    from .compressed_io import CompressedIO
+    from ..model.xmlns import XmlNs
+except ImportError:
+    sys.path.insert(0, '..')
+    from algorithm.compressed_io import CompressedIO
+    from model.xmlns import XmlNs
+
+
+#####
+
+class CityJsonWriter:
+    """ Model-Klasse zum Schreiben der von den Konvertern erzeugten CityGML-Struktur als CityJSON
+
+    Alle Punkte landen in einer gemeinsamen Punktliste. Sie werden über die transform-Parameter (scale/translate) auf
+    ganze Zahlen quantisiert und dabei zusammengeführt, sodass jeder Punkt nur einmal gespeichert wird. Oberflächen und
+    Öffnungen werden als Semantik, Räume, Bauteile und Einrichtungen als untergeordnete CityObjects übernommen. Liegen
+    die Oberflächen eines Gebäudes noch als SurfaceArray vor, werden ihre Punkte direkt aus den Arrays quantisiert statt
+    aus der GML gelesen.
+    """
+
+    # CityJSON-Version
+    version = "1.1"
+
+    # CityJSON-Typen der CityGML-Objekte
+    objectTypes = {"Building": "Building", "BuildingPart": "BuildingPart", "Room": "BuildingRoom",
+                   "BuildingInstallation": "BuildingInstallation", "IntBuildingInstallation": "BuildingInstallation",
+                   "BuildingFurniture": "BuildingFurniture"}
+
+    # Semantische Oberflächen und Öffnungen
+    surfaceTypes = ["GroundSurface", "WallSurface", "RoofSurface", "ClosureSurface", "OuterCeilingSurface",
+                    "OuterFloorSurface", "FloorSurface", "CeilingSurface", "InteriorWallSurface", "Window", "Door"]
+
+    # Zahlenwertige Gebäudeattribute
+    numericAttributes = ["measuredHeight", "storeysAboveGround", "storeysBelowGround"]
+
+    # Energy ADE-Eigenschaften, die nur Geometrie enthalten
+    geometryProperties = ["surfaceGeometry", "volumeGeometry", "position"]
+
+    # Energy ADE-Objekte, die innerhalb eines Gebäudes stehen und von späteren Gebäuden per XLink referenziert werden
+    sharedTypes = ["DualValueSchedule", "ConstantValueSchedule", "DailyPatternSchedule", "TimeSeriesSchedule",
+                   "WeatherData"]
+
+    def __init__(self, epsg, translate, scale=0.001):
+        """ Konstruktor der Model-Klasse zum Schreiben von CityJSON
+
+        Args:
+            epsg: EPSG-Code des Koordinatensystems
+            translate: Verschiebung der quantisierten Punkte, als Liste der Länge 3 (z.B. die Datumsverschiebung)
+            scale: Auflösung der quantisierten Punkte, als float
+                Default: 0.001
+        """
+        # Initialisierung von Attributen
+        self.epsg = epsg
+        self.scale = scale
+        self.translate = [float(value) if value is not None else 0.0 for value in translate]
+        self.title = None
+        self.vertices, self.vertexIds = [], {}
+        self.cityObjects = {}
+        self.templates, self.templateVertices, self.templateIds = [], [], {}
+        self.shared, self.sharedValues, self.resolving = {}, {}, set()
+        self.surfaces = {}
+
+    @staticmethod
+    def localName(ch):
+        """ Gibt den Namen eines XML-Elements ohne Namespace zurück
+
+        Args:
+            ch: Das XML-Element
+
+        Returns:
+            Der lokale Name, als String. None bei Kommentaren und Verarbeitungsanweisungen
+        """
+        return QName(ch).localname if isinstance(ch.tag, str) else None
+
+    @staticmethod
+    def toNumber(text):
+        """ Wandelt einen Text in eine Zahl um, falls möglich
+
+        Args:
+            text: Der Text
+
+        Returns:
+            Die Zahl als int oder float. Ansonsten der unveränderte Text
+        """
+        for cast in [int, float]:
+            try:
+                return cast(text)
+            except (TypeError, ValueError):
+                pass
+        return text
+
+    def vertexIndex(self, point):
+        """ Quantisiert einen Punkt und gibt seinen Index in der gemeinsamen Punktliste zurück
+
+        Args:
+            point: Der Punkt, als Liste der Länge 3
+
+        Returns:
+            Der Index des Punktes, als Integer
+        """
+        return self.keyIndex(tuple(int(round((float(value) - shift) / self.scale))
+                                   for value, shift in zip(point, self.translate)))
+
+    def vertexIndices(self, coords):
+        """ Quantisiert die Punkte eines Koordinaten-Arrays gemeinsam und gibt ihre Indizes in der Punktliste zurück
+
+        Args:
+            coords: Die Punkte, als Array der Form (n, 3)
+
+        Returns:
+            Die Indizes der Punkte, als Liste
+        """
+        keys = np.rint((np.asarray(coords, dtype=np.float64) - self.translate) / self.scale).astype(np.int64)
+        return [self.keyIndex(key) for key in map(tuple, keys.tolist())]
+
+    def keyIndex(self, key):
+        """ Gibt den Index eines quantisierten Punktes in der gemeinsamen Punktliste zurück, neue Punkte werden angefügt
+
+        Args:
+            key: Der quantisierte Punkt, als Tupel der Länge 3
+
+        Returns:
+            Der Index des Punktes, als Integer
+        """
+        index = self.vertexIds.get(key)
+        if index is None:
+            index = len(self.vertices)
+            self.vertexIds[key] = index
+            self.vertices.append(list(key))
+        return index
+
+    @staticmethod
+    def ringPoints(chRing):
+        """ Liest die Punkte eines GML-Rings (gml:pos oder gml:posList) ein
+
+        Args:
+            chRing: XML-Element des gml:LinearRing
+
+        Returns:
+            Die Punkte ohne den schließenden Punkt, als Liste von Listen der Länge 3
+        """
+        points = []
+        for chPos in chRing:
+            name = CityJsonWriter.localName(chPos)
+            if name == "pos":
+                points.append([float(value) for value in chPos.text.split()[:3]])
+            elif name == "posList":
+                dim = int(chPos.get("srsDimension", 3))
+                values = [float(value) for value in chPos.text.split()]
+                points += [values[i:i + 3] for i in range(0, len(values) - dim + 1, dim)]
+        if len(points) > 1 and points[0] == points[-1]:
+            points = points[:-1]
+        return points
+
+    def ring(self, chRing, vertexIndex=None):
+        """ Wandelt einen GML-Ring in eine Liste von Punktindizes um
+
+        Args:
+            chRing: XML-Element des gml:LinearRing
+            vertexIndex: Funktion, die einem Punkt seinen Index zuordnet
+                Default: None (gemeinsame, quantisierte Punktliste)
+
+        Returns:
+            Die Punktindizes ohne aufeinanderfolgende Duplikate, als Liste. None bei weniger als drei Punkten
+        """
+        vertexIndex = self.vertexIndex if vertexIndex is None else vertexIndex
+        return self.cleanRing([vertexIndex(point) for point in self.ringPoints(chRing)])
+
+    @staticmethod
+    def cleanRing(indices):
+        """ Entfernt aufeinanderfolgende Duplikate und den schließenden Punkt aus den Punktindizes eines Rings
+
+        Args:
+            indices: Die Punktindizes, als Liste
+
+        Returns:
+            Die bereinigten Punktindizes, als Liste. None bei weniger als drei verschiedenen Punkten
+        """
+        result = []
+        for index in indices:
+            if len(result) == 0 or result[-1] != index:
+                result.append(index)
+        if len(result) > 1 and result[0] == result[-1]:
+            result = result[:-1]
+        return result if len(set(result)) >= 3 else None
+
+    def polygon(self, chPoly, vertexIndex=None):
+        """ Wandelt ein GML-Polygon in CityJSON-Randlinien um
+
+        Args:
+            chPoly: XML-Element des gml:Polygon
+            vertexIndex: Funktion, die einem Punkt seinen Index zuordnet
+                Default: None (gemeinsame, quantisierte Punktliste)
+
+        Returns:
+            Die Ringe (Außenring zuerst), als Liste von Listen von Punktindizes. None bei entartetem Außenring
+        """
+        rings = []
+        for chBound in chPoly:
+            name = self.localName(chBound)
+            if name not in ["exterior", "interior"]:
+                continue
+            for chRing in chBound:
+                if self.localName(chRing) == "LinearRing":
+                    ring = self.ring(chRing, vertexIndex)
+                    if ring is None and name == "exterior":
+                        return None
+                    if ring is not None and name == "exterior":
+                        rings.insert(0, ring)
+                    elif ring is not None:
+                        rings.append(ring)
+        return rings if len(rings) > 0 else None
+
+    def polygons(self, ch, ids):
+        """ Sucht alle Polygone einer GML-Geometrie, auch über XLinks
+
+        Args:
+            ch: XML-Element der Geometrie oder einer Geometrie-Eigenschaft
+            ids: Die XML-Elemente des Objekts nach GML-ID, als Dictionary
+
+        Returns:
+            Die XML-Elemente der Polygone, als Liste
+        """
+        if self.localName(ch) == "Polygon":
+            return [ch]
+        href = ch.get(QName(XmlNs.xlink, "href"))
+        if href is not None:
+            target = ids.get(href.lstrip("#"))
+            return self.polygons(target, ids) if target is not None else []
+        result = []
+        for child in ch:
+            if isinstance(child.tag, str):
+                result += self.polygons(child, ids)
+        return result
+
+    def boundaries(self, ch, ids, vertexIndex=None):
+        """ Wandelt alle Polygone einer GML-Geometrie in CityJSON-Randlinien um
+
+        Args:
+            ch: XML-Element der Geometrie oder einer Geometrie-Eigenschaft
+            ids: Die XML-Elemente des Objekts nach GML-ID, als Dictionary
+            vertexIndex: Funktion, die einem Punkt seinen Index zuordnet
+                Default: None (gemeinsame, quantisierte Punktliste)
+
+        Returns:
+            Die Flächen, als Liste von Ringlisten
+        """
+        result = []
+        for chPoly in self.polygons(ch, ids):
+            polygon = self.polygon(chPoly, vertexIndex)
+            if polygon is not None:
+                result.append(polygon)
+        return result
+
+    def surfaceBoundaries(self, surface):
+        """ Wandelt die Polygone einer Oberfläche ohne Umweg über die GML in CityJSON-Randlinien um
+
+        Args:
+            surface: Die Oberfläche, als SurfaceArray
+
+        Returns:
+            Die Flächen, als Liste von Ringlisten
+        """
+        indices = self.vertexIndices(surface.coords)
+        ringOffsets, polyOffsets = surface.ringOffsets.tolist(), surface.polyOffsets.tolist()
+        result = []
+        for poly in range(0, surface.polygonCount):
+            rings = []
+            for ix in range(polyOffsets[poly], polyOffsets[poly + 1]):
+                ring = self.cleanRing(indices[ringOffsets[ix]:ringOffsets[ix + 1]])
+                if ring is None and ix == polyOffsets[poly]:
+                    break
+                if ring is not None:
+                    rings.append(ring)
+            if len(rings) > 0:
+                result.append(rings)
+        return result
+
+    def addSurfaces(self, surfaces):
+        """ Hinterlegt die Oberflächen eines Gebäudes samt Öffnungen, deren Geometrie dann aus den Arrays stammt
+
+        Args:
+            surfaces: Die Oberflächen, als Liste von SurfaceArrays
+        """
+        for surface in surfaces:
+            if surface.gmlId is not None:
+                self.surfaces[surface.gmlId] = surface
+            self.addSurfaces(surface.openings)
+
+    def addSurface(self, semantics, chSurf, ids, parents=None):
+        """ Übernimmt eine semantische Oberfläche (inkl. Öffnungen) in die Semantik der LoD-Geometrien
+
+        Args:
+            semantics: Die semantischen Geometrien je LoD, als Dictionary
+            chSurf: XML-Element der Oberfläche (z.B. bldg:WallSurface)
+            ids: Die XML-Elemente des Objekts nach GML-ID, als Dictionary
+            parents: Index der übergeordneten Oberfläche je LoD (bei Öffnungen), als Dictionary
+                Default: None
+        """
+        type = self.localName(chSurf)
+        surfaceArray = self.surfaces.get(chSurf.get(QName(XmlNs.gml, "id")))
+        indices = {}
+        for chProp in chSurf:
+            match = re.match(r"lod(\d)(MultiSurface|Geometry)$", self.localName(chProp) or "")
+            if match is None:
+                continue
+            polygons = self.boundaries(chProp, ids) if surfaceArray is None else self.surfaceBoundaries(surfaceArray)
+            if len(polygons) == 0:
+                continue
+            lod = match.group(1)
+            entry = semantics.setdefault(lod, {"boundaries": [], "surfaces": [], "values": []})
+            surface = {"type": type}
+            if parents is not None and lod in parents:
+                surface["parent"] = parents[lod]
+                entry["surfaces"][parents[lod]].setdefault("children", []).append(len(entry["surfaces"]))
+            indices[lod] = len(entry["surfaces"])
+            entry["surfaces"].append(surface)
+            entry["boundaries"] += polygons
+            entry["values"] += [indices[lod]] * len(polygons)
+
+        # Öffnungen
+        for chProp in chSurf:
+            if self.localName(chProp) == "opening":
+                for chOpening in chProp:
+                    if self.localName(chOpening) in self.surfaceTypes:
+                        self.addSurface(semantics, chOpening, ids, indices)
+
+    def template(self, chGeom, ids):
+        """ Übernimmt eine Vorlage einer ImplicitGeometry (einmalig je GML-ID)
+
+        Args:
+            chGeom: XML-Element von core:relativeGMLGeometry
+            ids: Die XML-Elemente des Objekts nach GML-ID, als Dictionary
+
+        Returns:
+            Der Index der Vorlage, als Integer. None, falls die Vorlage nicht gefunden wurde
+        """
+        href = chGeom.get(QName(XmlNs.xlink, "href"))
+        if href is not None:
+            return self.templateIds.get(href.lstrip("#"))
+        if len(chGeom) == 0:
+            return None
+        gmlId = chGeom[0].get(QName(XmlNs.gml, "id"))
+
+        def templateVertex(point):
+            self.templateVertices.append([float(value) for value in point])
+            return len(self.templateVertices) - 1
+
+        polygons = self.boundaries(chGeom, ids, templateVertex)
+        if len(polygons) == 0:
+            return None
+        self.templates.append({"type": "MultiSurface", "lod": "4", "boundaries": polygons})
+        if gmlId is not None:
+            self.templateIds[gmlId] = len(self.templates) - 1
+        return len(self.templates) - 1
+
+    def implicitGeometry(self, chProp, lod, ids):
+        """ Wandelt eine ImplicitGeometry in eine CityJSON-GeometryInstance um
+
+        Args:
+            chProp: XML-Element der Eigenschaft (z.B. bldg:lod4ImplicitRepresentation)
+            lod: Level of Detail, als String
+            ids: Die XML-Elemente des Objekts nach GML-ID, als Dictionary
+
+        Returns:
+            Die GeometryInstance, als Dictionary. None, falls unvollständig
+        """
+        chImpl = chProp.find(QName(XmlNs.core, "ImplicitGeometry"))
+        if chImpl is None:
+            return None
+        chMatrix = chImpl.find(QName(XmlNs.core, "transformationMatrix"))
+        chRel = chImpl.find(QName(XmlNs.core, "relativeGMLGeometry"))
+        chPos = chImpl.find(QName(XmlNs.core, "referencePoint").text + "//" + QName(XmlNs.gml, "pos").text)
+        if chRel is None or chPos is None:
+            return None
+        index = self.template(chRel, ids)
+        if index is None:
+            return None
+        matrix = [float(value) for value in chMatrix.text.split()] if chMatrix is not None else \
+            [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+        return {"type": "GeometryInstance", "lod": lod, "template": index,
+                "boundaries": [self.vertexIndex([float(value) for value in chPos.text.split()[:3]])],
+                "transformationMatrix": matrix}
+
+    def objectGeometry(self, chObj, ids):
+        """ Wandelt die Geometrien eines Objekts in CityJSON-Geometrien um
+
+        Liegen in einem LoD semantische Oberflächen vor, werden diese als MultiSurface mit Semantik übernommen und der
+        Körper desselben LoD (der auf dieselben Polygone verweist) übergangen.
+
+        Args:
+            chObj: XML-Element des Objekts
+            ids: Die XML-Elemente des Objekts nach GML-ID, als Dictionary
+
+        Returns:
+            Die Geometrien, als Liste von Dictionaries
+        """
+        semantics = {}
+        for chProp in chObj:
+            if self.localName(chProp) == "boundedBy":
+                for chSurf in chProp:
+                    if self.localName(chSurf) in self.surfaceTypes:
+                        self.addSurface(semantics, chSurf, ids)
+
+        geometries = []
+        for lod, entry in semantics.items():
+            geometries.append({"type": "MultiSurface", "lod": lod, "boundaries": entry["boundaries"],
+                               "semantics": {"surfaces": entry["surfaces"], "values": entry["values"]}})
+        for chProp in chObj:
+            match = re.match(r"lod(\d)(Solid|MultiSurface|Geometry|FootPrint|RoofEdge|ImplicitRepresentation)$",
+                             self.localName(chProp) or "")
+            if match is None or match.group(1) in semantics:
+                continue
+            lod, kind = match.group(1), match.group(2)
+            if kind == "ImplicitRepresentation":
+                geometry = self.implicitGeometry(chProp, lod, ids)
+                if geometry is not None:
+                    geometries.append(geometry)
+                continue
+            polygons = self.boundaries(chProp, ids)
+            if len(polygons) == 0:
+                continue
+            if kind == "Solid":
+                geometries.append({"type": "Solid", "lod": lod, "boundaries": [polygons]})
+            else:
+                geometries.append({"type": "MultiSurface", "lod": lod, "boundaries": polygons})
+        return geometries
+
+    def elementValue(self, ch):
+        """ Wandelt ein XML-Element (z.B. der Energy ADE) in einen JSON-Wert um
+
+        Eigenschaft und Objekt werden zusammengefasst, geteilte Objekte (Konstruktionen, Materialien, Wetterdaten,
+        Zeitpläne) und Verweise darauf durch deren Wert ersetzt. Geometrien werden übergangen.
+
+        Args:
+            ch: Das XML-Element
+
+        Returns:
+            Der Wert, als Zahl, String, Liste oder Dictionary
+        """
+        href = ch.get(QName(XmlNs.xlink, "href"))
+        if href is not None:
+            return self.sharedValue(href.lstrip("#"))
+        gmlId = ch.get(QName(XmlNs.gml, "id"))
+        if gmlId is not None and gmlId not in self.resolving and self.shared.get(gmlId) is ch:
+            return self.sharedValue(gmlId)
+        children = [child for child in ch if isinstance(child.tag, str)]
+        if len(children) == 0:
+            return self.toNumber(ch.text)
+        name = self.localName(ch)
+        if len(children) == 1 and name[0].islower() and self.localName(children[0])[0].isupper():
+            return self.elementValue(children[0])
+
+        # Mehrfach vorkommende Elemente als Liste
+        names = [self.localName(child) for child in children]
+        value = {}
+        for child, childName in zip(children, names):
+            if QName(child).namespace in [XmlNs.gml, XmlNs.bldg] and childName not in ["name", "description"]:
+                continue
+            if childName in self.geometryProperties:
+                continue
+            if names.count(childName) > 1:
+                value.setdefault(childName, []).append(self.elementValue(child))
+            else:
+                value[childName] = self.elementValue(child)
+        return value
+
+    def sharedValue(self, gmlId):
+        """ Gibt den Wert eines geteilten Objekts (featureMember oder Zeitplan/Wetterdaten eines vorigen Gebäudes)
+        zurück, mit Zwischenspeicherung
+
+        Args:
+            gmlId: GML-ID des Objekts
+
+        Returns:
+            Der Wert. Der Verweis als String, falls kein geteiltes Objekt vorliegt oder es auf sich selbst verweist
+        """
+        if gmlId in self.sharedValues:
+            return self.sharedValues[gmlId]
+        if gmlId not in self.shared or gmlId in self.resolving:
+            return "#" + gmlId
+        self.resolving.add(gmlId)
+        try:
+            chShared = self.shared[gmlId]
+            value = self.elementValue(chShared)
+        finally:
+            self.resolving.discard(gmlId)
+        self.sharedValues[gmlId] = dict({"type": self.localName(chShared)}, **value) if isinstance(value, dict) \
+            else value
+        return self.sharedValues[gmlId]
+
+    def objectAttributes(self, chObj, cityObject):
+        """ Übernimmt die Attribute eines Objekts (inkl. Adresse, generischer Attribute und Energy ADE)
+
+        Args:
+            chObj: XML-Element des Objekts
+            cityObject: Das CityObject, als Dictionary
+        """
+        attributes = cityObject["attributes"]
+        for chProp in chObj:
+            name = self.localName(chProp)
+            if name is None:
+                continue
+            namespace = QName(chProp).namespace
+            if namespace == XmlNs.energy:
+                value = self.elementValue(chProp)
+                key = "energy:" + name
+                attributes[key] = value if key not in attributes else \
+                    (attributes[key] if isinstance(attributes[key], list) else [attributes[key]]) + [value]
+            elif namespace == XmlNs.gen:
+                chValue = chProp.find(QName(XmlNs.gen, "value"))
+                if chProp.get("name") is not None and chValue is not None:
+                    attributes[chProp.get("name")] = chValue.text if name == "stringAttribute" else \
+                        self.toNumber(chValue.text)
+            elif name == "address":
+                address = {self.localName(ch): ch.text for ch in chProp.iter() if
+                           isinstance(ch.tag, str) and len(ch) == 0 and ch.text is not None and ch.text.strip()}
+                if len(address) > 0:
+                    cityObject.setdefault("address", []).append(address)
+            elif len(chProp) == 0 and chProp.text is not None and chProp.text.strip() != "":
+                numeric = chProp.get("uom") is not None or name in self.numericAttributes
+                attributes[name] = self.toNumber(chProp.text) if numeric else chProp.text
+
+    def addObject(self, chObj, ids=None, parentId=None):
+        """ Übernimmt ein CityGML-Objekt samt untergeordneter Objekte als CityObjects
+
+        Args:
+            chObj: XML-Element des Objekts (z.B. bldg:Building)
+            ids: Die XML-Elemente des Objekts nach GML-ID, als Dictionary
+                Default: None (aus dem Objekt berechnet)
+            parentId: ID des übergeordneten CityObjects
+                Default: None
+
+        Returns:
+            Die ID des CityObjects
+        """
+        if ids is None:
+            gmlIdTag = QName(XmlNs.gml, "id")
+            ids = {ch.get(gmlIdTag): ch for ch in chObj.iter() if isinstance(ch.tag, str) and ch.get(gmlIdTag)}
+        objId = chObj.get(QName(XmlNs.gml, "id")) or "ID_" + str(uuid.uuid4())
+        cityObject = {"type": self.objectTypes[self.localName(chObj)], "attributes": {}}
+        self.cityObjects[objId] = cityObject
+        if parentId is not None:
+            cityObject["parents"] = [parentId]
+            self.cityObjects[parentId].setdefault("children", []).append(objId)
+
+        self.objectAttributes(chObj, cityObject)
+        cityObject["geometry"] = self.objectGeometry(chObj, ids)
+        if len(cityObject["attributes"]) == 0:
+            del cityObject["attributes"]
+
+        # Untergeordnete Objekte (Gebäudeteile, Räume, Bauteile, Einrichtungen)
+        for chProp in chObj:
+            for chChild in chProp:
+                if self.localName(chProp) != "boundedBy" and self.localName(chChild) in self.objectTypes:
+                    self.addObject(chChild, ids, objId)
+        return objId
+
+    def addShared(self, root, chCOM=None):
+        """ Liest den Titel und die geteilten Objekte einer CityGML-Struktur ein
+
+        Neben den featureMembers zählen dazu die Zeitpläne und Wetterdaten der Energy ADE, die im ersten Gebäude
+        geschrieben und von späteren Gebäuden per XLink referenziert werden.
+
+        Args:
+            root: XML-Element des CityModel
+            chCOM: XML-Element des cityObjectMember, in dem nach eingebetteten geteilten Objekten gesucht wird
+                Default: None (gesamte CityGML-Struktur)
+
+        Returns:
+            Die eingebetteten geteilten Objekte nach GML-ID, als Dictionary
+        """
+        gmlIdTag = QName(XmlNs.gml, "id")
+        for chMember in root:
+            name = self.localName(chMember)
+            if name == "name" and self.title is None:
+                self.title = chMember.text
+            elif name == "featureMember":
+                for chShared in chMember:
+                    if chShared.get(gmlIdTag) is not None:
+                        self.shared[chShared.get(gmlIdTag)] = chShared
+
+        # Eingebettete Zeitpläne und Wetterdaten
+        nested = {}
+        for chShared in (root if chCOM is None else chCOM).iter(*[QName(XmlNs.energy, name).text
+                                                                   for name in self.sharedTypes]):
+            if chShared.get(gmlIdTag) is not None:
+                nested[chShared.get(gmlIdTag)] = chShared
+        self.shared.update(nested)
+        return nested
+
+    def addRoot(self, root):
+        """ Übernimmt alle Objekte einer CityGML-Struktur
+
+        Geteilte Objekte (featureMember, z.B. Konstruktionen der Energy ADE) werden vorab eingelesen, damit die
+        Gebäude sie über ihre Verweise einbinden können.
+
+        Args:
+            root: XML-Element des CityModel
+        """
+        self.addShared(root)
+        for chMember in root:
+            if self.localName(chMember) == "cityObjectMember":
+                for chObj in chMember:
+                    if self.localName(chObj) in self.objectTypes:
+                        self.addObject(chObj)
+
+    def addMember(self, root, chCOM, surfaces=None):
+        """ Übernimmt ein fertig konvertiertes cityObjectMember, das in der CityGML-Struktur verbleibt
+
+        Args:
+            root: XML-Element des CityModel
+            chCOM: XML-Element des cityObjectMember
+            surfaces: Die Oberflächen des Gebäudes, als Liste von SurfaceArrays
+                Default: None (Geometrie aus der GML)
+        """
+        self.addShared(root, chCOM)
+        self.addSurfaces(surfaces or [])
+        for chObj in chCOM:
+            if self.localName(chObj) in self.objectTypes:
+                self.addObject(chObj)
+        self.surfaces = {}
+
+    def transform(self):
+        """ Gibt die transform-Parameter der quantisierten Punkte zurück
+
+        Returns:
+            Die transform-Parameter, als Dictionary
+        """
+        return {"scale": [self.scale] * 3, "translate": self.translate}
+
+    def metadata(self):
+        """ Gibt die Metadaten zurück
+
+        Returns:
+            Die Metadaten (Koordinatensystem und ggf. Titel), als Dictionary
+        """
+        metadata = {"referenceSystem": "https://www.opengis.net/def/crs/EPSG/0/" + str(self.epsg)}
+        if self.title is not None:
+            metadata["title"] = self.title
+        return metadata
+
+    def toJson(self):
+        """ Erstellt das CityJSON-Dokument
+
+        Returns:
+            Das CityJSON-Dokument, als Dictionary
+        """
+        result = {"type": "CityJSON", "version": self.version, "transform": self.transform(),
+                  "metadata": self.metadata(), "CityObjects": self.cityObjects, "vertices": self.vertices}
+        if len(self.templates) > 0:
+            result["geometry-templates"] = {"templates": self.templates, "vertices-templates": self.templateVertices}
+        return result
+
+    def write(self, path, level=6):
+        """ Schreibt das CityJSON-Dokument in eine ggf. komprimierte Datei (.json oder .json.gz)
+
+        Args:
+            path: Pfad zur CityJSON-Datei
+            level: Komprimierungsstufe bei komprimierter Ausgabe von 1 (schnell) bis 9 (klein), als Integer
+                Default: 6
+        """
+        with CompressedIO.open(path, ".json", level) as file:
+            file.write(json.dumps(self.toJson(), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import os
+import gzip
+import zipfile
+from contextlib import contextmanager
+
+# IFC-Bibliotheken
+import ifcopenshell
+
+
+#####
+
+class CompressedIO:
+    """ Model-Klasse mit Werkzeugen zum transparenten Lesen und Schreiben komprimierter Dateien (gzip und ZIP)
+
+    Komprimierte Dateien werden als Datenstrom entpackt bzw. gepackt, ohne temporäre Dateien anzulegen. Eine ZIP-Datei
+    enthält genau eine Datei, deren Name sich aus dem Namen des Archivs ergibt.
+    """
+
+    @staticmethod
+    def compression(path):
+        """ Bestimmt die Komprimierung einer Datei anhand ihrer Endung
+
+        Args:
+            path: Pfad zur Datei
+
+        Returns:
+            "gzip" (Endung .gz), "zip" (Endungen .zip und .ifczip) oder None
+        """
+        lower = path.lower()
+        if lower.endswith(".gz"):
+            return "gzip"
+        if lower.endswith(".zip") or lower.endswith(".ifczip"):
+            return "zip"
+        return None
+
+    @staticmethod
+    def plainPath(path, suffix):
+        """ Gibt den Pfad ohne Komprimierungsendung zurück, aus dem sich das eigentliche Dateiformat ergibt
+
+        Args:
+            path: Pfad zur ggf. komprimierten Datei
+            suffix: Endung der in einem ZIP-Archiv enthaltenen Datei (z.B. ".gml" oder ".ifc")
+
+        Returns:
+            Der Pfad der unkomprimierten Datei, als String (z.B. "a.gml.gz" -> "a.gml", "a.ifczip" -> "a.ifc")
+        """
+        compression = CompressedIO.compression(path)
+        if compression == "gzip":
+            return path[:-3]
+        if compression == "zip":
+            return os.path.splitext(path)[0] + suffix
+        return path
+
+    @staticmethod
+    def baseName(path, suffix):
+        """ Gibt den Dateinamen ohne Verzeichnis, Komprimierungs- und Formatendung zurück
+
+        Args:
+            path: Pfad zur ggf. komprimierten Datei
+            suffix: Endung der in einem ZIP-Archiv enthaltenen Datei (z.B. ".gml" oder ".ifc")
+
+        Returns:
+            Der Dateiname, als String (z.B. "/a/b.gml.gz" -> "b")
+        """
+        return os.path.splitext(os.path.basename(CompressedIO.plainPath(path, suffix)))[0]
+
+    @staticmethod
+    def readIfc(path):
+        """ Liest eine ggf. komprimierte IFC-Datei (.ifc, .ifc.gz, .ifczip oder .zip) ein
+
+        Args:
+            path: Pfad zur IFC-Datei
+
+        Returns:
+            Eingelesene IFC-Datei
+        """
+        compression = CompressedIO.compression(path)
+        if compression is None:
+            return ifcopenshell.open(path)
+        if compression == "gzip":
+            with gzip.open(path, "rb") as file:
+                data = file.read()
+        else:
+            with zipfile.ZipFile(path) as archive:
+                names = [name for name in archive.namelist() if name.lower().endswith(".ifc")]
+                if len(names) == 0:
+                    raise ValueError("No IFC file in archive: " + path)
+                data = archive.read(names[0])
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            text = data.decode("latin-1")
+        return ifcopenshell.file.from_string(text)
+
+    @staticmethod
+    @contextmanager
+    def open(path, suffix, level=6):
+        """ Öffnet eine ggf. komprimierte Datei zum binären Schreiben
+
+        Args:
+            path: Pfad zur Datei
+            suffix: Endung der in einem ZIP-Archiv enthaltenen Datei (z.B. ".gml")
+            level: Komprimierungsstufe von 1 (schnell) bis 9 (klein), als Integer
+                Default: 6
+
+        Returns:
+            Die geöffnete Datei, als Kontextmanager
+        """
+        compression = CompressedIO.compression(path)
+        if compression == "gzip":
+            with gzip.open(path, "wb", compresslevel=level) as file:
+                yield file
+        elif compression == "zip":
+            with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=level) as archive:
+                name = os.path.basename(CompressedIO.plainPath(path, suffix))
+                with archive.open(name, "w", force_zip64=True) as file:
+                    yield file
+        else:
+            with open(path, "wb") as file:
+                yield file
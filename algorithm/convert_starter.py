@@ -11,11 +11,8 @@
 #####
 
 # Standard-Bibliotheken
+import os
 import sys
-import platform
-
-# IFC-Bibliotheken
-import ifcopenshell
 
 # XML-Bibliotheken
 from lxml import etree
@@ -28,6 +25,12 @@ from qgis.PyQt.QtCore import QCoreApplication, pyqtSignal
 
 # Plugin
 from .transformer import Transformer
+from .cost_model import CostModel
+from .compressed_io import CompressedIO
+from .cgml_writer import CityGmlWriter
+from .cityjson_writer import CityJsonWriter
+from .cityjson_seq_writer import CityJsonSeqWriter
+from .gpkg_writer import GpkgWriter
 from .converter_lod0 import LoD0Converter
 from .converter_lod1 import LoD1Converter
 from .converter_lod2 import LoD2Converter
@@ -49,17 +52,30 @@ class ConvertStarter(QgsTask):
 
     logging = pyqtSignal(str)
 
-    def __init__(self, description, parent, inPath, outPath, lod, eade, integr):
+    def __init__(self, description, parent, inPath, outPath, lod, eade, integr, dryRun=False, xlink=True, pretty=True,
+                 level=6, spaceBoundaries=False):
         """ Konstruktor der Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien
 
         Args:
             description: Beschreibung des QgsTasks
             parent: Die zugrunde liegende zentrale Model-Klasse
-            inPath: Pfad zur IFC-Datei
-            outPath: Pfad zur CityGML-Datei
+            inPath: Pfad zur IFC-Datei (auch komprimiert als .ifczip, .ifc.gz oder .zip)
+            outPath: Pfad zur CityGML-Datei (bzw. zur CityJSON-Datei bei Endung .json, CityJSONSeq bei .jsonl,
+                GeoPackage bei .gpkg), zusätzlich komprimiert mit Endung .gz bzw. als .zip (CityGML)
             lod: Gewähltes Level of Detail (LoD), als Integer
             eade: Ob die EnergyADE gewählt wurde, als Boolean
             integr: Ob die QGIS-Integration gewählt wurde, als Boolean
+            dryRun: Ob nur die Vorab-Analyse des Aufwands ausgegeben werden soll (Probelauf), als Boolean
+                Default: False
+            xlink: Ob die EnergyADE Gebäudegeometrien per XLink referenziert statt sie zu kopieren, als Boolean
+                Default: True
+            pretty: Ob die CityGML-Datei eingerückt geschrieben werden soll, als Boolean
+                Default: True
+            level: Komprimierungsstufe bei komprimierter Ausgabe von 1 (schnell) bis 9 (klein), als Integer
+                Default: 6
+            spaceBoundaries: Ob die LoD3-Außenhülle aus den Randflächen der Räume berechnet werden soll (innere Hülle),
+                als Boolean
+                Default: False
         """
         super().__init__(description, QgsTask.CanCancel)
 
@@ -67,6 +83,11 @@ class ConvertStarter(QgsTask):
         self.parent = parent
         self.inPath, self.outPath = inPath, outPath
         self.lod, self.eade, self.integr = lod, eade, integr
+        self.dryRun = dryRun
+        self.xlink = xlink
+        self.pretty = pretty
+        self.level = level
+        self.spaceBoundaries = spaceBoundaries
 
     @staticmethod
     def tr(msg):
@@ -91,8 +112,7 @@ class ConvertStarter(QgsTask):
 
         root = self.createSchema()
         trans = Transformer(ifc)
-        slash = "/" if platform.system() == "Linux" else "\\"
-        name = self.outPath[self.outPath.rindex(slash) + 1:-4]
+        name = CompressedIO.baseName(self.outPath, ".gml")
         if self.lod >= 3 or (self.lod == 2 and self.eade):
             self.setProgress(5)
         else:
@@ -101,6 +121,16 @@ class ConvertStarter(QgsTask):
         if self.isCanceled():
             return False
 
+        # Vorab-Analyse des Aufwands
+        costModel = CostModel(ifc, self.lod, self.eade)
+        report = costModel.report()
+        if self.dryRun:
+            for line in report:
+                self.logging.emit(line)
+            self.finished(True)
+            return True
+        self.logging.emit(self.tr(u'Estimated conversion time') + ": " + report[0])
+
         # Eigentliche Konvertierung: Unterscheidung nach den LoD
         dedConv = None
         if self.lod == 0:
@@ -113,14 +143,39 @@ class ConvertStarter(QgsTask):
             dedConv = LoD3Converter(self, ifc, name, trans, self.eade)
         elif self.lod == 4:
             dedConv = LoD4Converter(self, ifc, name, trans, self.eade)
-        root = dedConv.convert(root)
+        dedConv.costModel = costModel
+        dedConv.xlink = self.xlink
+        dedConv.spaceBoundaries = self.spaceBoundaries
+        if self.isCityJsonSeq():
+            dedConv.stream = CityJsonSeqWriter(self.outPath, trans.epsg, trans.originShift, name, level=self.level)
+        elif self.isCityJson():
+            dedConv.stream = CityJsonWriter(trans.epsg, trans.originShift)
+        costModel.start()
+        try:
+            root = dedConv.convert(root)
+        finally:
+            if self.isCityJsonSeq():
+                dedConv.stream.close()
 
         if self.isCanceled():
             return False
 
-        # Schreiben der CityGML in eine Datei
-        self.logging.emit(self.tr(u'CityGML file is generated'))
-        self.writeCGML(root)
+        # Schreiben der CityGML bzw. CityJSON in eine Datei (CityJSONSeq wurde bereits gebäudeweise geschrieben)
+        if self.isCityJsonSeq():
+            self.logging.emit(self.tr(u'CityJSONSeq file is completed'))
+        elif self.isGpkg():
+            self.logging.emit(self.tr(u'GeoPackage file is generated'))
+        elif self.isCityJson():
+            self.logging.emit(self.tr(u'CityJSON file is generated'))
+            self.writeCityJson(dedConv.stream)
+        else:
+            self.logging.emit(self.tr(u'CityGML file is generated'))
+            self.writeCGML(root, costModel.workers())
+
+        # GeoPackage als Ausgabe bzw. für die QGIS-Integration begleitend zur Ausgabe
+        gpkg = GpkgWriter(trans.epsg)
+        if self.isGpkg() or (self.integr and not self.isCityJsonSeq()):
+            gpkg.write(root, self.getGpkgPath())
         if self.isCanceled():
             return False
         if self.lod >= 3 or (self.lod == 2 and self.eade):
@@ -128,10 +183,12 @@ class ConvertStarter(QgsTask):
         else:
             self.setProgress(95)
 
-        # Integration der CityGML in QGIS
-        if self.integr:
+        # Integration des GeoPackages in QGIS
+        if self.integr and self.isCityJsonSeq():
+            self.logging.emit(self.tr(u'CityJSONSeq files cannot be integrated into QGIS'))
+        elif self.integr:
             self.logging.emit(self.tr(u'Model is integrated into QGIS'))
-            self.parent.gis.loadIntoGIS(self.outPath)
+            self.parent.gis.loadIntoGIS(self.getGpkgPath(), gpkg.getHeights())
 
         # Abschließen
         self.finished(True)
@@ -139,15 +196,15 @@ class ConvertStarter(QgsTask):
 
     @staticmethod
     def readIfc(path):
-        """ Liest eine IFC-Datei ein
+        """ Liest eine ggf. komprimierte IFC-Datei ein, komprimierte Dateien werden im Speicher entpackt
 
         Args:
-            path: Pfad zur IFC-Datei
+            path: Pfad zur IFC-Datei (.ifc, .ifc.gz, .ifczip oder .zip)
 
         Returns:
             Eingelesene IFC-Datei
         """
-        return ifcopenshell.open(path)
+        return CompressedIO.readIfc(path)
 
     @staticmethod
     def createSchema():
@@ -161,13 +218,63 @@ class ConvertStarter(QgsTask):
                                     'grp': XmlNs.grp, 'app': XmlNs.app, 'gml': XmlNs.gml, 'xAL': XmlNs.xAL,
                                     'xlink': XmlNs.xlink, 'xsi': XmlNs.xsi, 'energy': XmlNs.energy})
 
-    def writeCGML(self, root):
-        """ Schreibt die XML-Struktur in eine GML-Datei
+    def writeCGML(self, root, workers=None):
+        """ Schreibt die XML-Struktur in eine GML-Datei, die Fragmente der Gebäude werden parallel serialisiert
 
         Args:
             root: XML-Element
+            workers: Anzahl paralleler Worker, als Integer
+                Default: None (Anzahl der Prozessoren)
+        """
+        CityGmlWriter(self.pretty, workers=workers, level=self.level).write(root, self.outPath)
+
+    def getPlainPath(self):
+        """ Gibt den Ausgabepfad ohne Komprimierungsendung zurück, aus dem sich das Ausgabeformat ergibt
+
+        Returns:
+            Ausgabepfad ohne Komprimierungsendung (ZIP-Archive enthalten eine CityGML-Datei), als String
+        """
+        return CompressedIO.plainPath(self.outPath, ".gml")
+
+    def isCityJson(self):
+        """ Gibt zurück, ob als CityJSON geschrieben werden soll (Endung .json oder .jsonl)
+
+        Returns:
+            Ob CityJSON geschrieben werden soll, als Boolean
+        """
+        return self.getPlainPath().lower().endswith(".json") or self.isCityJsonSeq()
+
+    def isGpkg(self):
+        """ Gibt zurück, ob statt CityGML nur ein GeoPackage geschrieben werden soll (Endung .gpkg)
+
+        Returns:
+            Ob nur ein GeoPackage geschrieben werden soll, als Boolean
+        """
+        return self.outPath.lower().endswith(".gpkg")
+
+    def getGpkgPath(self):
+        """ Gibt den Pfad zum GeoPackage zurück, bei anderen Formaten neben der Ausgabedatei
+
+        Returns:
+            Pfad zum GeoPackage, als String
+        """
+        return self.outPath if self.isGpkg() else os.path.splitext(self.getPlainPath())[0] + ".gpkg"
+
+    def isCityJsonSeq(self):
+        """ Gibt zurück, ob gebäudeweise als CityJSONSeq geschrieben werden soll (Endung .jsonl)
+
+        Returns:
+            Ob CityJSONSeq geschrieben werden soll, als Boolean
+        """
+        return self.getPlainPath().lower().endswith(".jsonl")
+
+    def writeCityJson(self, writer):
+        """ Schreibt die während der Konvertierung gebäudeweise übernommenen Objekte als CityJSON-Datei
+
+        Args:
+            writer: Der CityJSON-Writer, an den die Konverter die fertigen Gebäude übergeben haben
         """
-        etree.ElementTree(root).write(self.outPath, xml_declaration=True, encoding="UTF-8", pretty_print=True)
+        writer.write(self.outPath, self.level)
 
     def finished(self, result):
         """ EventListener, wenn die Konvertierung abgeschlossen wurde
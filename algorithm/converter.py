@@ -13,13 +13,12 @@
 # Standard-Bibliotheken
 import sys
 import uuid
+import numpy as np
 from datetime import datetime
 
 # IFC-Bibliotheken
-import ifcopenshell
-import ifcopenshell.util.pset
 from ifcopenshell.util import element
-import ifcopenshell.geom
+import ifcopenshell.util.unit
 
 # XML-Bibliotheken
 from lxml import etree
@@ -36,13 +35,30 @@ from osgeo import ogr
 # Plugin
 from .utilitiesGeom import UtilitiesGeom
 from .utilitiesIfc import UtilitiesIfc
+from .utilitiesMesh import UtilitiesMesh
+from .exterior_map import ExteriorMap
+from .half_edge_mesh import HalfEdgeMesh
+from .height_estimator import HeightEstimator
+from .tessellation_profile import TessellationProfile
+from .time_budget import TimeBudget, BudgetExceeded, ConversionCanceled
+from .cost_model import CostModel
 try:
     from ..model.xmlns import XmlNs
     from ..model.mapper import Mapper
+    from ..model.facet_set import FacetSet
+    from ..model.surface_array import SurfaceArray
+    from ..model.construction_registry import ConstructionRegistry
+    from ..model.site_registry import SiteRegistry
+    from ..model.envelope import Envelope
 except ImportError:
     sys.path.insert(0, '..')
     from model.xmlns import XmlNs
     from model.mapper import Mapper
+    from model.facet_set import FacetSet
+    from model.surface_array import SurfaceArray
+    from model.construction_registry import ConstructionRegistry
+    from model.site_registry import SiteRegistry
+    from model.envelope import Envelope
 
 
 #####
@@ -51,6 +67,15 @@ except ImportError:
 class Converter(QgsTask):
     """ Abstrakte Model-Klasse mit Werkzeugen zum Konvertieren von IFC-Dateien zu CityGML-Dateien in allen LoD """
 
+    # Level of Detail (LoD) des Konverters
+    lod = 0
+
+    # Konverter-Klasse des nächstniedrigeren LoD bei Überschreitung des Zeitbudgets (None: ohne Zeitbudget)
+    fallback = None
+
+    # Eingangsgrößen des Kostenmodells, deren Aufwand der Konverter in eigenen Berechnungsschritten fortschreibt
+    stageKeys = ["base"]
+
     def __init__(self, task, ifc, name, trans, eade):
         """ Konstruktor der Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien in LoD2
 
@@ -69,8 +94,16 @@ class Converter(QgsTask):
         self.name = name
         self.trans = trans
         self.eade = eade
-        self.geom, self.bldgGeom = ogr.Geometry(ogr.wkbGeometryCollection), ogr.Geometry(ogr.wkbGeometryCollection)
-        self.progress, self.bldgCount = 0, 1
+        self.unitScale = ifcopenshell.util.unit.calculate_unit_scale(ifc)
+        self.envelope = Envelope()
+        self.progress, self.progressSpan, self.bldgCount = 0, 85, 1
+        self.costModel, self.bldgShare, self.stageShares = None, 1, {"base": 1.0}
+        self.xlink, self.spaceBoundaries = True, False
+        self.registry = ConstructionRegistry()
+        self.siteRegistry = SiteRegistry()
+        self.stream = None
+        self.facets = {}
+        self.exteriorMaps = {}
 
     @staticmethod
     def tr(msg):
@@ -93,19 +126,19 @@ class Converter(QgsTask):
         return root
 
     @staticmethod
-    def convertBound(geometry, chBound, trans):
+    def convertBound(envelope, chBound, trans):
         """ Konvertiert die Bounding Box
 
         Args:
-            geometry: Die konvertierten Geometrien, als GeometryCollection
+            envelope: Die Bounding Box der konvertierten Geometrien, als Envelope
             chBound: XML-Objekt, an das die Bounding Box angehängt werden soll
             trans: Transformer-Objekt
 
         Returns:
-            Die ergebene Bounding Box-Geometrie
+            Die ergebene Bounding Box, als Tupel (minX, maxX, minY, maxY, minZ, maxZ)
         """
         # Prüfung, ob Geometrien vorhanden
-        if geometry.GetGeometryCount() == 0:
+        if envelope.isEmpty():
             return
 
         # XML-Struktur
@@ -118,7 +151,7 @@ class Converter(QgsTask):
         chBoundEnvUC.set("srsDimension", "3")
 
         # Envelope-Berechnung
-        env = geometry.GetEnvelope3D()
+        env = envelope.bounds
         chBoundEnvLC.text = str(env[0]) + " " + str(env[2]) + " " + str(env[4])
         chBoundEnvUC.text = str(env[1]) + " " + str(env[3]) + " " + str(env[5])
 
@@ -358,6 +391,9 @@ class Converter(QgsTask):
     def calcHeight(ifc, ifcBuilding):
         """ Berechnet die Gebäudehöhe als Differenz zwischen tiefstem und höchstem Punkt
 
+        Die Höhe wird aus Qto-Mengen, Bounding Boxes bzw. Extrusionen oder Geschosshöhen abgeleitet, tesselliert
+        werden nur Bauteile ohne auswertbare Repräsentation.
+
         Args:
             ifc: IFC-Datei
             ifcBuilding: IFC-Gebäude, dessen Höhe berechnet werden soll
@@ -365,44 +401,8 @@ class Converter(QgsTask):
         Returns:
             Die Gebäudehöhe bzw. None, wenn sie nicht berechnet werden kann
         """
-        # Grundfläche
-        ifcSlabs = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcSlab", result=[], type="BASESLAB")
-        if len(ifcSlabs) == 0:
-            ifcSlabs = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcSlab", result=[], type="FLOOR")
-            # Wenn Grundfläche nicht vorhanden
-            if len(ifcSlabs) == 0:
-                return None
-
-        # Dächer
-        ifcRoofs = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcSlab", result=[], type="ROOF")
-        if len(ifcRoofs) == 0:
-            ifcRoofs = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcRoof", result=[])
-            # Wenn Dach nicht vorhanden
-            if len(ifcRoofs) == 0:
-                return None
-
-        # Berechnung der Minimalhöhe
-        settings = ifcopenshell.geom.settings()
-        settings.set(settings.USE_WORLD_COORDS, True)
-        minHeight = sys.maxsize
-        for ifcSlab in ifcSlabs:
-            shape = ifcopenshell.geom.create_shape(settings, ifcSlab)
-            verts = shape.geometry.verts
-            for i in range(2, len(verts), 3):
-                if verts[2] < minHeight:
-                    minHeight = verts[2]
-
-        # Berechnung der Maximalhöhe
-        maxHeight = -sys.maxsize
-        for ifcRoof in ifcRoofs:
-            shape = ifcopenshell.geom.create_shape(settings, ifcRoof)
-            verts = shape.geometry.verts
-            for i in range(2, len(verts), 3):
-                if verts[i] > maxHeight:
-                    maxHeight = verts[i]
-
-        height = maxHeight - minHeight
-        return height
+        # Mengenangaben und Repräsentationen zuerst, Tessellierung nur bei Bedarf
+        return HeightEstimator.calcHeight(ifc, ifcBuilding)
 
     @staticmethod
     def convertAddress(ifcBuilding, ifcSite, chBldg):
@@ -473,99 +473,411 @@ class Converter(QgsTask):
         return True
 
     @staticmethod
-    def calcPlane(ifcElements, trans):
+    def tessellate(ifcElement, trans, profile=TessellationProfile.DETAIL):
+        """ Tesselliert ein IFC-Element und georeferenziert die Dreiecke
+
+        Args:
+            ifcElement: Das zu tessellierende IFC-Element
+            trans: Transformer-Objekt
+            profile: Name des Tessellierungs-Profils
+                Default: TessellationProfile.DETAIL
+
+        Returns:
+            Die georeferenzierten Dreiecke, als Array der Form (n, 3, 3)
+        """
+        verts, faces = Converter.tessellateMesh(ifcElement, trans, profile)
+        if len(faces) == 0:
+            return np.empty((0, 3, 3))
+        return verts[faces]
+
+    @staticmethod
+    def tessellateMesh(ifcElement, trans, profile=TessellationProfile.DETAIL):
+        """ Tesselliert ein IFC-Element und georeferenziert die Vertizes, ohne die Dreiecke aufzulösen
+
+        Args:
+            ifcElement: Das zu tessellierende IFC-Element
+            trans: Transformer-Objekt
+            profile: Name des Tessellierungs-Profils
+                Default: TessellationProfile.DETAIL
+
+        Returns:
+            Die georeferenzierten Vertizes, als Array der Form (n, 3)
+            Die Dreiecke als Vertex-Indizes, als Array der Form (m, 3)
+        """
+        shape = TessellationProfile.createShape(ifcElement, profile)
+        verts = np.asarray(shape.geometry.verts, dtype=np.float64).reshape(-1, 3)
+        faces = np.asarray(shape.geometry.faces, dtype=np.int64).reshape(-1, 3)
+        return trans.georeferencePoints(verts), faces
+
+    @staticmethod
+    def tessellateMeshes(ifc, ifcElements, trans, profile=TessellationProfile.DETAIL, threads=1):
+        """ Tesselliert mehrere IFC-Elemente parallel und georeferenziert die Vertizes, ohne die Dreiecke aufzulösen
+
+        Args:
+            ifc: Die IFC-Datei
+            ifcElements: Die zu tessellierenden IFC-Elemente, als Liste
+            trans: Transformer-Objekt
+            profile: Name des Tessellierungs-Profils
+                Default: TessellationProfile.DETAIL
+            threads: Anzahl der Threads, als int
+                Default: 1
+
+        Returns:
+            Die georeferenzierten Vertizes und Dreiecke je Element-ID, als Dictionary von Tupeln
+        """
+        meshes = {}
+        for shape in TessellationProfile.iterateShapes(ifc, ifcElements, profile, threads):
+            verts = np.asarray(shape.geometry.verts, dtype=np.float64).reshape(-1, 3)
+            faces = np.asarray(shape.geometry.faces, dtype=np.int64).reshape(-1, 3)
+            if len(faces) > 0:
+                meshes[shape.id] = (trans.georeferencePoints(verts), faces)
+        return meshes
+
+    def getFacets(self, ifcElements, profile=TessellationProfile.FOOTPRINT):
+        """ Gibt die klassifizierten Dreiecke der IFC-Elemente zurück und tesselliert jedes Element nur einmal
+
+        Args:
+            ifcElements: Die IFC-Elemente, als Liste
+            profile: Name des Tessellierungs-Profils
+                Default: TessellationProfile.FOOTPRINT
+
+        Returns:
+            Die klassifizierten Dreiecke je Element, als Liste von FacetSets
+        """
+        facetSets = []
+        for ifcElement in ifcElements:
+            key = (ifcElement.id(), profile)
+            if key not in self.facets:
+                tris = self.tessellate(ifcElement, self.trans, profile)
+                normals, orientation, planeIds = UtilitiesMesh.classifyFacets(tris)
+                self.facets[key] = FacetSet(ifcElement, tris, normals, orientation, planeIds)
+            facetSets.append(self.facets[key])
+        return facetSets
+
+    def facetPolygons(self, facetSet, orientation=None):
+        """ Vereinigt die Dreiecke eines FacetSets ebenenweise zu Polygonen
+
+        Die Dreiecke werden über die Ebenen-Gruppen des FacetSets vorsortiert, sodass das Halbkanten-Netz nur noch
+        zusammenhängende Bereiche innerhalb einer Ebene bilden muss.
+
+        Args:
+            facetSet: Die klassifizierten Dreiecke eines IFC-Elements, als FacetSet
+            orientation: Nur Dreiecke dieser Ausrichtung(en) berücksichtigen
+                Default: None (alle nicht entarteten Dreiecke)
+
+        Returns:
+            Die Polygone als Listen geschlossener Ringe aus Punkten (Außenring zuerst). Leer, falls abgebrochen wurde
+        """
+        polygons = []
+        for indices in facetSet.groups(orientation).values():
+            polygons += HalfEdgeMesh(*facetSet.mesh(indices)).polygons(task=self.task)
+            if self.task.isCanceled():
+                return []
+        return polygons
+
+    def convertBldgShape(self, ifcBuilding, chBldg, height):
+        """ Konvertiert die Gebäudegeometrie im LoD des Konverters
+
+        Args:
+            ifcBuilding: Das IFC-Gebäude, aus dem die Geometrie entnommen werden soll
+            chBldg: XML-Element, an dem die Geometrie angefügt werden soll
+            height: Die Gebäudehöhe, als float
+
+        Returns:
+            GML-IDs der Bestandteile des Gebäudeumrisses, als Liste
+            Die Grundflächengeometrie
+            Die GML-IDs der Bestandteile mit zugehörigen IFC-Elementen, als Liste
+        """
+        return [], None, []
+
+    def convertBldgShapeBudget(self, ifcBuilding, chBldg, height):
+        """ Konvertiert die Gebäudegeometrie mit Zeitbudget
+
+        Wird das Zeitbudget überschritten, wird das Gebäude im nächstniedrigeren LoD konvertiert (LoD4 bzw. LoD3 über
+        LoD2 bis LoD1). Jeder LoD erhält ein eigenes Zeitbudget, LoD1 wird ohne Zeitbudget berechnet.
+
+        Args:
+            ifcBuilding: Das IFC-Gebäude, aus dem die Geometrie entnommen werden soll
+            chBldg: XML-Element, an dem die Geometrie angefügt werden soll
+            height: Die Gebäudehöhe, als float
+
+        Returns:
+            GML-IDs der Bestandteile des Gebäudeumrisses, als Liste
+            Die Grundflächengeometrie
+            Die GML-IDs der Bestandteile mit zugehörigen IFC-Elementen, als Liste
+            Der tatsächlich genutzte LoD, als Integer
+            Bzw. None, falls die Konvertierung abgebrochen wurde
+        """
+        conv = self
+        while conv.fallback is not None:
+            result = self.runBudget(conv, chBldg, conv.convertBldgShape, ifcBuilding, chBldg, height)
+            if self.task.isCanceled():
+                return None
+            if result is not None:
+                links, footPrint, surfaces = result
+                return links, footPrint, surfaces, conv.lod
+            conv = self.subConverter(conv.fallback)
+            conv.stageShares = conv.getStageShares(ifcBuilding)
+            self.task.logging.emit(self.tr(u'The building is converted in a lower LoD: ') + "LoD" + str(conv.lod))
+
+        # Niedrigster LoD ohne Zeitbudget
+        links, footPrint, surfaces = conv.convertBldgShape(ifcBuilding, chBldg, height)
+        self.progress = conv.progress
+        return links, footPrint, surfaces, conv.lod
+
+    def runBudget(self, conv, chBldg, func, *args):
+        """ Führt eine Berechnung an einem Gebäude mit Zeitbudget aus
+
+        Bei Überschreitung werden die bis dahin angefügten XML-Elemente, die Erweiterung der Bounding Box sowie der
+        Fortschritt verworfen.
+
+        Args:
+            conv: Der rechnende Konverter (dieser oder ein Konverter eines niedrigeren LoD)
+            chBldg: XML-Element des Gebäudes
+            func: Die auszuführende Methode des Konverters
+            *args: Die Argumente der Methode
+
+        Returns:
+            Das Ergebnis der Methode. None, falls das Zeitbudget überschritten oder die Konvertierung abgebrochen wurde
+        """
+        xmlCount, progress = len(chBldg), self.progress
+        bounds = self.envelope.bounds
+        conv.task, conv.progress = TimeBudget(self.task), self.progress
+        try:
+            result = func(*args)
+        except ConversionCanceled:
+            return None
+        except BudgetExceeded:
+            self.task.logging.emit(self.tr(u'Time budget of the building exceeded, the calculation is discarded'))
+            for child in list(chBldg)[xmlCount:]:
+                chBldg.remove(child)
+            self.envelope.bounds = bounds
+            self.progress = progress
+            self.task.setProgress(self.progress)
+            return None
+        finally:
+            conv.task = self.task
+        self.progress = conv.progress
+        return result
+
+    def subConverter(self, cls):
+        """ Erzeugt einen Konverter eines anderen LoD, der Bounding Box, Zwischenspeicher und Fortschritt teilt
+
+        Args:
+            cls: Die Konverter-Klasse
+
+        Returns:
+            Der erzeugte Konverter
+        """
+        conv = cls(self.task, self.ifc, self.name, self.trans, self.eade)
+        conv.envelope = self.envelope
+        conv.facets, conv.exteriorMaps = self.facets, self.exteriorMaps
+        conv.progress, conv.bldgCount = self.progress, self.bldgCount
+        conv.progressSpan = self.progressSpan
+        conv.costModel, conv.bldgShare = self.costModel, self.bldgShare
+        conv.xlink, conv.registry, conv.siteRegistry = self.xlink, self.registry, self.siteRegistry
+        conv.spaceBoundaries = self.spaceBoundaries
+        return conv
+
+    def getBldgShare(self, ifcBuilding):
+        """ Gibt den Anteil eines Gebäudes am Fortschritt zurück
+
+        Args:
+            ifcBuilding: Das IFC-Gebäude
+
+        Returns:
+            Der geschätzte Anteil am Gesamtaufwand aus der Vorab-Analyse, ansonsten der Anteil an der Gebäudeanzahl
+        """
+        if self.costModel is not None:
+            return self.costModel.share(ifcBuilding)
+        return 1 / len(self.ifc.by_type("IfcBuilding"))
+
+    def getStageShares(self, ifcBuilding):
+        """ Gibt die Anteile der Berechnungsschritte eines Gebäudes an dessen Fortschritt zurück
+
+        Args:
+            ifcBuilding: Das IFC-Gebäude
+
+        Returns:
+            Die Anteile je Eingangsgröße des Kostenmodells, als Dictionary
+        """
+        counts = self.costModel.counts.get(ifcBuilding.id()) if self.costModel is not None else None
+        if counts is None:
+            counts = CostModel.countInputs(self.ifc, ifcBuilding)
+        return CostModel.stageShares(counts, self.lod, self.eade, self.stageKeys)
+
+    def advance(self, key, fraction=1.0):
+        """ Schreibt den Fortschritt um einen Berechnungsschritt des aktuellen Gebäudes fort
+
+        Args:
+            key: Eingangsgröße des Kostenmodells, deren Aufwand der Schritt abarbeitet
+            fraction: Anteil des Schritts am Aufwand der Eingangsgröße, als float
+                Default: 1.0
+        """
+        self.progress += self.progressSpan * self.bldgShare * self.stageShares.get(key, 0) * fraction
+        self.task.setProgress(self.progress)
+
+    def logRemaining(self, ifcBuilding):
+        """ Gibt die geschätzte Restzeit nach der Konvertierung eines Gebäudes aus
+
+        Args:
+            ifcBuilding: Das fertig konvertierte IFC-Gebäude
+        """
+        if self.costModel is not None:
+            self.task.logging.emit(self.tr(u'Estimated remaining time') + ": " +
+                                   self.costModel.formatTime(self.costModel.remaining(ifcBuilding)))
+
+    def streamBldg(self, root, chCOM, surfaces=None):
+        """ Gibt ein fertig konvertiertes Gebäude direkt an den CityJSON-Writer weiter (CityJSON bzw. CityJSONSeq)
+
+        Die Zwischenspeicher des Gebäudes (Dreiecke, Einordnung der Bauteile) werden geleert, da spätere Gebäude sie
+        nicht mehr benötigen.
+
+        Args:
+            root: XML-Element des CityGML-Dokuments
+            chCOM: XML-Element des cityObjectMember des Gebäudes
+            surfaces: Die Oberflächen des Gebäudes, deren Geometrie der Writer direkt übernimmt, als Liste von
+                SurfaceArrays
+                Default: None (Geometrie aus der GML)
+        """
+        if self.stream is not None:
+            self.task.logging.emit(self.tr(u'Building is written'))
+            self.stream.addMember(root, chCOM, surfaces)
+        self.facets.clear()
+        self.exteriorMaps.clear()
+
+    def getExteriorMap(self, ifcBuilding):
+        """ Gibt die Einordnung der Bauteile eines Gebäudes in außen- und innenliegend zurück
+
+        Die IfcRelSpaceBoundaries werden je Gebäude nur einmal durchlaufen.
+
+        Args:
+            ifcBuilding: Das IFC-Gebäude
+
+        Returns:
+            Die Einordnung der Bauteile, als ExteriorMap
+        """
+        if ifcBuilding.id() not in self.exteriorMaps:
+            self.exteriorMaps[ifcBuilding.id()] = ExteriorMap(self.ifc, ifcBuilding)
+        return self.exteriorMaps[ifcBuilding.id()]
+
+    def assignOpenings(self, openings, walls):
+        """ Fügt die Öffnungen (Fenster & Türen) an die zugehörigen Wände in Level of Detail (LoD) 3 und 4 an
+
+        Args:
+            openings: Die anzufügenden Öffnungen (Fenster & Türen), als Liste
+            walls: Die Wände, an die die Öffnungen angefügt werden sollen, als Liste
+
+        Returns:
+            Die angepassten Wände, als Liste
+        """
+        # Wände nach IFC-Element indizieren
+        wallsByElem = {}
+        for wall in walls:
+            if wall.ifcElem is not None:
+                wallsByElem.setdefault(wall.ifcElem.id(), wall)
+
+        # Direkte Zuordnung über IfcRelFillsElement/IfcRelVoidsElement
+        openingsGeom = []
+        for opening in openings:
+            ifcHost = UtilitiesIfc.findHostElement(opening.ifcElem) if opening.ifcElem is not None else None
+            if ifcHost is not None and ifcHost.id() in wallsByElem:
+                wallsByElem[ifcHost.id()].openings.append(opening)
+            else:
+                openingsGeom.append(opening)
+
+        if self.task.isCanceled():
+            return False
+
+        # Geometrische Zuordnung: Wand bzw. Dach mit geringstem Abstand zur Öffnung über einmalig aufgebauten Index
+        if len(openingsGeom) > 0:
+            wallArrays = [SurfaceArray.fromOgr(wall.geom) for wall in walls]
+            wallPts = [wallArray.coords for wallArray in wallArrays]
+            wallIx = [np.full(len(wallArray.coords), w, dtype=np.int64) for w, wallArray in enumerate(wallArrays)]
+            if len(wallPts) > 0:
+                wallPts, wallIx = np.concatenate(wallPts), np.concatenate(wallIx)
+                queries = [np.asarray(opening.geom[0], dtype=np.float64)[:3] for opening in openingsGeom]
+                nearest, _ = UtilitiesMesh.nearestPoints(wallPts, queries)
+
+                # Öffnungen hinzufügen
+                for opening, ix in zip(openingsGeom, nearest):
+                    if ix >= 0:
+                        walls[wallIx[ix]].openings.append(opening)
+
+        if self.task.isCanceled():
+            return False
+
+        self.advance("wallOpenings", 0.5)
+
+        return walls
+
+    @staticmethod
+    def calcPlane(ifcElements, trans, grid=0.001, facets=None, profile=TessellationProfile.FOOTPRINT):
         """ Berechnet die plane Flächengeometrie
 
+        Die nicht vertikalen Dreiecke werden auf ein Raster eingerastet, entartete Dreiecke werden verworfen und die
+        verbleibenden in einem einzigen Schritt vereinigt. Die Höhe wird anschließend direkt auf den Koordinaten
+        gesetzt.
+
         Args:
             ifcElements: IFC-Elemente, aus denen die Fläche berechnet werden soll
             trans: Transformer-Objekt
+            grid: Rasterweite zum Einrasten der Vertizes, als float
+                Default: 0.001
+            facets: Bereits klassifizierte Dreiecke der IFC-Elemente, als Liste von FacetSets
+                Default: None (Elemente werden tesselliert)
+            profile: Name des Tessellierungs-Profils, falls tesselliert wird
+                Default: TessellationProfile.FOOTPRINT
 
         Returns:
             Erzeugte Geometrie mit zugehörigem IFC-Element
         """
-        # Vertizes aus den Elementen entnehmen und georeferenzieren
-        grVertsList = []
+        # Dreiecke aus den Elementen entnehmen
+        if facets is None:
+            facets = []
+            for ifcElement in ifcElements:
+                tris = Converter.tessellate(ifcElement, trans, profile)
+                normals, orientation, planeIds = UtilitiesMesh.classifyFacets(tris)
+                facets.append(FacetSet(ifcElement, tris, normals, orientation, planeIds))
+
+        # Nicht vertikale Dreiecke sammeln und niedrigste Höhe bestimmen
+        trisList = []
         ifcBase = None
         height = sys.maxsize
-        for ifcElement in ifcElements:
-            # noinspection PyUnresolvedReferences
-            settings = ifcopenshell.geom.settings()
-            settings.set(settings.USE_WORLD_COORDS, True)
-            # noinspection PyUnresolvedReferences
-            shape = ifcopenshell.geom.create_shape(settings, ifcElement)
-            # Vertizes
-            verts = shape.geometry.verts
-            grVertsCurr = [[round(verts[i], 5), round(verts[i + 1]), round(verts[i + 2])] for i in
-                           range(0, len(verts), 3)]
-            # Flächen
-            faces = shape.geometry.faces
-            grFacesCurr = [[faces[i], faces[i + 1], faces[i + 2]] for i in range(0, len(faces), 3)]
-            # Vertizes der Flächen
-            for face in grFacesCurr:
-                facePoints = [grVertsCurr[face[0]], grVertsCurr[face[1]], grVertsCurr[face[2]]]
-                points = []
-                for facePoint in facePoints:
-                    point = trans.georeferencePoint(facePoint)
-                    points.append(point)
-                    if point[2] < height:
-                        height = point[2]
-                        ifcBase = ifcElement
-                grVertsList.append(points)
-
-        # Geometrien erstellen
-        geometry = None
-        geometries = ogr.Geometry(ogr.wkbMultiPolygon)
-        for grVerts in grVertsList:
-            # Polygon aus Ring aus Punkten erstellen
-            geometry = ogr.Geometry(ogr.wkbPolygon)
-            ring = ogr.Geometry(ogr.wkbLinearRing)
-            for grVert in grVerts:
-                ring.AddPoint(grVert[0], grVert[1], height)
-            ring.CloseRings()
-            geometry.AddGeometry(ring)
-
-            # Geometrie testen und ggf. zur Liste hinzufügen
-            if not geometry.IsValid():
-                geomValid = geometry.MakeValid()
-                if geomValid is not None:
-                    geometry = geomValid
-                geomNorm = geometry.Normalize()
-                if geomNorm is not None:
-                    geometry = geomNorm
-            if geometry.GetGeometryName() == "POLYGON":
-                geometries.AddGeometry(geometry)
-
-        # Wenn mehr als eine Geometrie: Union
-        if geometries.GetGeometryCount() > 1 or geometry.GetGeometryName() != "POLYGON":
-            geometry = geometries.UnionCascaded()
-
-            # Wenn immer noch mehr als eine Geometrie: Union auf Buffer
-            if geometry.GetGeometryCount() > 1 or geometry.GetGeometryName() != "POLYGON":
-                bufferList = [0.001, 0.005, 0.01, 0.05, 0.1]
-                i = 0
-                for i in range(0, len(bufferList)):
-                    geometriesBuffer = ogr.Geometry(ogr.wkbMultiPolygon)
-                    for j in range(0, geometries.GetGeometryCount()):
-                        g = geometries.GetGeometryRef(j)
-                        gBuffer = g.Buffer(bufferList[i], quadsecs=0)
-                        geometriesBuffer.AddGeometry(gBuffer)
-                    geometry = geometriesBuffer.UnionCascaded()
-                    if geometry.GetGeometryCount() == 1 and geometry.GetGeometryName() == "POLYGON":
-                        break
-
-                # Wenn weiterhin mehr als eine Geometrie: Fehlermeldung und Abbruch
-                if geometry.GetGeometryCount() > 1 or geometry.GetGeometryName() != "POLYGON":
-                    return None
-
-                # Wenn nur noch eine Geometrie: Höhe wieder hinzufügen
-                else:
-                    geometry.Set3D(True)
-                    wkt = geometry.ExportToWkt()
-                    wkt = wkt.replace(" 0,", " " + str(height) + ",").replace(" 0)", " " + str(height) + ")")
-                    geometry = ogr.CreateGeometryFromWkt(wkt)
-                    geometry = UtilitiesGeom.simplify(geometry, 0.1, 0.05)
-                    geometry = UtilitiesGeom.buffer2D(geometry, -bufferList[i])
-
+        for facetSet in facets:
+            if len(facetSet) == 0:
+                continue
+            minHeight = facetSet.minHeight()
+            if minHeight < height:
+                height = minHeight
+                ifcBase = facetSet.ifcElem
+            trisList.append(facetSet.tris[facetSet.select([FacetSet.UP, FacetSet.DOWN])])
+
+        # Dreiecke einrasten und filtern
+        if len(trisList) == 0:
+            return None
+        tris2D = UtilitiesMesh.footprintTriangles(np.concatenate(trisList), grid)
+        if len(tris2D) == 0:
+            return None
+
+        # Einmalige Vereinigung
+        geometries = ogr.CreateGeometryFromWkt(UtilitiesMesh.trianglesToWkt(tris2D, grid))
+        geometry = geometries.UnionCascaded()
+
+        # Wenn mehr als eine Geometrie: Lücken über eine Schließung (Puffern und Zurückpuffern) überbrücken
+        if geometry is not None and geometry.GetGeometryName() != "POLYGON":
+            for dist in [0.001, 0.005, 0.01, 0.05, 0.1]:
+                geomClosed = geometry.Buffer(dist, 0).Buffer(-dist, 0)
+                if geomClosed.GetGeometryName() == "POLYGON":
+                    geometry = geomClosed
+                    break
+
+        # Wenn weiterhin mehr als eine Geometrie: Abbruch
+        if geometry is None or geometry.IsEmpty() or geometry.GetGeometryName() != "POLYGON":
+            return None
+
+        # Höhe auf den Koordinaten setzen
+        geometry = UtilitiesGeom.setHeight(geometry, height)
         geometry = UtilitiesGeom.simplify(geometry, 0.1, 0.05)
         return [ifcBase, geometry]
 
@@ -27,23 +27,19 @@ from lxml.etree import QName
 # QGIS-Bibliotheken
 from qgis.core import QgsTask
 
-# Geo-Bibliotheken
-from osgeo import ogr
-
 # Plugin
 from .utilitiesGeom import UtilitiesGeom
 from .utilitiesIfc import UtilitiesIfc
+from .exterior_map import ExteriorMap
 try:
     from ..model.xmlns import XmlNs
     from ..model.mapper import Mapper
-    from ..model.construction import Construction
-    from ..model.material import Material
+    from ..model.construction_registry import ConstructionRegistry
 except ImportError:
     sys.path.insert(0, '..')
     from model.xmlns import XmlNs
     from model.mapper import Mapper
-    from model.construction import Construction
-    from model.material import Material
+    from model.construction_registry import ConstructionRegistry
 
 
 #####
@@ -52,16 +48,33 @@ except ImportError:
 class EADEConverter(QgsTask):
     """ Model-Klasse zum Konvertieren von IFC-Dateien zur EnergyADE von CityGML """
 
+    # Typen der thermischen Begrenzungen je Oberflächentyp
+    boundaryTypes = {"Base": "groundSlab", "Roof": "roof", "Wall": "outerWall"}
+
     @staticmethod
-    def convertWeatherData(ifcProject, ifcSite, chBldg, bbox):
+    def convertWeatherData(ifcProject, ifcSite, chBldg, bbox, root=None, registry=None):
         """ Konvertiert die Wetterdaten eines Grundstücks von IFC zu CityGML als Teil der Energy ADE
 
+        Mit Registry werden die Wetterdaten je Grundstück nur einmal (als featureMember von root, falls angegeben)
+        geschrieben, alle Gebäude verweisen per XLink darauf.
+
         Args:
             ifcProject: Das IFC-Projekt, aus dem die Wettereinheiten entnommen werden sollen
             ifcSite: Das IFC-Grundtück, aus dem die Wetterdaten entnommen werden sollen
             chBldg: XML-Element, an dem die Wetterdaten angefügt werden sollen
             bbox: BoundingBox, aus dem die Position der Wettermessungen entnommen werden soll
+            root: XML-Element des CityGML-Dokuments, an dem die geteilten Wetterdaten angefügt werden sollen
+                Default: None
+            registry: Gebäudeübergreifend geteilte Objekte, als SiteRegistry
+                Default: None
         """
+        # Bereits geschriebene Wetterdaten des Grundstücks referenzieren
+        key = ("WeatherData", ifcSite.id())
+        if registry is not None and registry.find(key) is not None:
+            chwd = etree.SubElement(chBldg, QName(XmlNs.energy, "weatherData"))
+            chwd.set(QName(XmlNs.xlink, "href"), "#" + registry.find(key))
+            return
+
         if UtilitiesIfc.findPset(ifcSite, "Pset_SiteWeather") is not None:
             # Temperatur
             maxTemp = element.get_psets(ifcSite)["Pset_SiteWeather"]["MaxAmbientTemp"]
@@ -77,7 +90,15 @@ class EADEConverter(QgsTask):
 
             # XML-Struktur
             chwd = etree.SubElement(chBldg, QName(XmlNs.energy, "weatherData"))
-            chWD = etree.SubElement(chwd, QName(XmlNs.energy, "WeatherData"))
+            if registry is not None and root is not None:
+                chFM = etree.SubElement(root, QName(XmlNs.gml, "featureMember"))
+                chWD = etree.SubElement(chFM, QName(XmlNs.energy, "WeatherData"))
+            else:
+                chWD = etree.SubElement(chwd, QName(XmlNs.energy, "WeatherData"))
+            if registry is not None:
+                chWD.set(QName(XmlNs.gml, "id"), registry.add(key))
+                if root is not None:
+                    chwd.set(QName(XmlNs.xlink, "href"), "#" + registry.find(key))
 
             # Datentyp
             chWDType = etree.SubElement(chWD, QName(XmlNs.energy, "weatherDataType"))
@@ -123,7 +144,7 @@ class EADEConverter(QgsTask):
             chWDPosPtPos.text = str(meanX) + " " + str(meanY) + " " + str(meanZ)
 
     @staticmethod
-    def convertBldgAttr(ifc, ifcBuilding, chBldg, bbox, footPrint):
+    def convertBldgAttr(ifc, ifcBuilding, chBldg, bbox, footPrint, exteriorMap=None):
         """ Konvertiert die Gebäudeattribute für die Energy ADE
 
         Args:
@@ -132,6 +153,8 @@ class EADEConverter(QgsTask):
             chBldg: XML-Objekt, an das die Gebäudeattribute angehängt werden soll
             bbox: Die Bounding Box des Gebäudes
             footPrint: Der Grundriss des Gebäudes
+            exteriorMap: Die Einordnung der Bauteile in außen- und innenliegend, falls bereits berechnet
+                Default: None
         """
 
         # BuildingType
@@ -173,21 +196,9 @@ class EADEConverter(QgsTask):
 
         # ConstructionWeight
         ifcWalls = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcWall", result=[])
-        ifcWallsExt = []
-        ifcRelSpaceBoundaries = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcRelSpaceBoundary", result=[])
-        for ifcWall in ifcWalls:
-            extCount, intCount = 0, 0
-            for ifcRelSpaceBoundary in ifcRelSpaceBoundaries:
-                relElem = ifcRelSpaceBoundary.RelatedBuildingElement
-                if relElem == ifcWall:
-                    if ifcRelSpaceBoundary.InternalOrExternalBoundary == "EXTERNAL":
-                        extCount += 1
-                    elif ifcRelSpaceBoundary.InternalOrExternalBoundary == "INTERNAL":
-                        intCount += 1
-            if extCount > 0:
-                ifcWallsExt.append(ifcWall)
-            elif intCount == 0 and UtilitiesIfc.findPset(ifcWall, "Pset_WallCommon", "IsExternal"):
-                ifcWallsExt.append(ifcWall)
+        if exteriorMap is None:
+            exteriorMap = ExteriorMap(ifc, ifcBuilding)
+        ifcWallsExt = [ifcWall for ifcWall in ifcWalls if exteriorMap.isExternalWall(ifcWall)]
         if len(ifcWallsExt) != 0:
             thicknesses = []
             for ifcWall in ifcWallsExt:
@@ -322,7 +333,7 @@ class EADEConverter(QgsTask):
         chBldgHeightAgVal.text = str(footPrint.GetGeometryRef(0).GetPoint(0)[2])
 
     @staticmethod
-    def calcUsageZone(ifc, ifcProject, ifcBuilding, chBldg, linkUZ, chBldgTZ):
+    def calcUsageZone(ifc, ifcProject, ifcBuilding, chBldg, linkUZ, chBldgTZ, registry=None):
         """ Berechnet die Nutzungszone für die Energy ADE
 
         Args:
@@ -332,6 +343,8 @@ class EADEConverter(QgsTask):
             chBldg: XML-Objekt, an das die Nutzungszone angehängt werden soll
             linkUZ: GML-ID der Nutzungszone, als String
             chBldgTZ: XML-Objekt der ThermalZone
+            registry: Gebäudeübergreifend geteilte Zeitpläne, als SiteRegistry
+                Default: None
         """
 
         # XML-Struktur
@@ -342,10 +355,10 @@ class EADEConverter(QgsTask):
         # heatingSchedule & coolingSchedule
         for child in chBldgTZ:
             if "isCooled" in child.tag and child.text == "true":
-                EADEConverter.constructTempSchedule(ifc, chBldgUZ, "Cooling", ifcBuilding)
+                EADEConverter.constructTempSchedule(ifc, chBldgUZ, "Cooling", ifcBuilding, registry)
         for child in chBldgTZ:
             if "isHeated" in child.tag and child.text == "true":
-                EADEConverter.constructTempSchedule(ifc, chBldgUZ, "Heating", ifcBuilding)
+                EADEConverter.constructTempSchedule(ifc, chBldgUZ, "Heating", ifcBuilding, registry)
 
         # usageZoneType
         classType = None
@@ -426,18 +439,8 @@ class EADEConverter(QgsTask):
                                 occRate = occRate / 60 / 60
 
                 chBldgUzOccRate = etree.SubElement(chBldgUzOcc, QName(XmlNs.energy, "occupancyRate"))
-                chBldgUzOccDVS = etree.SubElement(chBldgUzOccRate, QName(XmlNs.energy, "DualValueSchedule"))
-                chBldgUzOccDVS.set(QName(XmlNs.gml, "id"), "GML_" + str(uuid.uuid4()))
-                chBldgUzOccName = etree.SubElement(chBldgUzOccDVS, QName(XmlNs.gml, "name"))
-                chBldgUzOccName.text = "Occupants"
-                chBldgUzOccUH = etree.SubElement(chBldgUzOccDVS, QName(XmlNs.energy, "usageHoursPerDay"))
-                chBldgUzOccUH.text = str(occRate)
-                chBldgUzOccUD = etree.SubElement(chBldgUzOccDVS, QName(XmlNs.energy, "usageDaysPerYear"))
-                chBldgUzOccUD.text = "365"
-                chBldgUzOccUVal = etree.SubElement(chBldgUzOccDVS, QName(XmlNs.energy, "usageValue"))
-                chBldgUzOccUVal.text = str(occCount)
-                chBldgUzOccIVal = etree.SubElement(chBldgUzOccDVS, QName(XmlNs.energy, "idleValue"))
-                chBldgUzOccIVal.text = "0"
+                EADEConverter.constructDualValueSchedule(chBldgUzOccRate, "Occupants", str(occRate), "365",
+                                                         str(occCount), "0", registry)
 
         # equippedWith: Facilities
         hasOccSchedule = False
@@ -451,18 +454,18 @@ class EADEConverter(QgsTask):
             ifcElectricalAppl += UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcMobileTelecommunicationsAppliance",
                                                           result=[])
             if len(ifcElectricalAppl) != 0:
-                EADEConverter.constructEquipSchedule(chBldgUZ, "ElectricalAppliances")
+                EADEConverter.constructEquipSchedule(chBldgUZ, "ElectricalAppliances", registry)
             ifcLightingFac = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcLamp", result=[])
             ifcLightingFac += UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcLightFixture", result=[])
             if len(ifcLightingFac) != 0:
-                EADEConverter.constructEquipSchedule(chBldgUZ, "LightingFacilities")
+                EADEConverter.constructEquipSchedule(chBldgUZ, "LightingFacilities", registry)
             ifcDhwFac = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcSpaceHeater", result=[])
             ifcDhwFac += UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcSanitaryTerminal", result=[])
             if len(ifcDhwFac) != 0:
-                EADEConverter.constructEquipSchedule(chBldgUZ, "DHWFacilities")
+                EADEConverter.constructEquipSchedule(chBldgUZ, "DHWFacilities", registry)
 
     @staticmethod
-    def constructTempSchedule(ifc, ch, mode, ifcBuilding):
+    def constructTempSchedule(ifc, ch, mode, ifcBuilding, registry=None):
         """ Erstellt den Zeitplanes der Temperaturen für die Energy ADE
 
         Args:
@@ -470,6 +473,8 @@ class EADEConverter(QgsTask):
             ch: XML-Objekt, an das der Zeitplan angehängt werden soll
             mode: Modus (Heating oder Cooling)
             ifcBuilding: IFC-Gebäude, aus dem die Nutzungszone berechnet werden soll
+            registry: Gebäudeübergreifend geteilte Zeitpläne, als SiteRegistry
+                Default: None
         """
 
         # min. und max. Temperaturen heraussuchen
@@ -494,26 +499,22 @@ class EADEConverter(QgsTask):
         if tempMax is not None and tempMin is not None:
             scheduleName = "heatingSchedule" if mode == "Heating" else "coolingSchedule"
             chBldgUzHeatSch = etree.SubElement(ch, QName(XmlNs.energy, scheduleName))
-            chBldgUzHsDVS = etree.SubElement(chBldgUzHeatSch, QName(XmlNs.energy, "DualValueSchedule"))
-            chBldgUzHsDVS.set(QName(XmlNs.gml, "id"), "GML_" + str(uuid.uuid4()))
-            chBldgUzHsName = etree.SubElement(chBldgUzHsDVS, QName(XmlNs.gml, "name"))
-            chBldgUzHsName.text = mode
-            chBldgUzHsUH = etree.SubElement(chBldgUzHsDVS, QName(XmlNs.energy, "usageHoursPerDay"))
-            chBldgUzHsUH.text = "8" if mode == "Heating" else "5"
-            chBldgUzHsUD = etree.SubElement(chBldgUzHsDVS, QName(XmlNs.energy, "usageDaysPerYear"))
-            chBldgUzHsUD.text = "200" if mode == "Heating" else "50"
-            chBldgUzHsUVal = etree.SubElement(chBldgUzHsDVS, QName(XmlNs.energy, "usageValue"))
-            chBldgUzHsUVal.text = str(tempMax) if mode == "Heating" else str(tempMin)
-            chBldgUzHsIVal = etree.SubElement(chBldgUzHsDVS, QName(XmlNs.energy, "idleValue"))
-            chBldgUzHsIVal.text = str(tempMin) if mode == "Heating" else str(tempMax)
+            if mode == "Heating":
+                EADEConverter.constructDualValueSchedule(chBldgUzHeatSch, mode, "8", "200", str(tempMax), str(tempMin),
+                                                         registry)
+            else:
+                EADEConverter.constructDualValueSchedule(chBldgUzHeatSch, mode, "5", "50", str(tempMin), str(tempMax),
+                                                         registry)
 
     @staticmethod
-    def constructEquipSchedule(ch, mode):
+    def constructEquipSchedule(ch, mode, registry=None):
         """ Erstellt den Zeitplan der Nutzung für die Energy ADE
 
         Args:
             ch: XML-Objekt, an das der Zeitplan angehängt werden soll
             mode: Modus (ElectricalAppliances, LightingFacilities oder DHWFacilities)
+            registry: Gebäudeübergreifend geteilte Zeitpläne, als SiteRegistry
+                Default: None
         """
 
         # XML-Struktur
@@ -521,21 +522,46 @@ class EADEConverter(QgsTask):
         chBldgUzEq = etree.SubElement(chBldgUzEqW, QName(XmlNs.energy, mode))
         scheduleName = mode + "Schedule"
         chBldgUzHeatSch = etree.SubElement(chBldgUzEq, QName(XmlNs.energy, scheduleName))
-        chBldgUzHsDVS = etree.SubElement(chBldgUzHeatSch, QName(XmlNs.energy, "DualValueSchedule"))
-        chBldgUzHsDVS.set(QName(XmlNs.gml, "id"), "GML_" + str(uuid.uuid4()))
-        chBldgUzHsName = etree.SubElement(chBldgUzHsDVS, QName(XmlNs.gml, "name"))
-        chBldgUzHsName.text = mode
-        chBldgUzHsUH = etree.SubElement(chBldgUzHsDVS, QName(XmlNs.energy, "usageHoursPerDay"))
-        chBldgUzHsUH.text = "3" if mode == "LightingFacilities" else "8"
-        chBldgUzHsUD = etree.SubElement(chBldgUzHsDVS, QName(XmlNs.energy, "usageDaysPerYear"))
-        chBldgUzHsUD.text = "365"
-        chBldgUzHsUVal = etree.SubElement(chBldgUzHsDVS, QName(XmlNs.energy, "usageValue"))
-        chBldgUzHsUVal.text = "1"
-        chBldgUzHsIVal = etree.SubElement(chBldgUzHsDVS, QName(XmlNs.energy, "idleValue"))
-        chBldgUzHsIVal.text = "0"
+        EADEConverter.constructDualValueSchedule(chBldgUzHeatSch, mode, "3" if mode == "LightingFacilities" else "8",
+                                                 "365", "1", "0", registry)
 
     @staticmethod
-    def calcThermalZone(ifc, ifcBuilding, chBldg, root, surfaces, lod):
+    def constructDualValueSchedule(ch, name, hours, days, usageValue, idleValue, registry=None):
+        """ Erstellt einen Zeitplan mit Nutzungs- und Ruhewert für die Energy ADE
+
+        Mit Registry wird ein inhaltsgleicher, bereits geschriebener Zeitplan per XLink referenziert.
+
+        Args:
+            ch: XML-Objekt der Zeitplan-Eigenschaft, an das der Zeitplan angehängt werden soll
+            name: Name des Zeitplans
+            hours: Nutzungsstunden pro Tag, als String
+            days: Nutzungstage pro Jahr, als String
+            usageValue: Nutzungswert, als String
+            idleValue: Ruhewert, als String
+            registry: Gebäudeübergreifend geteilte Zeitpläne, als SiteRegistry
+                Default: None
+        """
+        key = ("DualValueSchedule", name, hours, days, usageValue, idleValue)
+        if registry is not None and registry.find(key) is not None:
+            ch.set(QName(XmlNs.xlink, "href"), "#" + registry.find(key))
+            return
+
+        # XML-Struktur
+        chDVS = etree.SubElement(ch, QName(XmlNs.energy, "DualValueSchedule"))
+        chDVS.set(QName(XmlNs.gml, "id"), registry.add(key) if registry is not None else "GML_" + str(uuid.uuid4()))
+        chDVSName = etree.SubElement(chDVS, QName(XmlNs.gml, "name"))
+        chDVSName.text = name
+        chDVSUH = etree.SubElement(chDVS, QName(XmlNs.energy, "usageHoursPerDay"))
+        chDVSUH.text = hours
+        chDVSUD = etree.SubElement(chDVS, QName(XmlNs.energy, "usageDaysPerYear"))
+        chDVSUD.text = days
+        chDVSUVal = etree.SubElement(chDVS, QName(XmlNs.energy, "usageValue"))
+        chDVSUVal.text = usageValue
+        chDVSIVal = etree.SubElement(chDVS, QName(XmlNs.energy, "idleValue"))
+        chDVSIVal.text = idleValue
+
+    @staticmethod
+    def calcThermalZone(ifc, ifcBuilding, chBldg, root, surfaces, lod, xlink=True, registry=None):
         """ Berechnet die thermischen Zone für die Energy ADE
 
         Args:
@@ -545,11 +571,15 @@ class EADEConverter(QgsTask):
             root: XML-Objekt, aus dem die BoundingBox entnommen werden soll
             surfaces: Die Oberflächen, als Liste
             lod: Level of Detail, als Zahl
+            xlink: Ob Geometrien des Gebäudes per XLink referenziert statt kopiert werden sollen, als Boolean
+                Default: True
+            registry: Gebäudeübergreifende Konstruktionen und Materialien, als ConstructionRegistry
+                Default: None
 
         Returns
             linkUZ: GML-ID der anzufügenden Nutzungszone
             chBldgTZ: XML-Objekt der thermischen Zone
-            constructions: Die zu erstellenden Konstruktionen, als Liste
+            constructions: Die noch nicht geschriebenen Konstruktionen, als Liste
         """
 
         # XML-Struktur
@@ -630,295 +660,283 @@ class EADEConverter(QgsTask):
         # boundedBy: ThermalBoundary
         constructions = []
         if lod >= 2:
-            constructions = EADEConverter.calcThermalBoundaries(ifc, chBldg, chBldgTZ, lod, surfaces, linkTZ)
+            constructions = EADEConverter.calcThermalBoundaries(ifc, chBldgTZ, lod, surfaces, linkTZ, xlink,
+                                                                registry)
 
         # volumeGeometry
         chBldgTzVolGeom = etree.SubElement(chBldgTZ, QName(XmlNs.energy, "volumeGeometry"))
         for child in chBldg:
             tag = "lod" + str(lod) + "Solid"
             if tag in child.tag:
-                chBldgTzVolGeom.append(deepcopy(child[0]))
+                if xlink:
+                    gmlIdSolid = child[0].get(QName(XmlNs.gml, "id"))
+                    if gmlIdSolid is None:
+                        gmlIdSolid = "GML_" + str(uuid.uuid4())
+                        child[0].set(QName(XmlNs.gml, "id"), gmlIdSolid)
+                    chBldgTzVolGeom.set(QName(XmlNs.xlink, "href"), "#" + gmlIdSolid)
+                else:
+                    chBldgTzVolGeom.append(deepcopy(child[0]))
 
         return linkUZ, chBldgTZ, constructions
 
     @staticmethod
-    def calcThermalBoundaries(ifc, chBldg, chBldgTZ, lod, surfaces, linkTZ):
+    def calcThermalBoundaries(ifc, chBldgTZ, lod, surfaces, linkTZ, xlink=True, registry=None):
         """ Berechnet die thermischen Begrenzungen für die Energy ADE
 
+        Die Begrenzungen werden aus den Oberflächen des Konverters berechnet, ohne die geschriebene XML-Struktur erneut
+        auszulesen.
+
         Args:
             ifc: IFC-Datei
-            chBldg: XML-Objekt, aus dem die Begrenzungen entnommen werden sollen
             chBldgTZ: XML-Objekt, an das die thermischen Begrenzungen angehängt werden sollen
             lod: Level of Detail, als Zahl
-            surfaces: Die Öffnungen
+            surfaces: Die Oberflächen des Gebäudes (inkl. Öffnungen), als Liste
             linkTZ: GML-ID der thermischen Zone, der die thermischen Begrenzungen angehören
+            xlink: Ob die Geometrien der Oberflächen per XLink referenziert statt kopiert werden sollen, als Boolean
+                Default: True
+            registry: Gebäudeübergreifende Konstruktionen und Materialien, als ConstructionRegistry
+                Default: None
 
         Returns
-            constructions: Die zu erstellenden Konstruktionen, als Liste
+            constructions: Die noch nicht geschriebenen Konstruktionen, als Liste
         """
-        constructions = []
-        for child in chBldg:
-            if "boundedBy" in child.tag:
-                # XML-Struktur
-                chBldgTzBby = etree.SubElement(chBldgTZ, QName(XmlNs.energy, "boundedBy"))
-                chBldgTb = etree.SubElement(chBldgTzBby, QName(XmlNs.energy, "ThermalBoundary"))
-                chBldgTb.set(QName(XmlNs.gml, "id"), "GML_" + str(uuid.uuid4()))
-
-                # thermalBoundaryType
-                type = None
-                if "GroundSurface" in child[0].tag:
-                    type = "groundSlab"
-                elif "RoofSurface" in child[0].tag:
-                    type = "roof"
-                elif "WallSurface" in child[0].tag:
-                    type = "outerWall"
-                chBldgTbType = etree.SubElement(chBldgTb, QName(XmlNs.energy, "thermalBoundaryType"))
-                chBldgTbType.text = type
-
-                geomR, geomAll = None, []
-                for childGeom in child[0]:
-                    tag = "lod" + str(lod) + "MultiSurface"
-                    if tag in childGeom.tag:
-                        geomGML = etree.tostring(childGeom[0][0][0]).decode('utf-8')
-                        geom = ogr.CreateGeometryFromGML(geomGML)
-                        if geom.GetGeometryName() == "MULTIPOLYGON":
-                            geomR = geom.GetGeometryRef(0)
-                            for i in range(0, geom.GetGeometryCount()):
-                                geomAll.append(geom.GetGeometryRef(i))
-                        else:
-                            geomR = geom
-                            geomAll = [geom]
-
-                # azimuth
-                chBldgTbAz = etree.SubElement(chBldgTb, QName(XmlNs.energy, "azimuth"))
-                chBldgTbAz.set("uom", "deg")
-                chBldgTbAz.text = str(round(UtilitiesGeom.calcAzimuth(geomR), 5))
-
-                # inclination
-                chBldgTbIncl = etree.SubElement(chBldgTb, QName(XmlNs.energy, "inclination"))
-                chBldgTbIncl.set("uom", "deg")
-                chBldgTbIncl.text = str(round(UtilitiesGeom.calcInclination(geomR) / math.pi * 180, 5))
-
-                # area
-                chBldgTbArea = etree.SubElement(chBldgTb, QName(XmlNs.energy, "area"))
-                chBldgTbArea.set("uom", "m2")
-                chBldgTbArea.text = str(round(UtilitiesGeom.calcArea3D(geomAll), 5))
-
-                # surfaceGeometry
-                chGeom = None
-                for childGeom in child[0]:
-                    tag = "lod" + str(lod) + "MultiSurface"
-                    if tag in childGeom.tag:
-                        chGeom = childGeom
-                chBldgTbGeom = etree.SubElement(chBldgTb, QName(XmlNs.energy, "surfaceGeometry"))
-                chBldgTbGeom.append(deepcopy(chGeom[0]))
-
-                # construction
-                ifcElem = None
-                for surface in surfaces:
-                    if child[0].attrib['{http://www.opengis.net/gml}id'] == surface.gmlId:
-                        ifcElem = surface.ifcElem
-                        break
-
-                ifcMLS = None
-                rels = ifc.get_inverse(ifcElem)
-                for rel in rels:
-                    if rel.is_a('IfcRelAssociatesMaterial') and ifcElem in rel.RelatedObjects:
-                        if rel.RelatingMaterial is not None and rel.RelatingMaterial.is_a(
-                                "IfcMaterialLayerSetUsage"):
-                            ifcMLSU = rel.RelatingMaterial
-                            if ifcMLSU.ForLayerSet is not None:
-                                ifcMLS = ifcMLSU.ForLayerSet
+        if registry is None:
+            registry = ConstructionRegistry()
+        for surface in surfaces:
+            if surface.type not in EADEConverter.boundaryTypes:
+                continue
+
+            # XML-Struktur
+            chBldgTzBby = etree.SubElement(chBldgTZ, QName(XmlNs.energy, "boundedBy"))
+            chBldgTb = etree.SubElement(chBldgTzBby, QName(XmlNs.energy, "ThermalBoundary"))
+            chBldgTb.set(QName(XmlNs.gml, "id"), "GML_" + str(uuid.uuid4()))
+
+            # thermalBoundaryType
+            chBldgTbType = etree.SubElement(chBldgTb, QName(XmlNs.energy, "thermalBoundaryType"))
+            chBldgTbType.text = EADEConverter.boundaryTypes[surface.type]
+
+            geomAll = EADEConverter.surfaceGeoms(surface)
+
+            # azimuth
+            chBldgTbAz = etree.SubElement(chBldgTb, QName(XmlNs.energy, "azimuth"))
+            chBldgTbAz.set("uom", "deg")
+            chBldgTbAz.text = str(round(UtilitiesGeom.calcAzimuth(geomAll[0]), 5))
+
+            # inclination
+            chBldgTbIncl = etree.SubElement(chBldgTb, QName(XmlNs.energy, "inclination"))
+            chBldgTbIncl.set("uom", "deg")
+            chBldgTbIncl.text = str(round(UtilitiesGeom.calcInclination(geomAll[0]) / math.pi * 180, 5))
+
+            # area
+            chBldgTbArea = etree.SubElement(chBldgTb, QName(XmlNs.energy, "area"))
+            chBldgTbArea.set("uom", "m2")
+            chBldgTbArea.text = str(round(UtilitiesGeom.calcArea3D(geomAll), 5))
+
+            # surfaceGeometry
+            chBldgTbGeom = etree.SubElement(chBldgTb, QName(XmlNs.energy, "surfaceGeometry"))
+            chBldgTbGeom.append(EADEConverter.surfaceToMultiSurface(surface, geomAll, xlink))
+
+            # construction
+            ifcMLS = EADEConverter.findLayerSet(surface.ifcElem)
+            if ifcMLS is not None:
+                gmlIdConstr = registry.addLayer(ifcMLS, surface.ifcElem)
+                chBldgTbConstr = etree.SubElement(chBldgTb, QName(XmlNs.energy, "construction"))
+                chBldgTbConstr.set(QName(XmlNs.xlink, "href"), "#" + gmlIdConstr)
+
+            # contains
+            if lod >= 3:
+                EADEConverter.calcThermalOpenings(ifc, surface, chBldgTb, lod, registry, xlink)
+
+            # delimits
+            chBldgTbDel = etree.SubElement(chBldgTb, QName(XmlNs.energy, "delimits"))
+            chBldgTbDel.set(QName(XmlNs.xlink, "href"), "#" + linkTZ)
 
-                if ifcMLS is not None:
-                    sameMLS, constr = False, None
-                    for constr in constructions:
-                        if constr.ifcMLS == ifcMLS:
-                            sameMLS = True
-                            break
-                    if sameMLS:
-                        gmlIdConstr = constr.gmlId
-                        constr.ifcElems.append(ifcElem)
-                    else:
-                        gmlIdConstr = "GML_" + str(uuid.uuid4())
-                        constrNew = Construction(gmlIdConstr, ifcMLS, None, [ifcElem], "layer")
-                        constructions.append(constrNew)
-
-                    chBldgTbConstr = etree.SubElement(chBldgTb, QName(XmlNs.energy, "construction"))
-                    chBldgTbConstr.set(QName(XmlNs.xlink, "href"), "#" + gmlIdConstr)
-
-                # contains
-                if lod >= 3:
-                    EADEConverter.calcThermalOpenings(ifc, child, chBldgTb, lod, surfaces, constructions)
-
-                # delimits
-                chBldgTbDel = etree.SubElement(chBldgTb, QName(XmlNs.energy, "delimits"))
-                chBldgTbDel.set(QName(XmlNs.xlink, "href"), "#" + linkTZ)
-
-        return constructions
+        return registry.takeConstructions()
 
+    # noinspection PyUnusedLocal
     @staticmethod
-    def calcThermalOpenings(ifc, child, chBldgTb, lod, surfaces, constructions):
+    def calcThermalOpenings(ifc, surface, chBldgTb, lod, registry, xlink=True):
         """ Berechnet die thermischen Öffnungen für die Energy ADE
 
         Args:
             ifc: IFC-Datei
-            child: XML-Objekt, aus dem die Öffnungen entnommen werden sollen
+            surface: Die Oberfläche, deren Öffnungen übernommen werden sollen
             chBldgTb: XML-Objekt, an das die thermischen Öffnungen angehängt werden sollen
             lod: Level of Detail, als Zahl
-            surfaces: Die GML-IDs und zugehörigen IFC-Elemente der Oberflächen
-            constructions: Die zu erstellenden Konstruktionen, als Liste
-
-        Returns
-            constructions: Die zu erstellenden Konstruktionen der Boundary, mit GML-ID, IfcElement und Referenzen
+            registry: Gebäudeübergreifende Konstruktionen und Materialien, als ConstructionRegistry
+            xlink: Ob die Geometrien der Öffnungen per XLink referenziert statt kopiert werden sollen, als Boolean
+                Default: True
         """
-        for childSurf in child[0]:
-            if "opening" in childSurf.tag:
-                chOpen = childSurf[0]
-
-                # XML-Struktur
-                chBldgTbCont = etree.SubElement(chBldgTb, QName(XmlNs.energy, "contains"))
-                chBldgTo = etree.SubElement(chBldgTbCont, QName(XmlNs.energy, "ThermalOpening"))
-                chBldgTo.set(QName(XmlNs.gml, "id"), "GML_" + str(uuid.uuid4()))
-
-                # area
-                geom = None
-                for chGeom in chOpen:
-                    if "lod3MultiSurface" in chGeom.tag:
-                        geomGML = etree.tostring(chGeom[0][0][0]).decode('utf-8')
-                        geom = ogr.CreateGeometryFromGML(geomGML)
-                chBldgToArea = etree.SubElement(chBldgTo, QName(XmlNs.energy, "area"))
-                chBldgToArea.set("uom", "m2")
-                chBldgToArea.text = str(round(UtilitiesGeom.calcArea3D(geom), 5))
-
-                # construction
-                ifcElem = None
-                for surface in surfaces:
-                    if chOpen.attrib['{http://www.opengis.net/gml}id'] == surface.gmlId:
-                        ifcElem = surface.ifcElem
-                        break
-
-                # Material, falls vorhanden
-                ifcMLS = None
-                rels = ifc.get_inverse(ifcElem)
-                for rel in rels:
-                    if rel.is_a('IfcRelAssociatesMaterial') and ifcElem in rel.RelatedObjects:
-                        if rel.RelatingMaterial is not None and rel.RelatingMaterial.is_a(
-                                "IfcMaterialLayerSetUsage"):
-                            ifcMLSU = rel.RelatingMaterial
-                            if ifcMLSU.ForLayerSet is not None:
-                                ifcMLS = ifcMLSU.ForLayerSet
+        for opening in surface.openings:
+            ifcElem = opening.ifcElem
+            geomAll = EADEConverter.surfaceGeoms(opening)
 
-                if ifcMLS is not None:
-                    sameMLS, constr = False, None
-                    for constr in constructions:
-                        if constr.ifcMLS == ifcMLS:
-                            sameMLS = True
-                            break
-                    if sameMLS:
-                        gmlIdConstr = constr.gmlId
-                        constr.ifcElems.append(ifcElem)
-                    else:
-                        gmlIdConstr = "GML_" + str(uuid.uuid4())
-                        constrNew = Construction(gmlIdConstr, ifcMLS, None, [ifcElem], "layer")
-                        constructions.append(constrNew)
+            # XML-Struktur
+            chBldgTbCont = etree.SubElement(chBldgTb, QName(XmlNs.energy, "contains"))
+            chBldgTo = etree.SubElement(chBldgTbCont, QName(XmlNs.energy, "ThermalOpening"))
+            chBldgTo.set(QName(XmlNs.gml, "id"), "GML_" + str(uuid.uuid4()))
+
+            # area
+            chBldgToArea = etree.SubElement(chBldgTo, QName(XmlNs.energy, "area"))
+            chBldgToArea.set("uom", "m2")
+            chBldgToArea.text = str(round(UtilitiesGeom.calcArea3D(geomAll), 5))
+
+            # construction: Material, falls vorhanden
+            ifcMLS = EADEConverter.findLayerSet(ifcElem)
+            if ifcMLS is not None:
+                gmlIdConstr = registry.addLayer(ifcMLS, ifcElem)
+                chBldgToConstr = etree.SubElement(chBldgTo, QName(XmlNs.energy, "construction"))
+                chBldgToConstr.set(QName(XmlNs.xlink, "href"), "#" + gmlIdConstr)
+
+            # OpticalProperties, falls vorhanden
+            else:
+                thTransm, glazing = None, None
+                solRefl, visRefl, solTransm, visTransm = None, None, None, None
 
+                # U-Wert
+                if UtilitiesIfc.findPset(ifcElem, "Pset_DoorCommon",
+                                         "ThermalTransmittance") is not None:
+                    thTransm = element.get_psets(ifcElem)["Pset_DoorCommon"][
+                        "ThermalTransmittance"]
+                if UtilitiesIfc.findPset(ifcElem, "Pset_WindowCommon",
+                                         "ThermalTransmittance") is not None:
+                    thTransm = element.get_psets(ifcElem)["Pset_WindowCommon"][
+                        "ThermalTransmittance"]
+
+                # reflectance
+                if UtilitiesIfc.findPset(ifcElem, "Pset_DoorWindowGlazingType",
+                                         "SolarReflectance") is not None:
+                    solRefl = element.get_psets(ifcElem)["Pset_DoorWindowGlazingType"][
+                        "SolarReflectance"]
+                if UtilitiesIfc.findPset(ifcElem, "Pset_DoorWindowGlazingType",
+                                         "VisibleLightReflectance") is not None:
+                    visRefl = element.get_psets(ifcElem)["Pset_DoorWindowGlazingType"][
+                        "VisibleLightReflectance"]
+
+                # transmittance
+                if UtilitiesIfc.findPset(ifcElem, "Pset_DoorWindowGlazingType",
+                                         "SolarTransmittance") is not None:
+                    solTransm = element.get_psets(ifcElem)["Pset_DoorWindowGlazingType"][
+                        "SolarTransmittance"]
+                if UtilitiesIfc.findPset(ifcElem, "Pset_DoorWindowGlazingType",
+                                         "VisibleLightTransmittance") is not None:
+                    visTransm = element.get_psets(ifcElem)["Pset_DoorWindowGlazingType"][
+                        "VisibleLightTransmittance"]
+
+                # glazingRatio
+                if UtilitiesIfc.findPset(ifcElem, "Pset_DoorCommon",
+                                         "GlazingAreaFraction") is not None:
+                    glazing = element.get_psets(ifcElem)["Pset_DoorCommon"][
+                        "GlazingAreaFraction"]
+                if UtilitiesIfc.findPset(ifcElem, "Pset_WindowCommon",
+                                         "GlazingAreaFraction") is not None:
+                    glazing = element.get_psets(ifcElem)["Pset_WindowCommon"][
+                        "GlazingAreaFraction"]
+
+                if not (
+                        thTransm is None and solRefl is None and visRefl is None and solTransm
+                        is None and visTransm is None and glazing is None):
+                    optProp = [thTransm, solRefl, visRefl, solTransm, visTransm, glazing]
+                    gmlIdConstr = registry.addOptical(optProp, ifcElem)
                     chBldgToConstr = etree.SubElement(chBldgTo,
                                                       QName(XmlNs.energy, "construction"))
                     chBldgToConstr.set(QName(XmlNs.xlink, "href"), "#" + gmlIdConstr)
 
-                # OpticalProperties, falls vorhanden
-                else:
-                    thTransm, glazing = None, None
-                    solRefl, visRefl, solTransm, visTransm = None, None, None, None
-
-                    # U-Wert
-                    if UtilitiesIfc.findPset(ifcElem, "Pset_DoorCommon",
-                                             "ThermalTransmittance") is not None:
-                        thTransm = element.get_psets(ifcElem)["Pset_DoorCommon"][
-                            "ThermalTransmittance"]
-                    if UtilitiesIfc.findPset(ifcElem, "Pset_WindowCommon",
-                                             "ThermalTransmittance") is not None:
-                        thTransm = element.get_psets(ifcElem)["Pset_WindowCommon"][
-                            "ThermalTransmittance"]
-
-                    # reflectance
-                    if UtilitiesIfc.findPset(ifcElem, "Pset_DoorWindowGlazingType",
-                                             "SolarReflectance") is not None:
-                        solRefl = element.get_psets(ifcElem)["Pset_DoorWindowGlazingType"][
-                            "SolarReflectance"]
-                    if UtilitiesIfc.findPset(ifcElem, "Pset_DoorWindowGlazingType",
-                                             "VisibleLightReflectance") is not None:
-                        visRefl = element.get_psets(ifcElem)["Pset_DoorWindowGlazingType"][
-                            "VisibleLightReflectance"]
-
-                    # transmittance
-                    if UtilitiesIfc.findPset(ifcElem, "Pset_DoorWindowGlazingType",
-                                             "SolarTransmittance") is not None:
-                        solTransm = element.get_psets(ifcElem)["Pset_DoorWindowGlazingType"][
-                            "SolarTransmittance"]
-                    if UtilitiesIfc.findPset(ifcElem, "Pset_DoorWindowGlazingType",
-                                             "VisibleLightTransmittance") is not None:
-                        visTransm = element.get_psets(ifcElem)["Pset_DoorWindowGlazingType"][
-                            "VisibleLightTransmittance"]
-
-                    # glazingRatio
-                    if UtilitiesIfc.findPset(ifcElem, "Pset_DoorCommon",
-                                             "GlazingAreaFraction") is not None:
-                        glazing = element.get_psets(ifcElem)["Pset_DoorCommon"][
-                            "GlazingAreaFraction"]
-                    if UtilitiesIfc.findPset(ifcElem, "Pset_WindowCommon",
-                                             "GlazingAreaFraction") is not None:
-                        glazing = element.get_psets(ifcElem)["Pset_WindowCommon"][
-                            "GlazingAreaFraction"]
-
-                    if not (
-                            thTransm is None and solRefl is None and visRefl is None and solTransm
-                            is None and visTransm is None and glazing is None):
-                        sameOptProp, constr = False, None
-                        for constr in constructions:
-                            optProp = constr.optProp
-                            if constr.type == "optical" and optProp[0] == thTransm and optProp[1] == solRefl and \
-                                    optProp[2] == visRefl and optProp[3] == solTransm and optProp[4] == visTransm \
-                                    and optProp[5] == glazing:
-                                sameOptProp = True
-                                break
-                        if sameOptProp:
-                            gmlIdConstr = constr.gmlId
-                            constr.ifcElems.append(ifcElem)
-                        else:
-                            gmlIdConstr = "GML_" + str(uuid.uuid4())
-                            optProp = [thTransm, solRefl, visRefl, solTransm, visTransm,
-                                       glazing]
-                            constrNew = Construction(gmlIdConstr, None, optProp, [ifcElem], "optical")
-                            constructions.append(constrNew)
-
-                        chBldgToConstr = etree.SubElement(chBldgTo,
-                                                          QName(XmlNs.energy, "construction"))
-                        chBldgToConstr.set(QName(XmlNs.xlink, "href"), "#" + gmlIdConstr)
-
-                # surfaceGeometry
-                for chGeom in chOpen:
-                    tag = "lod" + str(lod) + "MultiSurface"
-                    if tag in chGeom.tag:
-                        chBldgToGeom = etree.SubElement(chBldgTo,
-                                                        QName(XmlNs.energy, "surfaceGeometry"))
-                        chBldgToGeom.append(deepcopy(chGeom[0]))
-
-        return constructions
+            # surfaceGeometry
+            chBldgToGeom = etree.SubElement(chBldgTo, QName(XmlNs.energy, "surfaceGeometry"))
+            chBldgToGeom.append(EADEConverter.surfaceToMultiSurface(opening, geomAll, xlink))
+
+    @staticmethod
+    def surfaceGeoms(surface):
+        """ Gibt die Geometrien einer Oberfläche als Liste von Polygonen zurück
+
+        Args:
+            surface: Die Oberfläche (Surface oder SurfaceArray), mit einer einzelnen Geometrie oder einer Liste
+
+        Returns:
+            Die Polygone, als Liste von OGR-Geometrien
+        """
+        geoms = surface.geom if isinstance(surface.geom, list) else [surface.geom]
+        polygons = []
+        for geom in geoms:
+            if geom.GetGeometryName() == "MULTIPOLYGON":
+                polygons += [geom.GetGeometryRef(i) for i in range(0, geom.GetGeometryCount())]
+            else:
+                polygons.append(geom)
+        return polygons
+
+    @staticmethod
+    def geomsToMultiSurface(geoms):
+        """ Erstellt eine GML-MultiSurface aus Polygonen
+
+        Args:
+            geoms: Die Polygone, als Liste von OGR-Geometrien
+
+        Returns:
+            Das XML-Element der MultiSurface
+        """
+        chMS = etree.Element(QName(XmlNs.gml, "MultiSurface"))
+        for geom in geoms:
+            chSM = etree.SubElement(chMS, QName(XmlNs.gml, "surfaceMember"))
+            chSM.append(UtilitiesGeom.geomToGml(geom))
+        return chMS
+
+    @staticmethod
+    def surfaceToMultiSurface(surface, geoms, xlink=True):
+        """ Erstellt die GML-MultiSurface einer Oberfläche, als Kopie oder als Verweis auf die Gebäudegeometrie
+
+        Args:
+            surface: Die Oberfläche (Surface oder SurfaceArray)
+            geoms: Die Polygone der Oberfläche, als Liste von OGR-Geometrien
+            xlink: Ob die Geometrie per XLink referenziert werden soll, falls deren GML-ID bekannt ist, als Boolean
+                Default: True
+
+        Returns:
+            Das XML-Element der MultiSurface
+        """
+        if not xlink or surface.geomId is None:
+            return EADEConverter.geomsToMultiSurface(geoms)
+        chMS = etree.Element(QName(XmlNs.gml, "MultiSurface"))
+        chSM = etree.SubElement(chMS, QName(XmlNs.gml, "surfaceMember"))
+        chSM.set(QName(XmlNs.xlink, "href"), "#" + surface.geomId)
+        return chMS
+
+    @staticmethod
+    def findLayerSet(ifcElem):
+        """ Sucht das Schichtmaterial (IfcMaterialLayerSet) eines IFC-Elements
+
+        Args:
+            ifcElem: Das IFC-Element
+
+        Returns:
+            Das IfcMaterialLayerSet, falls vorhanden. Ansonsten None
+        """
+        if ifcElem is None:
+            return None
+        ifcMLS = None
+        for rel in ifcElem.HasAssociations:
+            if rel.is_a('IfcRelAssociatesMaterial'):
+                if rel.RelatingMaterial is not None and rel.RelatingMaterial.is_a("IfcMaterialLayerSetUsage"):
+                    ifcMLSU = rel.RelatingMaterial
+                    if ifcMLSU.ForLayerSet is not None:
+                        ifcMLS = ifcMLSU.ForLayerSet
+        return ifcMLS
 
     @staticmethod
-    def convertConstructions(root, constructions):
+    def convertConstructions(root, constructions, registry=None):
         """ Berechnet die Konstruktionen der Begrenzung der thermalen Zone für die Energy ADE
 
         Args:
             root: XML-Objekt, an das die Konstruktionen angehängt werden sollen
             constructions: Die zu erstellenden Konstruktionen, als Liste
+            registry: Gebäudeübergreifende Konstruktionen und Materialien, als ConstructionRegistry
+                Default: None
 
         Returns
-            materials: Die zu erstellenden Materialien der Konstruktion, als Liste
+            materials: Die noch nicht geschriebenen Materialien der Konstruktionen, als Liste
         """
-        materials = []
+        if registry is None:
+            registry = ConstructionRegistry()
         for constr in constructions:
             # XML-Struktur
             chFM = etree.SubElement(root, QName(XmlNs.gml, "featureMember"))
@@ -937,12 +955,10 @@ class EADEConverter(QgsTask):
 
                 # U-Wert
                 thTransm = None
-                if UtilitiesIfc.findPset(constr.ifcElems[0], "Pset_WallCommon", "ThermalTransmittance") is not None:
-                    thTransm = element.get_psets(constr.ifcElems[0])["Pset_WallCommon"]["ThermalTransmittance"]
-                if UtilitiesIfc.findPset(constr.ifcElems[0], "Pset_RoofCommon", "ThermalTransmittance") is not None:
-                    thTransm = element.get_psets(constr.ifcElems[0])["Pset_RoofCommon"]["ThermalTransmittance"]
-                if UtilitiesIfc.findPset(constr.ifcElems[0], "Pset_SlabCommon", "ThermalTransmittance") is not None:
-                    thTransm = element.get_psets(constr.ifcElems[0])["Pset_SlabCommon"]["ThermalTransmittance"]
+                psets = element.get_psets(constr.ifcElems[0])
+                for psetName in ["Pset_WallCommon", "Pset_RoofCommon", "Pset_SlabCommon"]:
+                    if psets.get(psetName, {}).get("ThermalTransmittance") is not None:
+                        thTransm = psets[psetName]["ThermalTransmittance"]
                 if thTransm is not None:
                     chConstrUV = etree.SubElement(chConstr, QName(XmlNs.energy, "uValue"))
                     chConstrUV.set("uom", "W/K*m2")
@@ -975,13 +991,7 @@ class EADEConverter(QgsTask):
                         # material: Verweis auf Material
                         if matLayer.Material is not None:
                             chConstrLayMat = etree.SubElement(chConstrLayComp, QName(XmlNs.energy, "material"))
-                            gmlId = None
-                            for mat in materials:
-                                if mat.ifcMat == matLayer.Material:
-                                    gmlId = mat.gmlId
-                            if gmlId is None:
-                                gmlId = "GML_" + str(uuid.uuid4())
-                                materials.append(Material(gmlId, matLayer.Material))
+                            gmlId = registry.addMaterial(matLayer.Material)
                             chConstrLayMat.set(QName(XmlNs.xlink, "href"), "#" + gmlId)
             else:
                 # U-Wert
@@ -1045,7 +1055,7 @@ class EADEConverter(QgsTask):
                         chConstrOpGlaz.set("uom", "scale")
                         chConstrOpGlaz.text = str(optProp[5])
 
-        return materials
+        return registry.takeMaterials()
 
     @staticmethod
     def convertMaterials(root, materials):
@@ -39,6 +39,8 @@ except ImportError:
 class LoD0Converter(Converter):
     """ Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien in LoD0 """
 
+    stageKeys = ["base", "slabs", "roofFacets"]
+
     def __init__(self, task, ifc, name, trans, eade):
         """ Konstruktor der Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien in LoD0
 
@@ -86,8 +88,9 @@ class LoD0Converter(Converter):
             return False
 
         # Über alle enthaltenen Gebäude iterieren
-        bldgCount = len(ifcBuildings)
         for ifcBuilding in ifcBuildings:
+            self.bldgShare = self.getBldgShare(ifcBuilding)
+            self.stageShares = self.getStageShares(ifcBuilding)
             chCOM = etree.SubElement(root, QName(XmlNs.core, "cityObjectMember"))
             chBldg = etree.SubElement(chCOM, QName(XmlNs.bldg, "Building"))
 
@@ -96,24 +99,21 @@ class LoD0Converter(Converter):
             self.convertBldgAttr(self.ifc, ifcBuilding, chBldg)
             if self.task.isCanceled():
                 return False
-            self.progress += (10 / bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 1 / 3)
 
             # Grundfläche
             self.task.logging.emit(self.tr(u'Building footprint is calculated'))
             footPrint = self.convertFootPrint(ifcBuilding, chBldg)
             if self.task.isCanceled():
                 return False
-            self.progress += (25 / bldgCount) if not self.eade else (15 / bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("slabs")
 
             # Dachkantenfläche
             self.task.logging.emit(self.tr(u'Building roofedge is calculated'))
             self.convertRoofEdge(ifcBuilding, chBldg)
             if self.task.isCanceled():
                 return False
-            self.progress += (25 / bldgCount) if not self.eade else (15 / bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("roofFacets")
 
             # Adresse
             self.task.logging.emit(self.tr(u'Building address is extracted'))
@@ -122,34 +122,37 @@ class LoD0Converter(Converter):
                 self.task.logging.emit(self.tr(u'No address details existing'))
             if self.task.isCanceled():
                 return False
-            self.progress += (10 / bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 1 / 3)
 
             # Bounding Box
             self.task.logging.emit(self.tr(u'Building bound is calculated'))
-            bbox = self.convertBound(self.geom, chBound, self.trans)
+            bbox = self.convertBound(self.envelope, chBound, self.trans)
             if self.task.isCanceled():
                 return False
-            self.progress += (10 / bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 1 / 3)
 
             # EnergyADE
             if self.eade:
                 # Wetterdaten
                 self.task.logging.emit(self.tr(u'Energy ADE: weather data is extracted'))
-                EADEConverter.convertWeatherData(ifcProject, ifcSite, chBldg, bbox)
+                EADEConverter.convertWeatherData(ifcProject, ifcSite, chBldg, bbox, root, self.siteRegistry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (10 / bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.5)
 
                 # Gebäudeattribute
                 self.task.logging.emit(self.tr(u'Energy ADE: building attributes are extracted'))
-                EADEConverter.convertBldgAttr(self.ifc, ifcBuilding, chBldg, bbox, footPrint)
+                EADEConverter.convertBldgAttr(self.ifc, ifcBuilding, chBldg, bbox, footPrint,
+                                              self.getExteriorMap(ifcBuilding))
                 if self.task.isCanceled():
                     return False
-                self.progress += (10 / bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.5)
+
+            # Direkte Ausgabe
+            self.streamBldg(root, chCOM)
+
+            # Restzeit
+            self.logRemaining(ifcBuilding)
 
         return root
 
@@ -173,10 +176,10 @@ class LoD0Converter(Converter):
                 return
 
         # Geometrie
-        geometry = self.calcPlane(ifcSlabs, self.trans)[1]
+        plane = self.calcPlane(ifcSlabs, self.trans, facets=self.getFacets(ifcSlabs))
+        geometry = plane[1] if plane is not None else None
         if geometry is not None:
-            self.geom.AddGeometry(geometry)
-            self.bldgGeom.AddGeometry(geometry)
+            self.envelope.add(geometry)
             geomXML = UtilitiesGeom.geomToGml(geometry)
             if geomXML is not None:
                 # XML-Struktur
@@ -204,9 +207,12 @@ class LoD0Converter(Converter):
                 return
 
         # Geometrie
-        geometry = self.calcPlane(ifcRoofs, self.trans)[1]
-        self.geom.AddGeometry(geometry)
-        self.bldgGeom.AddGeometry(geometry)
+        plane = self.calcPlane(ifcRoofs, self.trans, facets=self.getFacets(ifcRoofs))
+        if plane is None:
+            self.task.logging.emit(self.tr(u"The RoofEdge geometry could not be calculated"))
+            return
+        geometry = plane[1]
+        self.envelope.add(geometry)
         geomXML = UtilitiesGeom.geomToGml(geometry)
         if geomXML is not None:
             # XML-Struktur
@@ -42,6 +42,9 @@ except ImportError:
 class LoD1Converter(Converter):
     """ Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien in LoD1 """
 
+    lod = 1
+    stageKeys = ["base", "slabs"]
+
     def __init__(self, task, ifc, name, trans, eade):
         """ Konstruktor der Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien in LoD1
 
@@ -91,7 +94,8 @@ class LoD1Converter(Converter):
         # Über alle enthaltenen Gebäude iterieren
         self.bldgCount = len(ifcBuildings)
         for ifcBuilding in ifcBuildings:
-            self.bldgGeom = ogr.Geometry(ogr.wkbGeometryCollection)
+            self.bldgShare = self.getBldgShare(ifcBuilding)
+            self.stageShares = self.getStageShares(ifcBuilding)
             chCOM = etree.SubElement(root, QName(XmlNs.core, "cityObjectMember"))
             chBldg = etree.SubElement(chCOM, QName(XmlNs.bldg, "Building"))
 
@@ -100,8 +104,7 @@ class LoD1Converter(Converter):
             height = self.convertBldgAttr(self.ifc, ifcBuilding, chBldg)
             if self.task.isCanceled():
                 return False
-            self.progress += (10 / self.bldgCount) if not self.eade else (5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.2)
 
             # Gebäudekörper
             self.task.logging.emit(self.tr(u'Building solid is calculated'))
@@ -114,54 +117,71 @@ class LoD1Converter(Converter):
             self.convertAddress(ifcBuilding, ifcSite, chBldg)
             if self.task.isCanceled():
                 return False
-            self.progress += (10 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.2)
 
             # Bounding Box
             self.task.logging.emit(self.tr(u'Building bound is calculated'))
-            bbox = self.convertBound(self.geom, chBound, self.trans)
+            bbox = self.convertBound(self.envelope, chBound, self.trans)
             if self.task.isCanceled():
                 return False
-            self.progress += (10 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.2)
 
             # EnergyADE
             if self.eade:
                 # Wetterdaten
                 self.task.logging.emit(self.tr(u'Energy ADE: weather data is extracted'))
-                EADEConverter.convertWeatherData(ifcProject, ifcSite, chBldg, bbox)
+                EADEConverter.convertWeatherData(ifcProject, ifcSite, chBldg, bbox, root, self.siteRegistry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.2)
 
                 # Gebäudeattribute
                 self.task.logging.emit(self.tr(u'Energy ADE: building attributes are extracted'))
-                EADEConverter.convertBldgAttr(self.ifc, ifcBuilding, chBldg, bbox, footPrint)
+                EADEConverter.convertBldgAttr(self.ifc, ifcBuilding, chBldg, bbox, footPrint,
+                                              self.getExteriorMap(ifcBuilding))
                 if self.task.isCanceled():
                     return False
-                self.progress += (5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.2)
 
                 # Thermale Zone
                 self.task.logging.emit(self.tr(u'Energy ADE: thermal zone is calculated'))
                 linkUZ, chBldgTZ, constructions = EADEConverter.calcThermalZone(self.ifc, ifcBuilding, chBldg, root, [],
-                                                                                1)
+                                                                                1, self.xlink)
                 if self.task.isCanceled():
                     return False
-                self.progress += (10 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.4)
 
                 # Nutzungszone
                 self.task.logging.emit(self.tr(u'Energy ADE: usage zone is calculated'))
-                EADEConverter.calcUsageZone(self.ifc, ifcProject, ifcBuilding, chBldg, linkUZ, chBldgTZ)
+                EADEConverter.calcUsageZone(self.ifc, ifcProject, ifcBuilding, chBldg, linkUZ, chBldgTZ,
+                                            self.siteRegistry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.2)
+
+            # Direkte Ausgabe
+            self.streamBldg(root, chCOM)
+
+            # Restzeit
+            self.logRemaining(ifcBuilding)
 
         return root
 
+    def convertBldgShape(self, ifcBuilding, chBldg, height):
+        """ Konvertiert die Gebäudegeometrie in LoD1, z.B. als Rückfall höherer LoD
+
+        Args:
+            ifcBuilding: Das IFC-Gebäude, aus dem die Geometrie entnommen werden soll
+            chBldg: XML-Element, an dem die Geometrie angefügt werden soll
+            height: Die Gebäudehöhe, als float
+
+        Returns:
+            GML-IDs der Bestandteile des Gebäudeumrisses (keine in LoD1), als Liste
+            Die Grundflächengeometrie
+            Die GML-IDs der Bestandteile mit zugehörigen IFC-Elementen (keine in LoD1), als Liste
+        """
+        return [], self.convertSolid(ifcBuilding, chBldg, height), []
+
     def convertSolid(self, ifcBuilding, chBldg, height):
         """ Konvertiert den Gebäudeumriss von IFC zu CityGML
 
@@ -190,27 +210,28 @@ class LoD1Converter(Converter):
         geometries = []
         # Berechnung der Grundfläche
         self.task.logging.emit(self.tr(u'Building geometry: base surface is calculated'))
-        geometries.append(self.calcPlane(ifcSlabs, self.trans)[1])
+        plane = self.calcPlane(ifcSlabs, self.trans, facets=self.getFacets(ifcSlabs))
+        if plane is None:
+            self.task.logging.emit(self.tr(u"The base surface could not be calculated"))
+            return
+        geometries.append(plane[1])
         if self.task.isCanceled():
             return False
-        self.progress += (15 / self.bldgCount) if not self.eade else (10 / self.bldgCount)
-        self.task.setProgress(self.progress)
+        self.advance("slabs")
 
         # Berechnung des Daches
         self.task.logging.emit(self.tr(u'Building geometry: roof surface is calculated'))
         geometries.append(self.calcRoof(geometries[0], height))
         if self.task.isCanceled():
             return False
-        self.progress += (15 / self.bldgCount) if not self.eade else (10 / self.bldgCount)
-        self.task.setProgress(self.progress)
+        self.advance("base", 0.2)
 
         # Berechnung der Wände
         self.task.logging.emit(self.tr(u'Building geometry: wall surfaces are calculated'))
         geometries += self.calcWalls(geometries[0], height)
         if self.task.isCanceled():
             return False
-        self.progress += (20 / self.bldgCount) if not self.eade else (10 / self.bldgCount)
-        self.task.setProgress(self.progress)
+        self.advance("base", 0.2)
 
         # Geometrie
         if geometries is not None and len(geometries) > 0:
@@ -220,8 +241,7 @@ class LoD1Converter(Converter):
             chBldgSolidExt = etree.SubElement(chBldgSolidSol, QName(XmlNs.gml, "exterior"))
             chBldgSolidCS = etree.SubElement(chBldgSolidExt, QName(XmlNs.gml, "CompositeSurface"))
             for geometry in geometries:
-                self.geom.AddGeometry(geometry)
-                self.bldgGeom.AddGeometry(geometry)
+                self.envelope.add(geometry)
                 chBldgSolidSM = etree.SubElement(chBldgSolidCS, QName(XmlNs.gml, "surfaceMember"))
                 geomXML = UtilitiesGeom.geomToGml(geometry)
                 chBldgSolidSM.append(geomXML)
@@ -11,16 +11,10 @@
 #####
 
 # Standard-Bibliotheken
-import math
 import sys
 import uuid
 import numpy as np
 
-# IFC-Bibliotheken
-import ifcopenshell
-import ifcopenshell.util.pset
-import ifcopenshell.geom
-
 # XML-Bibliotheken
 from lxml import etree
 # noinspection PyUnresolvedReferences
@@ -38,14 +32,20 @@ from sympy import Point3D, Plane, Line
 from .utilitiesGeom import UtilitiesGeom
 from .utilitiesIfc import UtilitiesIfc
 from .converter import Converter
+from .converter_lod1 import LoD1Converter
 from .converter_eade import EADEConverter
+from .tessellation_profile import TessellationProfile
 try:
     from ..model.xmlns import XmlNs
     from ..model.surface import Surface
+    from ..model.surface_array import SurfaceArray
+    from ..model.facet_set import FacetSet
 except ImportError:
     sys.path.insert(0, '..')
     from model.xmlns import XmlNs
     from model.surface import Surface
+    from model.surface_array import SurfaceArray
+    from model.facet_set import FacetSet
 
 
 #####
@@ -54,6 +54,10 @@ except ImportError:
 class LoD2Converter(Converter):
     """ Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien in LoD2 """
 
+    lod = 2
+    fallback = LoD1Converter
+    stageKeys = ["base", "slabs", "roofs", "roofFacets", "roofPairs"]
+
     def __init__(self, task, ifc, name, trans, eade):
         """ Konstruktor der Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien in LoD2
 
@@ -67,7 +71,7 @@ class LoD2Converter(Converter):
         super().__init__(task, ifc, name, trans, eade)
 
         # Initialisierung von Attributen
-        self.progress = 10 if not eade else 5
+        self.progress, self.progressSpan = (10, 85) if not eade else (5, 92.5)
 
     @staticmethod
     def tr(msg):
@@ -103,6 +107,8 @@ class LoD2Converter(Converter):
         # Über alle enthaltenen Gebäude iterieren
         self.bldgCount = len(ifcBuildings)
         for ifcBuilding in ifcBuildings:
+            self.bldgShare = self.getBldgShare(ifcBuilding)
+            self.stageShares = self.getStageShares(ifcBuilding)
             chCOM = etree.SubElement(root, QName(XmlNs.core, "cityObjectMember"))
             chBldg = etree.SubElement(chCOM, QName(XmlNs.bldg, "Building"))
 
@@ -111,92 +117,107 @@ class LoD2Converter(Converter):
             height = self.convertBldgAttr(self.ifc, ifcBuilding, chBldg)
             if self.task.isCanceled():
                 return False
-            self.progress += (5 / self.bldgCount) if not self.eade else (2.5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.1)
 
-            # Gebäudebestandteile
+            # Gebäudebestandteile (mit Zeitbudget, bei Überschreitung in LoD1)
             self.task.logging.emit(self.tr(u'Building bounds are calculated'))
-            links, footPrint, surfaces = self.convertBldgBound(ifcBuilding, chBldg, height)
+            shape = self.convertBldgShapeBudget(ifcBuilding, chBldg, height)
             if self.task.isCanceled():
                 return False
+            links, footPrint, surfaces, lod = shape
 
             # Gebäudekörper
             self.task.logging.emit(self.tr(u'Building solid is calculated'))
-            self.convertSolid(chBldg, links, 2)
+            self.convertSolid(chBldg, links, lod)
             if self.task.isCanceled():
                 return False
-            self.progress += (5 / self.bldgCount) if not self.eade else (2.5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.1)
 
             # Adresse
             self.task.logging.emit(self.tr(u'Building address is extracted'))
             self.convertAddress(ifcBuilding, ifcSite, chBldg)
             if self.task.isCanceled():
                 return False
-            self.progress += (5 / self.bldgCount) if not self.eade else (2.5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.1)
 
             # Bounding Box
             self.task.logging.emit(self.tr(u'Building bound is calculated'))
-            bbox = self.convertBound(self.geom, chBound, self.trans)
+            bbox = self.convertBound(self.envelope, chBound, self.trans)
             if self.task.isCanceled():
                 return False
-            self.progress += (5 / self.bldgCount) if not self.eade else (2.5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.1)
 
             # EnergyADE
             if self.eade:
                 # Wetterdaten
                 self.task.logging.emit(self.tr(u'Energy ADE: weather data is extracted'))
-                EADEConverter.convertWeatherData(ifcProject, ifcSite, chBldg, bbox)
+                EADEConverter.convertWeatherData(ifcProject, ifcSite, chBldg, bbox, root, self.siteRegistry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
 
                 # Gebäudeattribute
                 self.task.logging.emit(self.tr(u'Energy ADE: building attributes are extracted'))
-                EADEConverter.convertBldgAttr(self.ifc, ifcBuilding, chBldg, bbox, footPrint)
+                EADEConverter.convertBldgAttr(self.ifc, ifcBuilding, chBldg, bbox, footPrint,
+                                              self.getExteriorMap(ifcBuilding))
                 if self.task.isCanceled():
                     return False
-                self.progress += (5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.25)
 
                 # Thermale Zone
                 self.task.logging.emit(self.tr(u'Energy ADE: thermal zone is calculated'))
                 linkUZ, chBldgTZ, constructions = EADEConverter.calcThermalZone(self.ifc, ifcBuilding, chBldg, root,
-                                                                                surfaces, 2)
+                                                                                surfaces, lod, self.xlink,
+                                                                                self.registry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.25)
 
                 # Nutzungszone
                 self.task.logging.emit(self.tr(u'Energy ADE: usage zone is calculated'))
-                EADEConverter.calcUsageZone(self.ifc, ifcProject, ifcBuilding, chBldg, linkUZ, chBldgTZ)
+                EADEConverter.calcUsageZone(self.ifc, ifcProject, ifcBuilding, chBldg, linkUZ, chBldgTZ,
+                                            self.siteRegistry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
 
                 # Konstruktionen
                 self.task.logging.emit(self.tr(u'Energy ADE: construction is calculated'))
-                materials = EADEConverter.convertConstructions(root, constructions)
+                materials = EADEConverter.convertConstructions(root, constructions, self.registry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
 
                 # Materialien
                 self.task.logging.emit(self.tr(u'Energy ADE: material is calculated'))
                 EADEConverter.convertMaterials(root, materials)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
+
+            # Direkte Ausgabe
+            self.streamBldg(root, chCOM, surfaces)
+
+            # Restzeit
+            self.logRemaining(ifcBuilding)
 
         return root
 
+    def convertBldgShape(self, ifcBuilding, chBldg, height):
+        """ Konvertiert die Gebäudegeometrie in LoD2, z.B. als Rückfall höherer LoD
+
+        Args:
+            ifcBuilding: Das IFC-Gebäude, aus dem die Geometrie entnommen werden soll
+            chBldg: XML-Element, an dem die Geometrie angefügt werden soll
+            height: Die Gebäudehöhe, als float
+
+        Returns:
+            GML-IDs der Bestandteile des erweiterten Gebäudeumrisses, als Liste
+            Die Grundflächengeometrie
+            Die GML-IDs der Bestandteile mit zugehörigen IFC-Elementen, als Liste
+        """
+        return self.convertBldgBound(ifcBuilding, chBldg, height)
+
     def convertBldgBound(self, ifcBuilding, chBldg, height):
         """ Konvertiert den erweiterten Gebäudeumriss von IFC zu CityGML in Level of Detail (LoD) 2
 
@@ -226,12 +247,11 @@ class LoD2Converter(Converter):
 
         # Berechnung Grundfläche
         self.task.logging.emit(self.tr(u'Building geometry: base surface is calculated'))
-        baseList = self.calcPlane(ifcSlabs, self.trans)
+        baseList = self.calcPlane(ifcSlabs, self.trans, facets=self.getFacets(ifcSlabs))
         if baseList is None:
             return []
         base = Surface(baseList[1], baseList[0].Name, baseList[0], "Base")
-        self.progress += (10 / self.bldgCount)
-        self.task.setProgress(self.progress)
+        self.advance("slabs")
 
         # IFC-Elemente des Daches
         ifcRoofs = UtilitiesIfc.findElement(self.ifc, ifcBuilding, "IfcSlab", result=[], type="ROOF")
@@ -269,8 +289,7 @@ class LoD2Converter(Converter):
         walls += self.checkRoofWalls(wallsR, roofs)
         for roof in roofs:
             roof.geom = UtilitiesGeom.simplify(roof.geom, 0.01, 0.05)
-            self.progress += (2 / self.bldgCount / len(roofs))
-            self.task.setProgress(self.progress)
+            self.advance("roofFacets", 0.2 / len(roofs))
         if self.task.isCanceled():
             return False
 
@@ -280,6 +299,7 @@ class LoD2Converter(Converter):
 
             # Base
             link, base.gmlId = self.setElement(chBldg, base.geom, "GroundSurface", base.name)
+            base.geomId = link
             links.append(link)
             surfaces.append(base)
 
@@ -288,7 +308,7 @@ class LoD2Converter(Converter):
                 if roof.geom.GetGeometryName() == "POLYGON":
                     link, gmlId = self.setElement(chBldg, roof.geom, "RoofSurface", roof.name)
                     links.append(link)
-                    roof.gmlId = gmlId
+                    roof.gmlId, roof.geomId = gmlId, link
                     if roof.ifcElem is None:
                         ifcRoofs = UtilitiesIfc.findElement(self.ifc, ifcBuilding, "IfcRoof", result=[])
                         ifcRoofs += UtilitiesIfc.findElement(self.ifc, ifcBuilding, "IfcSlab", result=[], type="ROOF")
@@ -296,29 +316,23 @@ class LoD2Converter(Converter):
                     surfaces.append(roof)
 
             # Walls
+            randomWall = None
+            if len(walls) > 0:
+                # Zufällige äußere IfcWall
+                exteriorMap = self.getExteriorMap(ifcBuilding)
+                for ifcWall in UtilitiesIfc.findElement(self.ifc, ifcBuilding, "IfcWall", result=[]):
+                    if exteriorMap.isExternalWall(ifcWall):
+                        randomWall = ifcWall
+                        break
             for wall in walls:
                 link, wall.gmlId = self.setElement(chBldg, wall.geom, "WallSurface", wall.name)
+                wall.geomId = link
                 links.append(link)
-                # Zufällige IfcWall
-                ifcWalls = UtilitiesIfc.findElement(self.ifc, ifcBuilding, "IfcWall", result=[])
-                ifcRelSpaceBound = UtilitiesIfc.findElement(self.ifc, ifcBuilding, "IfcRelSpaceBoundary", result=[])
-                randomWall = None
-                for ifcWall in ifcWalls:
-                    extCt, intCt = 0, 0
-                    for ifcRelSpaceBoundary in ifcRelSpaceBound:
-                        relElem = ifcRelSpaceBoundary.RelatedBuildingElement
-                        if relElem == ifcWall:
-                            if ifcRelSpaceBoundary.InternalOrExternalBoundary == "EXTERNAL":
-                                extCt += 1
-                            elif ifcRelSpaceBoundary.InternalOrExternalBoundary == "INTERNAL":
-                                intCt += 1
-                    if extCt > 0 or (intCt == 0 and UtilitiesIfc.findPset(ifcWall, "Pset_WallCommon", "IsExternal")):
-                        randomWall = ifcWall
-                        break
                 wall.ifcElem = randomWall
                 surfaces.append(wall)
 
-        return links, base.geom, surfaces
+        # Nach dem Schreiben nur noch die kompakten Koordinaten-Arrays halten (Energy ADE)
+        return links, base.geom, SurfaceArray.compact(surfaces)
 
     def extractRoofs(self, ifcRoofs):
         """ Extrahiert die Geometrien von Dächern aus IFC
@@ -330,104 +344,48 @@ class LoD2Converter(Converter):
             Die extrahierten Dächer, als Liste
         """
         roofs = []
-        for ifcRoof in ifcRoofs:
-            settings = ifcopenshell.geom.settings()
-            settings.set(settings.USE_WORLD_COORDS, True)
-            shape = ifcopenshell.geom.create_shape(settings, ifcRoof)
-            # Vertizes
-            verts = shape.geometry.verts
-            grVertsCurr = [[round(verts[i], 5), round(verts[i + 1], 5), round(verts[i + 2], 5)] for i in
-                           range(0, len(verts), 3)]
-            # Flächen
-            faces = shape.geometry.faces
-            grFacesCurr = [[faces[i], faces[i + 1], faces[i + 2]] for i in range(0, len(faces), 3)]
-            # Vertizes der Flächen
-            grVertsList = []
-            for face in grFacesCurr:
-                facePoints = [grVertsCurr[face[0]], grVertsCurr[face[1]], grVertsCurr[face[2]]]
-                if not ((facePoints[0][0] == facePoints[1][0] and facePoints[0][1] == facePoints[1][1]) or (
-                        facePoints[0][0] == facePoints[2][0] and facePoints[0][1] == facePoints[2][1]) or (
-                                facePoints[1][0] == facePoints[2][0] and facePoints[1][1] == facePoints[2][1])):
-                    points = []
-                    for facePoint in facePoints:
-                        point = self.trans.georeferencePoint(facePoint)
-                        points.append(point)
-                    grVertsList.append(points)
-
-            # Geometrien erstellen
-            geometries = ogr.Geometry(ogr.wkbMultiPolygon)
-            for grVerts in grVertsList:
-                # Polygon aus Ring aus Punkten erstellen
-                geometry = ogr.Geometry(ogr.wkbPolygon)
-                ring = ogr.Geometry(ogr.wkbLinearRing)
-                for grVert in grVerts:
-                    ring.AddPoint(grVert[0], grVert[1], grVert[2])
-                ring.CloseRings()
-                geometry.AddGeometry(ring)
-                if geometry.IsSimple():
-                    geometries.AddGeometry(geometry)
-
-            # Alle Flächen in der gleichen Ebene vereinigen
-            checkList, heights, areas, geometriesRefUnionList = [], [], [], []
-            for i in range(0, geometries.GetGeometryCount()):
-                if i not in checkList:
-                    # Geometrie
-                    geometry = geometries.GetGeometryRef(i)
-                    ring = geometry.GetGeometryRef(0)
-
-                    # Multipolygon
-                    geometriesRef = ogr.Geometry(ogr.wkbMultiPolygon)
-                    geometriesRef.AddGeometry(geometry)
-
-                    # Ebeneneigenschaften
-                    apv = np.array(ring.GetPoint(0))
-                    r1 = np.array(ring.GetPoint(1)) - np.array(ring.GetPoint(0))
-                    r2 = np.array(ring.GetPoint(2)) - np.array(ring.GetPoint(0))
-                    nv = np.cross(r1, r2)
-                    checkList.append(i)
-
-                    for j in range(i + 1, geometries.GetGeometryCount()):
-                        # Geometrie
-                        ogeometry = geometries.GetGeometryRef(j)
-                        oring = ogeometry.GetGeometryRef(0)
-
-                        # Ebeneneigenschaften
-                        oapv = np.array(oring.GetPoint(0))
-                        or1 = np.array(oring.GetPoint(1)) - np.array(oring.GetPoint(0))
-                        or2 = np.array(oring.GetPoint(2)) - np.array(oring.GetPoint(0))
-                        onv = np.cross(or1, or2)
-
-                        # Schnittwinkel
-                        angle = np.arccos(np.linalg.norm(np.dot(nv, onv)) / (np.linalg.norm(nv) * np.linalg.norm(onv)))
-                        if math.isnan(angle) or angle < 0.001:
-
-                            # Distanz zwischen den Ebenen
-                            dist = (np.linalg.norm(np.dot(oapv - apv, nv))) / (np.linalg.norm(nv))
-                            if dist < 0.001:
-                                geometriesRef.AddGeometry(ogeometry)
-                                checkList.append(j)
-
-                    # Vereinigen
-                    geometriesRefUnion = geometriesRef.UnionCascaded()
-                    ring = geometriesRefUnion.GetGeometryRef(0)
-
-                    # Höhe herausfinden
-                    minHeight, maxHeight = sys.maxsize, -sys.maxsize
-                    for k in range(0, ring.GetPointCount()):
-                        point = ring.GetPoint(k)
-                        if point[2] > maxHeight:
-                            maxHeight = point[2]
-                        if point[2] < minHeight:
-                            minHeight = point[2]
-                    height = maxHeight - minHeight
-                    heights.append(maxHeight)
-
-                    # Ungefähre Fläche
-                    area = geometriesRefUnion.GetArea()
-                    area3d = height * height + area
-                    areas.append(area3d)
-
-                    geometriesRefUnionList.append(geometriesRefUnion)
+        for facetSet in self.getFacets(ifcRoofs, TessellationProfile.ROOF):
+            ifcRoof = facetSet.ifcElem
+
+            # Alle nicht vertikalen Flächen in der gleichen Ebene vereinigen
+            heights, areas, geometriesRefUnionList = [], [], []
+            for indices in facetSet.groups([FacetSet.UP, FacetSet.DOWN]).values():
+                # Multipolygon
+                geometriesRef = ogr.Geometry(ogr.wkbMultiPolygon)
+                for tri in facetSet.tris[indices]:
+                    # Polygon aus Ring aus Punkten erstellen
+                    geometry = ogr.Geometry(ogr.wkbPolygon)
+                    ring = ogr.Geometry(ogr.wkbLinearRing)
+                    for pt in tri:
+                        ring.AddPoint(float(pt[0]), float(pt[1]), float(pt[2]))
+                    ring.CloseRings()
+                    geometry.AddGeometry(ring)
+                    if geometry.IsSimple():
+                        geometriesRef.AddGeometry(geometry)
+                if geometriesRef.GetGeometryCount() == 0:
+                    continue
+
+                # Vereinigen
+                geometriesRefUnion = geometriesRef.UnionCascaded()
+                ring = geometriesRefUnion.GetGeometryRef(0)
+
+                # Höhe herausfinden
+                minHeight, maxHeight = sys.maxsize, -sys.maxsize
+                for k in range(0, ring.GetPointCount()):
+                    point = ring.GetPoint(k)
+                    if point[2] > maxHeight:
+                        maxHeight = point[2]
+                    if point[2] < minHeight:
+                        minHeight = point[2]
+                height = maxHeight - minHeight
+                heights.append(maxHeight)
+
+                # Ungefähre Fläche
+                area = geometriesRefUnion.GetArea()
+                area3d = height * height + area
+                areas.append(area3d)
+
+                geometriesRefUnionList.append(geometriesRefUnion)
 
             # Aus den vorhandenen Flächen die Außenfläche heraussuchen
             finalRoof = None
@@ -439,8 +397,7 @@ class LoD2Converter(Converter):
             if self.task.isCanceled():
                 return False
 
-            self.progress += (10 / self.bldgCount / len(ifcRoofs))
-            self.task.setProgress(self.progress)
+            self.advance("roofs", 1 / len(ifcRoofs))
 
         return roofs
 
@@ -641,8 +598,7 @@ class LoD2Converter(Converter):
             if self.task.isCanceled():
                 return False
 
-            self.progress += (8 / self.bldgCount / (ringBase.GetPointCount() - 1))
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.4 / (ringBase.GetPointCount() - 1))
 
         # Wenn über keinem Teil der Wand ein Dach ist
         for wall in wallsWORoof:
@@ -678,8 +634,7 @@ class LoD2Converter(Converter):
             if self.task.isCanceled():
                 return False
 
-        self.progress += (1 / self.bldgCount)
-        self.task.setProgress(self.progress)
+        self.advance("base", 0.1)
 
         # Neue Dächer, falls keine vorhanden
         roofsNew, done = [], []
@@ -718,8 +673,7 @@ class LoD2Converter(Converter):
             if self.task.isCanceled():
                 return False
 
-        self.progress += (1 / self.bldgCount)
-        self.task.setProgress(self.progress)
+        self.advance("base", 0.1)
 
         return walls, roofsNew
 
@@ -900,8 +854,7 @@ class LoD2Converter(Converter):
                 if self.task.isCanceled():
                     return False
 
-            self.progress += (5 / self.bldgCount / len(roofs))
-            self.task.setProgress(self.progress)
+            self.advance("roofPairs", 0.3 / len(roofs))
 
         # ÜBERPRÜFUNG DER WÄNDE #
         walls += wallsLine
@@ -1015,8 +968,7 @@ class LoD2Converter(Converter):
                 if self.task.isCanceled():
                     return False
 
-            self.progress += (5 / self.bldgCount / len(wallsCheck))
-            self.task.setProgress(self.progress)
+            self.advance("roofPairs", 0.3 / len(wallsCheck))
 
         return walls, roofsOut
 
@@ -1075,8 +1027,7 @@ class LoD2Converter(Converter):
                 if self.task.isCanceled():
                     return False
 
-            self.progress += (10 / self.bldgCount / len(roofsIn))
-            self.task.setProgress(self.progress)
+            self.advance("roofFacets", 0.8 / len(roofsIn))
 
         return roofs
 
@@ -1131,13 +1082,14 @@ class LoD2Converter(Converter):
             if self.task.isCanceled():
                 return False
 
-            self.progress += (8 / self.bldgCount / len(wallsIn))
-            self.task.setProgress(self.progress)
+            self.advance("roofPairs", 0.4 / len(wallsIn))
 
         geoms = []
         for surface in wallsChecked:
             geoms.append(surface.geom)
-        geoms = UtilitiesGeom.union3D(geoms)
+        geoms = UtilitiesGeom.union3D(geoms, task=self.task)
+        if self.task.isCanceled():
+            return False
         wallsOut = []
         for geom in geoms:
             wallsOut.append(Surface(geom, None, None, "Wall"))
@@ -1156,8 +1108,7 @@ class LoD2Converter(Converter):
             Die Poly-ID der Geometrie
             Die GML-ID des Objekts
         """
-        self.geom.AddGeometry(geometry)
-        self.bldgGeom.AddGeometry(geometry)
+        self.envelope.add(geometry)
 
         # XML-Struktur
         chBldgBB = etree.SubElement(chBldg, QName(XmlNs.bldg, "boundedBy"))
@@ -14,11 +14,7 @@
 import math
 import sys
 import uuid
-
-# IFC-Bibliotheken
-import ifcopenshell
-import ifcopenshell.util.pset
-import ifcopenshell.geom
+import numpy as np
 
 # XML-Bibliotheken
 from lxml import etree
@@ -37,14 +33,20 @@ from sympy import Point3D, Line
 from .utilitiesGeom import UtilitiesGeom
 from .utilitiesIfc import UtilitiesIfc
 from .converter import Converter
+from .converter_lod2 import LoD2Converter
 from .converter_eade import EADEConverter
+from .tessellation_profile import TessellationProfile
+from .opening_extractor import OpeningExtractor
+from .space_boundary_shell import SpaceBoundaryShell
 try:
     from ..model.xmlns import XmlNs
     from ..model.surface import Surface
+    from ..model.surface_array import SurfaceArray
 except ImportError:
     sys.path.insert(0, '..')
     from model.xmlns import XmlNs
     from model.surface import Surface
+    from model.surface_array import SurfaceArray
 
 
 #####
@@ -53,6 +55,10 @@ except ImportError:
 class LoD3Converter(Converter):
     """ Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien in LoD3 """
 
+    lod = 3
+    fallback = LoD2Converter
+    stageKeys = ["base", "slabs", "roofs", "walls", "openings", "wallOpenings"]
+
     def __init__(self, task, ifc, name, trans, eade):
         """ Konstruktor der Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien in LoD3
 
@@ -66,7 +72,7 @@ class LoD3Converter(Converter):
         super().__init__(task, ifc, name, trans, eade)
 
         # Initialisierung von Attributen
-        self.progress = 5
+        self.progress, self.progressSpan = 5, 92.5
 
     @staticmethod
     def tr(msg):
@@ -102,100 +108,117 @@ class LoD3Converter(Converter):
         # Über alle enthaltenen Gebäude iterieren
         self.bldgCount = len(ifcBuildings)
         for ifcBuilding in ifcBuildings:
+            self.bldgShare = self.getBldgShare(ifcBuilding)
+            self.stageShares = self.getStageShares(ifcBuilding)
             chCOM = etree.SubElement(root, QName(XmlNs.core, "cityObjectMember"))
             chBldg = etree.SubElement(chCOM, QName(XmlNs.bldg, "Building"))
 
             # Gebäudeattribute
             self.task.logging.emit(self.tr(u'Building attributes are extracted'))
-            self.convertBldgAttr(self.ifc, ifcBuilding, chBldg)
+            height = self.convertBldgAttr(self.ifc, ifcBuilding, chBldg)
             if self.task.isCanceled():
                 return False
-            self.progress += (2.5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.25)
 
-            # Gebäudebestandteile
+            # Gebäudebestandteile (mit Zeitbudget, bei Überschreitung in LoD2 bzw. LoD1)
             self.task.logging.emit(self.tr(u'Building bounds are calculated'))
-            links, footPrint, surfaces = self.convertBldgBound(ifcBuilding, chBldg)
+            shape = self.convertBldgShapeBudget(ifcBuilding, chBldg, height)
             if self.task.isCanceled():
                 return False
+            links, footPrint, surfaces, lod = shape
 
             # Gebäudekörper
             self.task.logging.emit(self.tr(u'Building solid is calculated'))
-            self.convertSolid(chBldg, links, 3)
+            self.convertSolid(chBldg, links, lod)
             if self.task.isCanceled():
                 return False
-            self.progress += (2.5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.25)
 
             # Adresse
             self.task.logging.emit(self.tr(u'Building address is extracted'))
             self.convertAddress(ifcBuilding, ifcSite, chBldg)
             if self.task.isCanceled():
                 return False
-            self.progress += (2.5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.25)
 
             # Bounding Box
             self.task.logging.emit(self.tr(u'Building bound is calculated'))
-            bbox = self.convertBound(self.geom, chBound, self.trans)
+            bbox = self.convertBound(self.envelope, chBound, self.trans)
             if self.task.isCanceled():
                 return False
-            self.progress += (2.5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 0.25)
 
             # EnergyADE
             if self.eade:
                 # Wetterdaten
                 self.task.logging.emit(self.tr(u'Energy ADE: weather data is extracted'))
-                EADEConverter.convertWeatherData(ifcProject, ifcSite, chBldg, bbox)
+                EADEConverter.convertWeatherData(ifcProject, ifcSite, chBldg, bbox, root, self.siteRegistry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
 
                 # Gebäudeattribute
                 self.task.logging.emit(self.tr(u'Energy ADE: building attributes are extracted'))
-                EADEConverter.convertBldgAttr(self.ifc, ifcBuilding, chBldg, bbox, footPrint)
+                EADEConverter.convertBldgAttr(self.ifc, ifcBuilding, chBldg, bbox, footPrint,
+                                              self.getExteriorMap(ifcBuilding))
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
 
                 # Thermale Zone
                 self.task.logging.emit(self.tr(u'Energy ADE: thermal zone is calculated'))
                 linkUZ, chBldgTZ, constructions = EADEConverter.calcThermalZone(self.ifc, ifcBuilding, chBldg, root,
-                                                                                surfaces, 3)
+                                                                                surfaces, lod, self.xlink,
+                                                                                self.registry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (7.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.375)
 
                 # Nutzungszone
                 self.task.logging.emit(self.tr(u'Energy ADE: usage zone is calculated'))
-                EADEConverter.calcUsageZone(self.ifc, ifcProject, ifcBuilding, chBldg, linkUZ, chBldgTZ)
+                EADEConverter.calcUsageZone(self.ifc, ifcProject, ifcBuilding, chBldg, linkUZ, chBldgTZ,
+                                            self.siteRegistry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
 
                 # Konstruktionen
                 self.task.logging.emit(self.tr(u'Energy ADE: construction is calculated'))
-                materials = EADEConverter.convertConstructions(root, constructions)
+                materials = EADEConverter.convertConstructions(root, constructions, self.registry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
 
                 # Materialien
                 self.task.logging.emit(self.tr(u'Energy ADE: material is calculated'))
                 EADEConverter.convertMaterials(root, materials)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
+
+            # Direkte Ausgabe
+            self.streamBldg(root, chCOM, surfaces)
+
+            # Restzeit
+            self.logRemaining(ifcBuilding)
 
         return root
 
+    def convertBldgShape(self, ifcBuilding, chBldg, height):
+        """ Konvertiert die Gebäudegeometrie in LoD3
+
+        Args:
+            ifcBuilding: Das IFC-Gebäude, aus dem die Geometrie entnommen werden soll
+            chBldg: XML-Element, an dem die Geometrie angefügt werden soll
+            height: Die Gebäudehöhe, als float (in LoD3 nicht benötigt)
+
+        Returns:
+            GML-IDs der Bestandteile des erweiterten Gebäudeumrisses, als Liste
+            Die Grundflächengeometrie
+            Die GML-IDs der Bestandteile mit zugehörigen IFC-Elementen, als Liste
+        """
+        return self.convertBldgBound(ifcBuilding, chBldg)
+
     def convertBldgBound(self, ifcBuilding, chBldg):
         """ Konvertiert den erweiterten Gebäudeumriss von IFC zu CityGML in Level of Detail (LoD) 3
 
@@ -208,66 +231,114 @@ class LoD3Converter(Converter):
             Die Grundflächengeometrie
             Die GML-IDs der Bestandteile mit zugehörigen IFC-Elementen, als Liste
         """
-        # Berechnung
-        self.task.logging.emit(self.tr(u'Building geometry: base surfaces are calculated'))
-        bases, basesOrig, floors = self.calcBases(ifcBuilding)
-        if self.task.isCanceled():
-            return False
+        # Berechnung über die Randflächen nur auf Wunsch und bei vollständiger Außenhülle, da diese die innere Hülle
+        # beschreiben (um die Dicke der Außenbauteile nach innen versetzt, eine Fläche je Raum und Bauteil)
+        shell = None
+        if self.spaceBoundaries:
+            shell = SpaceBoundaryShell(self.ifc, ifcBuilding, self.getExteriorMap(ifcBuilding), self.trans)
+            if not shell.isComplete():
+                self.task.logging.emit(self.tr(
+                    u'The space boundaries do not describe the building completely, the element geometries are used'))
+                shell = None
+        if shell is not None:
+            self.task.logging.emit(self.tr(u'Building geometry: surfaces are taken from the space boundaries'))
+            self.task.logging.emit(self.tr(u'The space boundaries describe the inner side of the external elements'))
+            bases, roofs, walls = self.calcBoundarySurfaces(shell)
+            if self.task.isCanceled():
+                return False
 
-        self.task.logging.emit(self.tr(u'Building geometry: roof surfaces are calculated'))
-        roofs, roofsOrig = self.calcRoofs(ifcBuilding)
-        if self.task.isCanceled():
-            return False
+        # Berechnung über die Bauteil-Geometrien
+        else:
+            self.task.logging.emit(self.tr(u'Building geometry: base surfaces are calculated'))
+            bases, basesOrig, floors = self.calcBases(ifcBuilding)
+            if self.task.isCanceled():
+                return False
 
-        self.task.logging.emit(self.tr(u'Building geometry: wall surfaces are calculated'))
-        walls = self.calcWalls(ifcBuilding)
-        if self.task.isCanceled():
-            return False
+            self.task.logging.emit(self.tr(u'Building geometry: roof surfaces are calculated'))
+            roofs, roofsOrig = self.calcRoofs(ifcBuilding)
+            if self.task.isCanceled():
+                return False
 
-        self.task.logging.emit(self.tr(u'Building geometry: door surfaces are calculated'))
-        openings = self.calcOpenings(ifcBuilding, "ifcDoor")
-        if self.task.isCanceled():
-            return False
+            self.task.logging.emit(self.tr(u'Building geometry: wall surfaces are calculated'))
+            walls = self.calcWalls(ifcBuilding)
+            if self.task.isCanceled():
+                return False
 
-        self.task.logging.emit(self.tr(u'Building geometry: window surfaces are calculated'))
-        openings += self.calcOpenings(ifcBuilding, "ifcWindow")
-        if self.task.isCanceled():
-            return False
+            self.task.logging.emit(self.tr(u'Building geometry: door surfaces are calculated'))
+            openings = self.calcOpenings(ifcBuilding, "ifcDoor")
+            if self.task.isCanceled():
+                return False
 
-        self.task.logging.emit(self.tr(u'Building geometry: openings are assigned to walls'))
-        walls = self.assignOpenings(openings, walls)
-        if self.task.isCanceled():
-            return False
+            self.task.logging.emit(self.tr(u'Building geometry: window surfaces are calculated'))
+            openings += self.calcOpenings(ifcBuilding, "ifcWindow")
+            if self.task.isCanceled():
+                return False
 
-        self.task.logging.emit(self.tr(u'Building geometry: wall and opening surfaces are adjusted to each other'))
-        walls, wallMainCounts = self.adjustWallOpenings(walls)
-        if self.task.isCanceled():
-            return False
+            self.task.logging.emit(self.tr(u'Building geometry: openings are assigned to walls'))
+            walls = self.assignOpenings(openings, walls)
+            if self.task.isCanceled():
+                return False
 
-        self.task.logging.emit(self.tr(u'Building geometry: wall surfaces are adjusted in their height'))
-        walls = self.adjustWallSize(walls, floors, roofs, basesOrig, roofsOrig, wallMainCounts)
-        if self.task.isCanceled():
-            return False
+            self.task.logging.emit(self.tr(u'Building geometry: wall and opening surfaces are adjusted to each other'))
+            walls, wallMainCounts = self.adjustWallOpenings(walls)
+            if self.task.isCanceled():
+                return False
+
+            self.task.logging.emit(self.tr(u'Building geometry: wall surfaces are adjusted in their height'))
+            walls = self.adjustWallSize(walls, floors, roofs, basesOrig, roofsOrig, wallMainCounts)
+            if self.task.isCanceled():
+                return False
 
         # Geometrie
         links, surfaces = [], []
         for base in bases:
             linksBase, base.gmlId, openSurf = self.setElementGroup(chBldg, base.geom, "GroundSurface", base.name,
                                                                    base.openings)
+            base.geomId = linksBase[0]
             links += linksBase
             surfaces += openSurf
         for roof in roofs:
             linksRoof, roof.gmlId, openSurf = self.setElementGroup(chBldg, roof.geom, "RoofSurface", roof.name,
                                                                    roof.openings)
+            roof.geomId = linksRoof[0]
             links += linksRoof
             surfaces += openSurf
         for wall in walls:
             linksWall, wall.gmlId, openSurf = self.setElementGroup(chBldg, wall.geom, "WallSurface", wall.name,
                                                                    wall.openings)
+            wall.geomId = linksWall[0]
             links += linksWall
             surfaces += openSurf
         surfaces += bases + roofs + walls
-        return links, bases[0].geom[0], surfaces
+
+        # Nach dem Schreiben nur noch die kompakten Koordinaten-Arrays halten (Energy ADE)
+        return links, bases[0].geom[0], SurfaceArray.compact(surfaces)
+
+    def calcBoundarySurfaces(self, shell):
+        """ Berechnet die Grund-, Dach- und Wandflächen samt Öffnungen aus den äußeren Randflächen
+
+        Die Öffnungen werden in der Ebene ihrer Wand ausgestanzt, eine Tessellierung der Bauteile entfällt.
+
+        Args:
+            shell: Die Außenhülle aus den Randflächen, als SpaceBoundaryShell
+
+        Returns:
+            Die berechneten Grundflächen, als Liste
+            Die berechneten Dachflächen, als Liste
+            Die berechneten Wandflächen, als Liste
+        """
+        surfaces = {"Base": [], "Roof": [], "Wall": []}
+        for face in shell.faces:
+            surface = shell.faceSurface(face)
+            if surface is not None:
+                surfaces[face.type].append(surface)
+
+            if self.task.isCanceled():
+                return [], [], []
+
+        for key in ["slabs", "roofs", "walls", "openings", "wallOpenings"]:
+            self.advance(key)
+        return surfaces["Base"], surfaces["Roof"], surfaces["Wall"]
 
     def calcBases(self, ifcBuilding):
         """ Berechnet die Grundfläche in Level of Detail (LoD) 3
@@ -295,40 +366,13 @@ class LoD3Converter(Converter):
 
         for i in range(0, len(ifcSlabs)):
             ifcSlab = ifcSlabs[i]
-            settings = ifcopenshell.geom.settings()
-            settings.set(settings.USE_WORLD_COORDS, True)
-            shape = ifcopenshell.geom.create_shape(settings, ifcSlab)
-            # Vertizes
-            verts = shape.geometry.verts
-            grVertsCurr = [[round(verts[i], 5), round(verts[i + 1], 5), round(verts[i + 2], 5)] for i in
-                           range(0, len(verts), 3)]
-            # Flächen
-            faces = shape.geometry.faces
-            grFacesCurr = [[faces[i], faces[i + 1], faces[i + 2]] for i in range(0, len(faces), 3)]
-            # Vertizes der Flächen
-            grVertsList = []
-            for face in grFacesCurr:
-                facePoints = [grVertsCurr[face[0]], grVertsCurr[face[1]], grVertsCurr[face[2]]]
-                points = []
-                for facePoint in facePoints:
-                    point = self.trans.georeferencePoint(facePoint)
-                    points.append(point)
-                grVertsList.append(points)
-
-            # Geometrien erstellen
-            geometries = []
-            for grVerts in grVertsList:
-                # Polygon aus Ring aus Punkten erstellen
-                geometry = ogr.Geometry(ogr.wkbPolygon)
-                ring = ogr.Geometry(ogr.wkbLinearRing)
-                for grVert in grVerts:
-                    ring.AddPoint(grVert[0], grVert[1], grVert[2])
-                ring.CloseRings()
-                geometry.AddGeometry(ring)
-                geometries.append(geometry)
-
-            # Alle Flächen in der gleichen Ebene vereinigen
-            slabGeom = UtilitiesGeom.union3D(geometries)
+            facetSet = self.getFacets([ifcSlab], TessellationProfile.DETAIL)[0]
+
+            # Alle Flächen in der gleichen Ebene vereinigen (Ebenen-Gruppen und Halbkanten-Netz)
+            polygons = self.facetPolygons(facetSet)
+            if self.task.isCanceled():
+                return False
+            slabGeom = SurfaceArray.fromPolygons(polygons).toOgr()
             slabGeom = UtilitiesGeom.simplify(slabGeom, 0.001, 0.05)
 
             # Höhen und Flächen der einzelnen Oberflächen heraussuchen
@@ -368,9 +412,7 @@ class LoD3Converter(Converter):
             if self.task.isCanceled():
                 return False
 
-            self.progress += (7 / self.bldgCount / len(ifcSlabs)) if not self.eade else (
-                    5 / self.bldgCount / len(ifcSlabs))
-            self.task.setProgress(self.progress)
+            self.advance("slabs", 0.7 / len(ifcSlabs))
 
         floors = bases
 
@@ -424,9 +466,7 @@ class LoD3Converter(Converter):
                 if self.task.isCanceled():
                     return False
 
-                self.progress += (3 / self.bldgCount / len(ifcSlabs)) if not self.eade else (
-                        2.5 / self.bldgCount / len(ifcSlabs))
-                self.task.setProgress(self.progress)
+                self.advance("slabs", 0.3 / len(ifcSlabs))
 
             removedBases.sort(reverse=True)
             for removedBase in removedBases:
@@ -456,40 +496,13 @@ class LoD3Converter(Converter):
         # Geometrie
         for i in range(0, len(ifcRoofs)):
             ifcRoof = ifcRoofs[i]
-            settings = ifcopenshell.geom.settings()
-            settings.set(settings.USE_WORLD_COORDS, True)
-            shape = ifcopenshell.geom.create_shape(settings, ifcRoof)
-            # Vertizes
-            verts = shape.geometry.verts
-            grVertsCurr = [[round(verts[i], 5), round(verts[i + 1], 5), round(verts[i + 2], 5)] for i in
-                           range(0, len(verts), 3)]
-            # Flächen
-            faces = shape.geometry.faces
-            grFacesCurr = [[faces[i], faces[i + 1], faces[i + 2]] for i in range(0, len(faces), 3)]
-            # Vertizes der Flächen
-            grVertsList = []
-            for face in grFacesCurr:
-                facePoints = [grVertsCurr[face[0]], grVertsCurr[face[1]], grVertsCurr[face[2]]]
-                points = []
-                for facePoint in facePoints:
-                    point = self.trans.georeferencePoint(facePoint)
-                    points.append(point)
-                grVertsList.append(points)
-
-            # Geometrien erstellen
-            geometries = []
-            for grVerts in grVertsList:
-                # Polygon aus Ring aus Punkten erstellen
-                geometry = ogr.Geometry(ogr.wkbPolygon)
-                ring = ogr.Geometry(ogr.wkbLinearRing)
-                for grVert in grVerts:
-                    ring.AddPoint(grVert[0], grVert[1], grVert[2])
-                ring.CloseRings()
-                geometry.AddGeometry(ring)
-                geometries.append(geometry)
-
-            # Alle Flächen in der gleichen Ebene vereinigen
-            roofGeom = UtilitiesGeom.union3D(geometries)
+            facetSet = self.getFacets([ifcRoof], TessellationProfile.DETAIL)[0]
+
+            # Alle Flächen in der gleichen Ebene vereinigen (Ebenen-Gruppen und Halbkanten-Netz)
+            polygons = self.facetPolygons(facetSet)
+            if self.task.isCanceled():
+                return False
+            roofGeom = SurfaceArray.fromPolygons(polygons).toOgr()
             roofGeom = UtilitiesGeom.simplify(roofGeom, 0.001, 0.05)
 
             # Höhen und Flächen der einzelnen Oberflächen heraussuchen
@@ -524,9 +537,7 @@ class LoD3Converter(Converter):
             if self.task.isCanceled():
                 return False
 
-            self.progress += (10 / self.bldgCount / len(ifcRoofs)) if not self.eade else (
-                    7.5 / self.bldgCount / len(ifcRoofs))
-            self.task.setProgress(self.progress)
+            self.advance("roofs", 1 / len(ifcRoofs))
 
         return roofs, roofsOrig
 
@@ -548,76 +559,28 @@ class LoD3Converter(Converter):
             return []
 
         # Heraussuchen der Außenwände
-        ifcWallsExt = []
-        ifcRelSpaceBoundaries = UtilitiesIfc.findElement(self.ifc, ifcBuilding, "IfcRelSpaceBoundary", result=[])
-        for ifcWall in ifcWalls:
-            extCount, intCount = 0, 0
-            for ifcRelSpaceBoundary in ifcRelSpaceBoundaries:
-                relElem = ifcRelSpaceBoundary.RelatedBuildingElement
-                if relElem == ifcWall:
-                    if ifcRelSpaceBoundary.InternalOrExternalBoundary == "EXTERNAL":
-                        extCount += 1
-                    elif ifcRelSpaceBoundary.InternalOrExternalBoundary == "INTERNAL":
-                        intCount += 1
-            if extCount > 0:
-                ifcWallsExt.append(ifcWall)
-            elif intCount == 0 and UtilitiesIfc.findPset(ifcWall, "Pset_WallCommon", "IsExternal"):
-                ifcWallsExt.append(ifcWall)
-
-            if self.task.isCanceled():
-                return False
+        exteriorMap = self.getExteriorMap(ifcBuilding)
+        ifcWallsExt = [ifcWall for ifcWall in ifcWalls if exteriorMap.isExternalWall(ifcWall)]
+        if self.task.isCanceled():
+            return False
 
         # Geometrie
         for i in range(0, len(ifcWallsExt)):
             ifcWall = ifcWallsExt[i]
-            settings = ifcopenshell.geom.settings()
-            settings.set(settings.USE_WORLD_COORDS, True)
-            shape = ifcopenshell.geom.create_shape(settings, ifcWall)
-            # Vertizes
-            verts = shape.geometry.verts
-            grVertsCurr = [[round(verts[i], 5), round(verts[i + 1], 5), round(verts[i + 2], 5)] for i in
-                           range(0, len(verts), 3)]
-            # Flächen
-            faces = shape.geometry.faces
-            grFacesCurr = [[faces[i], faces[i + 1], faces[i + 2]] for i in range(0, len(faces), 3)]
-            # Vertizes der Flächen
-            grVertsList = []
-            for face in grFacesCurr:
-                facePoints = [grVertsCurr[face[0]], grVertsCurr[face[1]], grVertsCurr[face[2]]]
-                points = []
-                for facePoint in facePoints:
-                    point = self.trans.georeferencePoint(facePoint)
-                    points.append(point)
-                grVertsList.append(points)
-
-                if self.task.isCanceled():
-                    return False
+            facetSet = self.getFacets([ifcWall], TessellationProfile.DETAIL)[0]
 
-            # Geometrien erstellen
-            geometries = []
-            for grVerts in grVertsList:
-                # Polygon aus Ring aus Punkten erstellen
-                geometry = ogr.Geometry(ogr.wkbPolygon)
-                ring = ogr.Geometry(ogr.wkbLinearRing)
-                for grVert in grVerts:
-                    ring.AddPoint(grVert[0], grVert[1], grVert[2])
-                ring.CloseRings()
-                geometry.AddGeometry(ring)
-                geometries.append(geometry)
-
-                if self.task.isCanceled():
-                    return False
-
-            # Vereinigen, Vereinfachen und Hinzufügen
-            wallGeom = UtilitiesGeom.union3D(geometries, task=self.task)
+            # Vereinigen, Vereinfachen und Hinzufügen (Ebenen-Gruppen und Halbkanten-Netz)
+            polygons = self.facetPolygons(facetSet)
+            if self.task.isCanceled():
+                return False
+            wallGeom = SurfaceArray.fromPolygons(polygons).toOgr()
             wallGeom = UtilitiesGeom.simplify(wallGeom, 0.001, 0.001, task=self.task)
             walls.append(Surface(wallGeom, ifcWall.Name, ifcWall, "Wall"))
 
             if self.task.isCanceled():
                 return False
 
-            self.progress += (10 / self.bldgCount / len(ifcWallsExt))
-            self.task.setProgress(self.progress)
+            self.advance("walls", 0.5 / len(ifcWallsExt))
 
         return walls
 
@@ -637,21 +600,10 @@ class LoD3Converter(Converter):
         ifcOpenings = UtilitiesIfc.findElement(self.ifc, ifcBuilding, type, result=[])
 
         # Heraussuchen der Außenöffnungen
-        ifcOpeningsExt = []
-        ifcRelSpaceBoundaries = UtilitiesIfc.findElement(self.ifc, ifcBuilding, "IfcRelSpaceBoundary", result=[])
+        exteriorMap = self.getExteriorMap(ifcBuilding)
         psetCommon = "Pset_DoorCommon" if type == "ifcDoor" else "Pset_WindowCommon"
-        for ifcOpening in ifcOpenings:
-            ext = UtilitiesIfc.findPset(ifcOpening, psetCommon, "IsExternal")
-            if ext is None:
-                ext = False
-                for ifcRelSpaceBoundary in ifcRelSpaceBoundaries:
-                    relElem = ifcRelSpaceBoundary.RelatedBuildingElement
-                    if relElem == ifcOpening and ifcRelSpaceBoundary.InternalOrExternalBoundary == "EXTERNAL":
-                        ext = True
-                if ext:
-                    ifcOpeningsExt.append(ifcOpening)
-            elif ext:
-                ifcOpeningsExt.append(ifcOpening)
+        ifcOpeningsExt = [ifcOpening for ifcOpening in ifcOpenings
+                          if exteriorMap.isExternalOpening(ifcOpening, psetCommon)]
 
         if self.task.isCanceled():
             return False
@@ -659,73 +611,35 @@ class LoD3Converter(Converter):
         # Geometrie
         for i in range(0, len(ifcOpeningsExt)):
             ifcOpening = ifcOpeningsExt[i]
-            settings = ifcopenshell.geom.settings()
-            settings.set(settings.USE_WORLD_COORDS, True)
-            shape = ifcopenshell.geom.create_shape(settings, ifcOpening)
-            # Vertizes
-            verts = shape.geometry.verts
-            grVertsCurr = [[round(verts[i], 5), round(verts[i + 1], 5), round(verts[i + 2], 5)] for i in
-                           range(0, len(verts), 3)]
-            grVertsList = []
-            minHeight, maxHeight = sys.maxsize, -sys.maxsize
-
-            # Nur wichtige Vertizes hinzufügen
-            for grVertCurr in grVertsCurr:
-                point = self.trans.georeferencePoint(grVertCurr)
-                if point[2] <= minHeight:
-                    minHeight = point[2]
-                    grVertsList.append(point)
-                if point[2] >= maxHeight:
-                    maxHeight = point[2]
-                    grVertsList.append(point)
-            openings.append(Surface(grVertsList, ifcOpening.Name, ifcOpening, type))
-
-            if self.task.isCanceled():
-                return False
-
-            self.progress += (10 / self.bldgCount / len(ifcOpeningsExt)) if not self.eade else (
-                    5 / self.bldgCount / len(ifcOpeningsExt))
-            self.task.setProgress(self.progress)
-
-        return openings
 
-    def assignOpenings(self, openings, walls):
-        """ Fügt die Öffnungen (Fenster & Türen) an die zugehörigen Wände in Level of Detail (LoD) 3 an
+            # Rechteckige Öffnungen: Eckpunkte aus Platzierung und Abmessungen
+            corners = OpeningExtractor.corners(ifcOpening, self.unitScale)
+            if corners is not None:
+                grVertsList = list(self.trans.georeferencePoints(np.round(corners, 5)))
 
-        Args:
-            openings: Die anzufügenden Öffnungen (Fenster & Türen), als Liste
-            walls: Die Wände, an die die Öffnungen angefügt werden sollen, als Liste
+            # Sonstige Öffnungen: Tessellierung
+            else:
+                # Georeferenzierte Vertizes
+                grVertsCurr = self.getFacets([ifcOpening], TessellationProfile.DETAIL)[0].mesh()[0]
+                grVertsList = []
+                minHeight, maxHeight = sys.maxsize, -sys.maxsize
 
-        Returns:
-            Die angepassten Wände, als Liste
-        """
-        for opening in openings:
-            ptOp = opening.geom[0]
-
-            # Wand bzw. Dach mit geringstem Abstand zur Öffnung berechnen
-            minDist, minDistElem = sys.maxsize, None
-            for wall in walls:
-                for geom in wall.geom:
-                    for i in range(0, geom.GetGeometryCount()):
-                        ring = geom.GetGeometryRef(i)
-                        for j in range(0, ring.GetPointCount()):
-                            pt = ring.GetPoint(j)
-                            dist = math.sqrt((ptOp[0] - pt[0]) ** 2 + (ptOp[1] - pt[1]) ** 2 + (ptOp[2] - pt[2]) ** 2)
-                            if dist < minDist:
-                                minDist, minDistElem = dist, wall
-
-            # Öffnung hinzufügen
-            if minDistElem is not None:
-                minDistElem.openings.append(opening)
+                # Nur wichtige Vertizes hinzufügen
+                for point in np.round(grVertsCurr, 5):
+                    if point[2] <= minHeight:
+                        minHeight = point[2]
+                        grVertsList.append(point)
+                    if point[2] >= maxHeight:
+                        maxHeight = point[2]
+                        grVertsList.append(point)
+            openings.append(Surface(grVertsList, ifcOpening.Name, ifcOpening, type))
 
             if self.task.isCanceled():
                 return False
 
-            self.progress += (10 / self.bldgCount / len(openings)) if not self.eade else (
-                    5 / self.bldgCount / len(openings))
-            self.task.setProgress(self.progress)
+            self.advance("openings", 0.5 / len(ifcOpeningsExt))
 
-        return walls
+        return openings
 
     def adjustWallOpenings(self, walls):
         """ Passt die Wände auf Grundlage der Dächer, Grundflächen und Öffnungen in Level of Detail (LoD) 3 an
@@ -1057,8 +971,7 @@ class LoD3Converter(Converter):
             if self.task.isCanceled():
                 return False
 
-            self.progress += (10 / self.bldgCount / len(walls))
-            self.task.setProgress(self.progress)
+            self.advance("wallOpenings", 0.5 / len(walls))
 
         return walls, wallMainCounts
 
@@ -1277,8 +1190,7 @@ class LoD3Converter(Converter):
                 if self.task.isCanceled():
                     return False
 
-            self.progress += (10 / self.bldgCount / len(walls))
-            self.task.setProgress(self.progress)
+            self.advance("walls", 0.5 / len(walls))
 
         return walls
 
@@ -1297,8 +1209,7 @@ class LoD3Converter(Converter):
             Die GML-ID des Objekts
         """
         for geometry in geometries:
-            self.geom.AddGeometry(geometry)
-            self.bldgGeom.AddGeometry(geometry)
+            self.envelope.add(geometry)
 
         # XML-Struktur
         chBldgBB = etree.SubElement(chBldg, QName(XmlNs.bldg, "boundedBy"))
@@ -1359,7 +1270,7 @@ class LoD3Converter(Converter):
                 gmlIdPoly = "PolyID" + str(uuid.uuid4())
                 chBldgPol.set(QName(XmlNs.gml, "id"), gmlIdPoly)
 
-            opening.gmlId = gmlId
+            opening.gmlId, opening.geomId = gmlId, polyId
             openSurf.append(opening)
 
         return polyIds, gmlIdMain, openSurf
@@ -11,13 +11,10 @@
 
 # Standard-Bibliotheken
 import math
+import os
 import sys
 import uuid
-
-# IFC-Bibliotheken
-import ifcopenshell
-import ifcopenshell.util.pset
-import ifcopenshell.geom
+import numpy as np
 
 # XML-Bibliotheken
 from lxml import etree
@@ -36,14 +33,22 @@ from sympy import Point3D, Line
 from .utilitiesGeom import UtilitiesGeom
 from .utilitiesIfc import UtilitiesIfc
 from .converter import Converter
+from .converter_lod2 import LoD2Converter
 from .converter_eade import EADEConverter
+from .half_edge_mesh import HalfEdgeMesh
+from .tessellation_profile import TessellationProfile
+from .opening_extractor import OpeningExtractor
+from .template_library import TemplateLibrary
+from .room_boundary import RoomBoundary
 try:
     from ..model.xmlns import XmlNs
     from ..model.surface import Surface
+    from ..model.surface_array import SurfaceArray
 except ImportError:
     sys.path.insert(0, '..')
     from model.xmlns import XmlNs
     from model.surface import Surface
+    from model.surface_array import SurfaceArray
 
 
 #####
@@ -52,6 +57,15 @@ except ImportError:
 class LoD4Converter(Converter):
     """ Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien in LoD4 """
 
+    lod = 4
+    fallback = LoD2Converter
+    stageKeys = ["base", "slabs", "roofs", "walls", "openings", "wallOpenings", "spaces"]
+
+    # IFC-Typen der Möbel und Installationen
+    furnitureTypes = ["IfcFurnishingElement"]
+    installationTypes = ["IfcStair", "IfcStairFlight", "IfcRamp", "IfcRampFlight", "IfcRailing", "IfcColumn", "IfcBeam",
+                         "IfcChimney", "IfcFlowTerminal"]
+
     def __init__(self, task, ifc, name, trans, eade):
         """ Konstruktor der Model-Klasse zum Konvertieren von IFC-Dateien zu CityGML-Dateien in LoD4
 
@@ -65,7 +79,9 @@ class LoD4Converter(Converter):
         super().__init__(task, ifc, name, trans, eade)
 
         # Initialisierung von Attributen
-        self.progress, self.bldgCount = 5, None
+        self.progress, self.progressSpan, self.bldgCount = 5, 92.5, None
+        self.templates = TemplateLibrary(trans, self.unitScale)
+        self.roomSurfaces = []
 
     @staticmethod
     def tr(msg):
@@ -102,32 +118,35 @@ class LoD4Converter(Converter):
         # Über alle enthaltenen Gebäude iterieren
         self.bldgCount = len(ifcBuildings)
         for ifcBuilding in ifcBuildings:
+            self.bldgShare = self.getBldgShare(ifcBuilding)
+            self.stageShares = self.getStageShares(ifcBuilding)
             chCOM = etree.SubElement(root, QName(XmlNs.core, "cityObjectMember"))
             chBldg = etree.SubElement(chCOM, QName(XmlNs.bldg, "Building"))
 
             # Gebäudeattribute
             self.task.logging.emit(self.tr(u'Building attributes are extracted'))
-            self.convertBldgAttr(self.ifc, ifcBuilding, chBldg)
+            height = self.convertBldgAttr(self.ifc, ifcBuilding, chBldg)
             if self.task.isCanceled():
                 return False
-            self.progress += (2.5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 1 / 3)
 
-            # Gebäudebestandteile
+            # Gebäudebestandteile (mit Zeitbudget, bei Überschreitung in LoD2 bzw. LoD1)
             self.task.logging.emit(self.tr(u'Building bounds are calculated'))
-            links, footPrint, surfaces = self.convertBldgBound(ifcBuilding, chBldg)
+            shape = self.convertBldgShapeBudget(ifcBuilding, chBldg, height)
             if self.task.isCanceled():
                 return False
+            links, footPrint, surfaces, lod = shape
 
             # Gebäudekörper
             self.task.logging.emit(self.tr(u'Building solid is calculated'))
-            self.convertSolid(chBldg, links, 4)
+            self.convertSolid(chBldg, links, lod)
             if self.task.isCanceled():
                 return False
 
-            # Innenräume
+            # Innenräume (mit Zeitbudget, bei Überschreitung ohne Innenräume)
             self.task.logging.emit(self.tr(u'Rooms are calculated'))
-            self.convertInterior(ifcBuilding, chBldg)
+            self.runBudget(self, chBldg, self.convertInterior, ifcBuilding, chBldg)
+            self.templates.prune(root)
             if self.task.isCanceled():
                 return False
 
@@ -136,70 +155,102 @@ class LoD4Converter(Converter):
             self.convertAddress(ifcBuilding, ifcSite, chBldg)
             if self.task.isCanceled():
                 return False
-            self.progress += (2.5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 1 / 3)
 
             # Bounding Box
             self.task.logging.emit(self.tr(u'Building bound is calculated'))
-            bbox = self.convertBound(self.geom, chBound, self.trans)
+            bbox = self.convertBound(self.envelope, chBound, self.trans)
             if self.task.isCanceled():
                 return False
-            self.progress += (2.5 / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("base", 1 / 3)
 
             # EnergyADE
             if self.eade:
                 # Wetterdaten
                 self.task.logging.emit(self.tr(u'Energy ADE: weather data is extracted'))
-                EADEConverter.convertWeatherData(ifcProject, ifcSite, chBldg, bbox)
+                EADEConverter.convertWeatherData(ifcProject, ifcSite, chBldg, bbox, root, self.siteRegistry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
 
                 # Gebäudeattribute
                 self.task.logging.emit(self.tr(u'Energy ADE: building attributes are extracted'))
-                EADEConverter.convertBldgAttr(self.ifc, ifcBuilding, chBldg, bbox, footPrint)
+                EADEConverter.convertBldgAttr(self.ifc, ifcBuilding, chBldg, bbox, footPrint,
+                                              self.getExteriorMap(ifcBuilding))
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
 
                 # Thermale Zone
                 self.task.logging.emit(self.tr(u'Energy ADE: thermal zone is calculated'))
                 linkUZ, chBldgTZ, constructions = EADEConverter.calcThermalZone(self.ifc, ifcBuilding, chBldg, root,
-                                                                                surfaces, 4)
+                                                                                surfaces, lod, self.xlink,
+                                                                                self.registry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (7.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.375)
 
                 # Nutzungszone
                 self.task.logging.emit(self.tr(u'Energy ADE: usage zone is calculated'))
-                EADEConverter.calcUsageZone(self.ifc, ifcProject, ifcBuilding, chBldg, linkUZ, chBldgTZ)
+                EADEConverter.calcUsageZone(self.ifc, ifcProject, ifcBuilding, chBldg, linkUZ, chBldgTZ,
+                                            self.siteRegistry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
 
                 # Konstruktionen
                 self.task.logging.emit(self.tr(u'Energy ADE: construction is calculated'))
-                materials = EADEConverter.convertConstructions(root, constructions)
+                materials = EADEConverter.convertConstructions(root, constructions, self.registry)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
 
                 # Materialien
                 self.task.logging.emit(self.tr(u'Energy ADE: material is calculated'))
                 EADEConverter.convertMaterials(root, materials)
                 if self.task.isCanceled():
                     return False
-                self.progress += (2.5 / self.bldgCount)
-                self.task.setProgress(self.progress)
+                self.advance("eade", 0.125)
+
+            # Direkte Ausgabe
+            self.streamBldg(root, chCOM, surfaces)
+
+            # Restzeit
+            self.logRemaining(ifcBuilding)
 
         return root
 
+    def streamBldg(self, root, chCOM, surfaces=None):
+        """ Gibt ein fertig konvertiertes Gebäude direkt an den CityJSON-Writer weiter (CityJSON bzw. CityJSONSeq)
+
+        Neben der Gebäudehülle werden die Raumbegrenzungen übergeben. Die Vorlagen eines entfernten Gebäudes werden
+        vergessen, da spätere Gebäude nicht mehr auf sie verweisen können.
+
+        Args:
+            root: XML-Element des CityGML-Dokuments
+            chCOM: XML-Element des cityObjectMember des Gebäudes
+            surfaces: Die Oberflächen der Gebäudehülle, als Liste von SurfaceArrays
+                Default: None (Geometrie aus der GML)
+        """
+        super().streamBldg(root, chCOM, (surfaces or []) + self.roomSurfaces)
+        self.roomSurfaces = []
+        self.templates.prune(root)
+
+    def convertBldgShape(self, ifcBuilding, chBldg, height):
+        """ Konvertiert die Gebäudegeometrie in LoD4
+
+        Args:
+            ifcBuilding: Das IFC-Gebäude, aus dem die Geometrie entnommen werden soll
+            chBldg: XML-Element, an dem die Geometrie angefügt werden soll
+            height: Die Gebäudehöhe, als float (in LoD4 nicht benötigt)
+
+        Returns:
+            GML-IDs der Bestandteile des erweiterten Gebäudeumrisses, als Liste
+            Die Grundflächengeometrie
+            Die GML-IDs der Bestandteile mit zugehörigen IFC-Elementen, als Liste
+        """
+        return self.convertBldgBound(ifcBuilding, chBldg)
+
     def convertBldgBound(self, ifcBuilding, chBldg):
         """ Konvertiert den erweiterten Gebäudeumriss von IFC zu CityGML in Level of Detail (LoD) 3
 
@@ -258,20 +309,25 @@ class LoD4Converter(Converter):
         for base in bases:
             linksBase, base.gmlId, openSurf = self.setElementGroup(chBldg, base.geom, "GroundSurface", 3, base.name,
                                                                    base.openings)
+            base.geomId = linksBase[0]
             links += linksBase
             surfaces += openSurf
         for roof in roofs:
             linksRoof, roof.gmlId, openSurf = self.setElementGroup(chBldg, roof.geom, "RoofSurface", 3, roof.name,
                                                                    roof.openings)
+            roof.geomId = linksRoof[0]
             links += linksRoof
             surfaces += openSurf
         for wall in walls:
             linksWall, wall.gmlId, openSurf = self.setElementGroup(chBldg, wall.geom, "WallSurface", 3, wall.name,
                                                                    wall.openings)
+            wall.geomId = linksWall[0]
             links += linksWall
             surfaces += openSurf
         surfaces += bases + roofs + walls
-        return links, bases[0].geom[0], surfaces
+
+        # Nach dem Schreiben nur noch die kompakten Koordinaten-Arrays halten (Energy ADE)
+        return links, bases[0].geom[0], SurfaceArray.compact(surfaces)
 
     def calcBases(self, ifcBuilding):
         """ Berechnet die Grundfläche in Level of Detail (LoD) 3
@@ -299,40 +355,13 @@ class LoD4Converter(Converter):
 
         for i in range(0, len(ifcSlabs)):
             ifcSlab = ifcSlabs[i]
-            settings = ifcopenshell.geom.settings()
-            settings.set(settings.USE_WORLD_COORDS, True)
-            shape = ifcopenshell.geom.create_shape(settings, ifcSlab)
-            # Vertizes
-            verts = shape.geometry.verts
-            grVertsCurr = [[round(verts[i], 5), round(verts[i + 1], 5), round(verts[i + 2], 5)] for i in
-                           range(0, len(verts), 3)]
-            # Flächen
-            faces = shape.geometry.faces
-            grFacesCurr = [[faces[i], faces[i + 1], faces[i + 2]] for i in range(0, len(faces), 3)]
-            # Vertizes der Flächen
-            grVertsList = []
-            for face in grFacesCurr:
-                facePoints = [grVertsCurr[face[0]], grVertsCurr[face[1]], grVertsCurr[face[2]]]
-                points = []
-                for facePoint in facePoints:
-                    point = self.trans.georeferencePoint(facePoint)
-                    points.append(point)
-                grVertsList.append(points)
-
-            # Geometrien erstellen
-            geometries = []
-            for grVerts in grVertsList:
-                # Polygon aus Ring aus Punkten erstellen
-                geometry = ogr.Geometry(ogr.wkbPolygon)
-                ring = ogr.Geometry(ogr.wkbLinearRing)
-                for grVert in grVerts:
-                    ring.AddPoint(grVert[0], grVert[1], grVert[2])
-                ring.CloseRings()
-                geometry.AddGeometry(ring)
-                geometries.append(geometry)
-
-            # Alle Flächen in der gleichen Ebene vereinigen
-            slabGeom = UtilitiesGeom.union3D(geometries)
+            facetSet = self.getFacets([ifcSlab], TessellationProfile.DETAIL)[0]
+
+            # Alle Flächen in der gleichen Ebene vereinigen (Ebenen-Gruppen und Halbkanten-Netz)
+            polygons = self.facetPolygons(facetSet)
+            if self.task.isCanceled():
+                return False
+            slabGeom = SurfaceArray.fromPolygons(polygons).toOgr()
             slabGeom = UtilitiesGeom.simplify(slabGeom, 0.001, 0.05)
 
             # Höhen und Flächen der einzelnen Oberflächen heraussuchen
@@ -372,9 +401,7 @@ class LoD4Converter(Converter):
             if self.task.isCanceled():
                 return False
 
-            self.progress += (7 / self.bldgCount / len(ifcSlabs)) if not self.eade else (
-                    5 / self.bldgCount / len(ifcSlabs))
-            self.task.setProgress(self.progress)
+            self.advance("slabs", 0.7 / len(ifcSlabs))
 
         floors = bases
 
@@ -428,9 +455,7 @@ class LoD4Converter(Converter):
                 if self.task.isCanceled():
                     return False
 
-                self.progress += (3 / self.bldgCount / len(ifcSlabs)) if not self.eade else (
-                        2.5 / self.bldgCount / len(ifcSlabs))
-                self.task.setProgress(self.progress)
+                self.advance("slabs", 0.3 / len(ifcSlabs))
 
             removedBases.sort(reverse=True)
             for removedBase in removedBases:
@@ -460,40 +485,13 @@ class LoD4Converter(Converter):
         # Geometrie
         for i in range(0, len(ifcRoofs)):
             ifcRoof = ifcRoofs[i]
-            settings = ifcopenshell.geom.settings()
-            settings.set(settings.USE_WORLD_COORDS, True)
-            shape = ifcopenshell.geom.create_shape(settings, ifcRoof)
-            # Vertizes
-            verts = shape.geometry.verts
-            grVertsCurr = [[round(verts[i], 5), round(verts[i + 1], 5), round(verts[i + 2], 5)] for i in
-                           range(0, len(verts), 3)]
-            # Flächen
-            faces = shape.geometry.faces
-            grFacesCurr = [[faces[i], faces[i + 1], faces[i + 2]] for i in range(0, len(faces), 3)]
-            # Vertizes der Flächen
-            grVertsList = []
-            for face in grFacesCurr:
-                facePoints = [grVertsCurr[face[0]], grVertsCurr[face[1]], grVertsCurr[face[2]]]
-                points = []
-                for facePoint in facePoints:
-                    point = self.trans.georeferencePoint(facePoint)
-                    points.append(point)
-                grVertsList.append(points)
-
-            # Geometrien erstellen
-            geometries = []
-            for grVerts in grVertsList:
-                # Polygon aus Ring aus Punkten erstellen
-                geometry = ogr.Geometry(ogr.wkbPolygon)
-                ring = ogr.Geometry(ogr.wkbLinearRing)
-                for grVert in grVerts:
-                    ring.AddPoint(grVert[0], grVert[1], grVert[2])
-                ring.CloseRings()
-                geometry.AddGeometry(ring)
-                geometries.append(geometry)
-
-            # Alle Flächen in der gleichen Ebene vereinigen
-            roofGeom = UtilitiesGeom.union3D(geometries)
+            facetSet = self.getFacets([ifcRoof], TessellationProfile.DETAIL)[0]
+
+            # Alle Flächen in der gleichen Ebene vereinigen (Ebenen-Gruppen und Halbkanten-Netz)
+            polygons = self.facetPolygons(facetSet)
+            if self.task.isCanceled():
+                return False
+            roofGeom = SurfaceArray.fromPolygons(polygons).toOgr()
             roofGeom = UtilitiesGeom.simplify(roofGeom, 0.001, 0.05)
 
             # Höhen und Flächen der einzelnen Oberflächen heraussuchen
@@ -528,9 +526,7 @@ class LoD4Converter(Converter):
             if self.task.isCanceled():
                 return False
 
-            self.progress += (10 / self.bldgCount / len(ifcRoofs)) if not self.eade else (
-                    7.5 / self.bldgCount / len(ifcRoofs))
-            self.task.setProgress(self.progress)
+            self.advance("roofs", 1 / len(ifcRoofs))
 
         return roofs, roofsOrig
 
@@ -552,76 +548,28 @@ class LoD4Converter(Converter):
             return []
 
         # Heraussuchen der Außenwände
-        ifcWallsExt = []
-        ifcRelSpaceBoundaries = UtilitiesIfc.findElement(self.ifc, ifcBuilding, "IfcRelSpaceBoundary", result=[])
-        for ifcWall in ifcWalls:
-            extCount, intCount = 0, 0
-            for ifcRelSpaceBoundary in ifcRelSpaceBoundaries:
-                relElem = ifcRelSpaceBoundary.RelatedBuildingElement
-                if relElem == ifcWall:
-                    if ifcRelSpaceBoundary.InternalOrExternalBoundary == "EXTERNAL":
-                        extCount += 1
-                    elif ifcRelSpaceBoundary.InternalOrExternalBoundary == "INTERNAL":
-                        intCount += 1
-            if extCount > 0:
-                ifcWallsExt.append(ifcWall)
-            elif intCount == 0 and UtilitiesIfc.findPset(ifcWall, "Pset_WallCommon", "IsExternal"):
-                ifcWallsExt.append(ifcWall)
-
-            if self.task.isCanceled():
-                return False
+        exteriorMap = self.getExteriorMap(ifcBuilding)
+        ifcWallsExt = [ifcWall for ifcWall in ifcWalls if exteriorMap.isExternalWall(ifcWall)]
+        if self.task.isCanceled():
+            return False
 
         # Geometrie
         for i in range(0, len(ifcWallsExt)):
             ifcWall = ifcWallsExt[i]
-            settings = ifcopenshell.geom.settings()
-            settings.set(settings.USE_WORLD_COORDS, True)
-            shape = ifcopenshell.geom.create_shape(settings, ifcWall)
-            # Vertizes
-            verts = shape.geometry.verts
-            grVertsCurr = [[round(verts[i], 5), round(verts[i + 1], 5), round(verts[i + 2], 5)] for i in
-                           range(0, len(verts), 3)]
-            # Flächen
-            faces = shape.geometry.faces
-            grFacesCurr = [[faces[i], faces[i + 1], faces[i + 2]] for i in range(0, len(faces), 3)]
-            # Vertizes der Flächen
-            grVertsList = []
-            for face in grFacesCurr:
-                facePoints = [grVertsCurr[face[0]], grVertsCurr[face[1]], grVertsCurr[face[2]]]
-                points = []
-                for facePoint in facePoints:
-                    point = self.trans.georeferencePoint(facePoint)
-                    points.append(point)
-                grVertsList.append(points)
-
-                if self.task.isCanceled():
-                    return False
+            facetSet = self.getFacets([ifcWall], TessellationProfile.DETAIL)[0]
 
-            # Geometrien erstellen
-            geometries = []
-            for grVerts in grVertsList:
-                # Polygon aus Ring aus Punkten erstellen
-                geometry = ogr.Geometry(ogr.wkbPolygon)
-                ring = ogr.Geometry(ogr.wkbLinearRing)
-                for grVert in grVerts:
-                    ring.AddPoint(grVert[0], grVert[1], grVert[2])
-                ring.CloseRings()
-                geometry.AddGeometry(ring)
-                geometries.append(geometry)
-
-                if self.task.isCanceled():
-                    return False
-
-            # Vereinigen, Vereinfachen und Hinzufügen
-            wallGeom = UtilitiesGeom.union3D(geometries, task=self.task)
+            # Vereinigen, Vereinfachen und Hinzufügen (Ebenen-Gruppen und Halbkanten-Netz)
+            polygons = self.facetPolygons(facetSet)
+            if self.task.isCanceled():
+                return False
+            wallGeom = SurfaceArray.fromPolygons(polygons).toOgr()
             wallGeom = UtilitiesGeom.simplify(wallGeom, 0.001, 0.001, task=self.task)
             walls.append(Surface(wallGeom, ifcWall.Name, ifcWall, "Wall"))
 
             if self.task.isCanceled():
                 return False
 
-            self.progress += (10 / self.bldgCount / len(ifcWallsExt))
-            self.task.setProgress(self.progress)
+            self.advance("walls", 0.5 / len(ifcWallsExt))
 
         return walls
 
@@ -641,21 +589,10 @@ class LoD4Converter(Converter):
         ifcOpenings = UtilitiesIfc.findElement(self.ifc, ifcBuilding, type, result=[])
 
         # Heraussuchen der Außenöffnungen
-        ifcOpeningsExt = []
-        ifcRelSpaceBoundaries = UtilitiesIfc.findElement(self.ifc, ifcBuilding, "IfcRelSpaceBoundary", result=[])
+        exteriorMap = self.getExteriorMap(ifcBuilding)
         psetCommon = "Pset_DoorCommon" if type == "ifcDoor" else "Pset_WindowCommon"
-        for ifcOpening in ifcOpenings:
-            ext = UtilitiesIfc.findPset(ifcOpening, psetCommon, "IsExternal")
-            if ext is None:
-                ext = False
-                for ifcRelSpaceBoundary in ifcRelSpaceBoundaries:
-                    relElem = ifcRelSpaceBoundary.RelatedBuildingElement
-                    if relElem == ifcOpening and ifcRelSpaceBoundary.InternalOrExternalBoundary == "EXTERNAL":
-                        ext = True
-                if ext:
-                    ifcOpeningsExt.append(ifcOpening)
-            elif ext:
-                ifcOpeningsExt.append(ifcOpening)
+        ifcOpeningsExt = [ifcOpening for ifcOpening in ifcOpenings
+                          if exteriorMap.isExternalOpening(ifcOpening, psetCommon)]
 
         if self.task.isCanceled():
             return False
@@ -663,73 +600,35 @@ class LoD4Converter(Converter):
         # Geometrie
         for i in range(0, len(ifcOpeningsExt)):
             ifcOpening = ifcOpeningsExt[i]
-            settings = ifcopenshell.geom.settings()
-            settings.set(settings.USE_WORLD_COORDS, True)
-            shape = ifcopenshell.geom.create_shape(settings, ifcOpening)
-            # Vertizes
-            verts = shape.geometry.verts
-            grVertsCurr = [[round(verts[i], 5), round(verts[i + 1], 5), round(verts[i + 2], 5)] for i in
-                           range(0, len(verts), 3)]
-            grVertsList = []
-            minHeight, maxHeight = sys.maxsize, -sys.maxsize
-
-            # Nur wichtige Vertizes hinzufügen
-            for grVertCurr in grVertsCurr:
-                point = self.trans.georeferencePoint(grVertCurr)
-                if point[2] <= minHeight:
-                    minHeight = point[2]
-                    grVertsList.append(point)
-                if point[2] >= maxHeight:
-                    maxHeight = point[2]
-                    grVertsList.append(point)
-            openings.append(Surface(grVertsList, ifcOpening.Name, ifcOpening, type))
-
-            if self.task.isCanceled():
-                return False
-
-            self.progress += (10 / self.bldgCount / len(ifcOpeningsExt)) if not self.eade else (
-                    5 / self.bldgCount / len(ifcOpeningsExt))
-            self.task.setProgress(self.progress)
-
-        return openings
 
-    def assignOpenings(self, openings, walls):
-        """ Fügt die Öffnungen (Fenster & Türen) an die zugehörigen Wände in Level of Detail (LoD) 3 an
+            # Rechteckige Öffnungen: Eckpunkte aus Platzierung und Abmessungen
+            corners = OpeningExtractor.corners(ifcOpening, self.unitScale)
+            if corners is not None:
+                grVertsList = list(self.trans.georeferencePoints(np.round(corners, 5)))
 
-        Args:
-            openings: Die anzufügenden Öffnungen (Fenster & Türen), als Liste
-            walls: Die Wände, an die die Öffnungen angefügt werden sollen, als Liste
+            # Sonstige Öffnungen: Tessellierung
+            else:
+                # Georeferenzierte Vertizes
+                grVertsCurr = self.getFacets([ifcOpening], TessellationProfile.DETAIL)[0].mesh()[0]
+                grVertsList = []
+                minHeight, maxHeight = sys.maxsize, -sys.maxsize
 
-        Returns:
-            Die angepassten Wände, als Liste
-        """
-        for opening in openings:
-            ptOp = opening.geom[0]
-
-            # Wand bzw. Dach mit geringstem Abstand zur Öffnung berechnen
-            minDist, minDistElem = sys.maxsize, None
-            for wall in walls:
-                for geom in wall.geom:
-                    for i in range(0, geom.GetGeometryCount()):
-                        ring = geom.GetGeometryRef(i)
-                        for j in range(0, ring.GetPointCount()):
-                            pt = ring.GetPoint(j)
-                            dist = math.sqrt((ptOp[0] - pt[0]) ** 2 + (ptOp[1] - pt[1]) ** 2 + (ptOp[2] - pt[2]) ** 2)
-                            if dist < minDist:
-                                minDist, minDistElem = dist, wall
-
-            # Öffnung hinzufügen
-            if minDistElem is not None:
-                minDistElem.openings.append(opening)
+                # Nur wichtige Vertizes hinzufügen
+                for point in np.round(grVertsCurr, 5):
+                    if point[2] <= minHeight:
+                        minHeight = point[2]
+                        grVertsList.append(point)
+                    if point[2] >= maxHeight:
+                        maxHeight = point[2]
+                        grVertsList.append(point)
+            openings.append(Surface(grVertsList, ifcOpening.Name, ifcOpening, type))
 
             if self.task.isCanceled():
                 return False
 
-            self.progress += (10 / self.bldgCount / len(openings)) if not self.eade else (
-                    5 / self.bldgCount / len(openings))
-            self.task.setProgress(self.progress)
+            self.advance("openings", 0.5 / len(ifcOpeningsExt))
 
-        return walls
+        return openings
 
     def adjustWallOpenings(self, walls):
         """ Passt die Wände auf Grundlage der Dächer, Grundflächen und Öffnungen in Level of Detail (LoD) 3 an
@@ -1061,8 +960,7 @@ class LoD4Converter(Converter):
             if self.task.isCanceled():
                 return False
 
-            self.progress += (10 / self.bldgCount / len(walls))
-            self.task.setProgress(self.progress)
+            self.advance("wallOpenings", 0.5 / len(walls))
 
         return walls, wallMainCounts
 
@@ -1281,8 +1179,7 @@ class LoD4Converter(Converter):
                 if self.task.isCanceled():
                     return False
 
-            self.progress += (10 / self.bldgCount / len(walls))
-            self.task.setProgress(self.progress)
+            self.advance("walls", 0.5 / len(walls))
 
         return walls
 
@@ -1302,8 +1199,7 @@ class LoD4Converter(Converter):
             Die GML-ID des Objekts
         """
         for geometry in geometries:
-            self.geom.AddGeometry(geometry)
-            self.bldgGeom.AddGeometry(geometry)
+            self.envelope.add(geometry)
 
         # XML-Struktur
         chBldgBB = etree.SubElement(chBldg, QName(XmlNs.bldg, "boundedBy"))
@@ -1364,7 +1260,7 @@ class LoD4Converter(Converter):
                 gmlIdPoly = "PolyID" + str(uuid.uuid4())
                 chBldgPol.set(QName(XmlNs.gml, "id"), gmlIdPoly)
 
-            opening.gmlId = gmlId
+            opening.gmlId, opening.geomId = gmlId, polyId
             openSurf.append(opening)
 
         return polyIds, gmlIdMain, openSurf
@@ -1376,16 +1272,33 @@ class LoD4Converter(Converter):
             ifcBuilding: Das IFC-Gebäude, aus dem das Gebäudeinnere entnommen werden soll
             chBldg: XML-Element, an dem das Gebäudeinnere angefügt werden soll
         """
-        # TODO: LoD4 - Interieur
-
         # IFC-Elemente der Grundfläche
         ifcSpaces = UtilitiesIfc.findElement(self.ifc, ifcBuilding, "IfcSpace", result=[])
         if len(ifcSpaces) == 0:
             self.task.logging.emit(self.tr(u"Due to the missing rooms, they will also be missing in CityGML"))
             return []
 
-        spaceCount = len(ifcSpaces)
+        # Randflächen je Raum, Räume ohne vollständige Randflächen werden gemeinsam parallel tesselliert
+        rooms = []
         for ifcSpace in ifcSpaces:
+            rooms.append(RoomBoundary(ifcSpace, self.trans, scale=self.unitScale))
+            if self.task.isCanceled():
+                return False
+        bodies = [room.ifcSpace for room in rooms if not room.isComplete()]
+        if self.costModel is not None:
+            threads = self.costModel.workers(tasks=len(bodies))
+        else:
+            threads = max(min(os.cpu_count() or 1, len(bodies)), 1)
+        meshes = self.tessellateMeshes(self.ifc, bodies, self.trans, TessellationProfile.FOOTPRINT, threads)
+        if self.task.isCanceled():
+            return False
+
+        spaceCount = len(ifcSpaces)
+        for room in rooms:
+            ifcSpace = room.ifcSpace
+            surfaces = self.calcRoom(room, meshes.get(ifcSpace.id()))
+            if self.task.isCanceled():
+                return False
             chIntRoom = etree.SubElement(chBldg, QName(XmlNs.bldg, "interiorRoom"))
             chRoom = etree.SubElement(chIntRoom, QName(XmlNs.bldg, "Room"))
 
@@ -1404,67 +1317,105 @@ class LoD4Converter(Converter):
                     chRoomDescr.text = ifcSpace.LongName
 
             # Raumbestandteile
-            links = self.convertRoomBound(ifcSpace, chRoom)
+            links = self.convertRoomBound(surfaces, chRoom)
             if self.task.isCanceled():
                 return False
-            self.progress += (5 / spaceCount / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("spaces", 0.25 / spaceCount)
 
             # Raumkörper
             self.convertSolid(chRoom, links, 4)
             if self.task.isCanceled():
                 return False
-            self.progress += (5 / spaceCount / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("spaces", 0.25 / spaceCount)
 
             # Möbel
             self.convertFurniture(ifcSpace, chRoom)
             if self.task.isCanceled():
                 return False
-            self.progress += (5 / spaceCount / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("spaces", 0.25 / spaceCount)
 
             # Installationen
             self.convertInstallation(ifcSpace, chRoom)
             if self.task.isCanceled():
                 return False
-            self.progress += (5 / spaceCount / self.bldgCount)
-            self.task.setProgress(self.progress)
+            self.advance("spaces", 0.25 / spaceCount)
 
-    # noinspection PyUnusedLocal
-    @staticmethod
-    def convertRoomBound(ifcSpace, chRoom):
-        """ Konvertiert einen Raum von IFC zu CityGML in Level of Detail (LoD) 4
+    def calcRoom(self, room, mesh=None):
+        """ Berechnet die Boden-, Decken-, Innenwand- und Abschlussflächen eines Raumes samt Öffnungen
+
+        Bevorzugt werden die Randflächen des Raumes (IfcRelSpaceBoundary). Beschreiben diese den Raum nicht
+        vollständig, werden die Flächen des tessellierten Raumkörpers über ihre Ausrichtung zugeordnet.
 
         Args:
-            ifcSpace: Der IFC-Raum, aus dem der Raumumriss entnommen werden soll
-            chRoom: XML-Element, an dem der Raumumriss angefügt werden soll
+            room: Die Randflächen des Raumes, als RoomBoundary
+            mesh: Die georeferenzierten Vertizes und Dreiecke des Raumkörpers, als Tupel
+                Default: None (Raumkörper nicht tessellierbar)
+
+        Returns:
+            Die Oberflächen des Raumes, als Liste von SurfaceArrays
         """
-        # Heraussuchen von Böden/Decken (IfcSlab), Wänden (IfcWall/IfcCurtainWall) und Öffnungen (IfcDoor/IfcWindow)
-        #   aus dem IfcSpace (über IfcRelAggregates)
-        # Setzen als bldg:FloorSurface/CeilingSurface/ClosureSurface und bldg:InteriorWallSurface (mit bdlg:Door/Window)
-        #   in bldg:boundedBy
-        # Entnehmen von grundlegenden Eigenschaften (Name)
-        # Berechnung der Geometrie
-        return []
+        if self.task.isCanceled():
+            return []
 
-    @staticmethod
-    def convertFurniture(ifcSpace, chRoom):
+        # Berechnung über die Randflächen
+        if room.isComplete():
+            surfaces = []
+            for face in room.faces:
+                surface = room.faceSurface(face)
+                if surface is not None:
+                    surfaces.append(surface)
+                if self.task.isCanceled():
+                    return []
+            return surfaces
+
+        # Berechnung über den Raumkörper
+        if mesh is None:
+            return []
+        ifcSpace = room.ifcSpace
+        name = ifcSpace.Name if ifcSpace.Name is not None else ifcSpace.LongName
+        polygons = HalfEdgeMesh(*mesh).polygons(task=self.task)
+        if self.task.isCanceled():
+            return []
+        return RoomBoundary.bodySurfaces(polygons, name)
+
+    def convertRoomBound(self, surfaces, chRoom):
+        """ Konvertiert die Begrenzung eines Raumes von IFC zu CityGML in Level of Detail (LoD) 4
+
+        Args:
+            surfaces: Die Oberflächen des Raumes, als Liste von SurfaceArrays
+            chRoom: XML-Element, an dem der Raumumriss angefügt werden soll
+
+        Returns:
+            GML-IDs der Bestandteile des Raumumrisses, als Liste
+        """
+        links = []
+        for surface in surfaces:
+            # Setzen als bldg:FloorSurface/CeilingSurface/InteriorWallSurface/ClosureSurface (mit bldg:Door/Window)
+            #   in bldg:boundedBy
+            polyIds, gmlId, openings = self.setElementGroup(chRoom, surface.geom, RoomBoundary.cityGmlTypes[
+                surface.type], 4, surface.name, surface.openings)
+            surface.gmlId = gmlId
+            links += polyIds
+        self.roomSurfaces += surfaces
+        return links
+
+    def convertFurniture(self, ifcSpace, chRoom):
         """ Konvertiert die Möblierung eines Raumes von IFC zu CityGML in Level of Detail (LoD) 4
 
         Args:
             ifcSpace: Der IFC-Raum, aus dem die Möbel entnommen werden sollen
             chRoom: XML-Element, an dem die Möbel angefügt werden sollen
         """
-        # Heraussuchen von Möbeln (ifcFurniture/IfcSystemFurnitureElemen)
-        #   aus dem IfcSpace (über IfcRelContainedInSpatialStructure)
-        # Setzen als bldg:BuildingFurniture in bldg:interiorFurniture
-        # Entnehmen von grundlegenden Eigenschaften (Name, Description, Function)
-        # Berechnung der Geometrie
-        return
+        # Heraussuchen von Möbeln (IfcFurnishingElement) aus dem IfcSpace (über IfcRelContainedInSpatialStructure)
+        for ifcElement in self.findContained(ifcSpace, self.furnitureTypes):
+            if self.task.isCanceled():
+                return
+            # Setzen als bldg:BuildingFurniture in bldg:interiorFurniture
+            chIntFurn = etree.SubElement(chRoom, QName(XmlNs.bldg, "interiorFurniture"))
+            chFurn = etree.SubElement(chIntFurn, QName(XmlNs.bldg, "BuildingFurniture"))
+            self.convertObject(ifcElement, chFurn)
 
-    @staticmethod
-    def convertInstallation(ifcSpace, chRoom):
+    def convertInstallation(self, ifcSpace, chRoom):
         """ Konvertiert die Installationen eines Raumes von IFC zu CityGML in Level of Detail (LoD) 4
 
         Args:
@@ -1472,8 +1423,65 @@ class LoD4Converter(Converter):
             chRoom: XML-Element, an dem die Installationen angefügt werden sollen
         """
         # Heraussuchen von Installationen (IfcStair, IfcRamp, IfcRailing, IfcColumn, IfcBeam, IfcChimney, ...)
-        #   aus dem IfcSpace (über IfcRelConrtainedInSpatialStructure)
-        # Setzen als bldg:IntBuildingInstallation in bldg:roomInstallation
-        # Entnehmen von grundlegenden Eigenschaften (Name, Description, Function)
-        # Berechnung der Geometrie
-        return
+        #   aus dem IfcSpace (über IfcRelContainedInSpatialStructure)
+        for ifcElement in self.findContained(ifcSpace, self.installationTypes):
+            if self.task.isCanceled():
+                return
+            # Setzen als bldg:IntBuildingInstallation in bldg:roomInstallation
+            chRoomInst = etree.SubElement(chRoom, QName(XmlNs.bldg, "roomInstallation"))
+            chInst = etree.SubElement(chRoomInst, QName(XmlNs.bldg, "IntBuildingInstallation"))
+            self.convertObject(ifcElement, chInst)
+
+    @staticmethod
+    def findContained(ifcSpace, types):
+        """ Sucht die in einem Raum enthaltenen IFC-Elemente bestimmter Typen
+
+        Args:
+            ifcSpace: Der IFC-Raum
+            types: Die gesuchten IFC-Typen, als Liste
+
+        Returns:
+            Die gefundenen IFC-Elemente, als Liste
+        """
+        result = []
+        for rel in ifcSpace.ContainsElements:
+            for ifcElement in rel.RelatedElements:
+                if any(ifcElement.is_a(type) for type in types) and ifcElement not in result:
+                    result.append(ifcElement)
+        return result
+
+    def convertObject(self, ifcElement, chObj):
+        """ Konvertiert Eigenschaften und Geometrie eines Möbels bzw. einer Installation
+
+        Geteilte Repräsentationen werden als ImplicitGeometry geschrieben, alle übrigen als explizite lod4Geometry.
+
+        Args:
+            ifcElement: Das IFC-Element
+            chObj: XML-Element des Möbels bzw. der Installation
+        """
+        # Eigenschaften
+        chObj.set(QName(XmlNs.gml, "id"), "UUID_" + str(uuid.uuid4()))
+        if ifcElement.Description is not None:
+            chObjDescr = etree.SubElement(chObj, QName(XmlNs.gml, "description"))
+            chObjDescr.text = ifcElement.Description
+        if ifcElement.Name is not None:
+            chObjName = etree.SubElement(chObj, QName(XmlNs.gml, "name"))
+            chObjName.text = ifcElement.Name
+
+        # Geometrie: einmalig tessellierte Vorlage mit Referenzpunkt und Transformationsmatrix
+        if self.templates.toXml(chObj, ifcElement, 4):
+            return
+
+        # Geometrie: explizit
+        try:
+            facetSet = self.getFacets([ifcElement], TessellationProfile.DETAIL)[0]
+        except RuntimeError:
+            return
+        if len(facetSet) == 0:
+            return
+        polygons = self.facetPolygons(facetSet)
+        if self.task.isCanceled():
+            return
+        surface = SurfaceArray.fromPolygons(polygons)
+        chObjGeom = etree.SubElement(chObj, QName(XmlNs.bldg, "lod4Geometry"))
+        chObjGeom.append(TemplateLibrary.surfaceToGml(surface))
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import os
+import json
+import time
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell
+import ifcopenshell.util.element
+
+# Plugin
+from .utilitiesIfc import UtilitiesIfc
+
+
+#####
+
+class CostModel:
+    """ Model-Klasse zum Abschätzen des Aufwands einer Konvertierung vor deren Beginn
+
+    Je Gebäude werden die Eingangsgrößen der einzelnen Berechnungsschritte gezählt, ohne zu tessellieren. Aus ihnen
+    werden Laufzeit und Speicherbedarf über lineare Modelle geschätzt. Die Schätzung steuert die Anteile der Gebäude
+    und ihrer Berechnungsschritte am Fortschritt, die Restzeit-Angabe und die Zahl paralleler Worker.
+    """
+
+    # Eingangsgrößen je Gebäude (roofPairs und wallOpenings für die paarweisen Verschneidungen)
+    KEYS = ["base", "slabs", "roofs", "roofFacets", "roofPairs", "walls", "openings", "wallOpenings", "spaces",
+            "spaceBoundaries", "materialLayers"]
+
+    # Laufzeit in Sekunden je Einheit und LoD. Ungemessene Startwerte, die durch die von test/benchmark_cost_model.py
+    # kalibrierten Werte (cost_model.json) ersetzt werden, sobald diese vorliegen
+    coefficients = {
+        0: {"base": 0.05, "slabs": 0.01, "roofFacets": 0.001},
+        1: {"base": 0.05, "slabs": 0.01},
+        2: {"base": 0.2, "slabs": 0.01, "roofs": 0.02, "roofFacets": 0.01, "roofPairs": 0.01},
+        3: {"base": 0.5, "slabs": 0.01, "roofs": 0.01, "walls": 0.4, "openings": 0.15, "wallOpenings": 0.005},
+        4: {"base": 0.5, "slabs": 0.01, "roofs": 0.01, "walls": 0.4, "openings": 0.15, "wallOpenings": 0.005,
+            "spaces": 0.05},
+    }
+
+    # Zusätzliche Laufzeit in Sekunden je Einheit mit EnergyADE
+    coefficientsEade = {"base": 0.2, "spaces": 0.01, "spaceBoundaries": 0.002, "materialLayers": 0.005}
+
+    # Speicherbedarf in Bytes je Einheit (Tessellierung, OGR-Geometrien und XML)
+    coefficientsMemory = {"base": 5e6, "slabs": 2e5, "roofs": 2e5, "roofFacets": 2e3, "walls": 3e5, "openings": 1e5,
+                          "spaces": 1e5, "spaceBoundaries": 2e4, "materialLayers": 1e3}
+
+    # Kalibrierte Laufzeit-Koeffizienten samt Herkunft
+    calibrationPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cost_model.json")
+
+    def __init__(self, ifc, lod, eade):
+        """ Konstruktor der Model-Klasse zum Abschätzen des Aufwands, die Eingangsgrößen werden sofort gezählt
+
+        Args:
+            ifc: Die IFC-Datei
+            lod: Gewähltes Level of Detail (LoD), als Integer
+            eade: Ob die EnergyADE gewählt wurde, als Boolean
+        """
+        # Initialisierung von Attributen
+        self.ifc = ifc
+        self.lod, self.eade = lod, eade
+        self.buildings = ifc.by_type("IfcBuilding")
+        self.counts, self.costs = {}, {}
+        self.started, self.done = None, 0
+        self.source = self.loadCalibration()
+
+        # Eingangsgrößen und Aufwand je Gebäude
+        for ifcBuilding in self.buildings:
+            self.counts[ifcBuilding.id()] = self.countInputs(ifc, ifcBuilding)
+            self.costs[ifcBuilding.id()] = self.estimate(self.counts[ifcBuilding.id()], lod, eade)
+
+    @classmethod
+    def loadCalibration(cls, path=None):
+        """ Übernimmt die mit test/benchmark_cost_model.py kalibrierten Laufzeit-Koeffizienten, falls vorhanden
+
+        Args:
+            path: Pfad zur Kalibrierungsdatei
+                Default: None (cost_model.json neben diesem Modul)
+
+        Returns:
+            Die Herkunft der Koeffizienten (Modelle, Datum, System), als Dictionary. None bei den Startwerten
+        """
+        path = cls.calibrationPath if path is None else path
+        if not os.path.isfile(path):
+            return None
+        with open(path, encoding="utf-8") as file:
+            calibration = json.load(file)
+        cls.coefficients = {int(lod): coeffs for lod, coeffs in calibration["coefficients"].items()}
+        cls.coefficientsEade = calibration["coefficientsEade"]
+        return calibration["source"]
+
+    @staticmethod
+    def saveCalibration(path, coefficients, coefficientsEade, source):
+        """ Speichert kalibrierte Laufzeit-Koeffizienten samt ihrer Herkunft
+
+        Args:
+            path: Pfad zur Kalibrierungsdatei
+            coefficients: Die Koeffizienten je LoD, als Dictionary
+            coefficientsEade: Die zusätzlichen Koeffizienten mit EnergyADE, als Dictionary
+            source: Die Herkunft (Modelle, Datum, System), als Dictionary
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"source": source, "coefficients": coefficients, "coefficientsEade": coefficientsEade}, file,
+                      indent=2)
+
+    @staticmethod
+    def countInputs(ifc, ifcBuilding):
+        """ Zählt die Eingangsgrößen der Berechnungsschritte eines Gebäudes
+
+        Args:
+            ifc: Die IFC-Datei
+            ifcBuilding: Das IFC-Gebäude
+
+        Returns:
+            Die Anzahlen je Eingangsgröße, als Dictionary
+        """
+        ifcSlabs = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcSlab", result=[])
+        ifcRoofs = [ifcSlab for ifcSlab in ifcSlabs if ifcSlab.PredefinedType == "ROOF"]
+        ifcRoofs += UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcRoof", result=[])
+        ifcWalls = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcWall", result=[])
+        ifcOpenings = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcDoor", result=[])
+        ifcOpenings += UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcWindow", result=[])
+        ifcSpaces = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcSpace", result=[])
+        ifcRelSpaceBoundaries = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcRelSpaceBoundary", result=[])
+
+        roofFacets = sum(CostModel.facetCount(ifcRoof) for ifcRoof in ifcRoofs)
+        return {
+            "base": 1,
+            "slabs": len(ifcSlabs) - len([ifcSlab for ifcSlab in ifcSlabs if ifcSlab.PredefinedType == "ROOF"]),
+            "roofs": len(ifcRoofs),
+            "roofFacets": roofFacets,
+            "roofPairs": roofFacets * (roofFacets - 1) / 2,
+            "walls": len(ifcWalls),
+            "openings": len(ifcOpenings),
+            "wallOpenings": len(ifcWalls) * len(ifcOpenings),
+            "spaces": len(ifcSpaces),
+            "spaceBoundaries": len(ifcRelSpaceBoundaries),
+            "materialLayers": sum(CostModel.layerCount(ifcElement) for ifcElement in ifcSlabs + ifcWalls + ifcRoofs),
+        }
+
+    @staticmethod
+    def facetCount(ifcElement):
+        """ Schätzt die Anzahl der Flächen der Body-Repräsentation eines Bauteils, ohne zu tessellieren
+
+        Args:
+            ifcElement: Das IFC-Bauteil
+
+        Returns:
+            Die geschätzte Anzahl der Flächen, als Integer
+        """
+        count = 0
+        for ifcPart in [ifcElement] + [part for rel in getattr(ifcElement, "IsDecomposedBy", None) or []
+                                       for part in rel.RelatedObjects]:
+            if ifcPart.Representation is None:
+                continue
+            for rep in ifcPart.Representation.Representations:
+                if rep.RepresentationIdentifier != "Body":
+                    continue
+                for item in rep.Items:
+                    if item.is_a("IfcMappedItem"):
+                        count += len(item.MappingSource.MappedRepresentation.Items) * 6
+                    elif item.is_a("IfcFacetedBrep"):
+                        count += len(item.Outer.CfsFaces)
+                    elif item.is_a("IfcTriangulatedFaceSet"):
+                        count += len(item.CoordIndex)
+                    elif item.is_a("IfcPolygonalFaceSet"):
+                        count += len(item.Faces)
+                    elif item.is_a("IfcExtrudedAreaSolid") and item.SweptArea.is_a("IfcArbitraryClosedProfileDef") \
+                            and item.SweptArea.OuterCurve.is_a("IfcPolyline"):
+                        count += len(item.SweptArea.OuterCurve.Points) + 1
+                    else:
+                        count += 6
+        return count
+
+    @staticmethod
+    def layerCount(ifcElement):
+        """ Zählt die Materialschichten eines Bauteils
+
+        Args:
+            ifcElement: Das IFC-Bauteil
+
+        Returns:
+            Die Anzahl der Materialschichten, als Integer
+        """
+        material = ifcopenshell.util.element.get_material(ifcElement)
+        if material is None:
+            return 0
+        if material.is_a("IfcMaterialLayerSetUsage"):
+            material = material.ForLayerSet
+        if material.is_a("IfcMaterialLayerSet"):
+            return len(material.MaterialLayers)
+        return 1
+
+    @staticmethod
+    def estimate(counts, lod, eade):
+        """ Schätzt die Laufzeit der Konvertierung eines Gebäudes
+
+        Args:
+            counts: Die Anzahlen je Eingangsgröße, als Dictionary
+            lod: Level of Detail (LoD), als Integer
+            eade: Ob die EnergyADE gewählt wurde, als Boolean
+
+        Returns:
+            Die geschätzte Laufzeit in Sekunden, als float
+        """
+        cost = sum(coeff * counts.get(key, 0) for key, coeff in CostModel.coefficients[lod].items())
+        if eade:
+            cost += sum(coeff * counts.get(key, 0) for key, coeff in CostModel.coefficientsEade.items())
+        return float(cost)
+
+    @staticmethod
+    def stageShares(counts, lod, eade, keys):
+        """ Schätzt die Anteile der Berechnungsschritte an der Laufzeit der Konvertierung eines Gebäudes
+
+        Der Anteil einer Eingangsgröße ist ihr Summand der Schätzung (Koeffizient mal Anzahl) geteilt durch die
+        geschätzte Laufzeit. Eingangsgrößen, die der Konverter nicht als eigene Schritte abbildet, werden dem
+        Grundaufwand (base) zugeschlagen, die zusätzliche Laufzeit der EnergyADE wird unter "eade" zusammengefasst.
+
+        Args:
+            counts: Die Anzahlen je Eingangsgröße, als Dictionary
+            lod: Level of Detail (LoD), als Integer
+            eade: Ob die EnergyADE gewählt wurde, als Boolean
+            keys: Die Eingangsgrößen mit eigenen Berechnungsschritten im Konverter, als Liste
+
+        Returns:
+            Die Anteile je Eingangsgröße (Summe 1), als Dictionary
+        """
+        costs = {}
+        for key, coeff in CostModel.coefficients[lod].items():
+            stage = key if key in keys else "base"
+            costs[stage] = costs.get(stage, 0) + coeff * counts.get(key, 0)
+        if eade:
+            costs["eade"] = sum(coeff * counts.get(key, 0) for key, coeff in CostModel.coefficientsEade.items())
+        cost = sum(costs.values())
+        if cost <= 0:
+            return {"base": 1.0}
+        return {key: float(value / cost) for key, value in costs.items()}
+
+    def total(self):
+        """ Gibt die geschätzte Laufzeit aller Gebäude zurück
+
+        Returns:
+            Die geschätzte Laufzeit in Sekunden, als float
+        """
+        return float(sum(self.costs.values()))
+
+    def share(self, ifcBuilding):
+        """ Gibt den Anteil eines Gebäudes an der geschätzten Laufzeit aller Gebäude zurück
+
+        Args:
+            ifcBuilding: Das IFC-Gebäude
+
+        Returns:
+            Der Anteil zwischen 0 und 1, als float
+        """
+        total = self.total()
+        if total <= 0 or ifcBuilding.id() not in self.costs:
+            return 1 / max(len(self.buildings), 1)
+        return self.costs[ifcBuilding.id()] / total
+
+    def memory(self, ifcBuilding=None):
+        """ Schätzt den Speicherbedarf der Konvertierung eines bzw. des größten Gebäudes
+
+        Args:
+            ifcBuilding: Das IFC-Gebäude
+                Default: None (größtes Gebäude)
+
+        Returns:
+            Der geschätzte Speicherbedarf in Bytes, als float
+        """
+        counts = [self.counts[ifcBuilding.id()]] if ifcBuilding is not None else list(self.counts.values())
+        return max([sum(coeff * count.get(key, 0) for key, coeff in self.coefficientsMemory.items())
+                    for count in counts] + [0.0])
+
+    @staticmethod
+    def availableMemory():
+        """ Gibt den physischen Arbeitsspeicher zurück
+
+        Returns:
+            Der Arbeitsspeicher in Bytes, als Integer. None, falls nicht ermittelbar
+        """
+        try:
+            return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (AttributeError, ValueError, OSError):
+            return None
+
+    def workers(self, tasks=None, memory=None):
+        """ Bestimmt die Zahl paralleler Worker aus Prozessoren, Aufgaben und Speicherbedarf
+
+        Jeder Worker wird mit dem geschätzten Speicherbedarf des größten Gebäudes angesetzt.
+
+        Args:
+            tasks: Anzahl der parallelisierbaren Aufgaben, als Integer
+                Default: None (Anzahl der Gebäude)
+            memory: Verfügbarer Arbeitsspeicher in Bytes
+                Default: None (physischer Arbeitsspeicher, zur Hälfte genutzt)
+
+        Returns:
+            Die Zahl der Worker, min. 1, als Integer
+        """
+        count = os.cpu_count() or 1
+        count = min(count, tasks if tasks is not None else len(self.buildings))
+        if memory is None and self.availableMemory() is not None:
+            memory = self.availableMemory() / 2
+        if memory is not None and self.memory() > 0:
+            count = min(count, int(memory // self.memory()))
+        return max(count, 1)
+
+    def start(self):
+        """ Startet die Zeitmessung für die Restzeit-Schätzung """
+        self.started, self.done = time.monotonic(), 0
+
+    def remaining(self, ifcBuilding):
+        """ Vermerkt ein Gebäude als konvertiert und schätzt die Restzeit
+
+        Die Restzeit wird über die bisher gemessene Laufzeit je geschätzter Sekunde hochgerechnet, zu Beginn über die
+        Schätzung allein.
+
+        Args:
+            ifcBuilding: Das fertig konvertierte IFC-Gebäude
+
+        Returns:
+            Die geschätzte Restzeit in Sekunden, als float
+        """
+        if self.started is None:
+            self.start()
+        self.done += self.costs.get(ifcBuilding.id(), 0)
+        rest = max(self.total() - self.done, 0)
+        if self.done <= 0:
+            return rest
+        return rest * (time.monotonic() - self.started) / self.done
+
+    def report(self):
+        """ Erstellt einen Bericht der Vorab-Analyse (Probelauf)
+
+        Returns:
+            Die Zeilen des Berichts, als Liste
+        """
+        lines = ["LoD" + str(self.lod) + (" + EnergyADE" if self.eade else "") + ": " + str(len(self.buildings)) +
+                 " building(s), estimated time " + self.formatTime(self.total()) + ", peak memory " +
+                 str(round(self.memory() / 1e6)) + " MB, workers " + str(self.workers()),
+                 "Coefficients: " + ("fitted on " + ", ".join(self.source["models"]) + " (" + self.source["date"] +
+                                     ")" if self.source is not None else "uncalibrated defaults")]
+        for ifcBuilding in self.buildings:
+            counts = self.counts[ifcBuilding.id()]
+            lines.append(str(ifcBuilding.Name or ifcBuilding.GlobalId) + ": " + self.formatTime(
+                self.costs[ifcBuilding.id()]) + " (" + ", ".join(
+                key + " " + str(int(counts[key])) for key in self.KEYS[1:] if counts[key] > 0) + ")")
+        return lines
+
+    @staticmethod
+    def formatTime(seconds):
+        """ Formatiert eine Zeitangabe
+
+        Args:
+            seconds: Die Zeit in Sekunden, als float
+
+        Returns:
+            Die Zeit im Format h:mm:ss, als String
+        """
+        seconds = int(round(seconds))
+        return str(seconds // 3600) + ":" + str(seconds % 3600 // 60).zfill(2) + ":" + str(seconds % 60).zfill(2)
+
+    @staticmethod
+    def calibrate(samples, keys=None):
+        """ Kalibriert die Koeffizienten eines LoD über gemessene Laufzeiten (kleinste Quadrate, nicht negativ)
+
+        Args:
+            samples: Gemessene Gebäude, als Liste von Tupeln aus Anzahlen (Dictionary) und Laufzeit in Sekunden
+            keys: Die zu kalibrierenden Eingangsgrößen, als Liste
+                Default: None (alle)
+
+        Returns:
+            Die Koeffizienten, als Dictionary
+        """
+        keys = CostModel.KEYS if keys is None else keys
+        a = np.array([[counts.get(key, 0) for key in keys] for counts, _ in samples], dtype=np.float64)
+        b = np.array([seconds for _, seconds in samples], dtype=np.float64)
+
+        # Negative Koeffizienten nacheinander entfernen und neu ausgleichen
+        active = list(range(len(keys)))
+        coeffs = np.zeros(len(keys))
+        while len(active) > 0:
+            x = np.linalg.lstsq(a[:, active], b, rcond=None)[0]
+            if np.all(x >= 0):
+                coeffs[active] = x
+                break
+            active.pop(int(np.argmin(x)))
+        return {key: float(coeffs[i]) for i, key in enumerate(keys) if coeffs[i] > 0}
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Plugin
+from .utilitiesIfc import UtilitiesIfc
+
+
+#####
+
+class ExteriorMap:
+    """ Model-Klasse zur einmaligen Einordnung der Bauteile eines Gebäudes in außen- und innenliegend """
+
+    EXTERNAL = "external"
+    INTERNAL = "internal"
+    UNKNOWN = "unknown"
+
+    def __init__(self, ifc, ifcBuilding):
+        """ Konstruktor der Model-Klasse zur Einordnung der Bauteile eines Gebäudes
+
+        Alle IfcRelSpaceBoundaries des Gebäudes werden einmalig durchlaufen und den zugehörigen Bauteilen
+        zugeordnet.
+
+        Args:
+            ifc: Die IFC-Datei
+            ifcBuilding: Das IFC-Gebäude
+        """
+        # Initialisierung von Attributen
+        self.ifc = ifc
+        self.ifcBuilding = ifcBuilding
+        self.relSpaceBoundaries = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcRelSpaceBoundary", result=[])
+        self.bounds = {}
+        self.counts = {}
+        self.psetCache = {}
+
+        # Randflächen je Bauteil
+        for ifcRelSpaceBoundary in self.relSpaceBoundaries:
+            relElem = ifcRelSpaceBoundary.RelatedBuildingElement
+            if relElem is None:
+                continue
+            self.bounds.setdefault(relElem.id(), []).append(ifcRelSpaceBoundary)
+            count = self.counts.setdefault(relElem.id(), [0, 0])
+            if ifcRelSpaceBoundary.InternalOrExternalBoundary == "EXTERNAL":
+                count[0] += 1
+            elif ifcRelSpaceBoundary.InternalOrExternalBoundary == "INTERNAL":
+                count[1] += 1
+
+    def state(self, ifcElement):
+        """ Einordnung eines Bauteils allein über die IfcRelSpaceBoundaries
+
+        Args:
+            ifcElement: Das IFC-Bauteil
+
+        Returns:
+            EXTERNAL, wenn min. eine äußere Randfläche existiert, INTERNAL, wenn nur innere Randflächen existieren,
+            ansonsten UNKNOWN
+        """
+        extCount, intCount = self.counts.get(ifcElement.id(), (0, 0))
+        if extCount > 0:
+            return self.EXTERNAL
+        elif intCount > 0:
+            return self.INTERNAL
+        return self.UNKNOWN
+
+    def boundaries(self, ifcElement):
+        """ Gibt die IfcRelSpaceBoundaries eines Bauteils zurück
+
+        Args:
+            ifcElement: Das IFC-Bauteil
+
+        Returns:
+            Die zugehörigen IfcRelSpaceBoundaries, als Liste
+        """
+        return self.bounds.get(ifcElement.id(), [])
+
+    def isExternalPset(self, ifcElement, psetName):
+        """ Liest das Attribut IsExternal aus dem PropertySet eines Bauteils (mit Zwischenspeicherung)
+
+        Args:
+            ifcElement: Das IFC-Bauteil
+            psetName: Name des PropertySets
+
+        Returns:
+            Der Wert von IsExternal, falls vorhanden. Ansonsten None
+        """
+        key = (ifcElement.id(), psetName)
+        if key not in self.psetCache:
+            self.psetCache[key] = UtilitiesIfc.findPset(ifcElement, psetName, "IsExternal")
+        return self.psetCache[key]
+
+    def isExternalWall(self, ifcWall):
+        """ Prüft, ob eine Wand außenliegend ist: über die Randflächen, sonst über das PropertySet
+
+        Args:
+            ifcWall: Die IFC-Wand
+
+        Returns:
+            Ob die Wand außenliegend ist, als Boolean
+        """
+        state = self.state(ifcWall)
+        if state == self.UNKNOWN:
+            return bool(self.isExternalPset(ifcWall, "Pset_WallCommon"))
+        return state == self.EXTERNAL
+
+    def isExternalOpening(self, ifcOpening, psetName):
+        """ Prüft, ob eine Öffnung außenliegend ist: über das PropertySet, sonst über die Randflächen
+
+        Args:
+            ifcOpening: Die IFC-Öffnung (Tür oder Fenster)
+            psetName: Name des PropertySets (Pset_DoorCommon oder Pset_WindowCommon)
+
+        Returns:
+            Ob die Öffnung außenliegend ist, als Boolean
+        """
+        ext = self.isExternalPset(ifcOpening, psetName)
+        if ext is None:
+            return self.state(ifcOpening) == self.EXTERNAL
+        return bool(ext)
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import os
+import re
+import sys
+
+# XML-Bibliotheken
+from lxml import etree
+# noinspection PyUnresolvedReferences
+from lxml.etree import QName
+
+# Geo-Bibliotheken
+from osgeo import ogr
+import osgeo.osr as osr
+
+# Plugin
+try:
+    from ..model.xmlns import XmlNs
+except ImportError:
+    sys.path.insert(0, '..')
+    from model.xmlns import XmlNs
+
+
+#####
+
+class GpkgWriter:
+    """ Model-Klasse zum Schreiben der von den Konvertern erzeugten CityGML-Struktur als GeoPackage für QGIS
+
+    Das GeoPackage enthält die 2.5D-Grundrisse mit den wichtigsten Gebäudeattributen (Layer buildings) und die
+    Oberflächen der Gebäude je LoD (Layer surfaces), jeweils mit R-Baum-Index. QGIS kann es so ohne Schema-Analyse
+    und .gfs-Datei direkt laden.
+    """
+
+    # Name der Layer
+    bldgLayer, surfLayer = "buildings", "surfaces"
+
+    # Übernommene Gebäudeattribute mit OGR-Feldtyp
+    attributes = [("measuredHeight", ogr.OFTReal), ("function", ogr.OFTString), ("usage", ogr.OFTString),
+                  ("storeysAboveGround", ogr.OFTInteger), ("storeysBelowGround", ogr.OFTInteger)]
+    casts = {ogr.OFTReal: float, ogr.OFTString: str, ogr.OFTInteger: int}
+
+    # Semantische Oberflächen
+    surfaceTypes = ["GroundSurface", "WallSurface", "RoofSurface", "ClosureSurface", "OuterCeilingSurface",
+                    "OuterFloorSurface"]
+
+    def __init__(self, epsg):
+        """ Konstruktor der Model-Klasse zum Schreiben von GeoPackages
+
+        Args:
+            epsg: EPSG-Code des Koordinatensystems
+        """
+        # Initialisierung von Attributen
+        self.srs = osr.SpatialReference()
+        self.srs.ImportFromEPSG(epsg)
+        self.minHeight, self.maxHeight = None, None
+
+    @staticmethod
+    def localName(ch):
+        """ Gibt den Namen eines XML-Elements ohne Namespace zurück
+
+        Args:
+            ch: Das XML-Element
+
+        Returns:
+            Der Name als String. None bei Kommentaren o.Ä.
+        """
+        return QName(ch).localname if isinstance(ch.tag, str) else None
+
+    @staticmethod
+    def polygons(ch, ids):
+        """ Sucht alle Polygone einer GML-Geometrie, auch über XLinks
+
+        Args:
+            ch: XML-Element der Geometrie oder einer Geometrie-Eigenschaft
+            ids: Die XML-Elemente des Gebäudes nach GML-ID, als Dictionary
+
+        Returns:
+            Die XML-Elemente der Polygone, als Liste
+        """
+        if GpkgWriter.localName(ch) == "Polygon":
+            return [ch]
+        href = ch.get(QName(XmlNs.xlink, "href"))
+        if href is not None:
+            target = ids.get(href.lstrip("#"))
+            return GpkgWriter.polygons(target, ids) if target is not None else []
+        result = []
+        for child in ch:
+            if isinstance(child.tag, str):
+                result += GpkgWriter.polygons(child, ids)
+        return result
+
+    @staticmethod
+    def toGeometry(chPolys):
+        """ Wandelt GML-Polygone in eine 2.5D-MultiPolygon-Geometrie um
+
+        Args:
+            chPolys: Die XML-Elemente der Polygone, als Liste
+
+        Returns:
+            Die Geometrie. None, falls kein Polygon gelesen werden konnte
+        """
+        geom = ogr.Geometry(ogr.wkbMultiPolygon25D)
+        for chPoly in chPolys:
+            poly = ogr.CreateGeometryFromGML(etree.tostring(chPoly, encoding="unicode"))
+            if poly is not None and not poly.IsEmpty():
+                geom.AddGeometry(poly)
+        return geom if geom.GetGeometryCount() > 0 else None
+
+    @staticmethod
+    def baseGeometry(geom):
+        """ Wählt die waagerechten Polygone auf der tiefsten Höhe aus (Grundfläche eines Körpers)
+
+        Args:
+            geom: Die Polygone des Körpers, als MultiPolygon-Geometrie
+
+        Returns:
+            Die Grundfläche, als MultiPolygon-Geometrie. None, falls keine vorliegt
+        """
+        if geom is None:
+            return None
+        minHeight = geom.GetEnvelope3D()[4]
+        base = ogr.Geometry(ogr.wkbMultiPolygon25D)
+        for i in range(0, geom.GetGeometryCount()):
+            poly = geom.GetGeometryRef(i)
+            if poly.GetEnvelope3D()[5] - minHeight < 0.001:
+                base.AddGeometry(poly)
+        return base if base.GetGeometryCount() > 0 else None
+
+    def footPrint(self, chBldg, ids):
+        """ Ermittelt den 2.5D-Grundriss eines Gebäudes
+
+        Verwendet wird der LoD0-Grundriss, ansonsten die Grundflächen (GroundSurface) oder die unterste Fläche des
+        Gebäudekörpers.
+
+        Args:
+            chBldg: XML-Element des Gebäudes
+            ids: Die XML-Elemente des Gebäudes nach GML-ID, als Dictionary
+
+        Returns:
+            Der Grundriss als Geometrie. None, falls keiner ermittelt werden konnte
+        """
+        chFootPrint = chBldg.find(QName(XmlNs.bldg, "lod0FootPrint"))
+        if chFootPrint is not None:
+            return self.toGeometry(self.polygons(chFootPrint, ids))
+
+        chGrounds = [chSurf for chProp in chBldg.iterchildren(QName(XmlNs.bldg, "boundedBy"))
+                     for chSurf in chProp.iterchildren(QName(XmlNs.bldg, "GroundSurface"))]
+        if len(chGrounds) > 0:
+            return self.toGeometry([chPoly for chSurf in chGrounds for chPoly in self.polygons(chSurf, ids)])
+
+        for chProp in chBldg:
+            if re.match(r"lod\dSolid$", self.localName(chProp) or ""):
+                return self.baseGeometry(self.toGeometry(self.polygons(chProp, ids)))
+        return None
+
+    def surfaces(self, chBldg, ids):
+        """ Ermittelt die Oberflächen eines Gebäudes je LoD
+
+        Liegen keine semantischen Oberflächen vor, werden Körper, Grundriss und Dachkanten übernommen.
+
+        Args:
+            chBldg: XML-Element des Gebäudes
+            ids: Die XML-Elemente des Gebäudes nach GML-ID, als Dictionary
+
+        Returns:
+            Die Oberflächen, als Liste von Tupeln aus Typ, LoD und Geometrie
+        """
+        result = []
+        for chProp in chBldg.iterchildren(QName(XmlNs.bldg, "boundedBy")):
+            for chSurf in chProp:
+                type = self.localName(chSurf)
+                if type not in self.surfaceTypes:
+                    continue
+                for chGeom in chSurf:
+                    match = re.match(r"lod(\d)MultiSurface$", self.localName(chGeom) or "")
+                    geom = self.toGeometry(self.polygons(chGeom, ids)) if match is not None else None
+                    if geom is not None:
+                        result.append((type, int(match.group(1)), geom))
+        if len(result) > 0:
+            return result
+
+        for chProp in chBldg:
+            match = re.match(r"lod(\d)(Solid|MultiSurface|FootPrint|RoofEdge)$", self.localName(chProp) or "")
+            geom = self.toGeometry(self.polygons(chProp, ids)) if match is not None else None
+            if geom is not None:
+                result.append((match.group(2), int(match.group(1)), geom))
+        return result
+
+    def createLayer(self, ds, name, fields):
+        """ Legt einen Layer mit R-Baum-Index an
+
+        Args:
+            ds: Die GeoPackage-Datenquelle
+            name: Name des Layers
+            fields: Die Felder, als Liste von Tupeln aus Name und OGR-Feldtyp
+
+        Returns:
+            Der angelegte Layer
+        """
+        layer = ds.CreateLayer(name, self.srs, ogr.wkbMultiPolygon25D, ["SPATIAL_INDEX=YES", "FID=fid"])
+        for fieldName, fieldType in fields:
+            layer.CreateField(ogr.FieldDefn(fieldName, fieldType))
+        return layer
+
+    def addBuilding(self, chBldg, bldgLayer, surfLayer):
+        """ Schreibt ein Gebäude mit Grundriss, Attributen und Oberflächen
+
+        Args:
+            chBldg: XML-Element des Gebäudes
+            bldgLayer: Der Layer der Gebäude
+            surfLayer: Der Layer der Oberflächen
+        """
+        gmlIdTag = QName(XmlNs.gml, "id")
+        ids = {ch.get(gmlIdTag): ch for ch in chBldg.iter() if isinstance(ch.tag, str) and ch.get(gmlIdTag)}
+        gmlId = chBldg.get(gmlIdTag)
+
+        # Gebäude
+        feature = ogr.Feature(bldgLayer.GetLayerDefn())
+        feature.SetField("gmlId", gmlId)
+        chName = chBldg.find(QName(XmlNs.gml, "name"))
+        if chName is not None:
+            feature.SetField("name", chName.text)
+        for name, fieldType in self.attributes:
+            chAttr = chBldg.find(QName(XmlNs.bldg, name))
+            if chAttr is not None and chAttr.text is not None:
+                feature.SetField(name, self.casts[fieldType](chAttr.text))
+        self.addHeight(feature.GetField("measuredHeight"))
+        footPrint = self.footPrint(chBldg, ids)
+        if footPrint is not None:
+            feature.SetGeometry(footPrint)
+        bldgLayer.CreateFeature(feature)
+
+        # Oberflächen
+        for type, lod, geom in self.surfaces(chBldg, ids):
+            feature = ogr.Feature(surfLayer.GetLayerDefn())
+            feature.SetField("gmlId", gmlId)
+            feature.SetField("type", type)
+            feature.SetField("lod", lod)
+            feature.SetGeometry(geom)
+            surfLayer.CreateFeature(feature)
+
+    def addHeight(self, height):
+        """ Führt die Höhenstatistik für die 3D-Darstellung beim Schreiben der Gebäude mit
+
+        Args:
+            height: Gemessene Höhe des Gebäudes, als float. None, falls nicht vorhanden
+        """
+        if height is None:
+            return
+        self.minHeight = height if self.minHeight is None else min(self.minHeight, height)
+        self.maxHeight = height if self.maxHeight is None else max(self.maxHeight, height)
+
+    def getHeights(self):
+        """ Gibt die minimale und maximale Gebäudehöhe der geschriebenen Gebäude zurück
+
+        Returns:
+            Minimale und maximale Höhe, als Tupel. None, falls kein Gebäude eine Höhe hat
+        """
+        return None if self.minHeight is None else (self.minHeight, self.maxHeight)
+
+    def write(self, root, path):
+        """ Schreibt alle Gebäude einer CityGML-Struktur in eine GeoPackage-Datei
+
+        Args:
+            root: XML-Element des CityModel
+            path: Pfad zur GeoPackage-Datei
+        """
+        if os.path.exists(path):
+            os.remove(path)
+        ds = ogr.GetDriverByName("GPKG").CreateDataSource(path)
+        bldgLayer = self.createLayer(ds, self.bldgLayer, [("gmlId", ogr.OFTString), ("name", ogr.OFTString)] +
+                                     self.attributes)
+        surfLayer = self.createLayer(ds, self.surfLayer, [("gmlId", ogr.OFTString), ("type", ogr.OFTString),
+                                                          ("lod", ogr.OFTInteger)])
+
+        # Alle Gebäude in einer Transaktion schreiben
+        ds.StartTransaction()
+        for chCOM in root.iterchildren(QName(XmlNs.core, "cityObjectMember")):
+            for chBldg in chCOM.iterchildren(QName(XmlNs.bldg, "Building")):
+                self.addBuilding(chBldg, bldgLayer, surfLayer)
+        ds.CommitTransaction()
+        ds = None
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+from collections import deque
+import numpy as np
+
+# Plugin
+from .vertex_welder import VertexWelder
+
+
+#####
+
+class HalfEdgeMesh:
+    """ Model-Klasse einer Halbkanten-Datenstruktur für tessellierte Geometrien
+
+    Die Halbkante h gehört zum Dreieck h // 3 und verläuft von origin[h] zu origin[next(h)]. Die Gegenkante twin[h]
+    ist -1, wenn die Kante am Rand des Netzes liegt.
+    """
+
+    def __init__(self, verts, faces, tol=0.00001):
+        """ Konstruktor der Halbkanten-Datenstruktur
+
+        Args:
+            verts: Die Vertizes, als Array der Form (n, 3)
+            faces: Die Dreiecke als Vertex-Indizes, als Array der Form (m, 3)
+            tol: Toleranz zum Verschweißen der Vertizes, als float
+                Default: 0.00001
+        """
+        verts = np.asarray(verts, dtype=np.float64).reshape(-1, 3)
+        faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+
+        # Vertizes verschweißen
+        welder = VertexWelder(tol)
+        ids = welder.weldPoints(verts)
+        self.verts = welder.getPoints()
+        faces = ids[faces] if len(faces) > 0 else faces
+
+        # Entartete Dreiecke entfernen
+        if len(faces) > 0:
+            distinct = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+            faces = faces[distinct]
+        if len(faces) > 0:
+            tris = self.verts[faces]
+            cross = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+            lengths = np.linalg.norm(cross, axis=1)
+            faces, cross, lengths = faces[lengths > 1e-12], cross[lengths > 1e-12], lengths[lengths > 1e-12]
+            self.normals = cross / lengths[:, None]
+        else:
+            self.normals = np.zeros((0, 3))
+        self.faces = faces
+
+        # Halbkanten
+        self.origin = faces.reshape(-1)
+        self.twin = self.calcTwins(self.origin, len(self.verts))
+
+    @staticmethod
+    def calcTwins(origin, vertCount):
+        """ Berechnet die Gegenkanten aller Halbkanten über sortierte Kanten-Schlüssel
+
+        Args:
+            origin: Die Start-Vertizes der Halbkanten, als Array
+            vertCount: Anzahl der Vertizes
+
+        Returns:
+            Die Indizes der Gegenkanten (-1 am Rand), als Array
+        """
+        count = len(origin)
+        twin = np.full(count, -1, dtype=np.int64)
+        if count == 0:
+            return twin
+        halfEdges = np.arange(count)
+        dest = origin[halfEdges - halfEdges % 3 + (halfEdges + 1) % 3]
+        key = origin * vertCount + dest
+        keyTwin = dest * vertCount + origin
+        order = np.argsort(key, kind="stable")
+        pos = np.searchsorted(key[order], keyTwin)
+        pos[pos >= count] = count - 1
+        found = key[order][pos] == keyTwin
+        twin[found] = order[pos[found]]
+        return twin
+
+    @staticmethod
+    def next(h):
+        """ Nächste Halbkante im selben Dreieck
+
+        Args:
+            h: Index der Halbkante
+
+        Returns:
+            Index der nächsten Halbkante
+        """
+        return h - h % 3 + (h + 1) % 3
+
+    def regions(self, angTol=0.001, distTol=0.001, task=None):
+        """ Zerlegt das Netz über eine Flutfüllung benachbarter Dreiecke in koplanare Bereiche
+
+        Args:
+            angTol: Maximale Abweichung des Normalenvektors (1 - Skalarprodukt), als float
+                Default: 0.001
+            distTol: Maximaler Abstand der Vertizes zur Ebene des Start-Dreiecks, als float
+                Default: 0.001
+            task: Task-Objekt, das je Bereich auf Abbruch geprüft wird
+                Default: None
+
+        Returns:
+            Die Dreiecks-Indizes je Bereich, als Liste von Arrays. Leer, falls abgebrochen wurde
+        """
+        faceCount = len(self.faces)
+        regionOf = np.full(faceCount, -1, dtype=np.int64)
+        regions = []
+        for seed in range(0, faceCount):
+            if regionOf[seed] >= 0:
+                continue
+            if task is not None and task.isCanceled():
+                return []
+            regionId = len(regions)
+            normal = self.normals[seed]
+            offset = np.dot(normal, self.verts[self.faces[seed, 0]])
+            regionOf[seed] = regionId
+            members, queue = [seed], deque([seed])
+            while queue:
+                face = queue.popleft()
+                for h in range(face * 3, face * 3 + 3):
+                    t = self.twin[h]
+                    if t < 0:
+                        continue
+                    other = t // 3
+                    if regionOf[other] >= 0:
+                        continue
+                    if 1 - np.dot(normal, self.normals[other]) > angTol:
+                        continue
+                    if np.max(np.abs(self.verts[self.faces[other]] @ normal - offset)) > distTol:
+                        continue
+                    regionOf[other] = regionId
+                    members.append(other)
+                    queue.append(other)
+            regions.append(np.array(members, dtype=np.int64))
+        return regions
+
+    def boundaryLoops(self, region):
+        """ Extrahiert die Randringe eines Bereichs, der Außenring zuerst
+
+        Args:
+            region: Die Dreiecks-Indizes des Bereichs, als Array
+
+        Returns:
+            Die Ringe als Listen von Vertex-Indizes (Außenring zuerst, danach Löcher)
+        """
+        inRegion = np.zeros(len(self.faces), dtype=bool)
+        inRegion[region] = True
+
+        # Randkanten: Gegenkante fehlt oder liegt außerhalb des Bereichs
+        halfEdges = (region[:, None] * 3 + np.arange(3)).reshape(-1)
+        twins = self.twin[halfEdges]
+        isBoundary = (twins < 0) | ~inRegion[np.where(twins < 0, 0, twins) // 3]
+        boundary = set(halfEdges[isBoundary].tolist())
+
+        # Randkanten zu Ringen verketten
+        loops = []
+        while boundary:
+            start = min(boundary)
+            loop, h = [], start
+            for _ in range(0, len(halfEdges) + 1):
+                boundary.discard(h)
+                loop.append(int(self.origin[h]))
+                # Nächste Randkante: um den End-Vertex innerhalb des Bereichs drehen
+                cand = self.next(h)
+                for _ in range(0, len(halfEdges) + 1):
+                    if cand in boundary or cand == start:
+                        break
+                    t = self.twin[cand]
+                    if t < 0 or not inRegion[t // 3]:
+                        break
+                    cand = self.next(t)
+                h = cand
+                if h == start or h not in boundary:
+                    break
+            if len(loop) >= 3:
+                loops.append(loop)
+
+        # Außenring (größter Flächeninhalt in der Ebene) zuerst
+        if len(loops) > 1:
+            normal = self.normals[region[0]]
+            areas = [abs(self.loopArea(loop, normal)) for loop in loops]
+            loops.insert(0, loops.pop(int(np.argmax(areas))))
+        return loops
+
+    def loopArea(self, loop, normal):
+        """ Berechnet den vorzeichenbehafteten Flächeninhalt eines Rings bezogen auf einen Normalenvektor
+
+        Args:
+            loop: Der Ring als Liste von Vertex-Indizes
+            normal: Der Normalenvektor der Ebene, als Array
+
+        Returns:
+            Der Flächeninhalt, als float
+        """
+        pts = self.verts[loop]
+        return 0.5 * np.dot(np.sum(np.cross(pts, np.roll(pts, -1, axis=0)), axis=0), normal)
+
+    def polygons(self, angTol=0.001, distTol=0.001, task=None):
+        """ Vereinigt die koplanaren Dreiecke zu Polygonen
+
+        Args:
+            angTol: Maximale Abweichung des Normalenvektors (1 - Skalarprodukt), als float
+                Default: 0.001
+            distTol: Maximaler Abstand der Vertizes zur Ebene des Start-Dreiecks, als float
+                Default: 0.001
+            task: Task-Objekt, das je Bereich auf Abbruch geprüft wird (z.B. ein Zeitbudget)
+                Default: None
+
+        Returns:
+            Die Polygone als Listen geschlossener Ringe aus Punkten (Außenring zuerst). Leer, falls abgebrochen wurde
+        """
+        polygons = []
+        for region in self.regions(angTol, distTol, task):
+            if task is not None and task.isCanceled():
+                return []
+            rings = []
+            for loop in self.boundaryLoops(region):
+                pts = self.verts[loop]
+                rings.append(np.vstack((pts, pts[:1])).tolist())
+            if len(rings) > 0:
+                polygons.append(rings)
+        return polygons
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell
+import ifcopenshell.util.element
+import ifcopenshell.util.placement
+import ifcopenshell.util.unit
+
+# Plugin
+from .utilitiesIfc import UtilitiesIfc
+from .tessellation_profile import TessellationProfile
+
+
+#####
+
+class HeightEstimator:
+    """ Model-Klasse zum Abschätzen von Höhen und Ausdehnungen ohne Tessellierung
+
+    Die Quellen werden nach Aufwand geordnet genutzt: Mengenangaben (Qto), die Bounding Box- bzw. Extrusions-
+    Repräsentation der Bauteile, Geschosshöhen und erst zuletzt die Tessellierung. Alle Längen werden über den
+    Faktor der Längeneinheit des Projekts in Meter umgerechnet, wie sie auch die Tessellierung liefert.
+    """
+
+    @staticmethod
+    def quantity(ifcElement, names, scale=1.0):
+        """ Liest eine Mengenangabe aus den Quantity Sets eines IFC-Elements
+
+        Args:
+            ifcElement: Das IFC-Element
+            names: Die Namen der gesuchten Mengen in absteigender Priorität, als Liste
+            scale: Faktor der Einheit der Menge in die Zieleinheit, als float
+                Default: 1.0
+
+        Returns:
+            Der Wert der ersten gefundenen Menge, als float. Ansonsten None
+        """
+        qtos = ifcopenshell.util.element.get_psets(ifcElement, qtos_only=True)
+        for name in names:
+            for qtoName, qto in qtos.items():
+                if (qtoName.startswith("Qto_") or qtoName == "BaseQuantities") and \
+                        isinstance(qto.get(name), (int, float)) and qto[name] > 0:
+                    return float(qto[name]) * scale
+        return None
+
+    @staticmethod
+    def transformCorners(matrix, mins, maxs):
+        """ Transformiert die Eckpunkte eines achsparallelen Quaders und gibt deren Ausdehnung zurück
+
+        Args:
+            matrix: Die Transformationsmatrix, als Array der Form (4, 4)
+            mins: Minimale Koordinaten des Quaders, als Array
+            maxs: Maximale Koordinaten des Quaders, als Array
+
+        Returns:
+            Minimale und maximale transformierte Koordinaten, jeweils als Array
+        """
+        corners = np.array([[x, y, z, 1] for x in (mins[0], maxs[0]) for y in (mins[1], maxs[1])
+                            for z in (mins[2], maxs[2])], dtype=np.float64)
+        pts = (corners @ np.asarray(matrix, dtype=np.float64).T)[:, :3]
+        return pts.min(axis=0), pts.max(axis=0)
+
+    @staticmethod
+    def profilePoints(ifcProfile):
+        """ Liest die Umringspunkte eines Profils in Profil-Koordinaten
+
+        Args:
+            ifcProfile: Das Profil (IfcRectangleProfileDef oder IfcArbitraryClosedProfileDef aus IfcPolyline)
+
+        Returns:
+            Die Punkte, als Array der Form (n, 2). None, falls das Profil nicht unterstützt wird
+        """
+        if ifcProfile.is_a("IfcRectangleProfileDef"):
+            x, y = ifcProfile.XDim / 2, ifcProfile.YDim / 2
+            pts = np.array([[-x, -y], [x, -y], [x, y], [-x, y]], dtype=np.float64)
+        elif ifcProfile.is_a("IfcArbitraryClosedProfileDef") and ifcProfile.OuterCurve.is_a("IfcPolyline"):
+            pts = np.array([list(pt.Coordinates)[:2] for pt in ifcProfile.OuterCurve.Points], dtype=np.float64)
+        else:
+            return None
+        if getattr(ifcProfile, "Position", None) is not None:
+            matrix = ifcopenshell.util.placement.get_axis2placement(ifcProfile.Position)
+            pts = pts @ np.asarray(matrix)[:2, :2].T + np.asarray(matrix)[:2, 2]
+        return pts
+
+    @staticmethod
+    def representationExtent(ifcElement, scale=1.0):
+        """ Berechnet die Ausdehnung eines Bauteils aus seiner Bounding Box- oder Extrusions-Repräsentation
+
+        Args:
+            ifcElement: Das IFC-Bauteil
+            scale: Faktor der Längeneinheit des Projekts in Meter, als float
+                Default: 1.0
+
+        Returns:
+            Minimale und maximale Koordinaten in Weltkoordinaten (in Meter), jeweils als Array. None, falls nicht
+            ableitbar
+        """
+        if ifcElement.Representation is None or ifcElement.ObjectPlacement is None:
+            return None
+        placement = np.asarray(ifcopenshell.util.placement.get_local_placement(ifcElement.ObjectPlacement))
+        reps = {rep.RepresentationIdentifier: rep for rep in ifcElement.Representation.Representations}
+
+        # Bounding Box
+        if "Box" in reps and len(reps["Box"].Items) == 1 and reps["Box"].Items[0].is_a("IfcBoundingBox"):
+            box = reps["Box"].Items[0]
+            mins = np.array(box.Corner.Coordinates, dtype=np.float64)
+            mins, maxs = HeightEstimator.transformCorners(placement, mins, mins + [box.XDim, box.YDim, box.ZDim])
+            return mins * scale, maxs * scale
+
+        # Extrusionen
+        pts = HeightEstimator.extrusionPoints(ifcElement, scale)
+        if pts is None:
+            return None
+        return pts.min(axis=0), pts.max(axis=0)
+
+    @staticmethod
+    def extrusionPoints(ifcElement, scale=1.0):
+        """ Berechnet die Eckpunkte der Extrusionen der Body-Repräsentation eines Bauteils
+
+        Args:
+            ifcElement: Das IFC-Bauteil
+            scale: Faktor der Längeneinheit des Projekts in Meter, als float
+                Default: 1.0
+
+        Returns:
+            Die Eckpunkte in Weltkoordinaten (in Meter), als Array der Form (n, 3). None, falls der Körper nicht nur
+            aus Extrusionen unterstützter Profile besteht
+        """
+        if ifcElement.Representation is None or ifcElement.ObjectPlacement is None:
+            return None
+        placement = np.asarray(ifcopenshell.util.placement.get_local_placement(ifcElement.ObjectPlacement))
+        reps = {rep.RepresentationIdentifier: rep for rep in ifcElement.Representation.Representations}
+        if "Body" not in reps or len(reps["Body"].Items) == 0:
+            return None
+        allPts = []
+        for item in reps["Body"].Items:
+            if not item.is_a("IfcExtrudedAreaSolid"):
+                return None
+            profile = HeightEstimator.profilePoints(item.SweptArea)
+            if profile is None:
+                return None
+            direction = np.array(item.ExtrudedDirection.DirectionRatios, dtype=np.float64)
+            direction = direction / np.linalg.norm(direction) * item.Depth
+            base = np.column_stack((profile, np.zeros(len(profile))))
+            pts = np.vstack((base, base + direction))
+            if item.Position is not None:
+                matrix = np.asarray(ifcopenshell.util.placement.get_axis2placement(item.Position))
+                pts = pts @ matrix[:3, :3].T + matrix[:3, 3]
+            allPts.append(pts @ placement[:3, :3].T + placement[:3, 3])
+        return np.vstack(allPts) * scale
+
+    @staticmethod
+    def tessellatedExtent(ifcElement):
+        """ Berechnet die Ausdehnung eines Bauteils über seine Tessellierung
+
+        Args:
+            ifcElement: Das IFC-Bauteil
+
+        Returns:
+            Minimale und maximale Koordinaten in Weltkoordinaten, jeweils als Array. None, falls nicht ableitbar
+        """
+        try:
+            shape = TessellationProfile.createShape(ifcElement, TessellationProfile.FOOTPRINT)
+        except RuntimeError:
+            return None
+        verts = np.asarray(shape.geometry.verts, dtype=np.float64).reshape(-1, 3)
+        if len(verts) == 0:
+            return None
+        return verts.min(axis=0), verts.max(axis=0)
+
+    @staticmethod
+    def elementExtent(ifcElements, tessellate=True, scale=1.0):
+        """ Berechnet die gemeinsame Ausdehnung mehrerer Bauteile, tesselliert wird nur bei Bedarf
+
+        Args:
+            ifcElements: Die IFC-Bauteile, als Liste
+            tessellate: Ob Bauteile ohne ableitbare Repräsentation tesselliert werden dürfen, als Boolean
+                Default: True
+            scale: Faktor der Längeneinheit des Projekts in Meter, als float
+                Default: 1.0
+
+        Returns:
+            Minimale und maximale Koordinaten in Weltkoordinaten (in Meter), jeweils als Array. None, falls nicht
+            ableitbar
+        """
+        mins, maxs = [], []
+        for ifcElement in ifcElements:
+            extent = HeightEstimator.representationExtent(ifcElement, scale)
+            if extent is None and tessellate:
+                extent = HeightEstimator.tessellatedExtent(ifcElement)
+            if extent is None:
+                return None
+            mins.append(extent[0])
+            maxs.append(extent[1])
+        if len(mins) == 0:
+            return None
+        return np.min(mins, axis=0), np.max(maxs, axis=0)
+
+    @staticmethod
+    def storeyRange(ifc, ifcBuilding):
+        """ Schätzt die Höhenausdehnung eines Gebäudes über die Höhenlagen und Höhen seiner Geschosse
+
+        Args:
+            ifc: Die IFC-Datei
+            ifcBuilding: Das IFC-Gebäude
+
+        Returns:
+            Minimale und maximale Höhe (in Meter), als Tupel. None, falls ein Geschoss keine Höhenangabe besitzt
+        """
+        ifcStoreys = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcBuildingStorey", result=[])
+        if len(ifcStoreys) == 0:
+            return None
+        scale = ifcopenshell.util.unit.calculate_unit_scale(ifc)
+        minHeight, maxHeight = None, None
+        for ifcStorey in ifcStoreys:
+            if ifcStorey.ObjectPlacement is not None:
+                elevation = ifcopenshell.util.placement.get_local_placement(ifcStorey.ObjectPlacement)[2][3]
+            elif ifcStorey.Elevation is not None:
+                elevation = ifcStorey.Elevation
+            else:
+                return None
+            height = HeightEstimator.quantity(ifcStorey, ["GrossHeight", "Height"])
+            if height is None:
+                return None
+            elevation, height = elevation * scale, height * scale
+            minHeight = elevation if minHeight is None else min(minHeight, elevation)
+            maxHeight = elevation + height if maxHeight is None else max(maxHeight, elevation + height)
+        return minHeight, maxHeight
+
+    @staticmethod
+    def calcHeight(ifc, ifcBuilding, tessellate=True):
+        """ Schätzt die Gebäudehöhe als Differenz zwischen tiefstem und höchstem Punkt
+
+        Reihenfolge: Qto-Höhe des Gebäudes, Ausdehnung von Grundfläche und Dächern (Repräsentation, nur bei Bedarf
+        tesselliert), Geschosshöhen.
+
+        Args:
+            ifc: Die IFC-Datei
+            ifcBuilding: Das IFC-Gebäude
+            tessellate: Ob Bauteile ohne ableitbare Repräsentation tesselliert werden dürfen, als Boolean
+                Default: True
+
+        Returns:
+            Die Gebäudehöhe in Meter bzw. None, wenn sie nicht berechnet werden kann
+        """
+        scale = ifcopenshell.util.unit.calculate_unit_scale(ifc)
+
+        # Mengenangaben
+        height = HeightEstimator.quantity(ifcBuilding, ["Height"], scale)
+        if height is not None:
+            return height
+
+        # Grundfläche und Dächer
+        ifcSlabs = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcSlab", result=[], type="BASESLAB")
+        if len(ifcSlabs) == 0:
+            ifcSlabs = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcSlab", result=[], type="FLOOR")
+        ifcRoofs = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcSlab", result=[], type="ROOF")
+        if len(ifcRoofs) == 0:
+            ifcRoofs = UtilitiesIfc.findElement(ifc, ifcBuilding, "IfcRoof", result=[])
+        if len(ifcSlabs) != 0 and len(ifcRoofs) != 0:
+            baseExtent = HeightEstimator.elementExtent(ifcSlabs, tessellate, scale)
+            roofExtent = HeightEstimator.elementExtent(ifcRoofs, tessellate, scale)
+            if baseExtent is not None and roofExtent is not None:
+                return float(roofExtent[1][2] - baseExtent[0][2])
+
+        # Geschosse
+        storeyRange = HeightEstimator.storeyRange(ifc, ifcBuilding)
+        if storeyRange is not None:
+            return float(storeyRange[1] - storeyRange[0])
+        return None
@@ -12,7 +12,6 @@
 
 # Standard-Bibliotheken
 import os
-import platform
 
 # IFC-Bibliotheken
 try:
@@ -27,6 +26,9 @@ except ImportError:
 from qgis.core import QgsTask, QgsApplication
 from qgis.PyQt.QtCore import QCoreApplication
 
+# Plugin
+from .compressed_io import CompressedIO
+
 #####
 
 
@@ -47,8 +49,7 @@ class IfcAnalyzer:
 
         # IFC-Datei
         self.ifc = self.read(path)
-        slash = "/" if platform.system() == "Linux" else "\\"
-        self.fileName = path[path.rindex(slash) + 1:-4]
+        self.fileName = CompressedIO.baseName(path, ".ifc")
 
     @staticmethod
     def tr(msg):
@@ -73,15 +74,15 @@ class IfcAnalyzer:
 
     @staticmethod
     def read(path):
-        """ Liest eine IFC-Datei ein
+        """ Liest eine ggf. komprimierte IFC-Datei ein, komprimierte Dateien werden im Speicher entpackt
 
         Args:
-            path: Pfad zur IFC-Datei
+            path: Pfad zur IFC-Datei (.ifc, .ifc.gz, .ifczip oder .zip)
 
         Returns:
             Eingelesene IFC-Datei
         """
-        return ifcopenshell.open(path)
+        return CompressedIO.readIfc(path)
 
     def printInfo(self, ifc):
         """ Stell die grundlegenden Informationen der IFC-Datei dar
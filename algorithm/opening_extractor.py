@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell
+import ifcopenshell.util.placement
+
+# Plugin
+from .height_estimator import HeightEstimator
+
+
+#####
+
+class OpeningExtractor:
+    """ Model-Klasse zum Ableiten rechteckiger Öffnungen (Türen und Fenster) ohne Tessellierung
+
+    Die Öffnung wird als Quader im Koordinatensystem ihrer Platzierung beschrieben: x entlang der Breite, z entlang
+    der Höhe, y quer zur Wand. Quellen sind die Bounding Box-Repräsentation, OverallWidth und OverallHeight mit der
+    Tiefe der gefüllten IfcOpeningElement sowie die Extrusion der IfcOpeningElement. Alle Längen werden über den
+    Faktor der Längeneinheit des Projekts in Meter umgerechnet.
+    """
+
+    @staticmethod
+    def fillingOpening(ifcOpening):
+        """ Sucht die IfcOpeningElement, die von einer Tür bzw. einem Fenster gefüllt wird
+
+        Args:
+            ifcOpening: Das IFC-Element der Tür bzw. des Fensters
+
+        Returns:
+            Die IfcOpeningElement, falls vorhanden. Ansonsten None
+        """
+        for relFills in getattr(ifcOpening, "FillsVoids", None) or []:
+            if relFills.RelatingOpeningElement is not None:
+                return relFills.RelatingOpeningElement
+        return None
+
+    @staticmethod
+    def isRectangularProfile(ifcProfile, tol=0.001):
+        """ Prüft, ob ein Profil ein Rechteck beschreibt
+
+        Args:
+            ifcProfile: Das Profil
+            tol: Toleranz für rechte Winkel (Betrag des Skalarprodukts der Einheitsvektoren), als float
+                Default: 0.001
+
+        Returns:
+            Ob das Profil rechteckig ist, als Boolean
+        """
+        if ifcProfile.is_a("IfcRectangleProfileDef"):
+            return True
+        pts = HeightEstimator.profilePoints(ifcProfile)
+        if pts is None:
+            return False
+        if len(pts) > 1 and np.allclose(pts[0], pts[-1]):
+            pts = pts[:-1]
+        if len(pts) != 4:
+            return False
+        edges = np.roll(pts, -1, axis=0) - pts
+        lengths = np.linalg.norm(edges, axis=1)
+        if np.any(lengths == 0):
+            return False
+        edges = edges / lengths[:, None]
+        return bool(np.all(np.abs(np.sum(edges * np.roll(edges, -1, axis=0), axis=1)) < tol))
+
+    @staticmethod
+    def isRectangular(ifcOpening):
+        """ Prüft über die gefüllte IfcOpeningElement, ob eine Öffnung rechteckig ist
+
+        Args:
+            ifcOpening: Das IFC-Element der Tür bzw. des Fensters
+
+        Returns:
+            Ob die Öffnung rechteckig ist, als Boolean (False, wenn nicht ableitbar)
+        """
+        ifcOpeningElement = OpeningExtractor.fillingOpening(ifcOpening)
+        if ifcOpeningElement is None or ifcOpeningElement.Representation is None:
+            return False
+        for rep in ifcOpeningElement.Representation.Representations:
+            if rep.RepresentationIdentifier != "Body":
+                continue
+            if len(rep.Items) == 0:
+                return False
+            for item in rep.Items:
+                if not item.is_a("IfcExtrudedAreaSolid") or not OpeningExtractor.isRectangularProfile(item.SweptArea):
+                    return False
+            return True
+        return False
+
+    @staticmethod
+    def localBox(ifcOpening, scale=1.0, sizeTol=0.05):
+        """ Berechnet den Quader einer Öffnung im Koordinatensystem ihrer Platzierung
+
+        OverallWidth und OverallHeight ersetzen die gemessene Breite bzw. Höhe nur, wenn sie um höchstens sizeTol
+        davon abweichen. Der gemessene Ursprung bleibt dabei erhalten.
+
+        Args:
+            ifcOpening: Das IFC-Element der Tür bzw. des Fensters
+            scale: Faktor der Längeneinheit des Projekts in Meter, als float
+                Default: 1.0
+            sizeTol: Maximale Abweichung der Attribute von der gemessenen Ausdehnung in Meter, als float
+                Default: 0.05
+
+        Returns:
+            Minimale und maximale Koordinaten des Quaders (in Meter), jeweils als Array. None, falls nicht ableitbar
+        """
+        # Bounding Box
+        if ifcOpening.Representation is not None:
+            for rep in ifcOpening.Representation.Representations:
+                if rep.RepresentationIdentifier == "Box" and len(rep.Items) == 1 and \
+                        rep.Items[0].is_a("IfcBoundingBox"):
+                    box = rep.Items[0]
+                    mins = np.array(box.Corner.Coordinates, dtype=np.float64)
+                    return mins * scale, (mins + [box.XDim, box.YDim, box.ZDim]) * scale
+
+        # Extrusion der gefüllten IfcOpeningElement im Koordinatensystem der Öffnung
+        ifcOpeningElement = OpeningExtractor.fillingOpening(ifcOpening)
+        if ifcOpeningElement is None or ifcOpening.ObjectPlacement is None:
+            return None
+        pts = HeightEstimator.extrusionPoints(ifcOpeningElement, scale)
+        if pts is None:
+            return None
+        placement = np.asarray(ifcopenshell.util.placement.get_local_placement(ifcOpening.ObjectPlacement))
+        pts = (pts - placement[:3, 3] * scale) @ placement[:3, :3]
+        mins, maxs = pts.min(axis=0), pts.max(axis=0)
+
+        # Breite und Höhe aus den Attributen der Tür bzw. des Fensters, falls sie zur gemessenen Ausdehnung passen
+        for axis, attr in [(0, "OverallWidth"), (2, "OverallHeight")]:
+            value = getattr(ifcOpening, attr, None)
+            if value is not None and value > 0 and abs(maxs[axis] - mins[axis] - value * scale) <= sizeTol:
+                maxs[axis] = mins[axis] + value * scale
+        return mins, maxs
+
+    @staticmethod
+    def corners(ifcOpening, scale=1.0):
+        """ Berechnet die Eckpunkte einer rechteckigen Öffnung in Weltkoordinaten
+
+        Args:
+            ifcOpening: Das IFC-Element der Tür bzw. des Fensters
+            scale: Faktor der Längeneinheit des Projekts in Meter, als float
+                Default: 1.0
+
+        Returns:
+            Die acht Eckpunkte in Meter (zuerst die unteren, dann die oberen), als Array der Form (8, 3). None, falls
+            die Öffnung nicht rechteckig ist oder nicht abgeleitet werden kann
+        """
+        if not OpeningExtractor.isRectangular(ifcOpening) or ifcOpening.ObjectPlacement is None:
+            return None
+        box = OpeningExtractor.localBox(ifcOpening, scale)
+        if box is None:
+            return None
+        mins, maxs = box
+        corners = np.array([[mins[0], mins[1], mins[2]], [maxs[0], mins[1], mins[2]], [maxs[0], maxs[1], mins[2]],
+                            [mins[0], maxs[1], mins[2]], [mins[0], mins[1], maxs[2]], [maxs[0], mins[1], maxs[2]],
+                            [maxs[0], maxs[1], maxs[2]], [mins[0], maxs[1], maxs[2]]], dtype=np.float64)
+        placement = np.asarray(ifcopenshell.util.placement.get_local_placement(ifcOpening.ObjectPlacement))
+        return corners @ placement[:3, :3].T + placement[:3, 3] * scale
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import sys
+import numpy as np
+
+# Plugin
+from .space_boundary_shell import BoundaryFace, SpaceBoundaryShell
+try:
+    from ..model.surface_array import SurfaceArray
+except ImportError:
+    sys.path.insert(0, '..')
+    from model.surface_array import SurfaceArray
+
+
+#####
+
+class RoomBoundary(SpaceBoundaryShell):
+    """ Model-Klasse zum Aufbau der Begrenzung eines Raumes aus seinen IfcRelSpaceBoundaries
+
+    Im Gegensatz zur Außenhülle werden alle Randflächen des Raumes genutzt, innen- wie außenliegende. Der
+    Normalenvektor der Randflächen zeigt in den Raum, Boden- und Deckenflächen ergeben sich somit aus dessen Richtung.
+    Virtuelle Randflächen werden zu Abschlussflächen. Wie bei der Außenhülle werden nur Randflächen des 2nd Level
+    genutzt, da Randflächen des 1st Level dieselben Bauteile ganzflächig und damit überlappend beschreiben.
+    """
+
+    # CityGML-Typen der Oberflächen
+    cityGmlTypes = {"Floor": "FloorSurface", "Ceiling": "CeilingSurface", "Wall": "InteriorWallSurface",
+                    "Closure": "ClosureSurface"}
+
+    # noinspection PyMissingConstructor
+    def __init__(self, ifcSpace, trans, planeTol=0.6, angTol=0.01, scale=1.0):
+        """ Konstruktor der Model-Klasse zum Aufbau der Begrenzung eines Raumes
+
+        Args:
+            ifcSpace: Der IFC-Raum
+            trans: Transformer-Objekt
+            planeTol: Maximaler Abstand einer Öffnung zur Ebene der zugehörigen Wand, als float
+                Default: 0.6
+            angTol: Maximale Abweichung paralleler Normalenvektoren (1 - Skalarprodukt), als float
+                Default: 0.01
+            scale: Faktor der Längeneinheit des Projekts in Meter, als float
+                Default: 1.0
+        """
+        # Initialisierung von Attributen
+        self.ifcSpace = ifcSpace
+        self.trans = trans
+        self.planeTol = planeTol
+        self.angTol = angTol
+        self.scale = scale
+        self.faces, self.openings, self.unsupported = [], [], []
+
+        # Randflächen des Raumes einlesen, ohne 2nd Level ist die Begrenzung nicht auswertbar
+        ifcRels = [ifcRel for ifcRel in ifcSpace.BoundedBy if self.isSecondLevel(ifcRel)]
+        if len(ifcRels) == 0:
+            self.unsupported.extend(ifcSpace.BoundedBy)
+        for ifcRel in ifcRels:
+            geom = self.boundaryGeometry(ifcRel, scale)
+            if geom is None:
+                self.unsupported.append(ifcRel)
+                continue
+            frame, rings = geom
+            ifcElem = ifcRel.RelatedBuildingElement
+            if ifcRel.PhysicalOrVirtualBoundary == "VIRTUAL" or ifcElem is None:
+                type = "Closure"
+            elif ifcElem.is_a("IfcDoor"):
+                type = "ifcDoor"
+            elif ifcElem.is_a("IfcWindow"):
+                type = "ifcWindow"
+            else:
+                type = self.classifyNormal(frame[:3, 2])
+            face = BoundaryFace(ifcRel, ifcElem, frame, rings, type)
+            if type in ["ifcDoor", "ifcWindow"]:
+                self.openings.append(face)
+            else:
+                self.faces.append(face)
+
+        self.orphans = self.assignOpenings()
+
+    @staticmethod
+    def classifyNormal(normal, vertTol=0.1):
+        """ Ordnet eine Raumbegrenzung über ihren in den Raum zeigenden Normalenvektor einem Oberflächentyp zu
+
+        Args:
+            normal: Der Normalenvektor (zeigt in den Raum), als Array
+            vertTol: Maximaler Betrag der z-Komponente des Normalenvektors für vertikale Flächen, als float
+                Default: 0.1
+
+        Returns:
+            Typ der Oberfläche (Floor, Ceiling oder Wall)
+        """
+        if normal[2] > vertTol:
+            return "Floor"
+        if normal[2] < -vertTol:
+            return "Ceiling"
+        return "Wall"
+
+    def isComplete(self):
+        """ Prüft, ob die Randflächen den Raum beschreiben
+
+        Vollständig ist die Begrenzung, wenn alle Randflächen lesbar sind und Boden- und Deckenflächen vorhanden sind.
+        Nicht zuordenbare Öffnungen werden übergangen.
+
+        Returns:
+            Ob die Begrenzung vollständig ist, als Boolean
+        """
+        if len(self.unsupported) > 0:
+            return False
+        types = set(face.type for face in self.faces)
+        return {"Floor", "Ceiling"}.issubset(types)
+
+    @staticmethod
+    def polygonNormal(ring):
+        """ Berechnet den Normalenvektor eines Rings nach Newell
+
+        Args:
+            ring: Die Punkte des Rings, als Array der Form (n, 3)
+
+        Returns:
+            Der normierte Normalenvektor, als Array. Ein Nullvektor bei entarteten Ringen
+        """
+        ring = np.asarray(ring, dtype=np.float64).reshape(-1, 3)
+        nxt = np.roll(ring, -1, axis=0)
+        normal = np.array([np.sum((ring[:, 1] - nxt[:, 1]) * (ring[:, 2] + nxt[:, 2])),
+                           np.sum((ring[:, 2] - nxt[:, 2]) * (ring[:, 0] + nxt[:, 0])),
+                           np.sum((ring[:, 0] - nxt[:, 0]) * (ring[:, 1] + nxt[:, 1]))])
+        length = np.linalg.norm(normal)
+        return normal / length if length > 0 else normal
+
+    @staticmethod
+    def bodySurfaces(polygons, name=None):
+        """ Ordnet die Flächen des Raumkörpers den Oberflächentypen zu (ohne Öffnungen)
+
+        Der Normalenvektor der Körperflächen zeigt aus dem Raum heraus und wird für die Zuordnung umgekehrt.
+
+        Args:
+            polygons: Die Flächen des Raumkörpers, als Liste von Polygonen, die jeweils eine Liste von Ringen sind
+            name: Name des Raumes
+                Default: None
+
+        Returns:
+            Die Oberflächen je Typ, als Liste von SurfaceArrays
+        """
+        groups = {}
+        for polygon in polygons:
+            type = RoomBoundary.classifyNormal(-RoomBoundary.polygonNormal(polygon[0]))
+            groups.setdefault(type, []).append(polygon)
+        return [SurfaceArray.fromPolygons(groups[type], name, None, type) for type in ["Floor", "Ceiling", "Wall"]
+                if type in groups]
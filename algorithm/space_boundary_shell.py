@@ -0,0 +1,445 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import sys
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell.util.placement
+import ifcopenshell.util.unit
+
+# Plugin
+from .utilitiesIfc import UtilitiesIfc
+try:
+    from ..model.surface_array import SurfaceArray
+except ImportError:
+    sys.path.insert(0, '..')
+    from model.surface_array import SurfaceArray
+
+
+#####
+
+class BoundaryFace:
+    """ Objekt-Klasse zum Halten einer äußeren Randfläche in ihrem ebenen Koordinatensystem """
+
+    __slots__ = ("ifcRel", "ifcElem", "frame", "rings", "type", "openings")
+
+    def __init__(self, ifcRel, ifcElem, frame, rings, type):
+        """ Konstruktor der Objekt-Klasse zum Halten einer äußeren Randfläche
+
+        Args:
+            ifcRel: Die IfcRelSpaceBoundary der Randfläche
+            ifcElem: Das zugehörige IFC-Bauteil
+            frame: Die Transformation der Ebene in Weltkoordinaten, als Array der Form (4, 4)
+            rings: Die Ringe in Ebenen-Koordinaten (Außenring zuerst), als Liste von Arrays der Form (n, 2)
+            type: Typ der Oberfläche (Wall, Roof, Base, ifcDoor oder ifcWindow)
+        """
+        self.ifcRel = ifcRel
+        self.ifcElem = ifcElem
+        self.frame = frame
+        self.rings = rings
+        self.type = type
+        self.openings = []
+
+    @property
+    def normal(self):
+        """ Der Normalenvektor der Ebene in Weltkoordinaten (zeigt in den Raum)
+
+        Returns:
+            Der Normalenvektor, als Array
+        """
+        return self.frame[:3, 2]
+
+    @property
+    def origin(self):
+        """ Der Ursprung der Ebene in Weltkoordinaten
+
+        Returns:
+            Der Ursprung, als Array
+        """
+        return self.frame[:3, 3]
+
+
+class SpaceBoundaryShell:
+    """ Model-Klasse zum Aufbau der Außenhülle eines Gebäudes aus den äußeren IfcRelSpaceBoundaries
+
+    Die Randflächen liegen auf der Raumseite der Bauteile. Ihr Normalenvektor zeigt in den Raum, die Außenseite der
+    Hülle liegt somit entgegen der Normalen. Die Hülle ist daher die innere Hülle des Gebäudes: Sie ist gegenüber der
+    Außenseite um die Dicke der Außenbauteile nach innen versetzt und an Innenwänden und Geschossdecken nicht
+    geschlossen. Verwendet werden nur Randflächen des 2nd Level, da nur diese je Bauteil und Raum genau eine Fläche
+    ohne Überlappung beschreiben.
+    """
+
+    def __init__(self, ifc, ifcBuilding, exteriorMap, trans, planeTol=0.6, angTol=0.01):
+        """ Konstruktor der Model-Klasse zum Aufbau der Außenhülle aus Randflächen
+
+        Args:
+            ifc: Die IFC-Datei
+            ifcBuilding: Das IFC-Gebäude
+            exteriorMap: Die Einordnung der Bauteile in außen- und innenliegend
+            trans: Transformer-Objekt
+            planeTol: Maximaler Abstand einer Öffnung zur Ebene der zugehörigen Wand, als float
+                Default: 0.6
+            angTol: Maximale Abweichung paralleler Normalenvektoren (1 - Skalarprodukt), als float
+                Default: 0.01
+        """
+        # Initialisierung von Attributen
+        self.ifc = ifc
+        self.ifcBuilding = ifcBuilding
+        self.exteriorMap = exteriorMap
+        self.trans = trans
+        self.planeTol = planeTol
+        self.angTol = angTol
+        self.scale = ifcopenshell.util.unit.calculate_unit_scale(ifc)
+        self.faces, self.openings, self.unsupported = [], [], []
+
+        # Äußere Randflächen einlesen
+        for ifcRel in exteriorMap.relSpaceBoundaries:
+            ifcElem = ifcRel.RelatedBuildingElement
+            if ifcElem is None or ifcRel.InternalOrExternalBoundary != "EXTERNAL":
+                continue
+            if ifcRel.PhysicalOrVirtualBoundary == "VIRTUAL":
+                continue
+            geom = self.boundaryGeometry(ifcRel, self.scale) if self.isSecondLevel(ifcRel) else None
+            if geom is None:
+                self.unsupported.append(ifcRel)
+                continue
+            frame, rings = geom
+            type = self.classify(ifcElem, frame)
+            if type is None:
+                continue
+            face = BoundaryFace(ifcRel, ifcElem, frame, rings, type)
+            if type in ["ifcDoor", "ifcWindow"]:
+                self.openings.append(face)
+            else:
+                self.faces.append(face)
+
+        # Grundflächen: nur die unterste Ebene, höher liegende Geschossdecken sind keine Außenhülle
+        grounds = [face for face in self.faces if face.type == "Base"]
+        if len(grounds) > 0:
+            minHeight = min(face.origin[2] for face in grounds)
+            self.faces = [face for face in self.faces if face.type != "Base" or face.origin[2] - minHeight < 0.01]
+
+        self.orphans = self.assignOpenings()
+
+    @staticmethod
+    def curvePoints(ifcCurve):
+        """ Liest die Punkte einer Randkurve in Ebenen-Koordinaten
+
+        Args:
+            ifcCurve: Die Randkurve (IfcPolyline oder IfcCompositeCurve aus IfcPolylines)
+
+        Returns:
+            Die Punkte des geschlossenen Rings, als Array der Form (n, 2). None, falls nicht unterstützt
+        """
+        if ifcCurve.is_a("IfcPolyline"):
+            pts = [list(pt.Coordinates)[:2] for pt in ifcCurve.Points]
+        elif ifcCurve.is_a("IfcCompositeCurve"):
+            pts = []
+            for segment in ifcCurve.Segments:
+                segPts = SpaceBoundaryShell.curvePoints(segment.ParentCurve)
+                if segPts is None:
+                    return None
+                segPts = segPts.tolist() if segment.SameSense else segPts[::-1].tolist()
+                pts += segPts if len(pts) == 0 or pts[-1] != segPts[0] else segPts[1:]
+        else:
+            return None
+        pts = np.array(pts, dtype=np.float64).reshape(-1, 2)
+        if len(pts) > 0 and np.any(pts[0] != pts[-1]):
+            pts = np.vstack((pts, pts[:1]))
+        return pts if len(pts) >= 4 else None
+
+    @staticmethod
+    def isSecondLevel(ifcRel):
+        """ Prüft, ob eine IfcRelSpaceBoundary eine Randfläche des 2nd Level ist
+
+        In IFC2X3 wird das Level nach Implementer Agreement über Name ('2ndLevel') bzw. Description ('2a', '2b')
+        angegeben, ab IFC4 zusätzlich über die Klasse IfcRelSpaceBoundary2ndLevel.
+
+        Args:
+            ifcRel: Die IfcRelSpaceBoundary
+
+        Returns:
+            Ob die Randfläche dem 2nd Level angehört, als Boolean
+        """
+        if ifcRel.is_a("IfcRelSpaceBoundary2ndLevel"):
+            return True
+        return ifcRel.Name == "2ndLevel" or ifcRel.Description in ["2a", "2b"]
+
+    @staticmethod
+    def boundaryGeometry(ifcRel, scale=1.0):
+        """ Liest die Geometrie einer IfcRelSpaceBoundary
+
+        Unterstützt werden IfcConnectionSurfaceGeometry mit IfcCurveBoundedPlane auf einer IfcPlane.
+
+        Args:
+            ifcRel: Die IfcRelSpaceBoundary
+            scale: Faktor der Längeneinheit des Projekts in Meter, als float
+                Default: 1.0
+
+        Returns:
+            Die Transformation der Ebene in Weltkoordinaten (in Meter), als Array der Form (4, 4)
+            Die Ringe in Ebenen-Koordinaten (in Meter, Außenring zuerst), als Liste von Arrays
+            None, falls die Geometrie fehlt oder nicht unterstützt wird
+        """
+        ifcConnGeom = ifcRel.ConnectionGeometry
+        if ifcConnGeom is None or not ifcConnGeom.is_a("IfcConnectionSurfaceGeometry"):
+            return None
+        ifcSurface = ifcConnGeom.SurfaceOnRelatingElement
+        if ifcSurface is None or not ifcSurface.is_a("IfcCurveBoundedPlane"):
+            return None
+        if not ifcSurface.BasisSurface.is_a("IfcPlane"):
+            return None
+
+        # Ringe
+        outer = SpaceBoundaryShell.curvePoints(ifcSurface.OuterBoundary)
+        if outer is None:
+            return None
+        rings = [outer * scale]
+        for ifcInner in ifcSurface.InnerBoundaries or []:
+            inner = SpaceBoundaryShell.curvePoints(ifcInner)
+            if inner is None:
+                return None
+            rings.append(inner * scale)
+
+        # Ebene relativ zur Platzierung des Raums
+        frame = ifcopenshell.util.placement.get_axis2placement(ifcSurface.BasisSurface.Position)
+        if ifcRel.RelatingSpace is not None and ifcRel.RelatingSpace.ObjectPlacement is not None:
+            frame = ifcopenshell.util.placement.get_local_placement(ifcRel.RelatingSpace.ObjectPlacement) @ frame
+        frame = np.array(frame, dtype=np.float64)
+        frame[:3, 3] *= scale
+        return frame, rings
+
+    @staticmethod
+    def classify(ifcElem, frame, vertTol=0.1):
+        """ Ordnet eine Randfläche über ihr Bauteil und ihre Ausrichtung einem Oberflächentyp zu
+
+        Args:
+            ifcElem: Das IFC-Bauteil der Randfläche
+            frame: Die Transformation der Ebene in Weltkoordinaten, als Array der Form (4, 4)
+            vertTol: Maximaler Betrag der z-Komponente des Normalenvektors für vertikale Flächen, als float
+                Default: 0.1
+
+        Returns:
+            Typ der Oberfläche (Wall, Roof, Base, ifcDoor oder ifcWindow), falls zuordenbar. Ansonsten None
+        """
+        normalZ = frame[2, 2]
+        if ifcElem.is_a("IfcDoor"):
+            return "ifcDoor"
+        if ifcElem.is_a("IfcWindow"):
+            return "ifcWindow"
+        if ifcElem.is_a("IfcRoof") or (ifcElem.is_a("IfcSlab") and ifcElem.PredefinedType == "ROOF"):
+            return "Roof"
+        if ifcElem.is_a("IfcSlab") and ifcElem.PredefinedType in ["BASESLAB", "FLOOR"] and normalZ > vertTol:
+            return "Base"
+        if abs(normalZ) <= vertTol:
+            return "Wall"
+        # Normalenvektor zeigt in den Raum: nach unten zeigend bedeutet Dach über dem Raum
+        return "Roof" if normalZ < -vertTol else None
+
+    def assignOpenings(self):
+        """ Ordnet die Öffnungen den Wandflächen zu, in deren Ebene sie liegen
+
+        Bevorzugt werden die Randflächen des Wirts-Bauteils aus IfcRelFillsElement und IfcRelVoidsElement.
+
+        Returns:
+            Die Öffnungen, für die keine Wandfläche gefunden wurde, als Liste
+        """
+        walls = [face for face in self.faces if face.type in ["Wall", "Roof"]]
+        orphans = []
+        for opening in self.openings:
+            ifcHost = UtilitiesIfc.findHostElement(opening.ifcElem)
+            hostWalls = [face for face in walls if ifcHost is not None and face.ifcElem == ifcHost]
+            best = None
+            for candidates in [hostWalls, walls]:
+                best = self.findHostFace(opening, candidates)
+                if best is not None:
+                    break
+            if best is None:
+                orphans.append(opening)
+                continue
+            face, ring2D = best
+            face.openings.append((opening, ring2D))
+        return orphans
+
+    def findHostFace(self, opening, faces):
+        """ Sucht die nächstgelegene, parallele Fläche, deren Außenring die Öffnung überdeckt
+
+        Args:
+            opening: Die Öffnung, als BoundaryFace
+            faces: Die möglichen Flächen, als Liste von BoundaryFaces
+
+        Returns:
+            Die Fläche und der Außenring der Öffnung in deren Ebenen-Koordinaten, als Tupel. None, falls keine passt
+        """
+        world = self.planeToWorld(opening.frame, opening.rings[0])
+        best, bestDist = None, self.planeTol
+        for face in faces:
+            if 1 - abs(np.dot(face.normal, opening.normal)) > self.angTol:
+                continue
+            local = self.worldToPlane(face.frame, world)
+            dist = np.max(np.abs(local[:, 2]))
+            if dist > bestDist:
+                continue
+            outer = face.rings[0]
+            if np.any(local[:, :2].min(axis=0) < outer.min(axis=0) - 0.01) or \
+                    np.any(local[:, :2].max(axis=0) > outer.max(axis=0) + 0.01):
+                continue
+            best, bestDist = (face, local[:, :2]), dist
+        return best
+
+    @staticmethod
+    def planeToWorld(frame, ring2D):
+        """ Transformiert Punkte aus Ebenen-Koordinaten in lokale Weltkoordinaten
+
+        Args:
+            frame: Die Transformation der Ebene, als Array der Form (4, 4)
+            ring2D: Die Punkte in Ebenen-Koordinaten, als Array der Form (n, 2)
+
+        Returns:
+            Die Punkte, als Array der Form (n, 3)
+        """
+        ring2D = np.asarray(ring2D, dtype=np.float64).reshape(-1, 2)
+        return ring2D @ frame[:3, :2].T + frame[:3, 3]
+
+    @staticmethod
+    def worldToPlane(frame, points):
+        """ Transformiert Punkte aus lokalen Weltkoordinaten in Ebenen-Koordinaten
+
+        Args:
+            frame: Die Transformation der Ebene, als Array der Form (4, 4)
+            points: Die Punkte, als Array der Form (n, 3)
+
+        Returns:
+            Die Punkte in Ebenen-Koordinaten (z: Abstand zur Ebene), als Array der Form (n, 3)
+        """
+        return (np.asarray(points, dtype=np.float64).reshape(-1, 3) - frame[:3, 3]) @ frame[:3, :3]
+
+    @staticmethod
+    def orientRing(ring2D, outer):
+        """ Orientiert einen Ring so, dass die Fläche von außen gesehen gegen den Uhrzeigersinn verläuft
+
+        Da der Normalenvektor der Ebene in den Raum zeigt, verlaufen Außenringe in Ebenen-Koordinaten im
+        Uhrzeigersinn und Innenringe gegen den Uhrzeigersinn.
+
+        Args:
+            ring2D: Der Ring in Ebenen-Koordinaten, als Array der Form (n, 2)
+            outer: Ob es sich um einen Außenring handelt, als Boolean
+
+        Returns:
+            Der orientierte Ring, als Array der Form (n, 2)
+        """
+        ring2D = np.asarray(ring2D, dtype=np.float64).reshape(-1, 2)
+        x, y = ring2D[:, 0], ring2D[:, 1]
+        area = 0.5 * np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+        return ring2D[::-1] if (area > 0) == outer else ring2D
+
+    def toWorld(self, face, ring2D, outer=True):
+        """ Orientiert einen Ring einer Fläche und georeferenziert ihn
+
+        Args:
+            face: Die Fläche, in deren Ebene der Ring liegt, als BoundaryFace
+            ring2D: Der Ring in Ebenen-Koordinaten, als Array der Form (n, 2)
+            outer: Ob es sich um einen Außenring handelt, als Boolean
+                Default: True
+
+        Returns:
+            Die georeferenzierten Punkte, als Array der Form (n, 3)
+        """
+        return self.trans.georeferencePoints(self.planeToWorld(face.frame, self.orientRing(ring2D, outer)))
+
+    def faceSurface(self, face):
+        """ Berechnet die Oberfläche einer Randfläche, deren Öffnungen in ihrer Ebene ausgestanzt werden
+
+        Args:
+            face: Die Randfläche, als BoundaryFace
+
+        Returns:
+            Die Oberfläche mit ihren Öffnungen, als SurfaceArray. None, falls keine Fläche verbleibt
+        """
+        # Öffnungen in Ebenen-Koordinaten ausstanzen
+        geom2D = self.ringsToPolygon2D(face.rings)
+        for opening, ring2D in face.openings:
+            geom2D = geom2D.Difference(self.ringsToPolygon2D([ring2D]))
+
+        # Zurück in Weltkoordinaten
+        polygons = []
+        parts = [geom2D] if geom2D.GetGeometryName() == "POLYGON" else \
+            [geom2D.GetGeometryRef(k) for k in range(0, geom2D.GetGeometryCount())]
+        for part in parts:
+            if part.GetGeometryName() != "POLYGON" or part.GetArea() == 0:
+                continue
+            rings = []
+            for k in range(0, part.GetGeometryCount()):
+                ring = part.GetGeometryRef(k)
+                ring2D = [ring.GetPoint_2D(m) for m in range(0, ring.GetPointCount())]
+                rings.append(self.toWorld(face, ring2D, k == 0))
+            polygons.append(rings)
+        if len(polygons) == 0:
+            return None
+
+        name = face.ifcElem.Name if face.ifcElem is not None else None
+        surface = SurfaceArray.fromPolygons(polygons, name, face.ifcElem, face.type)
+        for opening, ring2D in face.openings:
+            openingSurface = SurfaceArray.fromPolygons([[self.toWorld(face, ring2D)]], opening.ifcElem.Name,
+                                                       opening.ifcElem, opening.type)
+            surface.openings.append(openingSurface)
+        return surface
+
+    @staticmethod
+    def ringsToPolygon2D(rings):
+        """ Erstellt ein zweidimensionales OGR-Polygon aus Ringen in Ebenen-Koordinaten
+
+        Args:
+            rings: Die Ringe (Außenring zuerst), als Liste von Arrays der Form (n, 2)
+
+        Returns:
+            Das Polygon, als OGR-Geometrie
+        """
+        # Geo-Bibliotheken: nur laden, wenn tatsächlich Flächen verschnitten werden
+        from osgeo import ogr
+
+        geom = ogr.Geometry(ogr.wkbPolygon)
+        for ringPts in rings:
+            ring = ogr.Geometry(ogr.wkbLinearRing)
+            for pt in ringPts:
+                ring.AddPoint_2D(float(pt[0]), float(pt[1]))
+            geom.AddGeometry(ring)
+        return geom
+
+    def isComplete(self):
+        """ Prüft, ob die Randflächen die Außenhülle vollständig beschreiben
+
+        Vollständig ist die Hülle, wenn alle äußeren Randflächen lesbar und vom 2nd Level sind, jede äußere Wand und
+        jede äußere Öffnung eine Randfläche besitzt, alle Öffnungen einer Wand zugeordnet werden konnten und Grund-,
+        Dach- und Wandflächen vorhanden sind. Auch eine vollständige Hülle bleibt um die Bauteildicke nach innen
+        versetzt (siehe Klassenbeschreibung).
+
+        Returns:
+            Ob die Außenhülle vollständig ist, als Boolean
+        """
+        if len(self.unsupported) > 0 or len(self.orphans) > 0:
+            return False
+        types = set(face.type for face in self.faces)
+        if not {"Base", "Roof", "Wall"}.issubset(types):
+            return False
+
+        covered = set(face.ifcElem.id() for face in self.faces + self.openings)
+        for ifcWall in UtilitiesIfc.findElement(self.ifc, self.ifcBuilding, "IfcWall", result=[]):
+            if self.exteriorMap.isExternalWall(ifcWall) and ifcWall.id() not in covered:
+                return False
+        for type, psetName in [("IfcDoor", "Pset_DoorCommon"), ("IfcWindow", "Pset_WindowCommon")]:
+            for ifcOpening in UtilitiesIfc.findElement(self.ifc, self.ifcBuilding, type, result=[]):
+                if self.exteriorMap.isExternalOpening(ifcOpening, psetName) and ifcOpening.id() not in covered:
+                    return False
+        return True
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import sys
+import uuid
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell
+import ifcopenshell.util.placement
+
+# XML-Bibliotheken
+from lxml import etree
+# noinspection PyUnresolvedReferences
+from lxml.etree import QName
+
+# Plugin
+from .half_edge_mesh import HalfEdgeMesh
+from .tessellation_profile import TessellationProfile
+try:
+    from ..model.xmlns import XmlNs
+    from ..model.surface_array import SurfaceArray
+except ImportError:
+    sys.path.insert(0, '..')
+    from model.xmlns import XmlNs
+    from model.surface_array import SurfaceArray
+
+
+#####
+
+class TemplateLibrary:
+    """ Model-Klasse zum Instanziieren wiederkehrender Geometrien als CityGML-ImplicitGeometry
+
+    Geteilte Repräsentationen (IfcRepresentationMap über IfcMappedItem bzw. IfcTypeProduct) werden einmalig
+    tesselliert und beim ersten Vorkommen als Vorlage geschrieben. Jedes weitere Vorkommen verweist per XLink auf die
+    Vorlage und erhält nur Transformationsmatrix und Referenzpunkt. Die Tessellierung liefert Meter, daher werden
+    die Verschiebungen der Platzierungen über den Faktor der Längeneinheit des Projekts ebenfalls in Meter umgerechnet.
+    """
+
+    def __init__(self, trans, scale=1.0):
+        """ Konstruktor der Model-Klasse zum Instanziieren wiederkehrender Geometrien
+
+        Args:
+            trans: Transformer-Objekt
+            scale: Faktor der Längeneinheit des Projekts in Meter, als float
+                Default: 1.0
+        """
+        # Initialisierung von Attributen
+        self.trans = trans
+        self.scale = scale
+        self.templates = {}
+        self.gmlIds = {}
+        self.elements = {}
+
+    @staticmethod
+    def source(ifcElement, scale=1.0):
+        """ Sucht die geteilte Repräsentation eines Bauteils und deren Platzierung
+
+        Args:
+            ifcElement: Das IFC-Bauteil
+            scale: Faktor der Längeneinheit des Projekts in Meter, als float
+                Default: 1.0
+
+        Returns:
+            Die IfcRepresentationMap und die Transformationsmatrix von Vorlagen- in IFC-Weltkoordinaten (Form (4, 4),
+            Verschiebung in Meter). None, falls die Geometrie nicht geteilt ist
+        """
+        if ifcElement.ObjectPlacement is None:
+            return None
+        placement = np.asarray(ifcopenshell.util.placement.get_local_placement(ifcElement.ObjectPlacement))
+        source = None
+
+        # Vorkommen mit IfcMappedItem als einzigem Körper
+        bodies = [rep for rep in ifcElement.Representation.Representations if rep.RepresentationIdentifier == "Body"] \
+            if ifcElement.Representation is not None else []
+        if len(bodies) > 0:
+            items = bodies[0].Items
+            if len(items) == 1 and items[0].is_a("IfcMappedItem") and \
+                    items[0].MappingTarget.is_a("IfcCartesianTransformationOperator3D"):
+                matrix = ifcopenshell.util.placement.get_mappeditem_transformation(items[0])
+                source = items[0].MappingSource, placement @ np.asarray(matrix)
+
+        # Vorkommen ohne eigene Geometrie: Körper des Typs
+        else:
+            for relType in getattr(ifcElement, "IsTypedBy", None) or getattr(ifcElement, "IsDefinedBy", None) or []:
+                if source is not None or not relType.is_a("IfcRelDefinesByType"):
+                    continue
+                for repMap in relType.RelatingType.RepresentationMaps or []:
+                    if repMap.MappedRepresentation.RepresentationIdentifier == "Body":
+                        origin = ifcopenshell.util.placement.get_axis2placement(repMap.MappingOrigin)
+                        source = repMap, placement @ np.asarray(origin)
+                        break
+        if source is None:
+            return None
+
+        # Die Tessellierung der Vorlage liefert Meter: nur die Verschiebung ist in Meter umzurechnen
+        repMap, matrix = source
+        matrix = np.array(matrix, dtype=np.float64)
+        matrix[:3, 3] *= scale
+        return repMap, matrix
+
+    def template(self, repMap):
+        """ Tesselliert eine geteilte Repräsentation (mit Zwischenspeicherung)
+
+        Args:
+            repMap: Die IfcRepresentationMap
+
+        Returns:
+            Die Flächen in Vorlagen-Koordinaten, als SurfaceArray. None, falls nicht tessellierbar
+        """
+        if repMap.id() not in self.templates:
+            try:
+                shape = TessellationProfile.createShape(repMap.MappedRepresentation)
+                geometry = getattr(shape, "geometry", shape)
+                verts = np.asarray(geometry.verts, dtype=np.float64).reshape(-1, 3)
+                faces = np.asarray(geometry.faces, dtype=np.int64).reshape(-1, 3)
+                surface = SurfaceArray.fromPolygons(HalfEdgeMesh(verts, faces).polygons()) if len(faces) > 0 else None
+            except RuntimeError:
+                surface = None
+            self.templates[repMap.id()] = surface
+        return self.templates[repMap.id()]
+
+    def transformation(self, matrix):
+        """ Zerlegt eine Platzierung in CityGML-Transformationsmatrix und georeferenzierten Referenzpunkt
+
+        Args:
+            matrix: Die Transformationsmatrix von Vorlagen- in IFC-Weltkoordinaten, als Array der Form (4, 4)
+
+        Returns:
+            Die Transformationsmatrix ohne Verschiebung (Form (4, 4)) und der Referenzpunkt (Form (3,))
+        """
+        result = np.identity(4)
+        result[:3, :3] = np.asarray(self.trans.trans, dtype=np.float64).T @ np.asarray(matrix)[:3, :3]
+        refPoint = self.trans.georeferencePoints(np.asarray(matrix)[:3, 3])[0]
+        return result, refPoint
+
+    def toXml(self, chParent, ifcElement, lod=4):
+        """ Schreibt die Geometrie eines Bauteils als ImplicitGeometry
+
+        Args:
+            chParent: XML-Element des CityGML-Objekts (z.B. bldg:BuildingFurniture)
+            ifcElement: Das IFC-Bauteil
+            lod: Level of Detail (LoD)
+                Default: 4
+
+        Returns:
+            Ob die Geometrie implizit geschrieben wurde, als Boolean
+        """
+        source = self.source(ifcElement, self.scale)
+        if source is None:
+            return False
+        repMap, matrix = source
+        surface = self.template(repMap)
+        if surface is None or surface.polygonCount == 0:
+            return False
+        transMatrix, refPoint = self.transformation(matrix)
+
+        # XML-Struktur
+        chImpl = etree.SubElement(chParent, QName(XmlNs.bldg, "lod" + str(lod) + "ImplicitRepresentation"))
+        chImplGeom = etree.SubElement(chImpl, QName(XmlNs.core, "ImplicitGeometry"))
+        chImplMatrix = etree.SubElement(chImplGeom, QName(XmlNs.core, "transformationMatrix"))
+        chImplMatrix.text = " ".join(str(round(float(value), 10)) for value in transMatrix.flatten())
+        chImplRel = etree.SubElement(chImplGeom, QName(XmlNs.core, "relativeGMLGeometry"))
+
+        # Vorlage: beim ersten Vorkommen vollständig, danach als XLink
+        if repMap.id() in self.gmlIds:
+            chImplRel.set(QName(XmlNs.xlink, "href"), "#" + self.gmlIds[repMap.id()])
+        else:
+            gmlId = "GML_" + str(uuid.uuid4())
+            self.gmlIds[repMap.id()] = gmlId
+            self.elements[repMap.id()] = self.surfaceToGml(surface, gmlId)
+            chImplRel.append(self.elements[repMap.id()])
+
+        # Referenzpunkt
+        chImplRef = etree.SubElement(chImplGeom, QName(XmlNs.core, "referencePoint"))
+        chImplPt = etree.SubElement(chImplRef, QName(XmlNs.gml, "Point"))
+        chImplPos = etree.SubElement(chImplPt, QName(XmlNs.gml, "pos"))
+        chImplPos.set("srsDimension", "3")
+        chImplPos.text = " ".join(str(float(value)) for value in refPoint)
+        return True
+
+    def prune(self, root):
+        """ Vergisst Vorlagen, deren XML-Elemente nicht mehr im Dokument enthalten sind (z.B. nach Zeitbudget-Verwurf)
+
+        Args:
+            root: Das Wurzelelement des CityGML-Dokuments
+        """
+        for repMapId in list(self.elements.keys()):
+            if not any(chAnc is root for chAnc in self.elements[repMapId].iterancestors()):
+                del self.elements[repMapId], self.gmlIds[repMapId]
+
+    @staticmethod
+    def surfaceToGml(surface, gmlId=None):
+        """ Wandelt Flächen in eine GML-MultiSurface um, ohne Umweg über OGR
+
+        Args:
+            surface: Die Flächen, als SurfaceArray
+            gmlId: Die GML-ID der MultiSurface
+                Default: None
+
+        Returns:
+            Das XML-Element der MultiSurface
+        """
+        chMS = etree.Element(QName(XmlNs.gml, "MultiSurface"))
+        if gmlId is not None:
+            chMS.set(QName(XmlNs.gml, "id"), gmlId)
+        for j in range(0, surface.polygonCount):
+            chSM = etree.SubElement(chMS, QName(XmlNs.gml, "surfaceMember"))
+            chPoly = etree.SubElement(chSM, QName(XmlNs.gml, "Polygon"))
+            for i, ring in enumerate(surface.polygon(j)):
+                chRingProp = etree.SubElement(chPoly, QName(XmlNs.gml, "exterior" if i == 0 else "interior"))
+                chRing = etree.SubElement(chRingProp, QName(XmlNs.gml, "LinearRing"))
+                pts = list(ring) + ([ring[0]] if not np.allclose(ring[0], ring[-1]) else [])
+                for pt in pts:
+                    chPos = etree.SubElement(chRing, QName(XmlNs.gml, "pos"))
+                    chPos.text = " ".join(str(round(float(value), 6)) for value in pt)
+        return chMS
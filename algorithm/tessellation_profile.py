@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# IFC-Bibliotheken
+import ifcopenshell
+import ifcopenshell.geom
+
+
+#####
+
+class TessellationProfile:
+    """ Model-Klasse mit Tessellierungs-Einstellungen je Verwendungszweck
+
+    DETAIL: Volle Geometrie mit ausgeschnittenen Öffnungen (LoD3, LoD4)
+    FOOTPRINT: Ohne Öffnungsausschnitte, für Grundflächen, Höhen und Dächer ohne Öffnungen (LoD0 bis LoD2)
+    ROOF: Wie FOOTPRINT, gekrümmte Geometrien werden gröber angenähert (LoD2-Dächer)
+    """
+
+    DETAIL = "detail"
+    FOOTPRINT = "footprint"
+    ROOF = "roof"
+
+    # Einstellungen je Profil: Öffnungen ausschneiden, lineare Abweichung gekrümmter Geometrien (None: Standard)
+    profiles = {
+        DETAIL: (True, None),
+        FOOTPRINT: (False, None),
+        ROOF: (False, 0.01),
+    }
+
+    # Zwischenspeicher der erzeugten Einstellungen
+    cache = {}
+
+    @staticmethod
+    def settings(profile=DETAIL):
+        """ Gibt die ifcopenshell-Einstellungen eines Profils zurück (mit Zwischenspeicherung)
+
+        Args:
+            profile: Name des Profils
+                Default: DETAIL
+
+        Returns:
+            Die Einstellungen für ifcopenshell.geom.create_shape
+        """
+        if profile not in TessellationProfile.cache:
+            openings, deflection = TessellationProfile.profiles[profile]
+            # noinspection PyUnresolvedReferences
+            settings = ifcopenshell.geom.settings()
+            settings.set(settings.USE_WORLD_COORDS, True)
+            if not openings:
+                settings.set(settings.DISABLE_OPENING_SUBTRACTIONS, True)
+            if deflection is not None:
+                TessellationProfile.setDeflection(settings, deflection)
+            TessellationProfile.cache[profile] = settings
+        return TessellationProfile.cache[profile]
+
+    @staticmethod
+    def setDeflection(settings, deflection):
+        """ Setzt die lineare Abweichung bei der Annäherung gekrümmter Geometrien
+
+        Args:
+            settings: Die ifcopenshell-Einstellungen
+            deflection: Die maximale lineare Abweichung, als float
+        """
+        try:
+            # ifcopenshell ab v0.8
+            settings.set("mesher-linear-deflection", deflection)
+        except (TypeError, AttributeError, RuntimeError):
+            # ifcopenshell v0.7
+            settings.set_deflection_tolerance(deflection)
+
+    @staticmethod
+    def createShape(ifcElement, profile=DETAIL):
+        """ Tesselliert ein IFC-Element mit den Einstellungen eines Profils
+
+        Args:
+            ifcElement: Das zu tessellierende IFC-Element
+            profile: Name des Profils
+                Default: DETAIL
+
+        Returns:
+            Die Form mit Geometrie in Weltkoordinaten
+        """
+        # noinspection PyUnresolvedReferences
+        return ifcopenshell.geom.create_shape(TessellationProfile.settings(profile), ifcElement)
+
+    @staticmethod
+    def iterateShapes(ifc, ifcElements, profile=DETAIL, threads=1):
+        """ Tesselliert mehrere IFC-Elemente mit den Einstellungen eines Profils in mehreren Threads
+
+        Die Tessellierung läuft im ifcopenshell-Iterator außerhalb des Python-Interpreters und damit parallel. Die
+        Formen werden in der Reihenfolge geliefert, in der sie fertig werden; nicht tessellierbare Elemente fehlen.
+
+        Args:
+            ifc: Die IFC-Datei
+            ifcElements: Die zu tessellierenden IFC-Elemente, als Liste
+            profile: Name des Profils
+                Default: DETAIL
+            threads: Anzahl der Threads, als int
+                Default: 1
+
+        Returns:
+            Die Formen mit Geometrie in Weltkoordinaten, als Generator. Die ID des Elements liegt in shape.id
+        """
+        if len(ifcElements) == 0:
+            return
+        # noinspection PyUnresolvedReferences
+        iterator = ifcopenshell.geom.iterator(TessellationProfile.settings(profile), ifc, max(threads, 1),
+                                              include=list(ifcElements))
+        if not iterator.initialize():
+            return
+        while True:
+            yield iterator.get()
+            if not iterator.next():
+                break
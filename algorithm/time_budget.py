@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import time
+
+
+#####
+
+class BudgetExceeded(Exception):
+    """ Ausnahme, wenn das Zeitbudget eines Gebäudes überschritten wurde """
+
+
+class ConversionCanceled(Exception):
+    """ Ausnahme, wenn die Konvertierung während einer Berechnung abgebrochen wurde """
+
+
+class TimeBudget:
+    """ Model-Klasse für das Zeitbudget der Geometrieberechnung eines Gebäudes
+
+    Das Objekt ersetzt während der Berechnung den Task der Konverter. Alle Abfragen von isCanceled (auch innerhalb der
+    Schleifen der Geometrie-Werkzeuge) prüfen so zusätzlich das Zeitbudget und brechen die Berechnung über eine
+    Ausnahme bis zum Aufrufer ab.
+    """
+
+    # Zeitbudget je Gebäude und LoD in Sekunden (None: unbegrenzt)
+    seconds = 600
+
+    def __init__(self, task, seconds=None):
+        """ Konstruktor der Model-Klasse für das Zeitbudget eines Gebäudes, die Zeitmessung beginnt sofort
+
+        Args:
+            task: Der zugrunde liegende Task
+            seconds: Das Zeitbudget in Sekunden, als float
+                Default: None (Wert der Klasse)
+        """
+        # Initialisierung von Attributen
+        self.task = task
+        self.logging = task.logging
+        self.seconds = TimeBudget.seconds if seconds is None else seconds
+        self.start = time.monotonic()
+        self.exceeded = False
+
+    def elapsed(self):
+        """ Gibt die seit Beginn vergangene Zeit zurück
+
+        Returns:
+            Die vergangene Zeit in Sekunden, als float
+        """
+        return time.monotonic() - self.start
+
+    def isCanceled(self):
+        """ Prüft, ob die Konvertierung abgebrochen oder das Zeitbudget überschritten wurde
+
+        Returns:
+            False, wenn weitergerechnet werden kann
+
+        Raises:
+            ConversionCanceled: Wenn die Konvertierung abgebrochen wurde
+            BudgetExceeded: Wenn das Zeitbudget überschritten wurde
+        """
+        if self.task.isCanceled():
+            raise ConversionCanceled()
+        if self.exceeded or (self.seconds is not None and self.elapsed() > self.seconds):
+            self.exceeded = True
+            raise BudgetExceeded()
+        return False
+
+    def setProgress(self, progress):
+        """ Setzt den Fortschritt des zugrunde liegenden Tasks
+
+        Args:
+            progress: Der Fortschritt in Prozent, als float
+        """
+        self.task.setProgress(progress)
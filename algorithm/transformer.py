@@ -125,3 +125,15 @@ class Transformer:
         """
         result = np.mat(point) * np.mat(self.trans) + np.mat(self.originShift)
         return np.array(result)[0]
+
+    def georeferencePoints(self, points):
+        """ Georeferenziert mehrere Punkte in einem Schritt
+
+        Args:
+            points: Die zu georeferenzierenden Punkte, als Array der Form (n, 3)
+
+        Returns:
+            Die georeferenzierten Punkte, als Array der Form (n, 3)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        return points @ np.asarray(self.trans) + np.asarray(self.originShift, dtype=np.float64)
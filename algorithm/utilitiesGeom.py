@@ -31,6 +31,9 @@ except ImportError:
     import mpmath
     from sympy import Point3D, Plane, Line
 
+# Plugin
+from .vertex_welder import VertexWelder
+
 
 #####
 
@@ -413,6 +416,9 @@ class UtilitiesGeom:
         """
         geomsOut, done = [], []
 
+        # Vertizes verschweißen: Gleichheit von Punkten wird über Vertex-IDs geprüft
+        welder, ringIds = VertexWelder(0.0001), {}
+
         # Alle Geometrie miteinander auf Berührung testen
         for i in range(0, len(geomsIn)):
 
@@ -424,6 +430,9 @@ class UtilitiesGeom:
                 done.append(i)
                 continue
             ring1 = geom1.GetGeometryRef(0)
+            if i not in ringIds:
+                ringIds[i] = welder.weldRing(ring1)
+            ids1 = ringIds[i]
             for j in range(i + 1, len(geomsIn)):
                 if task is not None and task.isCanceled():
                     return False
@@ -434,6 +443,9 @@ class UtilitiesGeom:
                     done.append(j)
                     continue
                 ring2 = geom2.GetGeometryRef(0)
+                if j not in ringIds:
+                    ringIds[j] = welder.weldRing(ring2)
+                ids2 = ringIds[j]
 
                 # Auf Parallität prüfen
                 geom1Simp = UtilitiesGeom.simplify(geom1, 0.001, 0.0001)
@@ -457,23 +469,22 @@ class UtilitiesGeom:
                 tol = 0.001
                 if UtilitiesGeom.isEqual(unit1, unit2, tol) or UtilitiesGeom.isEqual(unit1, unit2Neg, tol):
 
-                    # Alle Eckpunkte miteinander vergleichen
+                    # Alle Eckpunkte über ihre Vertex-IDs miteinander vergleichen
                     samePts = []
                     ks, ms = [], []
-                    for k in range(0, ring1.GetPointCount() - 1):
-                        for m in range(0, ring2.GetPointCount() - 1):
-                            if ring1.GetPoint(k)[0] - 0.0001 < ring2.GetPoint(m)[0] < \
-                                    ring1.GetPoint(k)[0] + 0.0001 and ring1.GetPoint(k)[1] - 0.0001 < \
-                                    ring2.GetPoint(m)[1] < ring1.GetPoint(k)[1] + 0.0001 and \
-                                    ring1.GetPoint(k)[2] - 0.0001 < ring2.GetPoint(m)[2] < \
-                                    ring1.GetPoint(k)[2] + 0.0001:
-                                ks.append(k)
-                                if m not in ms:
-                                    ms.append(m)
-                                samePts.append(ring1.GetPoint(k))
+                    posM = {}
+                    for m in range(0, len(ids2) - 1):
+                        posM.setdefault(ids2[m], []).append(m)
+                    for k in range(0, len(ids1) - 1):
+                        for m in posM.get(ids1[k], []):
+                            ks.append(k)
+                            if m not in ms:
+                                ms.append(m)
+                            samePts.append(ids1[k])
+                    sameCount, samePts = len(samePts), set(samePts)
 
                     # Wenn mehrere gleiche Punkte gefunden
-                    if len(samePts) > 1:
+                    if sameCount > 1:
 
                         # Vereinigungs-Geometrie erstellen
                         geometry, ring = ogr.Geometry(ogr.wkbPolygon), ogr.Geometry(ogr.wkbLinearRing)
@@ -506,28 +517,27 @@ class UtilitiesGeom:
                             for k in range(0, ring1.GetPointCount() - 1):
                                 point1 = ring1.GetPoint(k)
 
-                                if point1 in samePts and k != ks[0] and k != ks[-1]:
+                                if ids1[k] in samePts and k != ks[0] and k != ks[-1]:
                                     continue
 
                                 ring.AddPoint(point1[0], point1[1], point1[2])
 
                                 # Wenn gleicher Eckpunkt: Anbinden der zweiten Geometrie
-                                if point1 in samePts:
+                                if ids1[k] in samePts:
                                     for m in range(0, ring2.GetPointCount() - 1):
-                                        point2 = ring2.GetPoint(m)
-                                        if point2 == point1:
-                                            if ring2.GetPoint(m + 1) in samePts:
+                                        if ids2[m] == ids1[k]:
+                                            if ids2[m + 1] in samePts:
                                                 break
                                             else:
                                                 for n in range(m + 1, ring2.GetPointCount() - 1):
                                                     point3 = ring2.GetPoint(n)
-                                                    if point3 in samePts:
+                                                    if ids2[n] in samePts:
                                                         break
                                                     else:
                                                         ring.AddPoint(point3[0], point3[1], point3[2])
                                                 for o in range(0, m):
                                                     point3 = ring2.GetPoint(o)
-                                                    if point3 in samePts:
+                                                    if ids2[o] in samePts:
                                                         break
                                                     else:
                                                         ring.AddPoint(point3[0], point3[1], point3[2])
@@ -546,7 +556,7 @@ class UtilitiesGeom:
                             break
 
                         # Spezialfall: Loch zwischen den beiden Polygonen
-                        elif len(samePts) > 3:
+                        elif sameCount > 3:
                             # Höhere Geometrie herausfinden, ggf. tauschen
                             maxHeightX, maxHeightY = -sys.maxsize, -sys.maxsize
                             for x in range(0, ring1.GetPointCount() - 1):
@@ -560,16 +570,15 @@ class UtilitiesGeom:
                             if maxHeightX < maxHeightY:
                                 geom1, geom2 = geom2, geom1
                                 ring1, ring2 = ring2, ring1
+                                ids1, ids2 = ids2, ids1
 
                             # Neue Löcher finden
                             # Liste aller Kontaktpunkte machen
                             sameKMs = []
                             for k in range(0, ring1.GetPointCount() - 1):
-                                point1 = ring1.GetPoint(k)
-                                if point1 in samePts:
+                                if ids1[k] in samePts:
                                     for m in range(0, ring2.GetPointCount() - 1):
-                                        point2 = ring2.GetPoint(m)
-                                        if point2 == point1:
+                                        if ids2[m] == ids1[k]:
                                             sameKMs.append([k, m])
 
                             # Kontaktpunkt-Differenz ohne Schnitt dazwischen
@@ -656,21 +665,24 @@ class UtilitiesGeom:
                         # Über alle Löcher gehen
                         for h in range(1, geom1.GetGeometryCount()):
                             innerRing1 = geom1.GetGeometryRef(h)
+                            innerIds1 = welder.weldRing(innerRing1)
 
-                            # Alle Eckpunkte miteinander vergleichen und Gleichheit notieren
+                            # Alle Eckpunkte über ihre Vertex-IDs miteinander vergleichen und Gleichheit notieren
                             samePts, ks = [], []
                             allKs, allMs = [False] * (innerRing1.GetPointCount() - 1), [False] * (
                                     ring2.GetPointCount() - 1)
+                            posM = {}
+                            for m in range(ring2.GetPointCount() - 2, -1, -1):
+                                posM[ids2[m]] = m
                             for k in range(0, innerRing1.GetPointCount() - 1):
-                                for m in range(0, ring2.GetPointCount() - 1):
-                                    if innerRing1.GetPoint(k) == ring2.GetPoint(m):
-                                        ks.append(k)
-                                        samePts.append(innerRing1.GetPoint(k))
-                                        allKs[k], allMs[m] = True, True
-                                        break
+                                if innerIds1[k] in posM:
+                                    ks.append(k)
+                                    samePts.append(innerIds1[k])
+                                    allKs[k], allMs[posM[innerIds1[k]]] = True, True
+                            sameCount, samePts = len(samePts), set(samePts)
 
                             # Wenn min. zwei gleiche Eckpunkte gefunden: Neue Lochgeometrie erzeugen
-                            if len(samePts) > 1:
+                            if sameCount > 1:
                                 newRings = []
 
                                 # Mehrere neue Löcher möglich: Iterieren, bis alle Punkte genutzt wurden
@@ -687,11 +699,9 @@ class UtilitiesGeom:
                                         s = mFalse - 1 if mFalse >= 1 else ring2.GetPointCount() - 1
                                         e = -1 if mFalse >= 1 else mFalse
                                         for k in range(s, e, -1):
-                                            mPoint = ring2.GetPoint(k)
-                                            if mPoint in samePts:
+                                            if ids2[k] in samePts:
                                                 for m in range(0, innerRing1.GetPointCount()):
-                                                    kPoint = innerRing1.GetPoint(m)
-                                                    if kPoint == mPoint:
+                                                    if innerIds1[m] == ids2[k]:
                                                         start = m
                                                         break
                                             if start is not None:
@@ -708,19 +718,19 @@ class UtilitiesGeom:
                                         allKs[n] = True
 
                                         # Bis gleicher Punkt zu anderer Wand gefunden
-                                        if point1 in samePts and find:
+                                        if innerIds1[n] in samePts and find:
                                             for o in range(0, ring2.GetPointCount()):
-                                                point2 = ring2.GetPoint(o)
-                                                if point2 == point1:
+                                                if ids2[o] == innerIds1[n]:
                                                     stop = False
 
                                                     # Über andere Wand gehen, bis gleicher Punkt zu Wand gefunden
-                                                    point3 = None
+                                                    id3 = None
                                                     for p in range(o + 1, ring2.GetPointCount() - 1):
                                                         point3 = ring2.GetPoint(p)
                                                         newRing.AddPoint(point3[0], point3[1], point3[2])
                                                         allMs[p] = True
-                                                        if point3 in samePts:
+                                                        id3 = ids2[p]
+                                                        if id3 in samePts:
                                                             stop = True
                                                             break
                                                     if not stop:
@@ -728,13 +738,13 @@ class UtilitiesGeom:
                                                             point3 = ring2.GetPoint(q)
                                                             newRing.AddPoint(point3[0], point3[1], point3[2])
                                                             allMs[q] = True
-                                                            if point3 in samePts:
+                                                            id3 = ids2[q]
+                                                            if id3 in samePts:
                                                                 break
 
                                                     # Loch zu Ende schließen
                                                     for r in range(0, innerRing1.GetPointCount()):
-                                                        point = innerRing1.GetPoint(r)
-                                                        if point == point3:
+                                                        if innerIds1[r] == id3:
                                                             find = False
                                                             if r < n:
                                                                 end = start
@@ -869,3 +879,25 @@ class UtilitiesGeom:
         """
         return pt1[0] - tol < pt2[0] < pt1[0] + tol and pt1[1] - tol < pt2[1] < pt1[1] + tol and pt1[2] - tol < pt2[2] \
             < pt1[2] + tol
+
+    @staticmethod
+    def setHeight(geom, height):
+        """ Setzt die Höhe aller Punkte eines OGR-Polygons auf einen einheitlichen Wert
+
+        Args:
+            geom: Das Polygon, dessen Höhe gesetzt werden soll
+            height: Die zu setzende Höhe, als float
+
+        Returns:
+            Das dreidimensionale Polygon
+        """
+        if geom is None or geom.IsEmpty() or geom.GetGeometryName() != "POLYGON":
+            return geom
+        geomHeight = ogr.Geometry(ogr.wkbPolygon)
+        for i in range(0, geom.GetGeometryCount()):
+            pts = np.asarray(geom.GetGeometryRef(i).GetPoints(), dtype=np.float64)[:, :2]
+            ring = ogr.Geometry(ogr.wkbLinearRing)
+            for pt in pts:
+                ring.AddPoint(float(pt[0]), float(pt[1]), float(height))
+            geomHeight.AddGeometry(ring)
+        return geomHeight
@@ -99,3 +99,21 @@ class UtilitiesIfc:
                     UtilitiesIfc.findElement(ifc, obj, outElement, result, type)
 
         return result
+
+    @staticmethod
+    def findHostElement(ifcOpening):
+        """ Finden des Bauteils, in dessen Öffnung ein Fenster oder eine Tür sitzt
+
+        Args:
+            ifcOpening: Das IFC-Element des Fensters bzw. der Tür
+
+        Returns:
+            Das Wirts-Bauteil (z.B. die Wand) über IfcRelFillsElement und IfcRelVoidsElement, falls vorhanden.
+            Ansonsten None
+        """
+        for relFills in getattr(ifcOpening, "FillsVoids", None) or []:
+            ifcOpeningElement = relFills.RelatingOpeningElement
+            for relVoids in getattr(ifcOpeningElement, "VoidsElements", None) or []:
+                if relVoids.RelatingBuildingElement is not None:
+                    return relVoids.RelatingBuildingElement
+        return None
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import numpy as np
+
+
+#####
+
+class UtilitiesMesh:
+    """ Model-Klasse mit Werkzeugen für tessellierte Geometrien (Dreiecksnetze) als numpy-Arrays """
+
+    @staticmethod
+    def snapToGrid(points, grid):
+        """ Rastet Koordinaten auf ein regelmäßiges Raster ein
+
+        Args:
+            points: Die Koordinaten, als Array
+            grid: Die Rasterweite, als float
+
+        Returns:
+            Die eingerasteten Koordinaten, als Array
+        """
+        return np.round(np.asarray(points, dtype=np.float64) / grid) * grid
+
+    @staticmethod
+    def footprintTriangles(tris, grid=0.001, minSlope=0.01):
+        """ Bereitet Dreiecke für die Vereinigung zu einer Grundfläche vor
+
+        Die Dreiecke werden in die XY-Ebene projiziert und auf das Raster eingerastet. Entartete Dreiecke sowie
+        Dreiecke, die seitlich ausgerichtet sind, werden verworfen. Die verbleibenden Dreiecke werden
+        einheitlich gegen den Uhrzeigersinn orientiert und für ein deterministisches Ergebnis sortiert.
+
+        Args:
+            tris: Die Dreiecke, als Array der Form (n, 3, 3)
+            grid: Die Rasterweite, als float
+                Default: 0.001
+            minSlope: Minimaler Betrag der z-Komponente des Einheits-Normalenvektors, als float
+                Default: 0.01
+
+        Returns:
+            Die projizierten Dreiecke, als Array der Form (m, 3, 2)
+        """
+        tris = np.asarray(tris, dtype=np.float64).reshape(-1, 3, 3)
+        if len(tris) == 0:
+            return np.empty((0, 3, 2))
+
+        # Seitlich ausgerichtete Dreiecke verwerfen
+        normals = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+        lengths = np.linalg.norm(normals, axis=1)
+        valid = lengths > 0
+        valid[valid] = np.abs(normals[valid, 2]) / lengths[valid] >= minSlope
+
+        # Projizieren und einrasten
+        tris2D = UtilitiesMesh.snapToGrid(tris[valid, :, :2], grid)
+
+        # Entartete Dreiecke verwerfen
+        areas = UtilitiesMesh.signedAreas2D(tris2D)
+        keep = np.abs(areas) >= (grid * grid)
+        tris2D, areas = tris2D[keep], areas[keep]
+
+        # Einheitliche Orientierung (gegen den Uhrzeigersinn)
+        cw = areas < 0
+        tris2D[cw] = tris2D[cw][:, ::-1]
+
+        # Deterministische Reihenfolge
+        if len(tris2D) > 0:
+            flat = tris2D.reshape(len(tris2D), -1)
+            tris2D = tris2D[np.lexsort(flat.T[::-1])]
+        return tris2D
+
+    @staticmethod
+    def signedAreas2D(tris2D):
+        """ Berechnet die vorzeichenbehafteten Flächeninhalte von Dreiecken in der Ebene
+
+        Args:
+            tris2D: Die Dreiecke, als Array der Form (n, 3, 2)
+
+        Returns:
+            Die Flächeninhalte (positiv: gegen den Uhrzeigersinn), als Array
+        """
+        a, b, c = tris2D[:, 0], tris2D[:, 1], tris2D[:, 2]
+        return 0.5 * ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1]))
+
+    @staticmethod
+    def trianglesToWkt(tris2D, grid=0.001):
+        """ Erzeugt aus projizierten Dreiecken ein WKT-MultiPolygon
+
+        Args:
+            tris2D: Die Dreiecke, als Array der Form (n, 3, 2)
+            grid: Die Rasterweite, aus der die Anzahl der Nachkommastellen abgeleitet wird, als float
+                Default: 0.001
+
+        Returns:
+            Das MultiPolygon, als WKT-String
+        """
+        digits = max(0, int(np.ceil(-np.log10(grid))))
+        fmt = "%." + str(digits) + "f %." + str(digits) + "f"
+        polygons = []
+        for tri in tris2D:
+            pts = [fmt % (pt[0], pt[1]) for pt in tri]
+            polygons.append("((" + ",".join(pts + [pts[0]]) + "))")
+        return "MULTIPOLYGON(" + ",".join(polygons) + ")"
+
+    @staticmethod
+    def classifyFacets(tris, angTol=0.001, distTol=0.001, vertTol=0.01):
+        """ Klassifiziert Dreiecke nach Normalenvektor, Ausrichtung und Ebene
+
+        Die Ebenen-ID wird über einen Hash aus dem quantisierten Normalenvektor und dem quantisierten Abstand der
+        Ebene zum Ursprung vergeben. Parallele Ebenen mit gegensätzlicher Normalenrichtung erhalten dieselbe ID.
+
+        Args:
+            tris: Die Dreiecke, als Array der Form (n, 3, 3)
+            angTol: Quantisierung der Komponenten des Einheits-Normalenvektors, als float
+                Default: 0.001
+            distTol: Quantisierung des Ebenenabstands, als float
+                Default: 0.001
+            vertTol: Maximaler Betrag der z-Komponente des Normalenvektors für vertikale Dreiecke, als float
+                Default: 0.01
+
+        Returns:
+            Die Einheits-Normalenvektoren (n, 3), die Ausrichtungen (1: oben, -1: unten, 0: vertikal) und die
+            Ebenen-IDs (-1 bei entarteten Dreiecken), jeweils als Array
+        """
+        tris = np.asarray(tris, dtype=np.float64).reshape(-1, 3, 3)
+        count = len(tris)
+        normals = np.zeros((count, 3))
+        orientation = np.zeros(count, dtype=np.int8)
+        planeIds = np.full(count, -1, dtype=np.int64)
+        if count == 0:
+            return normals, orientation, planeIds
+
+        # Normalenvektoren
+        cross = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+        lengths = np.linalg.norm(cross, axis=1)
+        valid = lengths > 1e-12
+        normals[valid] = cross[valid] / lengths[valid, None]
+
+        # Ausrichtung
+        orientation[normals[:, 2] >= vertTol] = 1
+        orientation[normals[:, 2] <= -vertTol] = -1
+
+        # Ebenen: Normalenvektor eindeutig ausrichten (erste von Null verschiedene Komponente positiv)
+        canon = normals[valid].copy()
+        lead = np.argmax(np.abs(canon) > angTol / 2, axis=1)
+        sign = np.sign(canon[np.arange(len(canon)), lead])
+        sign[sign == 0] = 1
+        canon *= sign[:, None]
+        offsets = np.einsum("ij,ij->i", canon, tris[valid, 0])
+
+        # Ebenen: Hash aus quantisiertem Normalenvektor und Abstand
+        keys = np.column_stack((np.round(canon / angTol), np.round(offsets / distTol))).astype(np.int64)
+        if len(keys) > 0:
+            planeIds[valid] = np.unique(keys, axis=0, return_inverse=True)[1].reshape(-1)
+        return normals, orientation, planeIds
+
+    @staticmethod
+    def nearestPoints(points, queries, chunk=4000000):
+        """ Sucht zu jedem Abfragepunkt den nächstgelegenen Punkt
+
+        Die Abfragen werden blockweise vektorisiert ausgewertet, sodass der Speicherbedarf begrenzt bleibt.
+
+        Args:
+            points: Die durchsuchten Punkte, als Array der Form (n, 3)
+            queries: Die Abfragepunkte, als Array der Form (m, 3)
+            chunk: Maximale Anzahl gleichzeitig berechneter Distanzen, als Integer
+                Default: 4000000
+
+        Returns:
+            Die Indizes der nächstgelegenen Punkte (-1, falls keine Punkte vorhanden), als Array
+            Die zugehörigen Distanzen, als Array
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        indices = np.full(len(queries), -1, dtype=np.int64)
+        dists = np.full(len(queries), np.inf)
+        if len(points) == 0 or len(queries) == 0:
+            return indices, dists
+
+        # Relativ zum Schwerpunkt rechnen, um Auslöschung bei großen Koordinaten zu vermeiden
+        center = points.mean(axis=0)
+        points, queries = points - center, queries - center
+        step = max(1, chunk // len(points))
+        for start in range(0, len(queries), step):
+            block = queries[start:start + step]
+            sq = np.sum((block[:, None, :] - points[None, :, :]) ** 2, axis=2)
+            ix = np.argmin(sq, axis=1)
+            indices[start:start + step] = ix
+            dists[start:start + step] = np.sqrt(sq[np.arange(len(block)), ix])
+        return indices, dists
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import math
+import numpy as np
+
+
+#####
+
+class VertexWelder:
+    """ Model-Klasse zum Verschweißen von Vertizes über ein Hash-Raster
+
+    Jeder Punkt wird einer Rasterzelle der Weite tol zugeordnet. Ein Punkt erhält die ID eines bereits bekannten
+    Punktes, wenn dieser in der eigenen oder einer benachbarten Zelle liegt und in keiner Koordinate um mehr als
+    tol abweicht. Andernfalls wird eine neue, fortlaufende ID vergeben. IDs sind damit stabil in der Reihenfolge
+    des ersten Auftretens.
+    """
+
+    # Versatz der 26 Nachbarzellen
+    offsets = np.array([[dx, dy, dz] for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+                        if (dx, dy, dz) != (0, 0, 0)], dtype=np.int64)
+
+    def __init__(self, tol=0.0001):
+        """ Konstruktor der Model-Klasse zum Verschweißen von Vertizes
+
+        Args:
+            tol: Toleranz, um die gleiche Punkte in jeder Koordinate verschieden sein dürfen, als float
+                Default: 0.0001
+        """
+        # Initialisierung von Attributen
+        self.tol = tol
+        self.grid = {}
+        self.points = []
+
+    def __len__(self):
+        """ Anzahl der verschweißten Vertizes
+
+        Returns:
+            Anzahl der Vertizes, als Integer
+        """
+        return len(self.points)
+
+    def weld(self, point):
+        """ Gibt die ID eines Punktes zurück und legt ihn bei Bedarf neu an
+
+        Args:
+            point: Der Punkt, als Liste oder Tupel mit drei Koordinaten
+
+        Returns:
+            Die ID des Punktes, als Integer
+        """
+        x, y, z = float(point[0]), float(point[1]), float(point[2]) if len(point) > 2 else 0.0
+        cell = (math.floor(x / self.tol), math.floor(y / self.tol), math.floor(z / self.tol))
+
+        # Benachbarte Zellen durchsuchen
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for dz in (-1, 0, 1):
+                    for ix in self.grid.get((cell[0] + dx, cell[1] + dy, cell[2] + dz), ()):
+                        pt = self.points[ix]
+                        if abs(pt[0] - x) <= self.tol and abs(pt[1] - y) <= self.tol and abs(pt[2] - z) <= self.tol:
+                            return ix
+
+        # Neuer Punkt
+        ix = len(self.points)
+        self.points.append((x, y, z))
+        self.grid.setdefault(cell, []).append(ix)
+        return ix
+
+    def weldPoints(self, points):
+        """ Verschweißt mehrere Punkte vektorisiert
+
+        Die Punkte werden auf das Raster quantisiert und über np.unique je Zelle zusammengefasst (Punkte einer Zelle
+        weichen um weniger als tol ab und erhalten dieselbe ID). Nur Zellen mit belegter Nachbarzelle oder bereits
+        verschweißten Punkten werden einzeln über weld aufgelöst.
+
+        Args:
+            points: Die Punkte, als Liste oder Array der Form (n, 3)
+
+        Returns:
+            Die IDs der Punkte, als Array
+        """
+        pts = np.asarray(points, dtype=np.float64)
+        if len(pts) == 0:
+            return np.zeros(0, dtype=np.int64)
+        pts = pts.reshape(len(pts), -1)
+        if pts.shape[1] == 2:
+            pts = np.hstack((pts, np.zeros((len(pts), 1))))
+
+        # Quantisieren und je Zelle zusammenfassen
+        cells = np.floor(pts / self.tol).astype(np.int64)
+        _, first, inverse = np.unique(self.cellKeys(cells), return_index=True, return_inverse=True)
+        uniq = cells[first]
+
+        # Zellen mit belegter Nachbarzelle bzw. bereits verschweißten Punkten heraussuchen
+        single = self.neighboured(uniq, np.array(list(self.grid.keys()), dtype=np.int64).reshape(-1, 3))
+
+        # IDs in der Reihenfolge des ersten Auftretens vergeben, Abschnitte ohne Einzelauflösung am Stück
+        order = np.argsort(first, kind="stable")
+        single, firstPts = single[order], pts[first[order]]
+        bounds = [0] + (np.flatnonzero(np.diff(single.astype(np.int8))) + 1).tolist() + [len(order)]
+        cellIds = np.empty(len(uniq), dtype=np.int64)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if single[start]:
+                cellIds[order[start:end]] = [self.weld(pt) for pt in firstPts[start:end].tolist()]
+                continue
+            ids = np.arange(len(self.points), len(self.points) + end - start, dtype=np.int64)
+            cellIds[order[start:end]] = ids
+            self.points.extend(map(tuple, firstPts[start:end].tolist()))
+            self.grid.update(zip(map(tuple, uniq[order[start:end]].tolist()), ([ix] for ix in ids.tolist())))
+        return cellIds[inverse.reshape(-1)]
+
+    def neighboured(self, cells, gridCells):
+        """ Prüft, welche Rasterzellen eine belegte Nachbarzelle haben oder bereits verschweißte Punkte enthalten
+
+        Die Zellen werden über einen Hash verglichen. Kollisionen führen nur zu unnötigen Einzelauflösungen.
+
+        Args:
+            cells: Die neu belegten Zellen (ohne Duplikate), als Integer-Array der Form (n, 3)
+            gridCells: Die Zellen der bereits verschweißten Punkte, als Integer-Array der Form (m, 3)
+
+        Returns:
+            Ob die Zellen einzeln aufgelöst werden müssen, als Boolean-Array
+        """
+        hashes = np.concatenate((self.cellHashes(cells), self.cellHashes(gridCells)))
+        occOrder = np.argsort(hashes, kind="stable")
+        occupied = hashes[occOrder]
+        single = np.zeros(len(cells), dtype=bool)
+        if len(gridCells) > 0:
+            single |= np.isin(hashes[:len(cells)], hashes[len(cells):])
+
+        # Zellen mit gleichem Hash immer einzeln auflösen, da die Suche nur eine von ihnen findet
+        same = np.flatnonzero(occupied[1:] == occupied[:-1])
+        other = occOrder[np.concatenate((same, same + 1))]
+        single[other[other < len(cells)]] = True
+
+        # Nachbarschaft ist symmetrisch: ohne bestehende Punkte genügt die Hälfte der Nachbarzellen
+        for offset in self.offsets if len(gridCells) > 0 else self.offsets[:13]:
+            keys = self.cellHashes(cells + offset)
+            pos = np.minimum(np.searchsorted(occupied, keys), len(occupied) - 1)
+            found = occupied[pos] == keys
+            single |= found
+            other = occOrder[pos[found]]
+            single[other[other < len(cells)]] = True
+        return single
+
+    @staticmethod
+    def cellKeys(cells):
+        """ Fasst die Indizes von Rasterzellen zu eindeutigen, sortierbaren Schlüsseln zusammen
+
+        Args:
+            cells: Die Zellen, als Integer-Array der Form (n, 3)
+
+        Returns:
+            Die Schlüssel, als Array der Länge n
+        """
+        cells = np.ascontiguousarray(cells, dtype=np.int64).reshape(-1, 3)
+        return cells.view(np.dtype((np.void, cells.dtype.itemsize * 3))).ravel()
+
+    @staticmethod
+    def cellHashes(cells):
+        """ Berechnet einen Hash der Indizes von Rasterzellen
+
+        Args:
+            cells: Die Zellen, als Integer-Array der Form (n, 3)
+
+        Returns:
+            Die Hashes, als uint64-Array der Länge n
+        """
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 3).astype(np.uint64)
+        return (cells[:, 0] * np.uint64(73856093)) ^ (cells[:, 1] * np.uint64(19349663)) ^ \
+            (cells[:, 2] * np.uint64(83492791))
+
+    def weldRing(self, ring):
+        """ Schreibt einen OGR-Ring als Liste von Vertex-IDs um
+
+        Args:
+            ring: Der Ring, als OGR-Geometrie
+
+        Returns:
+            Die IDs der Punkte des Rings (inkl. Schlusspunkt), als Liste
+        """
+        return [self.weld(ring.GetPoint(k)) for k in range(0, ring.GetPointCount())]
+
+    def getPoints(self):
+        """ Gibt die Koordinaten aller verschweißten Vertizes zurück
+
+        Returns:
+            Die Koordinaten in der Reihenfolge der IDs, als Array der Form (n, 3)
+        """
+        return np.array(self.points, dtype=np.float64).reshape(-1, 3)
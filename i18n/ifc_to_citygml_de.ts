@@ -12,6 +12,31 @@
         <source>Model is integrated into QGIS</source>
         <translation>Modell wird in QGIS integriert</translation>
     </message>
+    <message>
+        <location filename="../algorithm/convert_starter.py" line="128"/>
+        <source>Estimated conversion time</source>
+        <translation>Geschätzte Konvertierungsdauer</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/convert_starter.py" line="160"/>
+        <source>CityJSONSeq file is completed</source>
+        <translation>CityJSONSeq-Datei wird abgeschlossen</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/convert_starter.py" line="162"/>
+        <source>GeoPackage file is generated</source>
+        <translation>GeoPackage-Datei wird erstellt</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/convert_starter.py" line="164"/>
+        <source>CityJSON file is generated</source>
+        <translation>CityJSON-Datei wird erstellt</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/convert_starter.py" line="183"/>
+        <source>CityJSONSeq files cannot be integrated into QGIS</source>
+        <translation>CityJSONSeq-Dateien können nicht in QGIS integriert werden</translation>
+    </message>
 </context>
 <context>
     <name>Converter</name>
@@ -98,6 +123,56 @@
         <source>Close</source>
         <translation>Schließen</translation>
     </message>
+    <message>
+        <location filename="../view/dialog.ui" line="395"/>
+        <source>EnergyADE geometries reference the building geometry via XLink instead of copying it</source>
+        <translation>Geometrien der EnergyADE verweisen per XLink auf die Gebäudegeometrie, statt sie zu kopieren</translation>
+    </message>
+    <message>
+        <location filename="../view/dialog.ui" line="398"/>
+        <source>EnergyADE via XLinks</source>
+        <translation>EnergyADE über XLinks</translation>
+    </message>
+    <message>
+        <location filename="../view/dialog.ui" line="414"/>
+        <source>Indent the CityGML file for readability (larger file, slower writing)</source>
+        <translation>CityGML-Datei zur besseren Lesbarkeit einrücken (größere Datei, langsameres Schreiben)</translation>
+    </message>
+    <message>
+        <location filename="../view/dialog.ui" line="417"/>
+        <source>Indented CityGML</source>
+        <translation>CityGML eingerückt</translation>
+    </message>
+    <message>
+        <location filename="../view/dialog.ui" line="433"/>
+        <source>Only estimate the conversion time and memory per building, without converting</source>
+        <translation>Nur Konvertierungsdauer und Speicherbedarf je Gebäude abschätzen, ohne zu konvertieren</translation>
+    </message>
+    <message>
+        <location filename="../view/dialog.ui" line="436"/>
+        <source>Dry run</source>
+        <translation>Probelauf</translation>
+    </message>
+    <message>
+        <location filename="../view/dialog.ui" line="452"/>
+        <source>Compression level of compressed output files (.gz, .zip) from 1 (fast) to 9 (small)</source>
+        <translation>Komprimierungsstufe komprimierter Ausgabedateien (.gz, .zip) von 1 (schnell) bis 9 (klein)</translation>
+    </message>
+    <message>
+        <location filename="../view/dialog.ui" line="455"/>
+        <source>Compression level</source>
+        <translation>Komprimierungsstufe</translation>
+    </message>
+    <message>
+        <location filename="../view/dialog.ui" line="452"/>
+        <source>LoD3 exterior from the space boundaries: lies on the room side of the external elements (inner shell)</source>
+        <translation>LoD3-Außenhülle aus den Raumbegrenzungen: liegt auf der Raumseite der Außenbauteile (innere Hülle)</translation>
+    </message>
+    <message>
+        <location filename="../view/dialog.ui" line="455"/>
+        <source>Space boundaries (LoD3)</source>
+        <translation>Raumbegrenzungen (LoD3)</translation>
+    </message>
 </context>
 <context>
     <name>DialogVM</name>
@@ -260,6 +335,31 @@
         <source>Due to the missing roof, no RoofEdge geometry can be calculated</source>
         <translation>Wegen fehlenden Dachs kann keine Dachkantengeometrie berechnet werden</translation>
     </message>
+    <message>
+        <location filename="../algorithm/converter_lod0.py" line="216"/>
+        <source>The RoofEdge geometry could not be calculated</source>
+        <translation>Die RoofEdge-Geometrie konnte nicht berechnet werden</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="570"/>
+        <source>The building is converted in a lower LoD: </source>
+        <translation>Das Gebäude wird in einem niedrigeren LoD konvertiert: </translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="600"/>
+        <source>Time budget of the building exceeded, the calculation is discarded</source>
+        <translation>Zeitbudget des Gebäudes überschritten, die Berechnung wird verworfen</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="649"/>
+        <source>Estimated remaining time</source>
+        <translation>Geschätzte Restdauer</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="666"/>
+        <source>Building is written</source>
+        <translation>Gebäude wird geschrieben</translation>
+    </message>
 </context>
 <context>
     <name>LoD1Converter</name>
@@ -328,6 +428,31 @@
         <source>Building solid is calculated</source>
         <translation>Gebäudekörper wird berechnet</translation>
     </message>
+    <message>
+        <location filename="../algorithm/converter_lod1.py" line="220"/>
+        <source>The base surface could not be calculated</source>
+        <translation>Die Grundfläche konnte nicht berechnet werden</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="570"/>
+        <source>The building is converted in a lower LoD: </source>
+        <translation>Das Gebäude wird in einem niedrigeren LoD konvertiert: </translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="600"/>
+        <source>Time budget of the building exceeded, the calculation is discarded</source>
+        <translation>Zeitbudget des Gebäudes überschritten, die Berechnung wird verworfen</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="649"/>
+        <source>Estimated remaining time</source>
+        <translation>Geschätzte Restdauer</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="666"/>
+        <source>Building is written</source>
+        <translation>Gebäude wird geschrieben</translation>
+    </message>
 </context>
 <context>
     <name>LoD2Converter</name>
@@ -441,6 +566,26 @@
         <source>Building solid is calculated</source>
         <translation>Gebäudekörper wird berechnet</translation>
     </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="570"/>
+        <source>The building is converted in a lower LoD: </source>
+        <translation>Das Gebäude wird in einem niedrigeren LoD konvertiert: </translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="600"/>
+        <source>Time budget of the building exceeded, the calculation is discarded</source>
+        <translation>Zeitbudget des Gebäudes überschritten, die Berechnung wird verworfen</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="649"/>
+        <source>Estimated remaining time</source>
+        <translation>Geschätzte Restdauer</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="666"/>
+        <source>Building is written</source>
+        <translation>Gebäude wird geschrieben</translation>
+    </message>
 </context>
 <context>
     <name>LoD3Converter</name>
@@ -559,6 +704,41 @@
         <source>Building solid is calculated</source>
         <translation>Gebäudekörper wird berechnet</translation>
     </message>
+    <message>
+        <location filename="../algorithm/converter_lod3.py" line="247"/>
+        <source>Building geometry: surfaces are taken from the space boundaries</source>
+        <translation>Gebäudegeometrie: Oberflächen werden aus den Raumbegrenzungen übernommen</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter_lod3.py" line="248"/>
+        <source>The space boundaries describe the inner side of the external elements</source>
+        <translation>Die Raumbegrenzungen beschreiben die Innenseite der Außenbauteile</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="570"/>
+        <source>The building is converted in a lower LoD: </source>
+        <translation>Das Gebäude wird in einem niedrigeren LoD konvertiert: </translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="600"/>
+        <source>Time budget of the building exceeded, the calculation is discarded</source>
+        <translation>Zeitbudget des Gebäudes überschritten, die Berechnung wird verworfen</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="649"/>
+        <source>Estimated remaining time</source>
+        <translation>Geschätzte Restdauer</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="666"/>
+        <source>Building is written</source>
+        <translation>Gebäude wird geschrieben</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter_lod3.py" line="241"/>
+        <source>The space boundaries do not describe the building completely, the element geometries are used</source>
+        <translation>Die Raumbegrenzungen beschreiben das Gebäude nicht vollständig, die Bauteil-Geometrien werden verwendet</translation>
+    </message>
 </context>
 <context>
     <name>LoD4Converter</name>
@@ -687,6 +867,26 @@
         <source>Building bounds are calculated</source>
         <translation>Gebäudebestandteile werden berechnet</translation>
     </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="570"/>
+        <source>The building is converted in a lower LoD: </source>
+        <translation>Das Gebäude wird in einem niedrigeren LoD konvertiert: </translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="600"/>
+        <source>Time budget of the building exceeded, the calculation is discarded</source>
+        <translation>Zeitbudget des Gebäudes überschritten, die Berechnung wird verworfen</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="649"/>
+        <source>Estimated remaining time</source>
+        <translation>Geschätzte Restdauer</translation>
+    </message>
+    <message>
+        <location filename="../algorithm/converter.py" line="666"/>
+        <source>Building is written</source>
+        <translation>Gebäude wird geschrieben</translation>
+    </message>
 </context>
 <context>
     <name>Model</name>
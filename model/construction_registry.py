@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import sys
+import uuid
+
+# Plugin
+try:
+    from .construction import Construction
+    from .material import Material
+except ImportError:
+    sys.path.insert(0, '..')
+    from model.construction import Construction
+    from model.material import Material
+
+
+#####
+
+class ConstructionRegistry:
+    """ Objekt-Klasse zum gebäudeübergreifenden Halten der Konstruktionen und Materialien in der Energy ADE
+
+    Konstruktionen und Materialien werden über ihren Inhalt (Schichten, Dicken, Namen und Eigenschaften bzw. optische
+    Eigenschaften) identifiziert. Gleiche Konstruktionen verschiedener Gebäude erhalten so dieselbe GML-ID und werden
+    nur einmal geschrieben.
+    """
+
+    def __init__(self):
+        """ Konstruktor der Objekt-Klasse zum gebäudeübergreifenden Halten der Konstruktionen und Materialien """
+        self.constructions = {}
+        self.materials = {}
+        self.written = set()
+
+    @staticmethod
+    def materialKey(ifcMat):
+        """ Bildet den inhaltlichen Schlüssel eines Materials
+
+        Args:
+            ifcMat: IFC-Element des Materials
+
+        Returns:
+            Der Schlüssel aus Name, Beschreibung und Eigenschaften, als Tupel
+        """
+        props = []
+        for matProp in getattr(ifcMat, "HasProperties", None) or []:
+            for prop in getattr(matProp, "Properties", None) or []:
+                value = getattr(prop, "NominalValue", None)
+                props.append((matProp.Name, prop.Name, None if value is None else value.wrappedValue))
+        return ifcMat.Name, getattr(ifcMat, "Description", None), tuple(sorted(props, key=str))
+
+    @staticmethod
+    def layerKey(ifcMLS):
+        """ Bildet den inhaltlichen Schlüssel eines Schichtmaterials
+
+        Args:
+            ifcMLS: IFC-Element des MaterialLayerSets
+
+        Returns:
+            Der Schlüssel aus Name, Beschreibung und Schichten (Material und Dicke), als Tupel
+        """
+        layers = tuple((None if layer.Material is None else ConstructionRegistry.materialKey(layer.Material),
+                        layer.LayerThickness) for layer in ifcMLS.MaterialLayers or [])
+        return ifcMLS.LayerSetName, getattr(ifcMLS, "Description", None), layers
+
+    def addConstruction(self, key, ifcMLS, optProp, ifcElem, type):
+        """ Fügt ein IFC-Element einer Konstruktion hinzu und legt diese bei Bedarf an
+
+        Args:
+            key: Der inhaltliche Schlüssel der Konstruktion
+            ifcMLS: IFC-Element des MaterialLayerSets
+            optProp: Optische Eigenschaften, als Liste
+            ifcElem: Das IFC-Element, das die Konstruktion nutzt
+            type: Typ der Konstruktion (Layer oder optical)
+
+        Returns:
+            Die GML-ID der Konstruktion
+        """
+        if key not in self.constructions:
+            self.constructions[key] = Construction("GML_" + str(uuid.uuid4()), ifcMLS, optProp, [], type)
+        constr = self.constructions[key]
+        constr.ifcElems.append(ifcElem)
+        return constr.gmlId
+
+    def addLayer(self, ifcMLS, ifcElem):
+        """ Fügt ein IFC-Element der Konstruktion seines Schichtmaterials hinzu
+
+        Args:
+            ifcMLS: IFC-Element des MaterialLayerSets
+            ifcElem: Das IFC-Element
+
+        Returns:
+            Die GML-ID der Konstruktion
+        """
+        return self.addConstruction(("layer", self.layerKey(ifcMLS)), ifcMLS, None, ifcElem, "layer")
+
+    def addOptical(self, optProp, ifcElem):
+        """ Fügt ein IFC-Element der Konstruktion seiner optischen Eigenschaften hinzu
+
+        Args:
+            optProp: Optische Eigenschaften, als Liste
+            ifcElem: Das IFC-Element
+
+        Returns:
+            Die GML-ID der Konstruktion
+        """
+        return self.addConstruction(("optical", tuple(optProp)), None, list(optProp), ifcElem, "optical")
+
+    def addMaterial(self, ifcMat):
+        """ Sucht ein Material und legt es bei Bedarf an
+
+        Args:
+            ifcMat: IFC-Element des Materials
+
+        Returns:
+            Die GML-ID des Materials
+        """
+        key = self.materialKey(ifcMat)
+        if key not in self.materials:
+            self.materials[key] = Material("GML_" + str(uuid.uuid4()), ifcMat)
+        return self.materials[key].gmlId
+
+    def takeConstructions(self):
+        """ Gibt die noch nicht geschriebenen Konstruktionen zurück und markiert sie als geschrieben
+
+        Returns:
+            Die zu erstellenden Konstruktionen, als Liste
+        """
+        return self.take(self.constructions)
+
+    def takeMaterials(self):
+        """ Gibt die noch nicht geschriebenen Materialien zurück und markiert sie als geschrieben
+
+        Returns:
+            Die zu erstellenden Materialien, als Liste
+        """
+        return self.take(self.materials)
+
+    def take(self, objects):
+        """ Gibt die noch nicht geschriebenen Objekte zurück und markiert sie als geschrieben
+
+        Args:
+            objects: Die Konstruktionen oder Materialien, als Dictionary
+
+        Returns:
+            Die zu erstellenden Objekte, als Liste
+        """
+        result = [obj for obj in objects.values() if obj.gmlId not in self.written]
+        self.written.update(obj.gmlId for obj in result)
+        return result
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+class Envelope:
+    """ Objekt-Klasse einer laufend erweiterten 3D-Bounding Box
+
+    Statt alle konvertierten Geometrien zu sammeln, werden nur Minimum und Maximum je Achse gehalten, sodass der
+    Speicherbedarf nicht mit der Größe des Dokuments wächst.
+    """
+
+    __slots__ = ("bounds",)
+
+    def __init__(self, geometries=None):
+        """ Konstruktor der Objekt-Klasse einer laufend erweiterten 3D-Bounding Box
+
+        Args:
+            geometries: Geometrien, die die Bounding Box zu Beginn umfassen soll, als Liste von OGR-Geometrien
+                Default: None (leere Bounding Box)
+        """
+        self.bounds = None
+        for geometry in geometries or []:
+            self.add(geometry)
+
+    def add(self, geometry):
+        """ Erweitert die Bounding Box um eine Geometrie
+
+        Args:
+            geometry: Die Geometrie, als OGR-Geometrie
+        """
+        if geometry is not None and not geometry.IsEmpty():
+            self.addBounds(geometry.GetEnvelope3D())
+
+    def addBounds(self, bounds):
+        """ Erweitert die Bounding Box um eine andere Bounding Box
+
+        Args:
+            bounds: Die Bounding Box, als Tupel (minX, maxX, minY, maxY, minZ, maxZ) wie bei OGR
+        """
+        if self.bounds is None:
+            self.bounds = tuple(bounds)
+        else:
+            self.bounds = tuple(min(self.bounds[i], bounds[i]) if i % 2 == 0 else max(self.bounds[i], bounds[i])
+                                for i in range(0, 6))
+
+    def isEmpty(self):
+        """ Prüft, ob die Bounding Box noch keine Geometrie umfasst
+
+        Returns:
+            Ob die Bounding Box leer ist, als Boolean
+        """
+        return self.bounds is None
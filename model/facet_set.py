@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import numpy as np
+
+
+#####
+
+class FacetSet:
+    """ Objekt-Klasse zum Halten der klassifizierten Dreiecke (Facetten) eines IFC-Elements """
+
+    # Ausrichtungen
+    UP = 1
+    DOWN = -1
+    VERTICAL = 0
+
+    __slots__ = ("ifcElem", "tris", "normals", "orientation", "planeIds")
+
+    def __init__(self, ifcElem, tris, normals, orientation, planeIds):
+        """ Konstruktor der Objekt-Klasse zum Halten der klassifizierten Dreiecke eines IFC-Elements
+
+        Args:
+            ifcElem: Das IFC-Element der Dreiecke
+            tris: Die georeferenzierten Dreiecke, als Array der Form (n, 3, 3)
+            normals: Die Einheits-Normalenvektoren, als Array der Form (n, 3)
+            orientation: Die Ausrichtungen (1: oben, -1: unten, 0: vertikal), als Array
+            planeIds: Die Ebenen-IDs (-1 bei entarteten Dreiecken), als Array
+        """
+        self.ifcElem = ifcElem
+        self.tris = tris
+        self.normals = normals
+        self.orientation = orientation
+        self.planeIds = planeIds
+
+    def __len__(self):
+        """ Anzahl der Dreiecke
+
+        Returns:
+            Anzahl der Dreiecke, als Integer
+        """
+        return len(self.tris)
+
+    def select(self, orientation):
+        """ Gibt die Indizes der Dreiecke mit gegebener Ausrichtung zurück
+
+        Args:
+            orientation: Ausrichtung oder Liste von Ausrichtungen
+
+        Returns:
+            Die Indizes der Dreiecke, als Array
+        """
+        orientations = orientation if isinstance(orientation, (list, tuple)) else [orientation]
+        return np.nonzero(np.isin(self.orientation, orientations) & (self.planeIds >= 0))[0]
+
+    def groups(self, orientation=None):
+        """ Gruppiert die Dreiecke nach ihren Ebenen
+
+        Args:
+            orientation: Nur Dreiecke dieser Ausrichtung(en) berücksichtigen
+                Default: None (alle nicht entarteten Dreiecke)
+
+        Returns:
+            Die Indizes der Dreiecke je Ebenen-ID, als Dictionary
+        """
+        if orientation is None:
+            indices = np.nonzero(self.planeIds >= 0)[0]
+        else:
+            indices = self.select(orientation)
+        groups = {}
+        for planeId in np.unique(self.planeIds[indices]):
+            groups[int(planeId)] = indices[self.planeIds[indices] == planeId]
+        return groups
+
+    def mesh(self, indices=None):
+        """ Gibt die Dreiecke als indiziertes Netz zurück, identische Vertizes werden zusammengefasst
+
+        Args:
+            indices: Nur die Dreiecke mit diesen Indizes berücksichtigen, als Array
+                Default: None (alle Dreiecke)
+
+        Returns:
+            Die Vertizes in der Reihenfolge ihres ersten Auftretens, als Array der Form (n, 3)
+            Die Dreiecke als Vertex-Indizes, als Array der Form (m, 3)
+        """
+        tris = self.tris if indices is None else self.tris[indices]
+        if len(tris) == 0:
+            return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64)
+        points, first, inverse = np.unique(tris.reshape(-1, 3), axis=0, return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        return points[order], rank[inverse.reshape(-1)].reshape(-1, 3)
+
+    def minHeight(self):
+        """ Niedrigste Höhe der Dreiecke
+
+        Returns:
+            Die niedrigste Höhe, als float (None, wenn keine Dreiecke vorhanden sind)
+        """
+        return float(self.tris[:, :, 2].min()) if len(self.tris) > 0 else None
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import uuid
+
+
+#####
+
+class SiteRegistry:
+    """ Objekt-Klasse zum Halten der gebäudeübergreifend geteilten Objekte der Energy ADE (Wetterdaten und Zeitpläne)
+
+    Die Objekte werden über einen Schlüssel (z.B. das IFC-Grundstück oder den Inhalt des Zeitplans) identifiziert.
+    Sie werden einmalig geschrieben, jedes weitere Gebäude verweist per XLink auf ihre GML-ID.
+    """
+
+    def __init__(self):
+        """ Konstruktor der Objekt-Klasse zum Halten der gebäudeübergreifend geteilten Objekte """
+        self.gmlIds = {}
+
+    def find(self, key):
+        """ Sucht die GML-ID eines bereits geschriebenen Objekts
+
+        Args:
+            key: Der Schlüssel des Objekts, als Tupel
+
+        Returns:
+            Die GML-ID des Objekts. None, falls es noch nicht geschrieben wurde
+        """
+        return self.gmlIds.get(key)
+
+    def add(self, key):
+        """ Legt die GML-ID eines neu zu schreibenden Objekts an
+
+        Args:
+            key: Der Schlüssel des Objekts, als Tupel
+
+        Returns:
+            Die GML-ID des Objekts
+        """
+        self.gmlIds[key] = "GML_" + str(uuid.uuid4())
+        return self.gmlIds[key]
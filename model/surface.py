@@ -29,3 +29,4 @@ class Surface:
         self.type = type
         self.openings = []
         self.gmlId = None
+        self.geomId = None
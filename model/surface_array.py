@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+ ***************************************************************************/
+"""
+
+#####
+
+# Standard-Bibliotheken
+import numpy as np
+
+
+#####
+
+class SurfaceArray:
+    """ Objekt-Klasse zum kompakten Halten von Oberflächen-Geometrien in zusammenhängenden Arrays
+
+    Alle Koordinaten liegen in einem float64-Array der Form (n, 3). Die Ringe und Polygone werden über
+    Offset-Arrays adressiert: ringOffsets[i]:ringOffsets[i+1] sind die Punkte von Ring i,
+    polyOffsets[j]:polyOffsets[j+1] sind die Ringe von Polygon j (erster Ring: Außenring).
+    OGR-Geometrien werden erst bei Bedarf erzeugt und nicht gehalten, sodass eine Oberfläche nach dem Schreiben ihrer
+    Geometrie nur noch die Arrays belegt.
+    """
+
+    __slots__ = ("coords", "ringOffsets", "polyOffsets", "name", "ifcElem", "type", "openings", "gmlId", "geomId",
+                 "_ogr")
+
+    def __init__(self, coords, ringOffsets, polyOffsets, name=None, ifcElem=None, type=None):
+        """ Konstruktor der Objekt-Klasse zum kompakten Halten von Oberflächen-Geometrien
+
+        Args:
+            coords: Die Koordinaten aller Ringe, als Array der Form (n, 3)
+            ringOffsets: Start-Indizes der Ringe in coords inkl. Endindex, als Array
+            polyOffsets: Start-Indizes der Polygone in ringOffsets inkl. Endindex, als Array
+            name: Der Name der Oberfläche, als string
+                Default: None
+            ifcElem: Das IFC-Element der Oberfläche
+                Default: None
+            type: Typ der Oberfläche
+                Default: None
+        """
+        self.coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 3)
+        self.ringOffsets = np.asarray(ringOffsets, dtype=np.int64)
+        self.polyOffsets = np.asarray(polyOffsets, dtype=np.int64)
+        self.name = name
+        self.ifcElem = ifcElem
+        self.type = type
+        self.openings = []
+        self.gmlId = None
+        self.geomId = None
+        self._ogr = None
+
+    @classmethod
+    def fromPolygons(cls, polygons, name=None, ifcElem=None, type=None):
+        """ Erstellt ein SurfaceArray aus Punktlisten
+
+        Args:
+            polygons: Die Polygone, als Liste von Polygonen, die jeweils eine Liste von Ringen aus Punkten sind
+            name: Der Name der Oberfläche, als string
+                Default: None
+            ifcElem: Das IFC-Element der Oberfläche
+                Default: None
+            type: Typ der Oberfläche
+                Default: None
+
+        Returns:
+            Das erzeugte SurfaceArray
+        """
+        coords, ringOffsets, polyOffsets = [], [0], [0]
+        for polygon in polygons:
+            for ring in polygon:
+                coords.extend([pt[0], pt[1], pt[2] if len(pt) > 2 else 0] for pt in ring)
+                ringOffsets.append(len(coords))
+            polyOffsets.append(len(ringOffsets) - 1)
+        return cls(np.array(coords, dtype=np.float64).reshape(-1, 3), ringOffsets, polyOffsets, name, ifcElem, type)
+
+    @classmethod
+    def fromOgr(cls, geoms, name=None, ifcElem=None, type=None):
+        """ Erstellt ein SurfaceArray aus OGR-Polygonen
+
+        Args:
+            geoms: Die Polygone, als Liste von OGR-Geometrien
+            name: Der Name der Oberfläche, als string
+                Default: None
+            ifcElem: Das IFC-Element der Oberfläche
+                Default: None
+            type: Typ der Oberfläche
+                Default: None
+
+        Returns:
+            Das erzeugte SurfaceArray
+        """
+        polygons = []
+        for geom in geoms:
+            polygons.append([geom.GetGeometryRef(i).GetPoints() or [] for i in range(0, geom.GetGeometryCount())])
+        surface = cls.fromPolygons(polygons, name, ifcElem, type)
+        surface._ogr = list(geoms)
+        return surface
+
+    @classmethod
+    def fromSurface(cls, surface, memo=None):
+        """ Überführt eine Oberfläche samt Öffnungen in die kompakte Form, ohne deren OGR-Geometrien zu behalten
+
+        Args:
+            surface: Die Oberfläche (Surface oder SurfaceArray), mit einer einzelnen Geometrie oder einer Liste
+            memo: Bereits überführte Oberflächen nach Objekt-ID, als Dictionary, damit von mehreren Stellen
+                referenzierte Öffnungen nur einmal überführt werden
+                Default: None
+
+        Returns:
+            Die Oberfläche, als SurfaceArray
+        """
+        memo = {} if memo is None else memo
+        if id(surface) in memo:
+            return memo[id(surface)]
+
+        # Bereits kompakte Oberfläche: nur zwischengespeicherte OGR-Geometrien freigeben
+        if isinstance(surface, cls):
+            surface._ogr = None
+            result = surface
+        else:
+            geoms = surface.geom if isinstance(surface.geom, list) else [surface.geom]
+            polygons = []
+            for geom in geoms:
+                if geom is None:
+                    continue
+                parts = [geom.GetGeometryRef(i) for i in range(0, geom.GetGeometryCount())] \
+                    if geom.GetGeometryName() == "MULTIPOLYGON" else [geom]
+                for part in parts:
+                    polygons.append([part.GetGeometryRef(i).GetPoints() or []
+                                     for i in range(0, part.GetGeometryCount())])
+            result = cls.fromPolygons(polygons, surface.name, surface.ifcElem, surface.type)
+            result.gmlId, result.geomId = surface.gmlId, surface.geomId
+        memo[id(surface)] = result
+        result.openings = [cls.fromSurface(opening, memo) for opening in surface.openings]
+        return result
+
+    @classmethod
+    def compact(cls, surfaces):
+        """ Überführt die Oberflächen eines Gebäudes nach dem Schreiben ihrer Geometrie in die kompakte Form
+
+        Args:
+            surfaces: Die Oberflächen (Surface oder SurfaceArray), als Liste
+
+        Returns:
+            Die Oberflächen, als Liste von SurfaceArrays
+        """
+        memo = {}
+        return [cls.fromSurface(surface, memo) for surface in surfaces]
+
+    @property
+    def polygonCount(self):
+        """ Anzahl der Polygone
+
+        Returns:
+            Anzahl der Polygone, als Integer
+        """
+        return len(self.polyOffsets) - 1
+
+    @property
+    def nbytes(self):
+        """ Speicherbedarf der Geometrie-Arrays
+
+        Returns:
+            Speicherbedarf in Byte, als Integer
+        """
+        return self.coords.nbytes + self.ringOffsets.nbytes + self.polyOffsets.nbytes
+
+    def ring(self, poly, ring=0):
+        """ Gibt die Punkte eines Rings als Sicht auf das Koordinaten-Array zurück
+
+        Args:
+            poly: Index des Polygons
+            ring: Index des Rings innerhalb des Polygons
+                Default: 0 (Außenring)
+
+        Returns:
+            Die Punkte des Rings, als Array der Form (n, 3)
+        """
+        ix = self.polyOffsets[poly] + ring
+        return self.coords[self.ringOffsets[ix]:self.ringOffsets[ix + 1]]
+
+    def polygon(self, poly):
+        """ Gibt die Ringe eines Polygons zurück
+
+        Args:
+            poly: Index des Polygons
+
+        Returns:
+            Die Ringe des Polygons, als Liste von Arrays
+        """
+        return [self.ring(poly, i) for i in range(0, self.polyOffsets[poly + 1] - self.polyOffsets[poly])]
+
+    def toOgr(self):
+        """ Wandelt die Geometrie in OGR-Polygone um
+
+        Wurde die Oberfläche aus OGR-Geometrien erstellt, werden diese zurückgegeben, ansonsten werden die Polygone bei
+        jedem Aufruf neu erzeugt.
+
+        Returns:
+            Die Polygone, als Liste von OGR-Geometrien
+        """
+        if self._ogr is not None:
+            return self._ogr
+
+        # Geo-Bibliotheken: nur laden, wenn tatsächlich eine OGR-Geometrie benötigt wird
+        from osgeo import ogr
+
+        geoms = []
+        for j in range(0, self.polygonCount):
+            geom = ogr.Geometry(ogr.wkbPolygon)
+            for ringPts in self.polygon(j):
+                ring = ogr.Geometry(ogr.wkbLinearRing)
+                for pt in ringPts:
+                    ring.AddPoint(float(pt[0]), float(pt[1]), float(pt[2]))
+                geom.AddGeometry(ring)
+            geoms.append(geom)
+        return geoms
+
+    @property
+    def geom(self):
+        """ Die Geometrien der Oberfläche als OGR-Polygone, kompatibel zur Klasse Surface
+
+        Returns:
+            Die Polygone, als Liste von OGR-Geometrien
+        """
+        return self.toOgr()
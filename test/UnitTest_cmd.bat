@@ -34,11 +34,32 @@ python test_init.py
 python model/test_surface.py
 python model/test_construction.py
 python model/test_material.py
+python model/test_surface_array.py
+python model/test_facet_set.py
+python model/test_construction_registry.py
+python model/test_site_registry.py
 
 python algorithm/test_transformer.py
 python algorithm/test_ifc_analyzer.py
 python algorithm/test_utilitiesIFC.py
 python algorithm/test_utilitiesGeom.py
+python algorithm/test_utilitiesMesh.py
+python algorithm/test_half_edge_mesh.py
+python algorithm/test_vertex_welder.py
+python algorithm/test_exterior_map.py
+python algorithm/test_space_boundary_shell.py
+python algorithm/test_height_estimator.py
+python algorithm/test_tessellation_profile.py
+python algorithm/test_opening_extractor.py
+python algorithm/test_time_budget.py
+python algorithm/test_cost_model.py
+python algorithm/test_template_library.py
+python algorithm/test_room_boundary.py
+python algorithm/test_cityjson_writer.py
+python algorithm/test_cityjson_seq_writer.py
+python algorithm/test_gpkg_writer.py
+python algorithm/test_cgml_writer.py
+python algorithm/test_compressed_io.py
 
 python algorithm/test_convert_starter.py
 python algorithm/test_converter_lod0.py
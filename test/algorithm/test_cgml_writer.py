@@ -0,0 +1,146 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse CityGmlWriter
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import os
+import gzip
+import zipfile
+import tempfile
+
+# XML-Bibliotheken
+from lxml import etree
+# noinspection PyUnresolvedReferences
+from lxml.etree import QName
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.cgml_writer import CityGmlWriter
+from model.xmlns import XmlNs
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+
+def model(count):
+    """ Erstellt eine CityGML-Struktur mit Gebäuden und einem geteilten Objekt """
+    root = etree.Element(QName(XmlNs.core, "CityModel"),
+                         nsmap={'core': XmlNs.core, None: XmlNs.xmlns, 'bldg': XmlNs.bldg, 'gml': XmlNs.gml,
+                                'xlink': XmlNs.xlink, 'energy': XmlNs.energy})
+    etree.SubElement(root, QName(XmlNs.gml, "name")).text = "Modell"
+    for i in range(0, count):
+        chBldg = etree.SubElement(etree.SubElement(root, QName(XmlNs.core, "cityObjectMember")),
+                                  QName(XmlNs.bldg, "Building"))
+        chBldg.set(QName(XmlNs.gml, "id"), "GML_" + str(i))
+        etree.SubElement(chBldg, QName(XmlNs.bldg, "measuredHeight")).text = str(i)
+        chPoly = etree.fromstring("<gml:Polygon xmlns:gml='" + XmlNs.gml + "'><gml:exterior/></gml:Polygon>")
+        etree.SubElement(chBldg, QName(XmlNs.bldg, "lod1MultiSurface")).append(chPoly)
+    chFM = etree.SubElement(root, QName(XmlNs.gml, "featureMember"))
+    etree.SubElement(chFM, QName(XmlNs.energy, "Construction")).set(QName(XmlNs.xlink, "href"), "#GML_0")
+    return root
+
+
+def serialize(root, pretty, writer):
+    """ Schreibt die Struktur einmal mit lxml und einmal mit dem CityGmlWriter und gibt beide Ergebnisse zurück """
+    folder = tempfile.mkdtemp()
+    pathA, pathB = os.path.join(folder, "a.gml"), os.path.join(folder, "b.gml")
+    etree.ElementTree(root).write(pathA, xml_declaration=True, encoding="UTF-8", pretty_print=pretty)
+    writer.write(root, pathB)
+    with open(pathA, "rb") as fileA, open(pathB, "rb") as fileB:
+        result = fileA.read(), fileB.read()
+    os.remove(pathA)
+    os.remove(pathB)
+    return result
+
+
+#####
+
+
+class TestShell(unittest.TestCase):
+
+    def test_1(self):
+        start, end = CityGmlWriter(False).shell(model(0))
+        self.assertTrue(start.startswith(b"<core:CityModel"))
+        self.assertIn(b'xmlns:bldg="' + XmlNs.bldg.encode() + b'"', start)
+        self.assertEqual(b"</core:CityModel>", end)
+
+
+class TestFragment(unittest.TestCase):
+
+    def test_1(self):
+        root = model(1)
+        result = CityGmlWriter(False).fragment(root[1])
+        self.assertNotIn(b"xmlns", result)
+        self.assertTrue(result.startswith(b"<core:cityObjectMember><bldg:Building"))
+
+    def test_2(self):
+        root = model(1)
+        result = CityGmlWriter(True).fragment(root[1])
+        self.assertTrue(result.startswith(b"  <core:cityObjectMember>\n    <bldg:Building"))
+        self.assertTrue(result.endswith(b"  </core:cityObjectMember>\n"))
+
+    def test_3(self):
+        root = model(1)
+        root[1][0].find(QName(XmlNs.bldg, "measuredHeight")).text = "1\n2"
+        result = CityGmlWriter(True).fragment(root[1])
+        self.assertIn(b"1\n2", result)
+        self.assertTrue(result.startswith(b"<core:cityObjectMember>"))
+
+
+class TestWrite(unittest.TestCase):
+
+    def test_1(self):
+        expected, result = serialize(model(50), True, CityGmlWriter(True, 4))
+        self.assertEqual(expected, result)
+
+    def test_2(self):
+        expected, result = serialize(model(50), False, CityGmlWriter(False, 4))
+        self.assertEqual(expected, result)
+
+    def test_3(self):
+        expected, result = serialize(model(3), True, CityGmlWriter(True, 1))
+        self.assertEqual(expected, result)
+
+    def test_4(self):
+        expected, result = serialize(model(0), True, CityGmlWriter(True, 4))
+        self.assertEqual(expected, result)
+
+    def test_5(self):
+        for pretty in [True, False]:
+            expected, result = serialize(etree.Element("root"), pretty, CityGmlWriter(pretty, 4))
+            self.assertEqual(expected, result)
+
+    def test_6(self):
+        root = model(100)
+        expected = serialize(root, True, CityGmlWriter(True, 4))[0]
+        path = os.path.join(tempfile.mkdtemp(), "test.gml.gz")
+        CityGmlWriter(True, 4, 1).write(root, path)
+        with gzip.open(path, "rb") as file:
+            self.assertEqual(expected, file.read())
+        os.remove(path)
+
+    def test_7(self):
+        root = model(20)
+        expected = serialize(root, False, CityGmlWriter(False, 4))[0]
+        path = os.path.join(tempfile.mkdtemp(), "test.zip")
+        CityGmlWriter(False, 4).write(root, path)
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(["test.gml"], archive.namelist())
+            self.assertEqual(expected, archive.read("test.gml"))
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
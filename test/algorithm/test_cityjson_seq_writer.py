@@ -0,0 +1,197 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse CityJsonSeqWriter
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import json
+import os
+import gzip
+import zlib
+import tempfile
+
+# XML-Bibliotheken
+from lxml import etree
+# noinspection PyUnresolvedReferences
+from lxml.etree import QName
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.cityjson_seq_writer import CityJsonSeqWriter
+from model.surface_array import SurfaceArray
+from model.xmlns import XmlNs
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+
+def polygon(parent, points):
+    """ Erstellt ein GML-Polygon aus Punkten """
+    chPoly = etree.SubElement(parent, QName(XmlNs.gml, "Polygon"))
+    chRing = etree.SubElement(etree.SubElement(chPoly, QName(XmlNs.gml, "exterior")), QName(XmlNs.gml, "LinearRing"))
+    for point in points + [points[0]]:
+        etree.SubElement(chRing, QName(XmlNs.gml, "pos")).text = " ".join(str(value) for value in point)
+    return chPoly
+
+
+def member(root, gmlId, shift=0):
+    """ Erstellt ein cityObjectMember mit einem Gebäude mit Wand und Verweis auf eine Konstruktion """
+    chCOM = etree.SubElement(root, QName(XmlNs.core, "cityObjectMember"))
+    chBldg = etree.SubElement(chCOM, QName(XmlNs.bldg, "Building"))
+    chBldg.set(QName(XmlNs.gml, "id"), gmlId)
+    chWall = etree.SubElement(etree.SubElement(chBldg, QName(XmlNs.bldg, "boundedBy")),
+                              QName(XmlNs.bldg, "WallSurface"))
+    chMS = etree.SubElement(etree.SubElement(chWall, QName(XmlNs.bldg, "lod2MultiSurface")),
+                            QName(XmlNs.gml, "MultiSurface"))
+    polygon(etree.SubElement(chMS, QName(XmlNs.gml, "surfaceMember")),
+            [[shift, 0, 0], [shift + 10, 0, 0], [shift + 10, 0, 10], [shift, 0, 10]])
+    etree.SubElement(chBldg, QName(XmlNs.energy, "construction")).set(QName(XmlNs.xlink, "href"), "#GML_constr")
+    return chCOM
+
+
+def construction(root):
+    """ Erstellt eine geteilte Konstruktion als featureMember """
+    chConstr = etree.SubElement(etree.SubElement(root, QName(XmlNs.gml, "featureMember")),
+                                QName(XmlNs.energy, "Construction"))
+    chConstr.set(QName(XmlNs.gml, "id"), "GML_constr")
+    etree.SubElement(chConstr, QName(XmlNs.energy, "uValue")).text = "0.24"
+
+
+def readLines(path):
+    """ Liest die Zeilen einer CityJSONSeq-Datei ein """
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+#####
+
+
+class TestHeader(unittest.TestCase):
+
+    def test_1(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.city.jsonl")
+        writer = CityJsonSeqWriter(path, 25832, [100, 200, None], "Testmodell")
+        result = readLines(path)
+        writer.close()
+        self.assertEqual(1, len(result))
+        self.assertEqual("CityJSON", result[0]["type"])
+        self.assertEqual({}, result[0]["CityObjects"])
+        self.assertEqual([], result[0]["vertices"])
+        self.assertEqual([100.0, 200.0, 0.0], result[0]["transform"]["translate"])
+        self.assertEqual("https://www.opengis.net/def/crs/EPSG/0/25832", result[0]["metadata"]["referenceSystem"])
+        self.assertEqual("Testmodell", result[0]["metadata"]["title"])
+        os.remove(path)
+
+
+class TestAddMember(unittest.TestCase):
+
+    def test_1(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.city.jsonl")
+        writer = CityJsonSeqWriter(path, 25832, [0, 0, 0])
+        root = etree.Element(QName(XmlNs.core, "CityModel"))
+        chCOM = member(root, "GML_bldg1")
+        construction(root)
+        writer.addMember(root, chCOM)
+        self.assertEqual(2, len(readLines(path)))
+        self.assertEqual(1, len(root))
+        writer.addMember(root, member(root, "GML_bldg2", 10))
+        writer.close()
+        result = readLines(path)
+        self.assertEqual(["CityJSONFeature", "CityJSONFeature"], [line["type"] for line in result[1:]])
+        self.assertEqual(["GML_bldg1", "GML_bldg2"], [line["id"] for line in result[1:]])
+        self.assertEqual([[10000, 0, 0], [20000, 0, 0], [20000, 0, 10000], [10000, 0, 10000]], result[2]["vertices"])
+        self.assertEqual([[[0, 1, 2, 3]]], result[2]["CityObjects"]["GML_bldg2"]["geometry"][0]["boundaries"])
+        self.assertEqual({"type": "Construction", "uValue": 0.24},
+                         result[2]["CityObjects"]["GML_bldg2"]["attributes"]["energy:construction"])
+        self.assertEqual(2, writer.featureCount)
+        os.remove(path)
+
+    def test_2(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.city.jsonl.gz")
+        writer = CityJsonSeqWriter(path, 25832, [0, 0, 0])
+        root = etree.Element(QName(XmlNs.core, "CityModel"))
+        construction(root)
+        writer.addMember(root, member(root, "GML_bldg1"))
+        with open(path, "rb") as file:
+            decompressor = zlib.decompressobj(31)
+            lines = decompressor.decompress(file.read()).decode("utf-8").splitlines()
+        self.assertEqual(["CityJSON", "CityJSONFeature"], [json.loads(line)["type"] for line in lines])
+        writer.close()
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            self.assertEqual(2, len(file.readlines()))
+        os.remove(path)
+
+    def test_3(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.city.jsonl")
+        writer = CityJsonSeqWriter(path, 25832, [0, 0, 0])
+        root = etree.Element(QName(XmlNs.core, "CityModel"))
+        construction(root)
+        for gmlId, inline in [("GML_bldg1", True), ("GML_bldg2", False)]:
+            chCOM = member(root, gmlId)
+            chSched = etree.SubElement(chCOM[0], QName(XmlNs.energy, "schedule"))
+            if inline:
+                chDVS = etree.SubElement(chSched, QName(XmlNs.energy, "DualValueSchedule"))
+                chDVS.set(QName(XmlNs.gml, "id"), "GML_sched")
+                etree.SubElement(chDVS, QName(XmlNs.energy, "usageValue")).text = "1"
+            else:
+                chSched.set(QName(XmlNs.xlink, "href"), "#GML_sched")
+            writer.addMember(root, chCOM)
+        writer.close()
+        result = readLines(path)
+        for line in result[1:]:
+            self.assertEqual({"type": "DualValueSchedule", "usageValue": 1},
+                             line["CityObjects"][line["id"]]["attributes"]["energy:schedule"])
+        self.assertNotIn("GML_sched", writer.shared)
+        os.remove(path)
+
+    def test_4(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.city.jsonl")
+        writer = CityJsonSeqWriter(path, 25832, [0, 0, 0])
+        root = etree.Element(QName(XmlNs.core, "CityModel"))
+        chCOM = member(root, "GML_bldg1")
+        chCOM.find(".//" + QName(XmlNs.bldg, "WallSurface").text).set(QName(XmlNs.gml, "id"), "GML_wallSurf")
+        wall = SurfaceArray.fromPolygons([[[[0, 0, 0], [10, 0, 0], [10, 0, 10], [0, 0, 10], [0, 0, 0]]]])
+        wall.gmlId = "GML_wallSurf"
+        writer.addMember(root, chCOM, [wall])
+        writer.close()
+        result = readLines(path)
+        self.assertEqual([[0, 0, 0], [10000, 0, 0], [10000, 0, 10000], [0, 0, 10000]], result[1]["vertices"])
+        self.assertEqual([[[0, 1, 2, 3]]], result[1]["CityObjects"]["GML_bldg1"]["geometry"][0]["boundaries"])
+        self.assertEqual({}, writer.surfaces)
+        os.remove(path)
+
+
+class TestImplicitGeometry(unittest.TestCase):
+
+    def test_1(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.city.jsonl")
+        writer = CityJsonSeqWriter(path, 25832, [0, 0, 0])
+        chProp = etree.Element(QName(XmlNs.bldg, "lod4ImplicitRepresentation"))
+        chImpl = etree.SubElement(chProp, QName(XmlNs.core, "ImplicitGeometry"))
+        etree.SubElement(chImpl, QName(XmlNs.core, "transformationMatrix")).text = "0 -1 0 0 1 0 0 0 0 0 1 0 0 0 0 1"
+        chMS = etree.SubElement(etree.SubElement(chImpl, QName(XmlNs.core, "relativeGMLGeometry")),
+                                QName(XmlNs.gml, "MultiSurface"))
+        polygon(etree.SubElement(chMS, QName(XmlNs.gml, "surfaceMember")), [[0, 0, 0], [1, 0, 0], [1, 1, 0]])
+        chPos = etree.SubElement(etree.SubElement(etree.SubElement(chImpl, QName(XmlNs.core, "referencePoint")),
+                                                  QName(XmlNs.gml, "Point")), QName(XmlNs.gml, "pos"))
+        chPos.text = "5 5 1"
+        result = writer.implicitGeometry(chProp, "4", {})
+        writer.close()
+        self.assertEqual({"type": "MultiSurface", "lod": "4", "boundaries": [[[0, 1, 2]]]}, result)
+        self.assertEqual([[5000, 5000, 1000], [5000, 6000, 1000], [4000, 6000, 1000]], writer.vertices)
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
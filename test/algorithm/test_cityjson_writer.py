@@ -0,0 +1,306 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse CityJsonWriter
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import json
+import os
+import gzip
+import tempfile
+
+# XML-Bibliotheken
+from lxml import etree
+# noinspection PyUnresolvedReferences
+from lxml.etree import QName
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.cityjson_writer import CityJsonWriter
+from model.surface_array import SurfaceArray
+from model.xmlns import XmlNs
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+
+def polygon(parent, points, gmlId=None):
+    """ Erstellt ein GML-Polygon aus Punkten """
+    chPoly = etree.SubElement(parent, QName(XmlNs.gml, "Polygon"))
+    if gmlId is not None:
+        chPoly.set(QName(XmlNs.gml, "id"), gmlId)
+    chRing = etree.SubElement(etree.SubElement(chPoly, QName(XmlNs.gml, "exterior")), QName(XmlNs.gml, "LinearRing"))
+    for point in points + [points[0]]:
+        etree.SubElement(chRing, QName(XmlNs.gml, "pos")).text = " ".join(str(value) for value in point)
+    return chPoly
+
+
+def surface(chBldg, type, points, gmlId, lod=3):
+    """ Erstellt eine semantische Oberfläche mit einem Polygon """
+    chSurf = etree.SubElement(etree.SubElement(chBldg, QName(XmlNs.bldg, "boundedBy")), QName(XmlNs.bldg, type))
+    chMS = etree.SubElement(etree.SubElement(chSurf, QName(XmlNs.bldg, "lod" + str(lod) + "MultiSurface")),
+                            QName(XmlNs.gml, "MultiSurface"))
+    polygon(etree.SubElement(chMS, QName(XmlNs.gml, "surfaceMember")), points, gmlId)
+    return chSurf
+
+
+def building(root, gmlId, shift=0):
+    """ Erstellt ein Gebäude mit Wand, Dach, Fenster, Körper und Energy ADE-Attributen """
+    chBldg = etree.SubElement(etree.SubElement(root, QName(XmlNs.core, "cityObjectMember")),
+                              QName(XmlNs.bldg, "Building"))
+    chBldg.set(QName(XmlNs.gml, "id"), gmlId)
+    etree.SubElement(chBldg, QName(XmlNs.gml, "name")).text = "Haus " + gmlId
+    etree.SubElement(chBldg, QName(XmlNs.bldg, "function")).text = "1000"
+    chHeight = etree.SubElement(chBldg, QName(XmlNs.bldg, "measuredHeight"))
+    chHeight.set("uom", "m")
+    chHeight.text = "10.5"
+    chWall = surface(chBldg, "WallSurface", [[shift, 0, 0], [shift + 10, 0, 0], [shift + 10, 0, 10], [shift, 0, 10]],
+                     gmlId + "_wall")
+    chWin = etree.SubElement(etree.SubElement(chWall, QName(XmlNs.bldg, "opening")), QName(XmlNs.bldg, "Window"))
+    chMS = etree.SubElement(etree.SubElement(chWin, QName(XmlNs.bldg, "lod3MultiSurface")),
+                            QName(XmlNs.gml, "MultiSurface"))
+    polygon(etree.SubElement(chMS, QName(XmlNs.gml, "surfaceMember")),
+            [[shift + 2, 0, 2], [shift + 4, 0, 2], [shift + 4, 0, 4], [shift + 2, 0, 4]])
+    surface(chBldg, "RoofSurface", [[shift, 0, 10], [shift + 10, 0, 10], [shift + 10, 10, 10], [shift, 10, 10]],
+            gmlId + "_roof")
+    chSolid = etree.SubElement(etree.SubElement(chBldg, QName(XmlNs.bldg, "lod3Solid")), QName(XmlNs.gml, "Solid"))
+    chCS = etree.SubElement(etree.SubElement(chSolid, QName(XmlNs.gml, "exterior")),
+                            QName(XmlNs.gml, "CompositeSurface"))
+    for link in [gmlId + "_wall", gmlId + "_roof"]:
+        etree.SubElement(chCS, QName(XmlNs.gml, "surfaceMember")).set(QName(XmlNs.xlink, "href"), "#" + link)
+    chVol = etree.SubElement(etree.SubElement(chBldg, QName(XmlNs.energy, "volume")),
+                             QName(XmlNs.energy, "VolumeType"))
+    etree.SubElement(chVol, QName(XmlNs.energy, "type")).text = "grossVolume"
+    etree.SubElement(chVol, QName(XmlNs.energy, "value")).text = "1000.0"
+    chTZ = etree.SubElement(etree.SubElement(chBldg, QName(XmlNs.energy, "thermalZone")),
+                            QName(XmlNs.energy, "ThermalZone"))
+    chTB = etree.SubElement(etree.SubElement(chTZ, QName(XmlNs.energy, "boundedBy")),
+                            QName(XmlNs.energy, "ThermalBoundary"))
+    etree.SubElement(chTB, QName(XmlNs.energy, "construction")).set(QName(XmlNs.xlink, "href"), "#GML_constr")
+    return chBldg
+
+
+# CityGML-Struktur mit zwei Gebäuden, die sich Punkte und eine Konstruktion teilen
+root = etree.Element(QName(XmlNs.core, "CityModel"))
+etree.SubElement(root, QName(XmlNs.gml, "name")).text = "Testmodell"
+building(root, "GML_bldg1")
+building(root, "GML_bldg2", 10)
+chConstr = etree.SubElement(etree.SubElement(root, QName(XmlNs.gml, "featureMember")),
+                            QName(XmlNs.energy, "Construction"))
+chConstr.set(QName(XmlNs.gml, "id"), "GML_constr")
+etree.SubElement(chConstr, QName(XmlNs.gml, "name")).text = "Mauerwerk"
+etree.SubElement(chConstr, QName(XmlNs.energy, "uValue")).text = "0.24"
+
+
+def usageZone(chBldg, scheduleId, inline):
+    """ Erstellt eine Nutzungszone, deren Zeitplan eingebettet oder per XLink referenziert wird """
+    chUZ = etree.SubElement(etree.SubElement(chBldg, QName(XmlNs.energy, "usageZone")),
+                            QName(XmlNs.energy, "UsageZone"))
+    chSched = etree.SubElement(chUZ, QName(XmlNs.energy, "heatingSchedule"))
+    if not inline:
+        chSched.set(QName(XmlNs.xlink, "href"), "#" + scheduleId)
+        return
+    chDVS = etree.SubElement(chSched, QName(XmlNs.energy, "DualValueSchedule"))
+    chDVS.set(QName(XmlNs.gml, "id"), scheduleId)
+    etree.SubElement(chDVS, QName(XmlNs.energy, "usageHoursPerDay")).text = "8"
+    etree.SubElement(chDVS, QName(XmlNs.energy, "usageValue")).text = "1"
+
+
+# CityGML-Struktur mit zwei Gebäuden, deren Zeitplan im ersten Gebäude eingebettet ist
+rootSched = etree.Element(QName(XmlNs.core, "CityModel"))
+usageZone(building(rootSched, "GML_bldg1"), "GML_sched", True)
+usageZone(building(rootSched, "GML_bldg2", 10), "GML_sched", False)
+chConstr = etree.SubElement(etree.SubElement(rootSched, QName(XmlNs.gml, "featureMember")),
+                            QName(XmlNs.energy, "Construction"))
+chConstr.set(QName(XmlNs.gml, "id"), "GML_constr")
+
+#####
+
+
+class TestVertexIndex(unittest.TestCase):
+
+    def test_1(self):
+        writer = CityJsonWriter(32632, [100, 200, 5])
+        self.assertEqual(0, writer.vertexIndex([100.0, 200.0, 5.0]))
+        self.assertEqual(0, writer.vertexIndex([100.0002, 200.0, 5.0]))
+        self.assertEqual(1, writer.vertexIndex([101.0, 200.0, 5.0]))
+        self.assertEqual([[0, 0, 0], [1000, 0, 0]], writer.vertices)
+
+    def test_2(self):
+        writer = CityJsonWriter(32632, [0, 0, None], 0.01)
+        writer.vertexIndex([1.234, -2.0, 3.0])
+        self.assertEqual([[123, -200, 300]], writer.vertices)
+
+
+class TestPolygon(unittest.TestCase):
+
+    def test_1(self):
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        result = writer.polygon(polygon(etree.Element("root"), [[0, 0, 0], [1, 0, 0], [1, 1, 0]]))
+        self.assertEqual([[0, 1, 2]], result)
+
+    def test_2(self):
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        result = writer.polygon(polygon(etree.Element("root"), [[0, 0, 0], [1, 0, 0], [1, 0.0001, 0]]))
+        self.assertIsNone(result)
+
+
+class TestAddRoot(unittest.TestCase):
+
+    def test_1(self):
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        writer.addRoot(root)
+        self.assertEqual(["GML_bldg1", "GML_bldg2"], list(writer.cityObjects.keys()))
+        self.assertEqual("Testmodell", writer.title)
+
+    def test_2(self):
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        writer.addRoot(root)
+        self.assertEqual(10 + 7, len(writer.vertices))
+
+    def test_3(self):
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        writer.addRoot(root)
+        geometry = writer.cityObjects["GML_bldg1"]["geometry"]
+        self.assertEqual(1, len(geometry))
+        self.assertEqual("MultiSurface", geometry[0]["type"])
+        self.assertEqual("3", geometry[0]["lod"])
+        surfaces = geometry[0]["semantics"]["surfaces"]
+        self.assertEqual(["WallSurface", "Window", "RoofSurface"], [surf["type"] for surf in surfaces])
+        self.assertEqual(0, surfaces[1]["parent"])
+        self.assertEqual([1], surfaces[0]["children"])
+        self.assertEqual([0, 1, 2], geometry[0]["semantics"]["values"])
+
+    def test_4(self):
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        writer.addRoot(root)
+        attributes = writer.cityObjects["GML_bldg2"]["attributes"]
+        self.assertEqual(10.5, attributes["measuredHeight"])
+        self.assertEqual("1000", attributes["function"])
+        self.assertEqual({"type": "grossVolume", "value": 1000.0}, attributes["energy:volume"])
+        construction = attributes["energy:thermalZone"]["boundedBy"]["construction"]
+        self.assertEqual({"type": "Construction", "name": "Mauerwerk", "uValue": 0.24}, construction)
+
+
+class TestAddMember(unittest.TestCase):
+
+    def test_1(self):
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        for chCOM in rootSched.findall(QName(XmlNs.core, "cityObjectMember").text):
+            writer.addMember(rootSched, chCOM)
+        schedule = {"type": "DualValueSchedule", "usageHoursPerDay": 8, "usageValue": 1}
+        for gmlId in ["GML_bldg1", "GML_bldg2"]:
+            attributes = writer.cityObjects[gmlId]["attributes"]
+            self.assertEqual(schedule, attributes["energy:usageZone"]["heatingSchedule"])
+
+    def test_2(self):
+        model = etree.Element(QName(XmlNs.core, "CityModel"))
+        building(model, "GML_bldg1").find(".//" + QName(XmlNs.bldg, "WallSurface").text).set(
+            QName(XmlNs.gml, "id"), "GML_wallSurf")
+        wall = SurfaceArray.fromPolygons([[[[0, 0, 0], [10, 0, 0], [10, 0, 10], [0, 0, 10], [0, 0, 0]]]])
+        wall.gmlId = "GML_wallSurf"
+        expected = CityJsonWriter(32632, [0, 0, 0])
+        expected.addMember(model, model[0])
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        writer.addMember(model, model[0], [wall])
+        self.assertEqual(expected.cityObjects, writer.cityObjects)
+        self.assertEqual(expected.vertices, writer.vertices)
+        self.assertEqual({}, writer.surfaces)
+
+    def test_3(self):
+        model = etree.Element(QName(XmlNs.core, "CityModel"))
+        building(model, "GML_bldg1").find(".//" + QName(XmlNs.bldg, "WallSurface").text).set(
+            QName(XmlNs.gml, "id"), "GML_wallSurf")
+        wall = SurfaceArray.fromPolygons([[[[0, 0, 0], [10, 0, 0], [10, 0, 20], [0, 0, 20], [0, 0, 0]]]])
+        wall.gmlId = "GML_wallSurf"
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        writer.addMember(model, model[0], [wall])
+        boundary = writer.cityObjects["GML_bldg1"]["geometry"][0]["boundaries"][0][0]
+        self.assertEqual([[0, 0, 0], [10000, 0, 0], [10000, 0, 20000], [0, 0, 20000]],
+                         [writer.vertices[index] for index in boundary])
+
+    def test_4(self):
+        model = etree.Element(QName(XmlNs.core, "CityModel"))
+        chBldg = building(model, "GML_bldg1")
+        chDVS = etree.SubElement(etree.SubElement(chBldg, QName(XmlNs.energy, "schedule")),
+                                 QName(XmlNs.energy, "DualValueSchedule"))
+        chDVS.set(QName(XmlNs.gml, "id"), "GML_loop")
+        etree.SubElement(chDVS, QName(XmlNs.energy, "next")).set(QName(XmlNs.xlink, "href"), "#GML_loop")
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        writer.addRoot(model)
+        self.assertEqual({"type": "DualValueSchedule", "next": "#GML_loop"}, writer.sharedValue("GML_loop"))
+
+
+class TestImplicitGeometry(unittest.TestCase):
+
+    def test_1(self):
+        model = etree.Element(QName(XmlNs.core, "CityModel"))
+        chBldg = etree.SubElement(etree.SubElement(model, QName(XmlNs.core, "cityObjectMember")),
+                                  QName(XmlNs.bldg, "Building"))
+        for i in range(0, 2):
+            chFurn = etree.SubElement(etree.SubElement(chBldg, QName(XmlNs.bldg, "interiorFurniture")),
+                                      QName(XmlNs.bldg, "BuildingFurniture"))
+            chImpl = etree.SubElement(etree.SubElement(chFurn, QName(XmlNs.bldg, "lod4ImplicitRepresentation")),
+                                      QName(XmlNs.core, "ImplicitGeometry"))
+            etree.SubElement(chImpl, QName(XmlNs.core, "transformationMatrix")).text = \
+                "1 0 0 0 0 1 0 0 0 0 1 0 0 0 0 1"
+            chRel = etree.SubElement(chImpl, QName(XmlNs.core, "relativeGMLGeometry"))
+            if i == 0:
+                chMS = etree.SubElement(chRel, QName(XmlNs.gml, "MultiSurface"))
+                chMS.set(QName(XmlNs.gml, "id"), "GML_template")
+                polygon(etree.SubElement(chMS, QName(XmlNs.gml, "surfaceMember")), [[0, 0, 0], [1, 0, 0], [1, 1, 0]])
+            else:
+                chRel.set(QName(XmlNs.xlink, "href"), "#GML_template")
+            chPos = etree.SubElement(etree.SubElement(etree.SubElement(chImpl, QName(XmlNs.core, "referencePoint")),
+                                                      QName(XmlNs.gml, "Point")), QName(XmlNs.gml, "pos"))
+            chPos.text = str(i) + " 0 0"
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        writer.addRoot(model)
+        self.assertEqual(1, len(writer.templates))
+        self.assertEqual(3, len(writer.cityObjects))
+        furniture = [obj for obj in writer.cityObjects.values() if obj["type"] == "BuildingFurniture"]
+        self.assertEqual([0, 0], [obj["geometry"][0]["template"] for obj in furniture])
+        self.assertEqual([[0, 0, 0], [1000, 0, 0]],
+                         [writer.vertices[obj["geometry"][0]["boundaries"][0]] for obj in furniture])
+        self.assertEqual(2, len(writer.cityObjects[furniture[0]["parents"][0]]["children"]))
+
+
+class TestWrite(unittest.TestCase):
+
+    def test_1(self):
+        writer = CityJsonWriter(32632, [100, 200, 5])
+        writer.addRoot(root)
+        path = os.path.join(tempfile.mkdtemp(), "test.json")
+        writer.write(path)
+        with open(path, encoding="utf-8") as file:
+            result = json.load(file)
+        self.assertEqual("CityJSON", result["type"])
+        self.assertEqual({"scale": [0.001, 0.001, 0.001], "translate": [100.0, 200.0, 5.0]}, result["transform"])
+        self.assertEqual("https://www.opengis.net/def/crs/EPSG/0/32632", result["metadata"]["referenceSystem"])
+        self.assertNotIn("geometry-templates", result)
+        os.remove(path)
+
+    def test_2(self):
+        writer = CityJsonWriter(32632, [0, 0, 0])
+        writer.addRoot(root)
+        path = os.path.join(tempfile.mkdtemp(), "test.json.gz")
+        writer.write(path, 9)
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            result = json.load(file)
+        self.assertEqual(["GML_bldg1", "GML_bldg2"], list(result["CityObjects"].keys()))
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
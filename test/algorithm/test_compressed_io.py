@@ -0,0 +1,133 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse CompressedIO
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import os
+import gzip
+import zipfile
+import tempfile
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.compressed_io import CompressedIO
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# IFC-Datei
+dataPath = r"data/IFC_test.ifc"
+with open(dataPath, "rb") as dataFile:
+    data = dataFile.read()
+
+#####
+
+
+class TestCompression(unittest.TestCase):
+
+    def test_1(self):
+        self.assertEqual("gzip", CompressedIO.compression("a/b.gml.GZ"))
+
+    def test_2(self):
+        self.assertEqual("zip", CompressedIO.compression("a/b.ifczip"))
+        self.assertEqual("zip", CompressedIO.compression("a/b.zip"))
+
+    def test_3(self):
+        self.assertIsNone(CompressedIO.compression("a/b.gml"))
+
+
+class TestPlainPath(unittest.TestCase):
+
+    def test_1(self):
+        self.assertEqual("a/b.gml", CompressedIO.plainPath("a/b.gml.gz", ".gml"))
+
+    def test_2(self):
+        self.assertEqual("a/b.ifc", CompressedIO.plainPath("a/b.ifczip", ".ifc"))
+        self.assertEqual("a/b.gml", CompressedIO.plainPath("a/b.zip", ".gml"))
+
+    def test_3(self):
+        self.assertEqual("a/b.json", CompressedIO.plainPath("a/b.json", ".gml"))
+
+
+class TestBaseName(unittest.TestCase):
+
+    def test_1(self):
+        self.assertEqual("b", CompressedIO.baseName(os.path.join("a", "b.gml.gz"), ".gml"))
+        self.assertEqual("b.c", CompressedIO.baseName(os.path.join("a", "b.c.ifczip"), ".ifc"))
+        self.assertEqual("b", CompressedIO.baseName("b.gml", ".gml"))
+
+
+class TestReadIfc(unittest.TestCase):
+
+    def test_1(self):
+        result = CompressedIO.readIfc(dataPath)
+        self.assertEqual(1, len(result.by_type("IfcProject")))
+
+    def test_2(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.ifc.gz")
+        with gzip.open(path, "wb") as file:
+            file.write(data)
+        result = CompressedIO.readIfc(path)
+        self.assertEqual(len(CompressedIO.readIfc(dataPath).by_type("IfcBuilding")), len(result.by_type("IfcBuilding")))
+        os.remove(path)
+
+    def test_3(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.ifczip")
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("readme.txt", "IFC")
+            archive.writestr("model.ifc", data)
+        result = CompressedIO.readIfc(path)
+        self.assertEqual(1, len(result.by_type("IfcProject")))
+        os.remove(path)
+
+    def test_4(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.zip")
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("readme.txt", "IFC")
+        with self.assertRaises(ValueError):
+            CompressedIO.readIfc(path)
+        os.remove(path)
+
+
+class TestOpen(unittest.TestCase):
+
+    def test_1(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.gml.gz")
+        with CompressedIO.open(path, ".gml", 1) as file:
+            file.write(b"<a/>")
+        with gzip.open(path, "rb") as file:
+            self.assertEqual(b"<a/>", file.read())
+        os.remove(path)
+
+    def test_2(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.zip")
+        with CompressedIO.open(path, ".gml") as file:
+            file.write(b"<a/>")
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(["test.gml"], archive.namelist())
+            self.assertEqual(b"<a/>", archive.read("test.gml"))
+        os.remove(path)
+
+    def test_3(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.gml")
+        with CompressedIO.open(path, ".gml") as file:
+            file.write(b"<a/>")
+        with open(path, "rb") as file:
+            self.assertEqual(b"<a/>", file.read())
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
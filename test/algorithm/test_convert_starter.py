@@ -142,6 +142,46 @@ class TestWriteCGML(unittest.TestCase):
         self.assertEqual(corr, result)
 
 
+class TestGetPlainPath(unittest.TestCase):
+
+    def test_1(self):
+        conv = ConvertStarter("IFC-to-CityGML Conversion", None, inPath1, "data/CityGML_test.gml.gz", 0, False, False)
+        self.assertEqual("data/CityGML_test.gml", conv.getPlainPath())
+
+    def test_2(self):
+        conv = ConvertStarter("IFC-to-CityGML Conversion", None, inPath1, "data/CityGML_test.zip", 0, False, False)
+        self.assertEqual("data/CityGML_test.gml", conv.getPlainPath())
+
+
+class TestIsCityJson(unittest.TestCase):
+
+    def test_1(self):
+        conv = ConvertStarter("IFC-to-CityGML Conversion", None, inPath1, "data/CityJSON_test.json.gz", 0, False, False)
+        self.assertTrue(conv.isCityJson())
+        self.assertFalse(conv.isCityJsonSeq())
+
+    def test_2(self):
+        conv = ConvertStarter("IFC-to-CityGML Conversion", None, inPath1, "data/CityJSON_test.jsonl.gz", 0, False,
+                              False)
+        self.assertTrue(conv.isCityJson())
+        self.assertTrue(conv.isCityJsonSeq())
+
+    def test_3(self):
+        conv = ConvertStarter("IFC-to-CityGML Conversion", None, inPath1, "data/CityGML_test.zip", 0, False, False)
+        self.assertFalse(conv.isCityJson())
+
+
+class TestGetGpkgPath(unittest.TestCase):
+
+    def test_1(self):
+        conv = ConvertStarter("IFC-to-CityGML Conversion", None, inPath1, "data/CityGML_test.gml.gz", 0, False, False)
+        self.assertEqual("data/CityGML_test.gpkg", conv.getGpkgPath())
+
+    def test_2(self):
+        conv = ConvertStarter("IFC-to-CityGML Conversion", None, inPath1, "data/CityGML_test.gpkg", 0, False, False)
+        self.assertEqual("data/CityGML_test.gpkg", conv.getGpkgPath())
+
+
 class TestFinished(unittest.TestCase):
 
     def test_1(self):
@@ -29,8 +29,11 @@ sys.path.insert(0, '..')
 from algorithm.converter_eade import EADEConverter
 from algorithm.utilitiesIfc import UtilitiesIfc
 from model.surface import Surface
+from model.xmlns import XmlNs
 from model.construction import Construction
 from model.material import Material
+from model.construction_registry import ConstructionRegistry
+from model.site_registry import SiteRegistry
 
 #####
 
@@ -70,6 +73,7 @@ geom3 = ogr.CreateGeometryFromWkt("Polygon((0 0, 0 20, 20 20, 20 0, 0 0),(5 5, 5
 # Plugin
 surface1 = Surface([geom1, geom2], "Wand-ABC123", ifcWalls1[0], "Wall")
 surface2 = Surface([geom3], "Wand-XYZ_äöüß", ifcWalls1[1], "Wall")
+opening1 = Surface([geom3], "Fenster-123", ifcWindows1[0], "ifcWindow")
 constr1 = Construction("GML_ABC123", ifcMLS1, None, ifcWalls1, "layer")
 constr2 = Construction("GML_XYZ_äöüß", ifcMLS2, None, ifcWalls2, "layer")
 constr3 = Construction("GML_987_XYZ", ifcMLS3, None, ifcWalls3, "layer")
@@ -115,6 +119,15 @@ class TestConvertWeatherData(unittest.TestCase):
         EADEConverter.convertWeatherData(ifcProj3, ifcSite3, root, bbox)
         self.assertEqual(b'<root/>', etree.tostring(root))
 
+    def test_4(self):
+        root, chBldg1, chBldg2 = etree.Element("root"), etree.Element("bldg1"), etree.Element("bldg2")
+        registry = SiteRegistry()
+        EADEConverter.convertWeatherData(ifcProj1, ifcSite1, chBldg1, bbox, root, registry)
+        EADEConverter.convertWeatherData(ifcProj1, ifcSite1, chBldg2, bbox, root, registry)
+        self.assertEqual(1, len(root.findall(".//{%s}WeatherData" % XmlNs.energy)))
+        self.assertEqual(0, len(chBldg2.findall(".//{%s}WeatherData" % XmlNs.energy)))
+        self.assertEqual(chBldg1[0].get("{%s}href" % XmlNs.xlink), chBldg2[0].get("{%s}href" % XmlNs.xlink))
+
 
 class TestConvertBldgAttr(unittest.TestCase):
 
@@ -213,6 +226,13 @@ class TestConstructEquipSchedule(unittest.TestCase):
         EADEConverter.constructEquipSchedule(root, "DHWFacilities")
         self.assertEqual(530, len(etree.tostring(root)))
 
+    def test_4(self):
+        root, registry = etree.Element("root"), SiteRegistry()
+        EADEConverter.constructEquipSchedule(root, "DHWFacilities", registry)
+        EADEConverter.constructEquipSchedule(root, "DHWFacilities", registry)
+        self.assertEqual(1, len(root.findall(".//{%s}DualValueSchedule" % XmlNs.energy)))
+        self.assertEqual("#" + root[0][0][0][0].get("{%s}id" % XmlNs.gml), root[1][0][0].get("{%s}href" % XmlNs.xlink))
+
 
 class TestCalcThermalZone(unittest.TestCase):
 
@@ -224,63 +244,100 @@ class TestCalcThermalZone(unittest.TestCase):
     def test_2(self):
         root = etree.Element("root")
         EADEConverter.calcThermalZone(ifc1, ifcBldg1, root, [], [surface2, surface1], 2)
-        self.assertEqual(425, len(etree.tostring(root)))
+        self.assertEqual(2, len(root.findall(".//{%s}ThermalBoundary" % XmlNs.energy)))
 
     def test_3(self):
         root = etree.Element("root")
         EADEConverter.calcThermalZone(ifc1, ifcBldg1, root, [], [surface1, surface2], 3)
-        self.assertEqual(425, len(etree.tostring(root)))
+        self.assertEqual(2, len(root.findall(".//{%s}ThermalBoundary" % XmlNs.energy)))
 
     def test_4(self):
         root = etree.Element("root")
         EADEConverter.calcThermalZone(ifc2, ifcBldg2, root, [], [surface2, surface1], 3)
-        self.assertEqual(425, len(etree.tostring(root)))
+        self.assertEqual(2, len(root.findall(".//{%s}ThermalBoundary" % XmlNs.energy)))
 
     def test_5(self):
         root = etree.Element("root")
         EADEConverter.calcThermalZone(ifc3, ifcBldg3, root, [], [surface1, surface2], 2)
-        self.assertEqual(425, len(etree.tostring(root)))
+        self.assertEqual(2, len(root.findall(".//{%s}ThermalBoundary" % XmlNs.energy)))
 
 
 class TestCalcThermalBoundaries(unittest.TestCase):
 
     def test_1(self):
         root = etree.Element("root")
-        EADEConverter.calcThermalBoundaries(ifc1, [], root, 2, [surface1, surface2], "GML_abc123")
-        self.assertEqual(b'<root/>', etree.tostring(root))
+        EADEConverter.calcThermalBoundaries(ifc1, root, 2, [surface1, surface2], "GML_abc123")
+        self.assertEqual(2, len(root))
+        self.assertEqual(["outerWall", "outerWall"],
+                         [ch.text for ch in root.iter("{%s}thermalBoundaryType" % XmlNs.energy)])
 
     def test_2(self):
         root = etree.Element("root")
-        EADEConverter.calcThermalBoundaries(ifc1, [], root, 3, [surface2, surface1], "GML_abc123")
-        self.assertEqual(b'<root/>', etree.tostring(root))
+        result = EADEConverter.calcThermalBoundaries(ifc1, root, 3, [surface2, surface1], "GML_abc123")
+        self.assertEqual(2, len(root))
+        self.assertEqual(1, len(result))
 
     def test_3(self):
         root = etree.Element("root")
-        EADEConverter.calcThermalBoundaries(ifc2, [], root, 2, [surface2, surface1], "GML_abc123")
-        self.assertEqual(b'<root/>', etree.tostring(root))
+        EADEConverter.calcThermalBoundaries(ifc2, root, 2, [surface2, surface1, opening1], "GML_abc123")
+        self.assertEqual(2, len(root))
 
     def test_4(self):
         root = etree.Element("root")
-        EADEConverter.calcThermalBoundaries(ifc3, [], root, 3, [surface1, surface2], "GML_abc123")
+        EADEConverter.calcThermalBoundaries(ifc3, root, 3, [], "GML_abc123")
         self.assertEqual(b'<root/>', etree.tostring(root))
 
+    def test_5(self):
+        root1, root2, registry = etree.Element("root"), etree.Element("root"), ConstructionRegistry()
+        result1 = EADEConverter.calcThermalBoundaries(ifc1, root1, 2, [surface1, surface2], "GML_abc", True, registry)
+        result2 = EADEConverter.calcThermalBoundaries(ifc1, root2, 2, [surface2, surface1], "GML_xyz", True, registry)
+        self.assertEqual(1, len(result1))
+        self.assertEqual(0, len(result2))
+        self.assertEqual([ch.get("{%s}href" % XmlNs.xlink) for ch in root1.iter("{%s}construction" % XmlNs.energy)],
+                         [ch.get("{%s}href" % XmlNs.xlink) for ch in root2.iter("{%s}construction" % XmlNs.energy)])
+
 
 class TestCalcThermalOpenings(unittest.TestCase):
 
     def test_1(self):
         root = etree.Element("root")
-        EADEConverter.calcThermalBoundaries(ifc1, [], root, 3, [surface1, surface2], [constr1, constr4])
+        EADEConverter.calcThermalOpenings(ifc1, surface1, root, 3, ConstructionRegistry())
         self.assertEqual(b'<root/>', etree.tostring(root))
 
     def test_2(self):
         root = etree.Element("root")
-        EADEConverter.calcThermalBoundaries(ifc2, [], root, 3, [surface2, surface1], [constr2, constr5])
+        EADEConverter.calcThermalOpenings(ifc2, surface2, root, 3, ConstructionRegistry())
         self.assertEqual(b'<root/>', etree.tostring(root))
 
     def test_3(self):
         root = etree.Element("root")
-        EADEConverter.calcThermalBoundaries(ifc3, [], root, 3, [surface1, surface2], [constr3, constr6])
-        self.assertEqual(b'<root/>', etree.tostring(root))
+        wall = Surface([geom1], "Wand-Öffnung", ifcWalls1[0], "Wall")
+        wall.openings.append(opening1)
+        EADEConverter.calcThermalOpenings(ifc1, wall, root, 3, ConstructionRegistry())
+        self.assertEqual(1, len(root.findall(".//{%s}ThermalOpening" % XmlNs.energy)))
+        self.assertAlmostEqual(300, float(root.find(".//{%s}area" % XmlNs.energy).text))
+
+
+class TestSurfaceToMultiSurface(unittest.TestCase):
+
+    def test_1(self):
+        surface = Surface([geom1, geom2], "Wand-ABC123", ifcWalls1[0], "Wall")
+        surface.geomId = "PolyID_abc123"
+        result = EADEConverter.surfaceToMultiSurface(surface, surface.geom, True)
+        self.assertEqual(1, len(result))
+        self.assertEqual("#PolyID_abc123", result[0].get("{%s}href" % XmlNs.xlink))
+
+    def test_2(self):
+        surface = Surface([geom1, geom2], "Wand-ABC123", ifcWalls1[0], "Wall")
+        surface.geomId = "PolyID_abc123"
+        result = EADEConverter.surfaceToMultiSurface(surface, surface.geom, False)
+        self.assertEqual(2, len(result))
+        self.assertIsNone(result[0].get("{%s}href" % XmlNs.xlink))
+
+    def test_3(self):
+        result = EADEConverter.surfaceToMultiSurface(surface2, surface2.geom, True)
+        self.assertEqual(1, len(result))
+        self.assertEqual(1, len(result[0]))
 
 
 class TestConvertConstructions(unittest.TestCase):
@@ -303,6 +360,13 @@ class TestConvertConstructions(unittest.TestCase):
         self.assertEqual(1, len(result))
         self.assertEqual(1770, len(etree.tostring(root)))
 
+    def test_4(self):
+        root, registry = etree.Element("root"), ConstructionRegistry()
+        result1 = EADEConverter.convertConstructions(root, [constr1], registry)
+        result2 = EADEConverter.convertConstructions(root, [constr1], registry)
+        self.assertEqual(1, len(result1))
+        self.assertEqual(0, len(result2))
+
 
 class TestConvertMaterials(unittest.TestCase):
 
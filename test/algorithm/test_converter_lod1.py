@@ -30,6 +30,7 @@ sys.path.insert(0, '..')
 from algorithm.converter_lod1 import LoD1Converter
 from algorithm.transformer import Transformer
 from algorithm.utilitiesIfc import UtilitiesIfc
+from model.envelope import Envelope
 
 #####
 
@@ -75,8 +76,7 @@ class TestConstructor(unittest.TestCase):
         self.assertEqual("Test123", result.name)
         self.assertEqual(trans1, result.trans)
         self.assertFalse(result.eade)
-        self.assertEqual("<class 'osgeo.ogr.Geometry'>", str(type(result.geom)))
-        self.assertEqual("<class 'osgeo.ogr.Geometry'>", str(type(result.bldgGeom)))
+        self.assertTrue(result.envelope.isEmpty())
         self.assertEqual(10, result.progress)
         self.assertEqual(1, result.bldgCount)
 
@@ -88,8 +88,7 @@ class TestConstructor(unittest.TestCase):
         self.assertEqual("TestABC", result.name)
         self.assertEqual(trans2, result.trans)
         self.assertTrue(result.eade)
-        self.assertEqual("<class 'osgeo.ogr.Geometry'>", str(type(result.geom)))
-        self.assertEqual("<class 'osgeo.ogr.Geometry'>", str(type(result.bldgGeom)))
+        self.assertTrue(result.envelope.isEmpty())
         self.assertEqual(10, result.progress)
         self.assertEqual(1, result.bldgCount)
 
@@ -98,25 +97,25 @@ class TestConvertBound(unittest.TestCase):
 
     def test_1(self):
         root = etree.Element("root")
-        result = LoD1Converter.convertBound(geom1, root, trans1)
+        result = LoD1Converter.convertBound(Envelope([geom1]), root, trans1)
         corr = (10, 20, 10, 20, 10, 10)
         self.assertEqual(corr, result)
 
     def test_2(self):
         root = etree.Element("root")
-        result = LoD1Converter.convertBound(geom2, root, trans1)
+        result = LoD1Converter.convertBound(Envelope([geom2]), root, trans1)
         corr = (10, 90, 10, 90, 10, 10)
         self.assertEqual(corr, result)
 
     def test_3(self):
         root = etree.Element("root")
-        result = LoD1Converter.convertBound(geom3, root, trans1)
+        result = LoD1Converter.convertBound(Envelope([geom3]), root, trans1)
         corr = (10, 20, 10, 20, 10, 20)
         self.assertEqual(corr, result)
 
     def test_4(self):
         root = etree.Element("root")
-        result = LoD1Converter.convertBound(geom4, root, trans1)
+        result = LoD1Converter.convertBound(Envelope([geom4]), root, trans1)
         corr = (10, 90, 10, 90, 10, 20)
         self.assertEqual(corr, result)
 
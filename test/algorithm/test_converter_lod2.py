@@ -31,6 +31,7 @@ sys.path.insert(0, '..')
 from algorithm.converter_lod2 import LoD2Converter
 from algorithm.transformer import Transformer
 from algorithm.utilitiesIfc import UtilitiesIfc
+from model.envelope import Envelope
 from model.surface import Surface
 
 #####
@@ -99,8 +100,7 @@ class TestConstructor(unittest.TestCase):
         self.assertEqual("Test123", result.name)
         self.assertEqual(trans1, result.trans)
         self.assertFalse(result.eade)
-        self.assertEqual("<class 'osgeo.ogr.Geometry'>", str(type(result.geom)))
-        self.assertEqual("<class 'osgeo.ogr.Geometry'>", str(type(result.bldgGeom)))
+        self.assertTrue(result.envelope.isEmpty())
         self.assertEqual(10, result.progress)
         self.assertEqual(1, result.bldgCount)
 
@@ -112,8 +112,7 @@ class TestConstructor(unittest.TestCase):
         self.assertEqual("TestABC", result.name)
         self.assertEqual(trans2, result.trans)
         self.assertTrue(result.eade)
-        self.assertEqual("<class 'osgeo.ogr.Geometry'>", str(type(result.geom)))
-        self.assertEqual("<class 'osgeo.ogr.Geometry'>", str(type(result.bldgGeom)))
+        self.assertTrue(result.envelope.isEmpty())
         self.assertEqual(5, result.progress)
         self.assertEqual(1, result.bldgCount)
 
@@ -122,25 +121,25 @@ class TestConvertBound(unittest.TestCase):
 
     def test_1(self):
         root = etree.Element("root")
-        result = LoD2Converter.convertBound(geom1, root, trans1)
+        result = LoD2Converter.convertBound(Envelope([geom1]), root, trans1)
         corr = (10, 20, 10, 20, 10, 10)
         self.assertEqual(corr, result)
 
     def test_2(self):
         root = etree.Element("root")
-        result = LoD2Converter.convertBound(geom2, root, trans1)
+        result = LoD2Converter.convertBound(Envelope([geom2]), root, trans1)
         corr = (10, 90, 10, 90, 10, 10)
         self.assertEqual(corr, result)
 
     def test_3(self):
         root = etree.Element("root")
-        result = LoD2Converter.convertBound(geom3, root, trans1)
+        result = LoD2Converter.convertBound(Envelope([geom3]), root, trans1)
         corr = (10, 20, 10, 20, 10, 20)
         self.assertEqual(corr, result)
 
     def test_4(self):
         root = etree.Element("root")
-        result = LoD2Converter.convertBound(geom4, root, trans1)
+        result = LoD2Converter.convertBound(Envelope([geom4]), root, trans1)
         corr = (10, 90, 10, 90, 10, 20)
         self.assertEqual(corr, result)
 
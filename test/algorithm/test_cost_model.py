@@ -0,0 +1,175 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse CostModel
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import os
+import tempfile
+
+# IFC-Bibliotheken
+import ifcopenshell
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.cost_model import CostModel
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# IFC-Elemente
+ifc = ifcopenshell.open(r"data/IFC_test.ifc")
+ifcBldg = ifc.by_type("IfcBuilding")[0]
+ifcWall = ifc.by_type("IfcWall")[0]
+
+#####
+
+
+class TestCountInputs(unittest.TestCase):
+
+    def test_1(self):
+        result = CostModel.countInputs(ifc, ifcBldg)
+        self.assertEqual(len(ifc.by_type("IfcWall")), result["walls"])
+        self.assertEqual(len(ifc.by_type("IfcDoor")) + len(ifc.by_type("IfcWindow")), result["openings"])
+        self.assertEqual(len(ifc.by_type("IfcSpace")), result["spaces"])
+        self.assertEqual(len(ifc.by_type("IfcRelSpaceBoundary")), result["spaceBoundaries"])
+        self.assertEqual(result["walls"] * result["openings"], result["wallOpenings"])
+
+    def test_2(self):
+        result = CostModel.countInputs(ifc, ifcBldg)
+        self.assertEqual(set(CostModel.KEYS), set(result.keys()))
+
+
+class TestFacetCount(unittest.TestCase):
+
+    def test_1(self):
+        self.assertGreaterEqual(CostModel.facetCount(ifcWall), 6)
+
+
+class TestEstimate(unittest.TestCase):
+
+    def test_1(self):
+        counts = CostModel.countInputs(ifc, ifcBldg)
+        self.assertLess(CostModel.estimate(counts, 1, False), CostModel.estimate(counts, 3, False))
+
+    def test_2(self):
+        counts = CostModel.countInputs(ifc, ifcBldg)
+        self.assertLess(CostModel.estimate(counts, 3, False), CostModel.estimate(counts, 3, True))
+
+
+class TestShare(unittest.TestCase):
+
+    def test_1(self):
+        model = CostModel(ifc, 3, False)
+        self.assertAlmostEqual(1, sum(model.share(ifcBuilding) for ifcBuilding in ifc.by_type("IfcBuilding")))
+
+
+class TestStageShares(unittest.TestCase):
+
+    def test_1(self):
+        counts = CostModel.countInputs(ifc, ifcBldg)
+        for lod in range(0, 5):
+            keys = list(CostModel.coefficients[lod].keys())
+            result = CostModel.stageShares(counts, lod, True, keys)
+            self.assertAlmostEqual(1, sum(result.values()))
+            self.assertIn("eade", result)
+            cost = CostModel.estimate(counts, lod, True)
+            for key in keys:
+                self.assertAlmostEqual(CostModel.coefficients[lod][key] * counts[key] / cost, result.get(key, 0))
+
+    def test_2(self):
+        # Nicht abgebildete Eingangsgrößen zählen zum Grundaufwand
+        counts = {"base": 1, "slabs": 2, "walls": 3}
+        result = CostModel.stageShares(counts, 3, False, ["base", "slabs"])
+        cost = CostModel.estimate(counts, 3, False)
+        self.assertEqual({"base", "slabs"}, set(result.keys()))
+        self.assertAlmostEqual((0.5 + 0.4 * 3) / cost, result["base"])
+
+    def test_3(self):
+        self.assertEqual({"base": 1.0}, CostModel.stageShares({}, 3, False, ["base", "walls"]))
+
+
+class TestWorkers(unittest.TestCase):
+
+    def test_1(self):
+        model = CostModel(ifc, 3, False)
+        self.assertEqual(1, model.workers(tasks=1))
+
+    def test_2(self):
+        model = CostModel(ifc, 3, False)
+        self.assertEqual(1, model.workers(tasks=100, memory=model.memory()))
+
+
+class TestCalibration(unittest.TestCase):
+
+    def test_1(self):
+        self.assertIsNone(CostModel.loadCalibration(os.path.join(tempfile.mkdtemp(), "cost_model.json")))
+
+    def test_2(self):
+        coefficients, coefficientsEade = CostModel.coefficients, CostModel.coefficientsEade
+        path = os.path.join(tempfile.mkdtemp(), "cost_model.json")
+        source = {"models": ["IFC_test.ifc"], "date": "2024-01-01"}
+        CostModel.saveCalibration(path, {lod: {"base": lod + 1.0} for lod in range(0, 5)}, {"spaces": 0.5}, source)
+        try:
+            self.assertEqual(source, CostModel.loadCalibration(path))
+            self.assertEqual({"base": 4.0}, CostModel.coefficients[3])
+            self.assertEqual(4.0 + 0.5 * 2, CostModel.estimate({"base": 1, "spaces": 2}, 3, True))
+        finally:
+            CostModel.coefficients, CostModel.coefficientsEade = coefficients, coefficientsEade
+        os.remove(path)
+
+
+class TestRemaining(unittest.TestCase):
+
+    def test_1(self):
+        model = CostModel(ifc, 3, False)
+        model.start()
+        self.assertEqual(0, model.remaining(ifcBldg))
+
+
+class TestFormatTime(unittest.TestCase):
+
+    def test_1(self):
+        self.assertEqual("1:01:05", CostModel.formatTime(3665))
+
+
+class TestCalibrate(unittest.TestCase):
+
+    def test_1(self):
+        samples = [({"base": 1, "walls": w, "openings": o}, 0.5 + 0.2 * w + 0.1 * o) for w, o in
+                   [(1, 0), (2, 4), (5, 1), (10, 8)]]
+        result = CostModel.calibrate(samples, ["base", "walls", "openings"])
+        self.assertAlmostEqual(0.5, result["base"])
+        self.assertAlmostEqual(0.2, result["walls"])
+        self.assertAlmostEqual(0.1, result["openings"])
+
+    def test_2(self):
+        samples = [({"base": 1, "walls": w}, 1.0) for w in [1, 2, 3]]
+        result = CostModel.calibrate(samples, ["base", "walls"])
+        self.assertAlmostEqual(1.0, result["base"])
+        self.assertNotIn("walls", result)
+
+
+class TestReport(unittest.TestCase):
+
+    def test_1(self):
+        model = CostModel(ifc, 2, True)
+        result = model.report()
+        self.assertEqual(2 + len(ifc.by_type("IfcBuilding")), len(result))
+        self.assertTrue(result[0].startswith("LoD2 + EnergyADE"))
+        self.assertTrue(result[1].startswith("Coefficients: "))
+
+
+if __name__ == '__main__':
+    unittest.main()
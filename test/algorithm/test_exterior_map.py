@@ -0,0 +1,90 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse ExteriorMap
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+
+# IFC-Bibliotheken
+import ifcopenshell
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.exterior_map import ExteriorMap
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# IFC-Elemente
+ifc = ifcopenshell.open(r"data/IFC_test.ifc")
+ifcBldg = ifc.by_type("IfcBuilding")[0]
+exteriorMap = ExteriorMap(ifc, ifcBldg)
+
+#####
+
+
+class TestState(unittest.TestCase):
+
+    def test_1(self):
+        result = exteriorMap.state(ifc.by_guid("3rPX_Juz59peXXY6wDJl18"))
+        self.assertEqual(ExteriorMap.EXTERNAL, result)
+
+    def test_2(self):
+        result = exteriorMap.state(ifc.by_guid("3PfS__Y_DBAfq5naM6zD2Z"))
+        self.assertEqual(ExteriorMap.INTERNAL, result)
+
+    def test_3(self):
+        result = exteriorMap.state(ifcBldg)
+        self.assertEqual(ExteriorMap.UNKNOWN, result)
+
+
+class TestBoundaries(unittest.TestCase):
+
+    def test_1(self):
+        result = exteriorMap.boundaries(ifc.by_guid("3PfS__Y_DBAfq5naM6zD2Z"))
+        self.assertEqual(4, len(result))
+        self.assertTrue(all(rel.is_a("IfcRelSpaceBoundary") for rel in result))
+
+    def test_2(self):
+        result = exteriorMap.boundaries(ifcBldg)
+        self.assertEqual([], result)
+
+
+class TestIsExternalWall(unittest.TestCase):
+
+    def test_1(self):
+        result = [ifcWall.GlobalId for ifcWall in ifc.by_type("IfcWall") if exteriorMap.isExternalWall(ifcWall)]
+        self.assertEqual(8, len(result))
+        self.assertIn("3rPX_Juz59peXXY6wDJl18", result)
+        self.assertNotIn("3PfS__Y_DBAfq5naM6zD2Z", result)
+
+
+class TestIsExternalOpening(unittest.TestCase):
+
+    def test_1(self):
+        result = exteriorMap.isExternalOpening(ifc.by_guid("1srAI$R4T8ihLXSNHmUSET"), "Pset_WindowCommon")
+        self.assertTrue(result)
+
+    def test_2(self):
+        result = exteriorMap.isExternalOpening(ifc.by_guid("1Oms875aH3Wg$9l65H2ZGw"), "Pset_DoorCommon")
+        self.assertFalse(result)
+
+    def test_3(self):
+        result = [ifcDoor for ifcDoor in ifc.by_type("IfcDoor")
+                  if exteriorMap.isExternalOpening(ifcDoor, "Pset_DoorCommon")]
+        self.assertEqual(2, len(result))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse GpkgWriter
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import os
+import tempfile
+
+# XML-Bibliotheken
+from lxml import etree
+# noinspection PyUnresolvedReferences
+from lxml.etree import QName
+
+# Geo-Bibliotheken
+from osgeo import ogr
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.gpkg_writer import GpkgWriter
+from model.xmlns import XmlNs
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+
+def polygon(parent, points, gmlId=None):
+    """ Erstellt ein GML-Polygon aus Punkten """
+    chPoly = etree.SubElement(parent, QName(XmlNs.gml, "Polygon"))
+    if gmlId is not None:
+        chPoly.set(QName(XmlNs.gml, "id"), gmlId)
+    chRing = etree.SubElement(etree.SubElement(chPoly, QName(XmlNs.gml, "exterior")), QName(XmlNs.gml, "LinearRing"))
+    for point in points + [points[0]]:
+        etree.SubElement(chRing, QName(XmlNs.gml, "pos")).text = " ".join(str(value) for value in point)
+    return chPoly
+
+
+def building(root, gmlId):
+    """ Erstellt ein Gebäude mit Attributen, Grund- und Dachfläche """
+    chBldg = etree.SubElement(etree.SubElement(root, QName(XmlNs.core, "cityObjectMember")),
+                              QName(XmlNs.bldg, "Building"))
+    chBldg.set(QName(XmlNs.gml, "id"), gmlId)
+    etree.SubElement(chBldg, QName(XmlNs.bldg, "function")).text = "1000"
+    etree.SubElement(chBldg, QName(XmlNs.bldg, "measuredHeight")).text = "10.5"
+    etree.SubElement(chBldg, QName(XmlNs.bldg, "storeysAboveGround")).text = "3"
+    for type, z in [("GroundSurface", 0), ("RoofSurface", 10)]:
+        chSurf = etree.SubElement(etree.SubElement(chBldg, QName(XmlNs.bldg, "boundedBy")), QName(XmlNs.bldg, type))
+        chMS = etree.SubElement(etree.SubElement(chSurf, QName(XmlNs.bldg, "lod2MultiSurface")),
+                                QName(XmlNs.gml, "MultiSurface"))
+        polygon(etree.SubElement(chMS, QName(XmlNs.gml, "surfaceMember")),
+                [[0, 0, z], [10, 0, z], [10, 10, z], [0, 10, z]])
+    return chBldg
+
+
+def solid(chBldg):
+    """ Erstellt einen LoD1-Körper aus Grund- und Dachfläche """
+    chSolid = etree.SubElement(etree.SubElement(chBldg, QName(XmlNs.bldg, "lod1Solid")), QName(XmlNs.gml, "Solid"))
+    chCS = etree.SubElement(etree.SubElement(chSolid, QName(XmlNs.gml, "exterior")),
+                            QName(XmlNs.gml, "CompositeSurface"))
+    for z in [0, 10]:
+        polygon(etree.SubElement(chCS, QName(XmlNs.gml, "surfaceMember")),
+                [[0, 0, z], [10, 0, z], [10, 10, z], [0, 10, z]])
+    polygon(etree.SubElement(chCS, QName(XmlNs.gml, "surfaceMember")), [[0, 0, 0], [10, 0, 0], [10, 0, 10], [0, 0, 10]])
+    return chBldg
+
+
+#####
+
+
+class TestFootPrint(unittest.TestCase):
+
+    def test_1(self):
+        root = etree.Element(QName(XmlNs.core, "CityModel"))
+        chBldg = building(root, "GML_bldg")
+        result = GpkgWriter(32632).footPrint(chBldg, {})
+        self.assertEqual(1, result.GetGeometryCount())
+        self.assertEqual((0.0, 10.0, 0.0, 10.0, 0.0, 0.0), result.GetEnvelope3D())
+
+    def test_2(self):
+        chBldg = solid(etree.Element(QName(XmlNs.bldg, "Building")))
+        result = GpkgWriter(32632).footPrint(chBldg, {})
+        self.assertEqual(1, result.GetGeometryCount())
+        self.assertEqual(0.0, result.GetEnvelope3D()[5])
+
+    def test_3(self):
+        result = GpkgWriter(32632).footPrint(etree.Element(QName(XmlNs.bldg, "Building")), {})
+        self.assertIsNone(result)
+
+
+class TestSurfaces(unittest.TestCase):
+
+    def test_1(self):
+        root = etree.Element(QName(XmlNs.core, "CityModel"))
+        result = GpkgWriter(32632).surfaces(building(root, "GML_bldg"), {})
+        self.assertEqual([("GroundSurface", 2), ("RoofSurface", 2)], [(type, lod) for type, lod, geom in result])
+
+    def test_2(self):
+        chBldg = solid(etree.Element(QName(XmlNs.bldg, "Building")))
+        result = GpkgWriter(32632).surfaces(chBldg, {})
+        self.assertEqual(1, len(result))
+        self.assertEqual(("Solid", 1), result[0][0:2])
+        self.assertEqual(3, result[0][2].GetGeometryCount())
+
+
+class TestGetHeights(unittest.TestCase):
+
+    def test_1(self):
+        writer = GpkgWriter(32632)
+        writer.addHeight(12.0)
+        writer.addHeight(None)
+        writer.addHeight(4.5)
+        writer.addHeight(7.0)
+        self.assertEqual((4.5, 12.0), writer.getHeights())
+
+    def test_2(self):
+        self.assertIsNone(GpkgWriter(32632).getHeights())
+
+
+class TestWrite(unittest.TestCase):
+
+    def test_1(self):
+        root = etree.Element(QName(XmlNs.core, "CityModel"))
+        building(root, "GML_bldg1")
+        building(root, "GML_bldg2")
+        path = os.path.join(tempfile.mkdtemp(), "test.gpkg")
+        GpkgWriter(32632).write(root, path)
+        ds = ogr.Open(path)
+        bldgLayer, surfLayer = ds.GetLayerByName("buildings"), ds.GetLayerByName("surfaces")
+        self.assertEqual(2, bldgLayer.GetFeatureCount())
+        self.assertEqual(4, surfLayer.GetFeatureCount())
+        feature = bldgLayer.GetNextFeature()
+        self.assertEqual("GML_bldg1", feature.GetField("gmlId"))
+        self.assertEqual(10.5, feature.GetField("measuredHeight"))
+        self.assertEqual("1000", feature.GetField("function"))
+        self.assertEqual(3, feature.GetField("storeysAboveGround"))
+        self.assertEqual(ogr.wkbMultiPolygon25D, feature.GetGeometryRef().GetGeometryType())
+        self.assertEqual("32632", bldgLayer.GetSpatialRef().GetAuthorityCode(None))
+        self.assertEqual(1, ds.ExecuteSQL("SELECT HasSpatialIndex('buildings', 'geom')").GetNextFeature().GetField(0))
+        ds = None
+        os.remove(path)
+
+    def test_2(self):
+        root = etree.Element(QName(XmlNs.core, "CityModel"))
+        building(root, "GML_bldg1")
+        building(root, "GML_bldg2").find(QName(XmlNs.bldg, "measuredHeight")).text = "4.25"
+        path = os.path.join(tempfile.mkdtemp(), "test.gpkg")
+        writer = GpkgWriter(32632)
+        writer.write(root, path)
+        self.assertEqual((4.25, 10.5), writer.getHeights())
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
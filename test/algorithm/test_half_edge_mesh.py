@@ -0,0 +1,128 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse HalfEdgeMesh
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import numpy as np
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.half_edge_mesh import HalfEdgeMesh
+from algorithm.time_budget import TimeBudget, BudgetExceeded
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+
+class Task:
+    """ Einfacher Ersatz des zugrunde liegenden Tasks """
+
+    def __init__(self, canceled=False):
+        self.canceled = canceled
+        self.logging = None
+
+    def isCanceled(self):
+        return self.canceled
+
+
+# Netz 1: Raster aus 3x3 Quadraten mit Loch in der Mitte
+verts1 = [[x, y, 0] for y in range(0, 4) for x in range(0, 4)]
+faces1 = []
+for y in range(0, 3):
+    for x in range(0, 3):
+        if (x, y) != (1, 1):
+            a = y * 4 + x
+            faces1 += [[a, a + 1, a + 5], [a, a + 5, a + 4]]
+
+# Netz 2: Würfel mit nicht verschweißten Vertizes je Seite
+verts2, faces2 = [], []
+for quad in [[[0, 0, 0], [0, 1, 0], [1, 1, 0], [1, 0, 0]], [[0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]],
+             [[0, 0, 0], [1, 0, 0], [1, 0, 1], [0, 0, 1]], [[0, 1, 0], [0, 1, 1], [1, 1, 1], [1, 1, 0]],
+             [[0, 0, 0], [0, 0, 1], [0, 1, 1], [0, 1, 0]], [[1, 0, 0], [1, 1, 0], [1, 1, 1], [1, 0, 1]]]:
+    k = len(verts2)
+    verts2 += quad
+    faces2 += [[k, k + 1, k + 2], [k, k + 2, k + 3]]
+
+# Netz 3: Dreieck mit entartetem Dreieck
+verts3 = [[0, 0, 0], [1, 0, 0], [0, 1, 0], [0.000001, 0, 0]]
+faces3 = [[0, 1, 2], [0, 3, 1]]
+
+#####
+
+
+class TestConstructor(unittest.TestCase):
+
+    def test_1(self):
+        result = HalfEdgeMesh(verts2, faces2)
+        self.assertEqual(8, len(result.verts))
+        self.assertEqual(12, len(result.faces))
+        self.assertTrue(np.all(result.twin >= 0))
+
+    def test_2(self):
+        result = HalfEdgeMesh(verts3, faces3)
+        self.assertEqual(3, len(result.verts))
+        self.assertEqual(1, len(result.faces))
+        self.assertTrue(np.all(result.twin == -1))
+
+
+class TestRegions(unittest.TestCase):
+
+    def test_1(self):
+        result = HalfEdgeMesh(verts1, faces1).regions()
+        self.assertEqual(1, len(result))
+        self.assertEqual(16, len(result[0]))
+
+    def test_2(self):
+        result = HalfEdgeMesh(verts2, faces2).regions()
+        self.assertEqual(6, len(result))
+
+
+class TestBoundaryLoops(unittest.TestCase):
+
+    def test_1(self):
+        mesh = HalfEdgeMesh(verts1, faces1)
+        result = mesh.boundaryLoops(mesh.regions()[0])
+        self.assertEqual(2, len(result))
+        self.assertEqual(12, len(result[0]))
+        self.assertEqual(4, len(result[1]))
+        self.assertAlmostEqual(9, mesh.loopArea(result[0], np.array([0, 0, 1])))
+        self.assertAlmostEqual(-1, mesh.loopArea(result[1], np.array([0, 0, 1])))
+
+
+class TestPolygons(unittest.TestCase):
+
+    def test_1(self):
+        result = HalfEdgeMesh(verts2, faces2).polygons()
+        self.assertEqual(6, len(result))
+        for polygon in result:
+            self.assertEqual(1, len(polygon))
+            self.assertEqual(5, len(polygon[0]))
+            self.assertEqual(polygon[0][0], polygon[0][-1])
+
+    def test_2(self):
+        result = HalfEdgeMesh([], []).polygons()
+        self.assertEqual([], result)
+
+    def test_3(self):
+        result = HalfEdgeMesh(verts2, faces2).polygons(task=Task(canceled=True))
+        self.assertEqual([], result)
+
+    def test_4(self):
+        with self.assertRaises(BudgetExceeded):
+            HalfEdgeMesh(verts2, faces2).polygons(task=TimeBudget(Task(), 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
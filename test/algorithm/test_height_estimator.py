@@ -0,0 +1,110 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse HeightEstimator
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.height_estimator import HeightEstimator
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# IFC-Elemente
+ifc = ifcopenshell.open(r"data/IFC_test.ifc")
+ifcBldg = ifc.by_type("IfcBuilding")[0]
+ifcStorey = ifc.by_type("IfcBuildingStorey")[0]
+ifcRoof = [ifcSlab for ifcSlab in ifc.by_type("IfcSlab") if ifcSlab.PredefinedType == "ROOF"][0]
+
+# Kopie mit Längeneinheit Millimeter
+ifcMm = ifcopenshell.open(r"data/IFC_test.ifc")
+for ifcUnit in ifcMm.by_type("IfcSIUnit"):
+    if ifcUnit.UnitType == "LENGTHUNIT":
+        ifcUnit.Prefix = "MILLI"
+ifcBldgMm = ifcMm.by_type("IfcBuilding")[0]
+ifcRoofMm = [ifcSlab for ifcSlab in ifcMm.by_type("IfcSlab") if ifcSlab.PredefinedType == "ROOF"][0]
+
+#####
+
+
+class TestQuantity(unittest.TestCase):
+
+    def test_1(self):
+        result = HeightEstimator.quantity(ifcStorey, ["GrossHeight"])
+        self.assertAlmostEqual(2.7, result)
+
+    def test_2(self):
+        result = HeightEstimator.quantity(ifcBldg, ["Height"])
+        self.assertIsNone(result)
+
+
+class TestRepresentationExtent(unittest.TestCase):
+
+    def test_1(self):
+        mins, maxs = HeightEstimator.representationExtent(ifcRoof)
+        tessMins, tessMaxs = HeightEstimator.tessellatedExtent(ifcRoof)
+        self.assertAlmostEqual(tessMins[2], mins[2], 5)
+        self.assertAlmostEqual(tessMaxs[2], maxs[2], 5)
+        self.assertTrue(np.all(mins <= tessMins + 0.00001) and np.all(maxs >= tessMaxs - 0.00001))
+
+    def test_2(self):
+        mins, maxs = HeightEstimator.representationExtent(ifcRoofMm, 0.001)
+        tessMins, tessMaxs = HeightEstimator.tessellatedExtent(ifcRoofMm)
+        self.assertAlmostEqual(tessMins[2], mins[2], 8)
+        self.assertAlmostEqual(tessMaxs[2], maxs[2], 8)
+        self.assertTrue(np.all(mins <= tessMins + 0.00000001) and np.all(maxs >= tessMaxs - 0.00000001))
+
+
+class TestElementExtent(unittest.TestCase):
+
+    def test_1(self):
+        ifcSlabs = ifc.by_type("IfcSlab")
+        mins, maxs = HeightEstimator.elementExtent(ifcSlabs, tessellate=False)
+        self.assertAlmostEqual(-0.2, mins[2])
+        self.assertAlmostEqual(6.317691, maxs[2], 5)
+
+    def test_2(self):
+        self.assertIsNone(HeightEstimator.elementExtent([]))
+
+
+class TestStoreyRange(unittest.TestCase):
+
+    def test_1(self):
+        result = HeightEstimator.storeyRange(ifc, ifcBldg)
+        np.testing.assert_array_almost_equal([0, 4.7], result)
+
+    def test_2(self):
+        result = HeightEstimator.storeyRange(ifcMm, ifcBldgMm)
+        np.testing.assert_array_almost_equal([0, 0.0047], result, 8)
+
+
+class TestCalcHeight(unittest.TestCase):
+
+    def test_1(self):
+        result = HeightEstimator.calcHeight(ifc, ifcBldg, tessellate=False)
+        self.assertAlmostEqual(6.517691, result, 5)
+
+    def test_2(self):
+        result = HeightEstimator.calcHeight(ifcMm, ifcBldgMm, tessellate=False)
+        self.assertAlmostEqual(0.006517691, result, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse OpeningExtractor
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell
+import ifcopenshell.geom
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.opening_extractor import OpeningExtractor
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# IFC-Elemente
+ifc = ifcopenshell.open(r"data/IFC_test.ifc")
+ifcOpenings = ifc.by_type("IfcWindow") + ifc.by_type("IfcDoor")
+ifcWindow = ifc.by_guid("1srAI$R4T8ihLXSNHmUSET")
+
+# Kopien mit Längeneinheit Millimeter, in der zweiten Kopie Fenster ohne Bounding Box
+ifcMm, ifcMmBody = ifcopenshell.open(r"data/IFC_test.ifc"), ifcopenshell.open(r"data/IFC_test.ifc")
+for ifcUnit in ifcMm.by_type("IfcSIUnit") + ifcMmBody.by_type("IfcSIUnit"):
+    if ifcUnit.UnitType == "LENGTHUNIT":
+        ifcUnit.Prefix = "MILLI"
+ifcWindowMm = ifcMm.by_guid("1srAI$R4T8ihLXSNHmUSET")
+ifcWindowMmBody = ifcMmBody.by_guid("1srAI$R4T8ihLXSNHmUSET")
+ifcWindowMmBody.Representation.Representations = [rep for rep in ifcWindowMmBody.Representation.Representations
+                                                  if rep.RepresentationIdentifier != "Box"]
+
+# Einstellungen der Tessellierung als Referenz
+settings = ifcopenshell.geom.settings()
+settings.set(settings.USE_WORLD_COORDS, True)
+
+#####
+
+
+class TestFillingOpening(unittest.TestCase):
+
+    def test_1(self):
+        result = OpeningExtractor.fillingOpening(ifcWindow)
+        self.assertTrue(result.is_a("IfcOpeningElement"))
+
+
+class TestIsRectangularProfile(unittest.TestCase):
+
+    def test_1(self):
+        profile = ifc.createIfcArbitraryClosedProfileDef("AREA", None, ifc.createIfcPolyline(
+            [ifc.createIfcCartesianPoint(pt) for pt in [(0., 0.), (2., 0.), (2., 1.), (0., 1.), (0., 0.)]]))
+        self.assertTrue(OpeningExtractor.isRectangularProfile(profile))
+
+    def test_2(self):
+        profile = ifc.createIfcArbitraryClosedProfileDef("AREA", None, ifc.createIfcPolyline(
+            [ifc.createIfcCartesianPoint(pt) for pt in [(0., 0.), (2., 0.), (1., 1.), (0., 0.)]]))
+        self.assertFalse(OpeningExtractor.isRectangularProfile(profile))
+
+
+class TestCorners(unittest.TestCase):
+
+    def test_1(self):
+        for ifcOpening in ifcOpenings:
+            result = OpeningExtractor.corners(ifcOpening)
+            if result is None:
+                # Runde Öffnungen werden weiterhin tesselliert
+                self.assertFalse(OpeningExtractor.isRectangular(ifcOpening))
+                continue
+            verts = np.asarray(ifcopenshell.geom.create_shape(settings, ifcOpening).geometry.verts).reshape(-1, 3)
+            np.testing.assert_array_almost_equal(verts.min(axis=0), result.min(axis=0), 4)
+            np.testing.assert_array_almost_equal(verts.max(axis=0), result.max(axis=0), 4)
+
+    def test_2(self):
+        result = OpeningExtractor.corners(ifcWindow)
+        self.assertTrue(np.all(result[:4, 2] < result[4:, 2]))
+
+    def test_3(self):
+        result = [OpeningExtractor.corners(ifcOpening) is not None for ifcOpening in ifcOpenings]
+        self.assertEqual(len(ifcOpenings) - 2, sum(result))
+
+    def test_4(self):
+        result = OpeningExtractor.corners(ifcWindowMm, 0.001)
+        verts = np.asarray(ifcopenshell.geom.create_shape(settings, ifcWindowMm).geometry.verts).reshape(-1, 3)
+        np.testing.assert_array_almost_equal(verts.min(axis=0), result.min(axis=0), 7)
+        np.testing.assert_array_almost_equal(verts.max(axis=0), result.max(axis=0), 7)
+
+
+class TestLocalBox(unittest.TestCase):
+
+    def test_1(self):
+        mins, maxs = OpeningExtractor.localBox(ifcWindow)
+        np.testing.assert_array_almost_equal([ifcWindow.OverallWidth, ifcWindow.OverallHeight],
+                                             [maxs[0] - mins[0], maxs[2] - mins[2]])
+
+    def test_2(self):
+        # Ableitung über die IfcOpeningElement: Breite und Höhe wie aus der Bounding Box
+        mins, maxs = OpeningExtractor.localBox(ifcWindowMmBody, 0.001)
+        minsRef, maxsRef = OpeningExtractor.localBox(ifcWindow)
+        np.testing.assert_array_almost_equal([minsRef[0] * 0.001, minsRef[2] * 0.001], [mins[0], mins[2]], 8)
+        np.testing.assert_array_almost_equal([maxsRef[0] * 0.001, maxsRef[2] * 0.001], [maxs[0], maxs[2]], 8)
+
+    def test_3(self):
+        # Breite innerhalb der Toleranz übernehmen, abweichende Höhe verwerfen, Ursprung bleibt erhalten
+        minsRef, maxsRef = OpeningExtractor.localBox(ifcWindowMmBody, 0.001)
+        width, height = ifcWindowMmBody.OverallWidth, ifcWindowMmBody.OverallHeight
+        ifcWindowMmBody.OverallWidth, ifcWindowMmBody.OverallHeight = width - 1, height + 1000
+        mins, maxs = OpeningExtractor.localBox(ifcWindowMmBody, 0.001)
+        ifcWindowMmBody.OverallWidth, ifcWindowMmBody.OverallHeight = width, height
+        np.testing.assert_array_almost_equal(minsRef, mins, 8)
+        np.testing.assert_array_almost_equal([minsRef[0] + (width - 1) * 0.001, maxsRef[2]], [maxs[0], maxs[2]], 8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse RoomBoundary
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell
+import ifcopenshell.guid
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.room_boundary import RoomBoundary
+from algorithm.half_edge_mesh import HalfEdgeMesh
+from algorithm.tessellation_profile import TessellationProfile
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# IFC-Elemente
+ifc = ifcopenshell.open(r"data/IFC_test.ifc")
+ifcSpaces = ifc.by_type("IfcSpace")
+
+# Raum mit Randflächen des 1st und 2nd Level
+ifcMixed = ifcopenshell.open(r"data/IFC_test.ifc")
+ifcSpaceMixed = ifcMixed.by_type("IfcSpace")[0]
+for rel in list(ifcSpaceMixed.BoundedBy):
+    attributes = rel.get_info(recursive=False)
+    del attributes["id"], attributes["type"]
+    attributes.update(GlobalId=ifcopenshell.guid.new(), Name="1stLevel", Description="1")
+    ifcMixed.create_entity("IfcRelSpaceBoundary", **attributes)
+
+#####
+
+
+class TestInit(unittest.TestCase):
+
+    def test_1(self):
+        for ifcSpace in ifcSpaces:
+            room = RoomBoundary(ifcSpace, None)
+            self.assertEqual(len(ifcSpace.BoundedBy), len(room.faces) + len(room.openings))
+            self.assertEqual(0, len(room.orphans))
+            self.assertEqual(len(room.openings), sum(len(face.openings) for face in room.faces))
+
+    def test_2(self):
+        for ifcSpace in ifcSpaces:
+            room = RoomBoundary(ifcSpace, None)
+            virtual = [rel for rel in ifcSpace.BoundedBy if rel.PhysicalOrVirtualBoundary == "VIRTUAL"]
+            self.assertEqual(len(virtual), len([face for face in room.faces if face.type == "Closure"]))
+
+    def test_3(self):
+        # Längeneinheit Millimeter: Ebenen und Ringe in Meter
+        room, roomMm = RoomBoundary(ifcSpaces[0], None), RoomBoundary(ifcSpaces[0], None, scale=0.001)
+        for face, faceMm in zip(room.faces, roomMm.faces):
+            np.testing.assert_array_almost_equal(face.origin * 0.001, faceMm.origin)
+            np.testing.assert_array_almost_equal(face.rings[0] * 0.001, faceMm.rings[0])
+
+    def test_4(self):
+        # Randflächen des 1st Level überlagern die des 2nd Level und werden übergangen
+        room, roomMixed = RoomBoundary(ifcSpaces[0], None), RoomBoundary(ifcSpaceMixed, None)
+        self.assertEqual(2 * len(ifcSpaces[0].BoundedBy), len(ifcSpaceMixed.BoundedBy))
+        self.assertEqual(len(room.faces), len(roomMixed.faces))
+        self.assertEqual(len(room.openings), len(roomMixed.openings))
+        self.assertTrue(roomMixed.isComplete())
+
+    def test_5(self):
+        # Nur Randflächen des 1st Level: Berechnung über den Raumkörper
+        ifcSpace = ifcMixed.by_type("IfcSpace")[1]
+        for rel in ifcSpace.BoundedBy:
+            rel.Name, rel.Description = "1stLevel", "1"
+        room = RoomBoundary(ifcSpace, None)
+        self.assertEqual(0, len(room.faces))
+        self.assertFalse(room.isComplete())
+
+
+class TestClassifyNormal(unittest.TestCase):
+
+    def test_1(self):
+        self.assertEqual("Floor", RoomBoundary.classifyNormal([0, 0, 1]))
+        self.assertEqual("Ceiling", RoomBoundary.classifyNormal([0, 0.6, -0.8]))
+        self.assertEqual("Wall", RoomBoundary.classifyNormal([1, 0, 0.05]))
+
+
+class TestIsComplete(unittest.TestCase):
+
+    def test_1(self):
+        self.assertTrue(all(RoomBoundary(ifcSpace, None).isComplete() for ifcSpace in ifcSpaces))
+
+    def test_2(self):
+        room = RoomBoundary(ifcSpaces[0], None)
+        room.faces = [face for face in room.faces if face.type != "Ceiling"]
+        self.assertFalse(room.isComplete())
+
+
+class TestPolygonNormal(unittest.TestCase):
+
+    def test_1(self):
+        ring = [[0, 0, 0], [2, 0, 0], [2, 1, 0], [0, 1, 0]]
+        np.testing.assert_array_almost_equal([0, 0, 1], RoomBoundary.polygonNormal(ring))
+        np.testing.assert_array_almost_equal([0, 0, -1], RoomBoundary.polygonNormal(ring[::-1]))
+
+
+class TestBodySurfaces(unittest.TestCase):
+
+    def test_1(self):
+        shape = TessellationProfile.createShape(ifcSpaces[0], TessellationProfile.FOOTPRINT)
+        verts = np.asarray(shape.geometry.verts, dtype=np.float64).reshape(-1, 3)
+        faces = np.asarray(shape.geometry.faces, dtype=np.int64).reshape(-1, 3)
+        result = RoomBoundary.bodySurfaces(HalfEdgeMesh(verts, faces).polygons(), ifcSpaces[0].Name)
+        types = dict((surface.type, surface.polygonCount) for surface in result)
+        self.assertEqual(1, types["Floor"])
+        self.assertEqual(1, types["Ceiling"])
+        self.assertEqual(4, types["Wall"])
+        self.assertLess(result[0].coords[:, 2].max(), result[1].coords[:, 2].min())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse SpaceBoundaryShell
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.exterior_map import ExteriorMap
+from algorithm.space_boundary_shell import SpaceBoundaryShell
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# IFC-Elemente
+ifc = ifcopenshell.open(r"data/IFC_test.ifc")
+ifcBldg = ifc.by_type("IfcBuilding")[0]
+shell = SpaceBoundaryShell(ifc, ifcBldg, ExteriorMap(ifc, ifcBldg), None)
+ifc2 = ifcopenshell.open(r"data/IFC_test2.ifc")
+ifcBldg2 = ifc2.by_type("IfcBuilding")[0]
+shell2 = SpaceBoundaryShell(ifc2, ifcBldg2, ExteriorMap(ifc2, ifcBldg2), None)
+
+# Kopie in Millimetern und mit Randflächen des 1st Level
+ifcMm = ifcopenshell.open(r"data/IFC_test.ifc")
+for ifcUnit in ifcMm.by_type("IfcSIUnit"):
+    if ifcUnit.UnitType == "LENGTHUNIT":
+        ifcUnit.Prefix = "MILLI"
+ifcBldgMm = ifcMm.by_type("IfcBuilding")[0]
+shellMm = SpaceBoundaryShell(ifcMm, ifcBldgMm, ExteriorMap(ifcMm, ifcBldgMm), None)
+for rel in ifcMm.by_type("IfcRelSpaceBoundary"):
+    rel.Name, rel.Description = "1stLevel", None
+shellLevel1 = SpaceBoundaryShell(ifcMm, ifcBldgMm, ExteriorMap(ifcMm, ifcBldgMm), None)
+
+#####
+
+
+class TestBoundaryGeometry(unittest.TestCase):
+
+    def test_1(self):
+        ifcRel = [rel for rel in ifc.by_type("IfcRelSpaceBoundary") if rel.RelatedBuildingElement is not None and
+                  rel.RelatedBuildingElement.GlobalId == "1srAI$R4T8ihLXSNHmUSET"][0]
+        frame, rings = SpaceBoundaryShell.boundaryGeometry(ifcRel)
+        world = SpaceBoundaryShell.planeToWorld(frame, rings[0])
+        self.assertEqual(1, len(rings))
+        np.testing.assert_array_almost_equal([0.12, 6.495, 0.8], world.min(axis=0))
+        np.testing.assert_array_almost_equal([0.12, 8.495, 2], world.max(axis=0))
+
+    def test_2(self):
+        ifcRel = [rel for rel in ifc.by_type("IfcRelSpaceBoundary") if rel.RelatedBuildingElement is not None and
+                  rel.RelatedBuildingElement.GlobalId == "1srAI$R4T8ihLXSNHmUSET"][0]
+        frame, rings = SpaceBoundaryShell.boundaryGeometry(ifcRel, 0.001)
+        world = SpaceBoundaryShell.planeToWorld(frame, rings[0])
+        np.testing.assert_array_almost_equal([0.00012, 0.006495, 0.0008], world.min(axis=0))
+        np.testing.assert_array_almost_equal([0.00012, 0.008495, 0.002], world.max(axis=0))
+
+    def test_3(self):
+        self.assertAlmostEqual(0.001, shellMm.scale)
+        faces = dict((face.ifcRel.id(), face) for face in shell.faces)
+        for faceMm in shellMm.faces:
+            if faceMm.ifcRel.id() in faces:
+                face = faces[faceMm.ifcRel.id()]
+                np.testing.assert_array_almost_equal(face.origin * 0.001, faceMm.origin)
+                np.testing.assert_array_almost_equal(face.rings[0] * 0.001, faceMm.rings[0])
+
+
+class TestPlaneToWorld(unittest.TestCase):
+
+    def test_1(self):
+        frame = np.array([[1, 0, 0, 5], [0, 0, 1, 2], [0, -1, 0, 0], [0, 0, 0, 1]], dtype=np.float64)
+        world = SpaceBoundaryShell.planeToWorld(frame, [[1, 2], [3, 4]])
+        np.testing.assert_array_almost_equal([[6, 2, -2], [8, 2, -4]], world)
+        local = SpaceBoundaryShell.worldToPlane(frame, world)
+        np.testing.assert_array_almost_equal([[1, 2, 0], [3, 4, 0]], local)
+
+
+class TestOrientRing(unittest.TestCase):
+
+    def test_1(self):
+        ring = [[0, 0], [1, 0], [1, 1], [0, 0]]
+        np.testing.assert_array_equal(ring[::-1], SpaceBoundaryShell.orientRing(ring, True))
+        np.testing.assert_array_equal(ring, SpaceBoundaryShell.orientRing(ring, False))
+
+
+class TestIsComplete(unittest.TestCase):
+
+    def test_1(self):
+        types = [face.type for face in shell.faces]
+        self.assertEqual(14, types.count("Wall"))
+        self.assertEqual(6, types.count("Base"))
+        self.assertEqual(2, types.count("Roof"))
+        self.assertEqual(13, sum(len(face.openings) for face in shell.faces))
+        self.assertTrue(shell.isComplete())
+
+    def test_2(self):
+        self.assertEqual(2, len(shell2.orphans))
+        self.assertFalse(shell2.isComplete())
+
+    def test_3(self):
+        self.assertEqual(0, len(shellLevel1.faces))
+        self.assertLess(0, len(shellLevel1.unsupported))
+        self.assertFalse(shellLevel1.isComplete())
+
+
+if __name__ == '__main__':
+    unittest.main()
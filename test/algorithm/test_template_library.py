@@ -0,0 +1,134 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse TemplateLibrary
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell
+
+# XML-Bibliotheken
+from lxml import etree
+# noinspection PyUnresolvedReferences
+from lxml.etree import QName
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.template_library import TemplateLibrary
+from algorithm.tessellation_profile import TessellationProfile
+from model.xmlns import XmlNs
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+
+class Transformer:
+    """ Einfacher Ersatz des Transformers mit Drehung um 90° und Verschiebung """
+    trans = np.array([[0, 1, 0], [-1, 0, 0], [0, 0, 1]], dtype=np.float64)
+    originShift = np.array([1000, 2000, 10], dtype=np.float64)
+
+    def georeferencePoints(self, points):
+        return np.atleast_2d(points) @ self.trans + self.originShift
+
+
+# IFC-Elemente
+ifc = ifcopenshell.open(r"data/IFC_test.ifc")
+ifcBeams = [ifcBeam for ifcBeam in ifc.by_type("IfcBeam") if TemplateLibrary.source(ifcBeam) is not None]
+ifcWall = ifc.by_type("IfcWall")[0]
+
+# Kopie mit Längeneinheit Millimeter
+ifcMm = ifcopenshell.open(r"data/IFC_test.ifc")
+for ifcUnit in ifcMm.by_type("IfcSIUnit"):
+    if ifcUnit.UnitType == "LENGTHUNIT":
+        ifcUnit.Prefix = "MILLI"
+ifcBeamsMm = [ifcMm.by_guid(ifcBeam.GlobalId) for ifcBeam in ifcBeams]
+
+#####
+
+
+class TestSource(unittest.TestCase):
+
+    def test_1(self):
+        self.assertIsNone(TemplateLibrary.source(ifcWall))
+
+    def test_2(self):
+        repMaps = set(TemplateLibrary.source(ifcBeam)[0].id() for ifcBeam in ifcBeams)
+        self.assertGreater(len(ifcBeams), len(repMaps))
+
+
+class TestTransformation(unittest.TestCase):
+
+    def test_1(self):
+        # Vorlage mit Platzierung muss die Weltgeometrie der Tessellierung ergeben
+        library = TemplateLibrary(Transformer())
+        for ifcBeam in ifcBeams:
+            repMap, matrix = TemplateLibrary.source(ifcBeam)
+            transMatrix, refPoint = library.transformation(matrix)
+            local = library.template(repMap).coords
+            result = local @ transMatrix[:3, :3].T + refPoint
+            shape = TessellationProfile.createShape(ifcBeam)
+            world = library.trans.georeferencePoints(np.asarray(shape.geometry.verts).reshape(-1, 3))
+            np.testing.assert_allclose(world.min(axis=0), result.min(axis=0), atol=0.001)
+            np.testing.assert_allclose(world.max(axis=0), result.max(axis=0), atol=0.001)
+
+    def test_2(self):
+        # Wie test_1 mit Längeneinheit Millimeter, Tessellierung in Meter
+        library = TemplateLibrary(Transformer(), 0.001)
+        for ifcBeam in ifcBeamsMm:
+            repMap, matrix = TemplateLibrary.source(ifcBeam, library.scale)
+            transMatrix, refPoint = library.transformation(matrix)
+            local = library.template(repMap).coords
+            result = local @ transMatrix[:3, :3].T + refPoint
+            shape = TessellationProfile.createShape(ifcBeam)
+            world = library.trans.georeferencePoints(np.asarray(shape.geometry.verts).reshape(-1, 3))
+            np.testing.assert_allclose(world.min(axis=0), result.min(axis=0), atol=0.000001)
+            np.testing.assert_allclose(world.max(axis=0), result.max(axis=0), atol=0.000001)
+
+
+class TestToXml(unittest.TestCase):
+
+    def test_1(self):
+        library = TemplateLibrary(Transformer())
+        repMap = TemplateLibrary.source(ifcBeams[0])[0]
+        chRoot = etree.Element(QName(XmlNs.core, "CityModel"))
+        sharing = [ifcBeam for ifcBeam in ifcBeams if TemplateLibrary.source(ifcBeam)[0] == repMap]
+        for ifcBeam in sharing:
+            chInst = etree.SubElement(chRoot, QName(XmlNs.bldg, "IntBuildingInstallation"))
+            self.assertTrue(library.toXml(chInst, ifcBeam))
+        self.assertEqual(1, len(chRoot.findall(".//" + QName(XmlNs.gml, "MultiSurface").text)))
+        self.assertEqual(len(sharing) - 1, len(chRoot.findall(".//*[@{%s}href]" % XmlNs.xlink)))
+        self.assertEqual(len(sharing), len(chRoot.findall(".//" + QName(XmlNs.core, "referencePoint").text)))
+
+    def test_2(self):
+        self.assertFalse(TemplateLibrary(Transformer()).toXml(etree.Element("test"), ifcWall))
+
+
+class TestPrune(unittest.TestCase):
+
+    def test_1(self):
+        library = TemplateLibrary(Transformer())
+        chRoot = etree.Element(QName(XmlNs.core, "CityModel"))
+        chInst = etree.SubElement(chRoot, QName(XmlNs.bldg, "IntBuildingInstallation"))
+        library.toXml(chInst, ifcBeams[0])
+        library.prune(chRoot)
+        self.assertEqual(1, len(library.gmlIds))
+        chRoot.remove(chInst)
+        library.prune(chRoot)
+        self.assertEqual(0, len(library.gmlIds))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse TessellationProfile
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell
+import ifcopenshell.geom
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.tessellation_profile import TessellationProfile
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# IFC-Elemente
+ifc = ifcopenshell.open(r"data/IFC_test.ifc")
+ifcSlabs = ifc.by_type("IfcSlab")
+ifcWalls = ifc.by_type("IfcWall")
+ifcSpaces = ifc.by_type("IfcSpace")
+
+# Bisherige Einstellungen als Referenz
+settingsRef = ifcopenshell.geom.settings()
+settingsRef.set(settingsRef.USE_WORLD_COORDS, True)
+
+
+def meshStats(shape):
+    """ Kennwerte eines Netzes: Ausdehnung sowie Flächeninhalt der nach oben und nach unten zeigenden Dreiecke """
+    verts = np.asarray(shape.geometry.verts).reshape(-1, 3)
+    tris = verts[np.asarray(shape.geometry.faces).reshape(-1, 3)]
+    cross = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    areaUp, areaDown = np.sum(cross[cross[:, 2] > 0, 2]) / 2, np.sum(-cross[cross[:, 2] < 0, 2]) / 2
+    return np.concatenate((verts.min(axis=0), verts.max(axis=0), [areaUp, areaDown]))
+
+#####
+
+
+class TestSettings(unittest.TestCase):
+
+    def test_1(self):
+        self.assertIs(TessellationProfile.settings(TessellationProfile.ROOF),
+                      TessellationProfile.settings(TessellationProfile.ROOF))
+
+
+class TestCreateShape(unittest.TestCase):
+
+    def test_1(self):
+        for ifcSlab in ifcSlabs:
+            reference = meshStats(ifcopenshell.geom.create_shape(settingsRef, ifcSlab))
+            for profile in [TessellationProfile.FOOTPRINT, TessellationProfile.ROOF]:
+                result = meshStats(TessellationProfile.createShape(ifcSlab, profile))
+                # Ausdehnung immer gleich, Flächeninhalte nur ohne Aussparungen (z.B. Treppenloch)
+                np.testing.assert_array_almost_equal(reference[:6], result[:6], 5)
+                if len(ifcSlab.HasOpenings) == 0:
+                    np.testing.assert_array_almost_equal(reference[6:], result[6:], 5)
+                else:
+                    self.assertGreater(result[6], reference[6])
+
+    def test_2(self):
+        for ifcWall in ifcWalls:
+            reference = np.asarray(ifcopenshell.geom.create_shape(settingsRef, ifcWall).geometry.verts)
+            result = np.asarray(TessellationProfile.createShape(ifcWall).geometry.verts)
+            np.testing.assert_array_almost_equal(reference, result)
+
+    def test_3(self):
+        ifcWall = ifc.by_guid("3rPX_Juz59peXXY6wDJl18")
+        detail = TessellationProfile.createShape(ifcWall, TessellationProfile.DETAIL)
+        footprint = TessellationProfile.createShape(ifcWall, TessellationProfile.FOOTPRINT)
+        self.assertLess(len(footprint.geometry.faces), len(detail.geometry.faces))
+
+
+class TestIterateShapes(unittest.TestCase):
+
+    def test_1(self):
+        shapes = dict((shape.id, shape) for shape in TessellationProfile.iterateShapes(
+            ifc, ifcSpaces, TessellationProfile.FOOTPRINT, threads=4))
+        self.assertEqual(set(ifcSpace.id() for ifcSpace in ifcSpaces), set(shapes.keys()))
+        for ifcSpace in ifcSpaces:
+            reference = meshStats(TessellationProfile.createShape(ifcSpace, TessellationProfile.FOOTPRINT))
+            np.testing.assert_array_almost_equal(reference, meshStats(shapes[ifcSpace.id()]))
+
+    def test_2(self):
+        self.assertEqual([], list(TessellationProfile.iterateShapes(ifc, [], threads=4)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse TimeBudget
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.time_budget import TimeBudget, BudgetExceeded, ConversionCanceled
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+
+class Task:
+    """ Einfacher Ersatz des zugrunde liegenden Tasks """
+
+    def __init__(self, canceled=False):
+        self.canceled = canceled
+        self.logging = None
+        self.progress = 0
+
+    def isCanceled(self):
+        return self.canceled
+
+    def setProgress(self, progress):
+        self.progress = progress
+
+
+#####
+
+
+class TestIsCanceled(unittest.TestCase):
+
+    def test_1(self):
+        budget = TimeBudget(Task(), None)
+        self.assertFalse(budget.isCanceled())
+
+    def test_2(self):
+        budget = TimeBudget(Task(), 0)
+        with self.assertRaises(BudgetExceeded):
+            budget.isCanceled()
+        self.assertTrue(budget.exceeded)
+
+    def test_3(self):
+        budget = TimeBudget(Task(canceled=True), None)
+        with self.assertRaises(ConversionCanceled):
+            budget.isCanceled()
+        self.assertFalse(budget.exceeded)
+
+    def test_4(self):
+        budget = TimeBudget(Task(), 3600)
+        self.assertFalse(budget.isCanceled())
+        budget.seconds = 0
+        with self.assertRaises(BudgetExceeded):
+            budget.isCanceled()
+        budget.seconds = 3600
+        with self.assertRaises(BudgetExceeded):
+            budget.isCanceled()
+
+
+class TestSetProgress(unittest.TestCase):
+
+    def test_1(self):
+        task = Task()
+        TimeBudget(task).setProgress(42.5)
+        self.assertEqual(42.5, task.progress)
+
+
+if __name__ == '__main__':
+    unittest.main()
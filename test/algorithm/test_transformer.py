@@ -89,5 +89,20 @@ class TestGeoreferencePoint(unittest.TestCase):
         np.testing.assert_array_almost_equal(corr, result)
 
 
+class TestGeoreferencePoints(unittest.TestCase):
+
+    def test_1(self):
+        trans = Transformer(ifc)
+        result = trans.georeferencePoints([[12, 34, 23], [-34, 12.123456789, 17.00000001]])
+        corr = [[458851.7312259316, 5438804.6763615385, 133], [458838.9214002475, 5438755.376346237, 127.00000001]]
+        np.testing.assert_array_almost_equal(corr, result)
+
+    def test_2(self):
+        trans = Transformer(ifc2)
+        result = trans.georeferencePoints([12, 34, 23])
+        corr = [[509740.99656973616, 6096753.890383066, 233]]
+        np.testing.assert_array_almost_equal(corr, result)
+
+
 if __name__ == '__main__':
     unittest.main()
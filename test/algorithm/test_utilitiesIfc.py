@@ -88,5 +88,20 @@ class TestFindElement(unittest.TestCase):
         self.assertEqual(13, len(result))
 
 
+class TestFindHostElement(unittest.TestCase):
+
+    def test_1(self):
+        result = UtilitiesIfc.findHostElement(ifc.by_guid("1srAI$R4T8ihLXSNHmUSET"))
+        self.assertEqual("3rPX_Juz59peXXY6wDJl18", result.GlobalId)
+
+    def test_2(self):
+        result = UtilitiesIfc.findHostElement(ifc.by_guid("1Oms875aH3Wg$9l65H2ZGw"))
+        self.assertEqual("3PfS__Y_DBAfq5naM6zD2Z", result.GlobalId)
+
+    def test_3(self):
+        result = UtilitiesIfc.findHostElement(ifcBldg)
+        self.assertIsNone(result)
+
+
 if __name__ == '__main__':
     unittest.main()
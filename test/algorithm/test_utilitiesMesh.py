@@ -0,0 +1,129 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse UtilitiesMesh
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import numpy as np
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.utilitiesMesh import UtilitiesMesh
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# Dreiecke
+triUp = [[0, 0, 5], [10, 0, 5], [10, 10, 5]]
+triDown = [[0, 0, 0], [10, 10, 0], [10, 0, 0]]
+triSide = [[0, 0, 0], [10, 0, 0], [10, 0, 5]]
+triDegen = [[0, 0, 0], [5, 5, 0], [10, 10, 0]]
+triNoise = [[0.00049, 0.0001, 0], [9.9996, 0.0004, 0], [0.0001, 10.0004, 0]]
+
+#####
+
+
+class TestSnapToGrid(unittest.TestCase):
+
+    def test_1(self):
+        result = UtilitiesMesh.snapToGrid([[0.00049, 1.0006], [2.4, -0.0004]], 0.001)
+        np.testing.assert_array_almost_equal([[0, 1.001], [2.4, 0]], result)
+
+    def test_2(self):
+        result = UtilitiesMesh.snapToGrid([12.26, 12.24], 0.5)
+        np.testing.assert_array_almost_equal([12.5, 12], result)
+
+
+class TestFootprintTriangles(unittest.TestCase):
+
+    def test_1(self):
+        result = UtilitiesMesh.footprintTriangles([triUp, triDown, triSide, triDegen])
+        self.assertEqual((2, 3, 2), result.shape)
+        self.assertTrue(np.all(UtilitiesMesh.signedAreas2D(result) > 0))
+
+    def test_2(self):
+        result = UtilitiesMesh.footprintTriangles([triNoise])
+        np.testing.assert_array_almost_equal([[[0, 0], [10, 0], [0, 10]]], result)
+
+    def test_3(self):
+        result1 = UtilitiesMesh.footprintTriangles([triUp, triDown])
+        result2 = UtilitiesMesh.footprintTriangles([triDown, triUp])
+        np.testing.assert_array_equal(result1, result2)
+
+    def test_4(self):
+        result = UtilitiesMesh.footprintTriangles([])
+        self.assertEqual(0, len(result))
+
+
+class TestSignedAreas2D(unittest.TestCase):
+
+    def test_1(self):
+        result = UtilitiesMesh.signedAreas2D(np.array([[[0, 0], [10, 0], [10, 10]], [[0, 0], [10, 10], [10, 0]]]))
+        np.testing.assert_array_almost_equal([50, -50], result)
+
+
+class TestTrianglesToWkt(unittest.TestCase):
+
+    def test_1(self):
+        result = UtilitiesMesh.trianglesToWkt(np.array([[[0, 0], [10, 0], [10, 10]]]))
+        self.assertEqual("MULTIPOLYGON(((0.000 0.000,10.000 0.000,10.000 10.000,0.000 0.000)))", result)
+
+    def test_2(self):
+        result = UtilitiesMesh.trianglesToWkt(np.array([[[0, 0], [1, 0], [1, 1]], [[0, 0], [1, 1], [0, 1]]]), 0.1)
+        self.assertEqual("MULTIPOLYGON(((0.0 0.0,1.0 0.0,1.0 1.0,0.0 0.0)),((0.0 0.0,1.0 1.0,0.0 1.0,0.0 0.0)))",
+                         result)
+
+
+class TestClassifyFacets(unittest.TestCase):
+
+    def test_1(self):
+        normals, orientation, planeIds = UtilitiesMesh.classifyFacets([triUp, triDown, triSide, triDegen])
+        np.testing.assert_array_almost_equal([[0, 0, 1], [0, 0, -1], [0, -1, 0], [0, 0, 0]], normals)
+        self.assertEqual([1, -1, 0, 0], list(orientation))
+        self.assertEqual(-1, planeIds[3])
+        self.assertEqual(3, len(set(planeIds[:3])))
+
+    def test_2(self):
+        triUp2 = [[20, 20, 5], [30, 20, 5], [30, 30, 5]]
+        triUpRev = [[20, 20, 5], [30, 30, 5], [30, 20, 5]]
+        normals, orientation, planeIds = UtilitiesMesh.classifyFacets([triUp, triUp2, triUpRev, triDown])
+        self.assertEqual(planeIds[0], planeIds[1])
+        self.assertEqual(planeIds[0], planeIds[2])
+        self.assertNotEqual(planeIds[0], planeIds[3])
+
+    def test_3(self):
+        normals, orientation, planeIds = UtilitiesMesh.classifyFacets([])
+        self.assertEqual(0, len(planeIds))
+
+
+class TestNearestPoints(unittest.TestCase):
+
+    def test_1(self):
+        points = [[0, 0, 0], [10, 0, 0], [10, 10, 0]]
+        indices, dists = UtilitiesMesh.nearestPoints(points, [[9, 1, 0], [1, 0, 0], [10, 10, 3]])
+        self.assertEqual([1, 0, 2], list(indices))
+        np.testing.assert_array_almost_equal([np.sqrt(2), 1, 3], dists)
+
+    def test_2(self):
+        points = np.array([[458851.73, 5438804.67, 133], [458851.74, 5438804.67, 133]])
+        indices, dists = UtilitiesMesh.nearestPoints(points, [[458851.741, 5438804.67, 133]] * 5, chunk=2)
+        self.assertEqual([1] * 5, list(indices))
+
+    def test_3(self):
+        indices, dists = UtilitiesMesh.nearestPoints([], [[0, 0, 0]])
+        self.assertEqual([-1], list(indices))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse VertexWelder
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import numpy as np
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.vertex_welder import VertexWelder
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+#####
+
+
+class TestWeld(unittest.TestCase):
+
+    def test_1(self):
+        welder = VertexWelder(0.0001)
+        result = [welder.weld([10, 10, 10]), welder.weld([20, 20, 20]), welder.weld([10.00005, 9.99995, 10])]
+        self.assertEqual([0, 1, 0], result)
+        self.assertEqual(2, len(welder))
+
+    def test_2(self):
+        # Punkte auf verschiedenen Seiten einer Zellgrenze
+        welder = VertexWelder(0.001)
+        result = [welder.weld([0.00099, 0, 0]), welder.weld([0.00101, 0, 0])]
+        self.assertEqual([0, 0], result)
+
+    def test_3(self):
+        welder = VertexWelder(0.0001)
+        result = [welder.weld([10, 10, 10]), welder.weld([10.0002, 10, 10]), welder.weld([10, 10])]
+        self.assertEqual([0, 1, 2], result)
+
+
+class TestWeldPoints(unittest.TestCase):
+
+    def test_1(self):
+        welder = VertexWelder(0.0001)
+        result = welder.weldPoints([[0, 0, 0], [1, 0, 0], [0, 0, 0.00001], [1, 0, 0]])
+        self.assertEqual([0, 1, 0, 1], list(result))
+        np.testing.assert_array_almost_equal([[0, 0, 0], [1, 0, 0]], welder.getPoints())
+
+    def test_2(self):
+        welder = VertexWelder()
+        result = welder.weldPoints([])
+        self.assertEqual(0, len(result))
+        self.assertEqual((0, 3), welder.getPoints().shape)
+
+    def test_3(self):
+        # Punkte auf verschiedenen Seiten einer Zellgrenze
+        welder = VertexWelder(0.001)
+        result = welder.weldPoints([[0.00099, 0, 0], [5, 5, 5], [0.00101, 0, 0], [5, 5, 5]])
+        self.assertEqual([0, 1, 0, 1], list(result))
+
+    def test_4(self):
+        # Bereits verschweißte Punkte werden berücksichtigt
+        welder = VertexWelder(0.0001)
+        welder.weld([0, 0, 0])
+        result = welder.weldPoints([[0.00005, 0, 0], [5, 5, 0], [-0.00005, 0, 0]])
+        self.assertEqual([0, 1, 0], list(result))
+        self.assertEqual(1, welder.weld([5, 5, 0.00001]))
+
+    def test_5(self):
+        # Gleiches Ergebnis wie das punktweise Verschweißen
+        rng = np.random.default_rng(1)
+        points = rng.uniform(0, 1, (2000, 3)).round(3)
+        points = np.concatenate((points, points + rng.uniform(-0.00003, 0.00003, points.shape), points[:100]))
+        welder1, welder2 = VertexWelder(0.0001), VertexWelder(0.0001)
+        expected = [welder1.weld(point) for point in points]
+        result = welder2.weldPoints(points)
+        self.assertEqual(expected, list(result))
+        np.testing.assert_array_equal(welder1.getPoints(), welder2.getPoints())
+
+
+if __name__ == '__main__':
+    unittest.main()
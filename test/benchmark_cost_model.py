@@ -0,0 +1,95 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Kalibrierung der Koeffizienten des CostModel über gemessene Konvertierungen (benötigt QGIS-Python)
+Die Koeffizienten werden samt Herkunft in algorithm/cost_model.json geschrieben und vom CostModel übernommen.
+Aufruf: python benchmark_cost_model.py [IFC-Dateien]
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import os
+import sys
+import time
+import platform
+from datetime import date
+
+# IFC-Bibliotheken
+import ifcopenshell
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.convert_starter import ConvertStarter
+from algorithm.converter_lod0 import LoD0Converter
+from algorithm.converter_lod1 import LoD1Converter
+from algorithm.converter_lod2 import LoD2Converter
+from algorithm.converter_lod3 import LoD3Converter
+from algorithm.converter_lod4 import LoD4Converter
+from algorithm.cost_model import CostModel
+from algorithm.transformer import Transformer
+
+#####
+
+CONVERTERS = [LoD0Converter, LoD1Converter, LoD2Converter, LoD3Converter, LoD4Converter]
+
+
+class Logging:
+    """ Ersatz des Logging-Signals """
+
+    def emit(self, msg):
+        pass
+
+
+class Task:
+    """ Ersatz des zugrunde liegenden Tasks """
+    logging = Logging()
+
+    def isCanceled(self):
+        return False
+
+    def setProgress(self, progress):
+        pass
+
+
+def measure(path, lod, eade):
+    """ Konvertiert eine Datei und gibt die summierten Eingangsgrößen und die Laufzeit zurück
+
+    Da das Modell linear ist, kann jede Datei als eine Messung mit den Summen ihrer Gebäude eingehen.
+    """
+    ifc = ifcopenshell.open(path)
+    counts = {}
+    for ifcBuilding in ifc.by_type("IfcBuilding"):
+        for key, count in CostModel.countInputs(ifc, ifcBuilding).items():
+            counts[key] = counts.get(key, 0) + count
+    conv = CONVERTERS[lod](Task(), ifc, "benchmark", Transformer(ifc), eade)
+    start = time.perf_counter()
+    conv.convert(ConvertStarter.createSchema())
+    return counts, time.perf_counter() - start
+
+
+def main(paths):
+    coefficients, samplesEade = {}, []
+    for lod in range(0, len(CONVERTERS)):
+        samples = [measure(path, lod, False) for path in paths]
+        coefficients[lod] = CostModel.calibrate(samples, list(CostModel.coefficients[lod].keys()))
+        print("LoD%d  gemessen %s" % (lod, ", ".join("%.2f s" % sample[1] for sample in samples)))
+        print("      Koeffizienten %s" % coefficients[lod])
+
+        # Mehraufwand der EnergyADE als Differenz zur Konvertierung ohne
+        for (counts, seconds), (_, secondsEade) in zip(samples, [measure(path, lod, True) for path in paths]):
+            samplesEade.append((counts, max(secondsEade - seconds, 0)))
+    coefficientsEade = CostModel.calibrate(samplesEade, list(CostModel.coefficientsEade.keys()))
+    print("EnergyADE  Koeffizienten %s" % coefficientsEade)
+
+    source = {"models": [os.path.basename(path) for path in paths], "date": date.today().isoformat(),
+              "system": platform.platform(), "cpus": os.cpu_count()}
+    CostModel.saveCalibration(CostModel.calibrationPath, coefficients, coefficientsEade, source)
+    print("Gespeichert in %s" % CostModel.calibrationPath)
+
+if __name__ == '__main__':
+    main(sys.argv[1:] if len(sys.argv) > 1 else [r"data/IFC_test.ifc", r"data/IFC_test2.ifc"])
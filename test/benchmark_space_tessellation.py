@@ -0,0 +1,60 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Laufzeitvergleich der Tessellierung der Raumkörper (LoD4) nacheinander gegenüber dem parallelen
+ifcopenshell-Iterator mit steigender Anzahl an Threads
+Aufruf: python benchmark_space_tessellation.py [IFC-Dateien]
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import os
+import sys
+import time
+
+# IFC-Bibliotheken
+import ifcopenshell
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.tessellation_profile import TessellationProfile
+
+#####
+
+
+def measure(function, repeat):
+    """ Misst die mittlere Laufzeit einer Funktion und gibt deren Ergebnis zurück """
+    start, result = time.perf_counter(), None
+    for _ in range(0, repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(paths, repeat=5):
+    profile = TessellationProfile.FOOTPRINT
+    print("CPU-Kerne: %d" % (os.cpu_count() or 1))
+    for path in paths:
+        ifc = ifcopenshell.open(path)
+        ifcSpaces = ifc.by_type("IfcSpace")
+        print("%s: %d Räume" % (path, len(ifcSpaces)))
+        if len(ifcSpaces) == 0:
+            continue
+        timeSeq, shapes = measure(lambda: [TessellationProfile.createShape(ifcSpace, profile)
+                                           for ifcSpace in ifcSpaces], repeat)
+        print("  nacheinander      %7.3f s  (%d Formen)" % (timeSeq, len(shapes)))
+        threads = 1
+        while threads <= max(os.cpu_count() or 1, 1):
+            timePar, shapes = measure(lambda: list(TessellationProfile.iterateShapes(ifc, ifcSpaces, profile, threads)),
+                                      repeat)
+            print("  Iterator %2d Thr.  %7.3f s  (%d Formen)  x%.2f" % (threads, timePar, len(shapes),
+                                                                       timeSeq / timePar))
+            threads *= 2
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] if len(sys.argv) > 1 else [r"data/IFC_test.ifc", r"data/IFC_test2.ifc"])
@@ -0,0 +1,143 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Laufzeitvergleich der Tessellierungs-Profile gegenüber den bisherigen Einstellungen mit Prüfung der geometrischen
+Gleichwertigkeit je Bauteil (Bounding Box und gerichteter Hausdorff-Abstand vom Profil zur bisherigen Geometrie)
+Aufruf: python benchmark_tessellation.py [IFC-Dateien]
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import sys
+import time
+import numpy as np
+
+# IFC-Bibliotheken
+import ifcopenshell
+import ifcopenshell.geom
+
+# Plugin
+sys.path.insert(0, '..')
+from algorithm.tessellation_profile import TessellationProfile
+
+#####
+
+# Verwendungszwecke: IFC-Klassen und Profil
+USES = [
+    ("LoD0-2 Grundfläche", ["IfcSlab"], TessellationProfile.FOOTPRINT),
+    ("LoD2 Dach", ["IfcSlab", "IfcRoof"], TessellationProfile.ROOF),
+    ("LoD3-4 Wand", ["IfcWall"], TessellationProfile.DETAIL),
+]
+
+# Maximale Abweichung je Bauteil in Meter: Bounding Box und Abstand der Profil-Vertizes zur bisherigen Geometrie.
+# Weggelassene Öffnungsausschnitte entfernen nur Geometrie und werden daher nur in Fläche und Volumen sichtbar.
+TOLERANCE = 0.01
+
+
+def measure(settings, ifcElements, repeat):
+    """ Misst die Laufzeit der Tessellierung, zählt die erzeugten Dreiecke und gibt die Geometrien zurück """
+    start, triCount, meshes = time.perf_counter(), 0, []
+    for _ in range(0, repeat):
+        meshes = []
+        for ifcElement in ifcElements:
+            geometry = ifcopenshell.geom.create_shape(settings, ifcElement).geometry
+            triCount += len(geometry.faces) // 3
+            verts = np.asarray(geometry.verts, dtype=np.float64).reshape(-1, 3)
+            meshes.append(verts[np.asarray(geometry.faces, dtype=np.int64).reshape(-1, 3)])
+    return time.perf_counter() - start, triCount // repeat, meshes
+
+
+def pointTriangleDistance(pts, tris, chunk=256):
+    """ Berechnet je Punkt den kleinsten Abstand zu einer Menge von Dreiecken
+
+    Args:
+        pts: Die Punkte, als Array der Form (n, 3)
+        tris: Die Dreiecke, als Array der Form (m, 3, 3)
+        chunk: Anzahl der gleichzeitig verarbeiteten Punkte, als int
+
+    Returns:
+        Die Abstände, als Array der Form (n,)
+    """
+    a, b, c = tris[:, 0], tris[:, 1], tris[:, 2]
+    ab, ac = b - a, c - a
+    normal = np.cross(ab, ac)
+    normLen = np.linalg.norm(normal, axis=1)
+    valid = normLen > 1e-12
+    normal[valid] /= normLen[valid, None]
+    dot00, dot01, dot11 = np.einsum("ij,ij->i", ab, ab), np.einsum("ij,ij->i", ab, ac), np.einsum("ij,ij->i", ac, ac)
+    denom = np.where(valid, dot00 * dot11 - dot01 * dot01, 1)
+
+    def segment(p, s, e):
+        d = e - s
+        t = np.clip(np.einsum("nmj,mj->nm", p - s, d) / np.maximum(np.einsum("ij,ij->i", d, d), 1e-24), 0, 1)
+        return np.linalg.norm(p - (s + t[..., None] * d), axis=2)
+
+    result = []
+    for k in range(0, len(pts), chunk):
+        p = pts[k:k + chunk, None, :]
+        ap = p - a
+        dot02, dot12 = np.einsum("nmj,mj->nm", ap, ab), np.einsum("nmj,mj->nm", ap, ac)
+        u, v = (dot11 * dot02 - dot01 * dot12) / denom, (dot00 * dot12 - dot01 * dot02) / denom
+        inside = valid & (u >= 0) & (v >= 0) & (u + v <= 1)
+        dist = np.minimum(np.minimum(segment(p, a, b), segment(p, b, c)), segment(p, c, a))
+        dist = np.where(inside, np.abs(np.einsum("nmj,mj->nm", ap, normal)), dist)
+        result.append(dist.min(axis=1))
+    return np.concatenate(result) if len(result) > 0 else np.zeros(0)
+
+
+def compare(trisRef, trisProf):
+    """ Vergleicht die Geometrie eines Bauteils aus beiden Einstellungen
+
+    Returns:
+        Abweichung der Bounding Box, gerichteter Hausdorff-Abstand vom Profil zur bisherigen Geometrie sowie relative
+        Abweichung von Oberfläche und Volumen, als Tupel
+    """
+    if len(trisRef) == 0 or len(trisProf) == 0:
+        return (0.0, 0.0, 0.0, 0.0) if len(trisRef) == len(trisProf) else (np.inf, np.inf, 1.0, 1.0)
+    ptsRef, ptsProf = trisRef.reshape(-1, 3), trisProf.reshape(-1, 3)
+    boxDev = max(np.abs(ptsRef.min(axis=0) - ptsProf.min(axis=0)).max(),
+                 np.abs(ptsRef.max(axis=0) - ptsProf.max(axis=0)).max())
+    hausdorff = pointTriangleDistance(np.unique(ptsProf, axis=0), trisRef).max()
+
+    def areaVolume(tris):
+        cross = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+        return np.linalg.norm(cross, axis=1).sum() / 2, abs(np.einsum("ij,ij->", tris[:, 0], cross)) / 6
+
+    areaRef, volRef = areaVolume(trisRef)
+    areaProf, volProf = areaVolume(trisProf)
+    return boxDev, hausdorff, abs(areaProf - areaRef) / max(areaRef, 1e-12), abs(volProf - volRef) / max(volRef, 1e-12)
+
+
+def main(paths, repeat=5):
+    settingsRef = ifcopenshell.geom.settings()
+    settingsRef.set(settingsRef.USE_WORLD_COORDS, True)
+    equivalent = True
+    for path in paths:
+        ifc = ifcopenshell.open(path)
+        print(path)
+        for name, types, profile in USES:
+            ifcElements = [ifcElement for type in types for ifcElement in ifc.by_type(type)]
+            if len(ifcElements) == 0:
+                continue
+            timeRef, trisRef, meshesRef = measure(settingsRef, ifcElements, repeat)
+            timeProf, trisProf, meshesProf = measure(TessellationProfile.settings(profile), ifcElements, repeat)
+            print("  %-20s %4d Elemente  bisher %7.3f s (%6d Dreiecke)  %-9s %7.3f s (%6d Dreiecke)  x%.2f" % (
+                name, len(ifcElements), timeRef, trisRef, profile, timeProf, trisProf, timeRef / timeProf))
+
+            # Geometrische Gleichwertigkeit je Bauteil
+            devs = np.array([compare(meshRef, meshProf) for meshRef, meshProf in zip(meshesRef, meshesProf)])
+            failed = [ifcElement.GlobalId for ifcElement, dev in zip(ifcElements, devs) if dev[:2].max() > TOLERANCE]
+            equivalent = equivalent and len(failed) == 0
+            print("  %-20s max. Abweichung  Bounding Box %.6f m  Hausdorff %.6f m  Fläche %.2f %%  Volumen %.2f %%  %s"
+                  % ("", devs[:, 0].max(), devs[:, 1].max(), devs[:, 2].max() * 100, devs[:, 3].max() * 100,
+                   "OK" if len(failed) == 0 else "ABWEICHUNG: " + ", ".join(failed)))
+    return equivalent
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main(sys.argv[1:] if len(sys.argv) > 1 else [r"data/IFC_test.ifc", r"data/IFC_test2.ifc"]) else 1)
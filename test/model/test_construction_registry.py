@@ -0,0 +1,101 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse ConstructionRegistry
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+
+# IFC-Bibliotheken
+import ifcopenshell
+
+# Plugin
+sys.path.insert(0, '..')
+from model.construction_registry import ConstructionRegistry
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# IFC-Elemente
+ifc = ifcopenshell.open(r"data/IFC_test.ifc")
+ifcWalls = ifc.by_type("IfcWall")
+ifcWindows = ifc.by_type("IfcWindow")
+ifcMLS = ifc.by_type("IfcMaterialLayerSet")
+ifcMat = ifc.by_type("IfcMaterial")[0]
+
+#####
+
+
+class TestAddLayer(unittest.TestCase):
+
+    def test_1(self):
+        registry = ConstructionRegistry()
+        result1 = registry.addLayer(ifcMLS[0], ifcWalls[0])
+        result2 = registry.addLayer(ifcMLS[0], ifcWalls[1])
+        self.assertEqual(result1, result2)
+        self.assertEqual(1, len(registry.constructions))
+        self.assertEqual([ifcWalls[0], ifcWalls[1]], list(registry.constructions.values())[0].ifcElems)
+
+    def test_2(self):
+        registry = ConstructionRegistry()
+        result1 = registry.addLayer(ifcMLS[0], ifcWalls[0])
+        result2 = registry.addLayer(ifcMLS[1], ifcWalls[1])
+        self.assertNotEqual(result1, result2)
+        self.assertEqual(2, len(registry.constructions))
+
+
+class TestAddOptical(unittest.TestCase):
+
+    def test_1(self):
+        registry = ConstructionRegistry()
+        result1 = registry.addOptical([3.0, 0.2, None, 0.8, 0.85, 0.7], ifcWindows[0])
+        result2 = registry.addOptical([3.0, 0.2, None, 0.8, 0.85, 0.7], ifcWindows[0])
+        result3 = registry.addOptical([2.4, 0.2, None, 0.8, 0.85, 0.7], ifcWindows[0])
+        self.assertEqual(result1, result2)
+        self.assertNotEqual(result1, result3)
+        self.assertEqual("optical", registry.constructions[("optical", (3.0, 0.2, None, 0.8, 0.85, 0.7))].type)
+
+
+class TestAddMaterial(unittest.TestCase):
+
+    def test_1(self):
+        registry = ConstructionRegistry()
+        self.assertEqual(registry.addMaterial(ifcMat), registry.addMaterial(ifcMat))
+        self.assertEqual(1, len(registry.materials))
+
+    def test_2(self):
+        self.assertEqual(ConstructionRegistry.materialKey(ifcMLS[0].MaterialLayers[0].Material),
+                         ConstructionRegistry.materialKey(ifcMLS[1].MaterialLayers[0].Material))
+
+
+class TestTake(unittest.TestCase):
+
+    def test_1(self):
+        registry = ConstructionRegistry()
+        registry.addLayer(ifcMLS[0], ifcWalls[0])
+        self.assertEqual(1, len(registry.takeConstructions()))
+        registry.addLayer(ifcMLS[0], ifcWalls[1])
+        registry.addLayer(ifcMLS[2], ifcWalls[1])
+        result = registry.takeConstructions()
+        self.assertEqual(1, len(result))
+        self.assertEqual(ifcMLS[2], result[0].ifcMLS)
+
+    def test_2(self):
+        registry = ConstructionRegistry()
+        registry.addMaterial(ifcMat)
+        self.assertEqual(1, len(registry.takeMaterials()))
+        self.assertEqual(0, len(registry.takeMaterials()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse Envelope
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+
+# Plugin
+sys.path.insert(0, '..')
+from model.envelope import Envelope
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+
+class Geometry:
+    """ Einfacher Ersatz einer OGR-Geometrie mit fester Bounding Box """
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+
+    def IsEmpty(self):
+        return self.bounds is None
+
+    def GetEnvelope3D(self):
+        return self.bounds
+
+
+#####
+
+
+class TestConstructor(unittest.TestCase):
+
+    def test_1(self):
+        result = Envelope()
+        self.assertTrue(result.isEmpty())
+        self.assertIsNone(result.bounds)
+
+    def test_2(self):
+        result = Envelope([Geometry((10, 20, 10, 20, 10, 10)), Geometry((50, 90, 50, 90, 10, 20))])
+        self.assertEqual((10, 90, 10, 90, 10, 20), result.bounds)
+
+
+class TestAdd(unittest.TestCase):
+
+    def test_1(self):
+        result = Envelope()
+        result.add(Geometry(None))
+        result.add(None)
+        self.assertTrue(result.isEmpty())
+
+    def test_2(self):
+        result = Envelope()
+        result.addBounds((0, 5, -2, 3, 1, 4))
+        result.addBounds((1, 2, -5, 1, 0, 6))
+        self.assertEqual((0, 5, -5, 3, 0, 6), result.bounds)
+
+
+if __name__ == '__main__':
+    unittest.main()
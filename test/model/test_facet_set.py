@@ -0,0 +1,89 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse FacetSet
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import numpy as np
+
+# Plugin
+sys.path.insert(0, '..')
+from model.facet_set import FacetSet
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# Dreiecke
+tris = np.array([[[0, 0, 5], [10, 0, 5], [10, 10, 5]], [[0, 0, 5], [10, 10, 5], [0, 10, 5]],
+                 [[0, 0, 0], [10, 10, 0], [10, 0, 0]], [[0, 0, 0], [10, 0, 0], [10, 0, 5]]], dtype=np.float64)
+normals = np.array([[0, 0, 1], [0, 0, 1], [0, 0, -1], [0, -1, 0]], dtype=np.float64)
+orientation = np.array([1, 1, -1, 0], dtype=np.int8)
+planeIds = np.array([2, 2, 1, 0])
+
+#####
+
+
+class TestConstructor(unittest.TestCase):
+
+    def test_1(self):
+        result = FacetSet(None, tris, normals, orientation, planeIds)
+        self.assertIsNone(result.ifcElem)
+        self.assertEqual(4, len(result))
+        self.assertEqual(0, result.minHeight())
+
+
+class TestSelect(unittest.TestCase):
+
+    def test_1(self):
+        result = FacetSet(None, tris, normals, orientation, planeIds).select(FacetSet.UP)
+        self.assertEqual([0, 1], list(result))
+
+    def test_2(self):
+        result = FacetSet(None, tris, normals, orientation, planeIds).select([FacetSet.DOWN, FacetSet.VERTICAL])
+        self.assertEqual([2, 3], list(result))
+
+
+class TestGroups(unittest.TestCase):
+
+    def test_1(self):
+        result = FacetSet(None, tris, normals, orientation, planeIds).groups()
+        self.assertEqual([0, 1, 2], sorted(result.keys()))
+        self.assertEqual([0, 1], list(result[2]))
+
+    def test_2(self):
+        result = FacetSet(None, tris, normals, orientation, planeIds).groups([FacetSet.UP, FacetSet.DOWN])
+        self.assertEqual([1, 2], sorted(result.keys()))
+
+
+class TestMesh(unittest.TestCase):
+
+    def test_1(self):
+        verts, faces = FacetSet(None, tris, normals, orientation, planeIds).mesh()
+        self.assertEqual((7, 3), verts.shape)
+        self.assertEqual([[0, 1, 2], [0, 2, 3]], faces[:2].tolist())
+        self.assertTrue(np.array_equal(tris, verts[faces]))
+
+    def test_2(self):
+        verts, faces = FacetSet(None, tris, normals, orientation, planeIds).mesh(np.array([2]))
+        self.assertEqual([[0, 1, 2]], faces.tolist())
+        self.assertTrue(np.array_equal(tris[2], verts[faces[0]]))
+
+    def test_3(self):
+        verts, faces = FacetSet(None, tris[:0], normals[:0], orientation[:0], planeIds[:0]).mesh()
+        self.assertEqual(0, len(verts))
+        self.assertEqual(0, len(faces))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse SiteRegistry
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+
+# Plugin
+sys.path.insert(0, '..')
+from model.site_registry import SiteRegistry
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+#####
+
+
+class TestFind(unittest.TestCase):
+
+    def test_1(self):
+        registry = SiteRegistry()
+        self.assertIsNone(registry.find(("WeatherData", 1)))
+
+    def test_2(self):
+        registry = SiteRegistry()
+        gmlId = registry.add(("WeatherData", 1))
+        self.assertEqual(gmlId, registry.find(("WeatherData", 1)))
+        self.assertIsNone(registry.find(("WeatherData", 2)))
+
+
+class TestAdd(unittest.TestCase):
+
+    def test_1(self):
+        registry = SiteRegistry()
+        result1 = registry.add(("DualValueSchedule", "Heating", "8", "200", "21.0", "17.0"))
+        result2 = registry.add(("DualValueSchedule", "Cooling", "5", "50", "17.0", "21.0"))
+        self.assertTrue(result1.startswith("GML_"))
+        self.assertNotEqual(result1, result2)
+        self.assertEqual(2, len(registry.gmlIds))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# coding=utf-8
+"""
+/***************************************************************************
+@title: IFC-to-CityGML
+@organization: Jade Hochschule Oldenburg
+@author: Nicklas Meyer
+@version: v1.0 (09.09.2022)
+
+Unit-Tests für die Modelklasse SurfaceArray
+ ***************************************************************************/
+"""
+
+# Standard-Bibliotheken
+import unittest
+import logging
+import sys
+import numpy as np
+
+# Plugin
+sys.path.insert(0, '..')
+from model.surface_array import SurfaceArray
+
+#####
+
+LOGGER = logging.getLogger('QGIS')
+
+# Geometrien
+poly1 = [[[10, 10, 10], [10, 20, 10], [20, 20, 10], [20, 15, 10], [10, 10, 10]]]
+poly2 = [[[0, 0, 0], [0, 20, 0], [20, 20, 0], [20, 0, 0], [0, 0, 0]],
+         [[5, 5, 0], [5, 15, 0], [15, 15, 0], [15, 5, 0], [5, 5, 0]]]
+
+#####
+
+
+class TestConstructor(unittest.TestCase):
+
+    def test_1(self):
+        result = SurfaceArray(np.zeros((4, 3)), [0, 4], [0, 1], "Dach-01", None, "Roof")
+        self.assertEqual((4, 3), result.coords.shape)
+        self.assertEqual("Dach-01", result.name)
+        self.assertIsNone(result.ifcElem)
+        self.assertEqual("Roof", result.type)
+        self.assertIsNone(result.gmlId)
+        self.assertEqual([], result.openings)
+
+    def test_2(self):
+        result = SurfaceArray([], [0], [0])
+        self.assertEqual(0, result.polygonCount)
+        with self.assertRaises(AttributeError):
+            result.foo = 1
+
+
+class TestFromPolygons(unittest.TestCase):
+
+    def test_1(self):
+        result = SurfaceArray.fromPolygons([poly1], "Dach-01", None, "Roof")
+        self.assertEqual(1, result.polygonCount)
+        self.assertEqual([0, 5], list(result.ringOffsets))
+        self.assertEqual([0, 1], list(result.polyOffsets))
+        self.assertEqual(np.float64, result.coords.dtype)
+
+    def test_2(self):
+        result = SurfaceArray.fromPolygons([poly1, poly2])
+        self.assertEqual(2, result.polygonCount)
+        self.assertEqual([0, 5, 10, 15], list(result.ringOffsets))
+        self.assertEqual([0, 1, 3], list(result.polyOffsets))
+        self.assertEqual(15 * 3 * 8 + 4 * 8 + 3 * 8, result.nbytes)
+
+
+class TestRing(unittest.TestCase):
+
+    def test_1(self):
+        result = SurfaceArray.fromPolygons([poly1, poly2])
+        self.assertEqual(poly1[0], result.ring(0).tolist())
+        self.assertEqual(poly2[1], result.ring(1, 1).tolist())
+
+    def test_2(self):
+        surface = SurfaceArray.fromPolygons([poly1, poly2])
+        result = surface.polygon(1)
+        self.assertEqual(2, len(result))
+        self.assertTrue(np.shares_memory(result[0], surface.coords))
+
+
+class TestCompact(unittest.TestCase):
+
+    def test_1(self):
+        opening = SurfaceArray.fromPolygons([poly1], "Fenster-01", None, "ifcWindow")
+        wall = SurfaceArray.fromPolygons([poly2], "Wand-01", None, "Wall")
+        wall.openings.append(opening)
+        wall._ogr = []
+        result = SurfaceArray.compact([opening, wall])
+        self.assertIs(wall, result[1])
+        self.assertIs(result[0], result[1].openings[0])
+        self.assertIsNone(wall._ogr)
+
+    def test_2(self):
+        result = SurfaceArray.compact([])
+        self.assertEqual([], result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -45,9 +45,10 @@ class DialogVM(QtWidgets.QDialog, FORM_CLASS):
         self.setupUi(self)
 
         # Datei-Format-Filter für die Dateiauswahlen und ReadOnly für die Textfelder setzen
-        self.fileWidget_ifc.setFilter("Industry Foundation Classes (*.ifc)")
+        self.fileWidget_ifc.setFilter("Industry Foundation Classes (*.ifc *.ifczip *.ifc.gz *.zip)")
         self.fileWidget_ifc.lineEdit().setReadOnly(True)
-        self.fileWidget_cgml.setFilter("Geography Markup Language (*.gml)")
+        self.fileWidget_cgml.setFilter("Geography Markup Language (*.gml *.gml.gz *.zip);;CityJSON (*.json *.json.gz);;"
+                                       "CityJSONSeq (*.city.jsonl *.jsonl *.jsonl.gz);;GeoPackage (*.gpkg)")
         self.fileWidget_cgml.lineEdit().setReadOnly(True)
 
         # EventListener für die Knöpfe
@@ -138,6 +139,46 @@ class DialogVM(QtWidgets.QDialog, FORM_CLASS):
         """
         return self.checkBox_integr.isChecked()
 
+    def getOptionXlink(self):
+        """ Gibt zurück, ob die Geometrien der EnergyADE per XLink referenziert werden sollen.
+
+        Returns:
+            Auswahl als Boolean
+        """
+        return self.checkBox_xlink.isChecked()
+
+    def getOptionPretty(self):
+        """ Gibt zurück, ob die CityGML-Datei eingerückt geschrieben werden soll.
+
+        Returns:
+            Auswahl als Boolean
+        """
+        return self.checkBox_pretty.isChecked()
+
+    def getOptionDryRun(self):
+        """ Gibt zurück, ob nur die Vorab-Analyse des Aufwands ausgegeben werden soll (Probelauf).
+
+        Returns:
+            Auswahl als Boolean
+        """
+        return self.checkBox_dryRun.isChecked()
+
+    def getOptionSpaceBounds(self):
+        """ Gibt zurück, ob die LoD3-Außenhülle aus den Randflächen der Räume berechnet werden soll.
+
+        Returns:
+            Auswahl als Boolean
+        """
+        return self.checkBox_spaceBounds.isChecked()
+
+    def getCompressionLevel(self):
+        """ Gibt die gewählte Komprimierungsstufe für komprimierte Ausgabedateien zurück.
+
+        Returns:
+            Komprimierungsstufe von 1 (schnell) bis 9 (klein) als Integer
+        """
+        return self.spinBox_level.value()
+
     def getLod(self):
         """ Gibt die gewählte Level of Detail (LoD)-Stufe zurück.
 
@@ -13,15 +13,22 @@
 # Standard-Bibliotheken
 import sys
 import os.path
-import platform
 
 # QGIS-Bibliotheken
 from qgis.core import QgsProject, QgsVectorLayer
 from qgis.PyQt.QtCore import QCoreApplication
+from qgis.PyQt.QtXml import QDomDocument
 
 # XML-Bibliotheken
 from lxml import etree
 
+# Plugin
+try:
+    from ..algorithm.gpkg_writer import GpkgWriter
+except ImportError:
+    sys.path.insert(0, '..')
+    from algorithm.gpkg_writer import GpkgWriter
+
 
 #####
 
@@ -49,59 +56,61 @@ class GisVM:
         """
         return QCoreApplication.translate('GisVM', msg)
 
-    def loadIntoGIS(self, path):
+    def loadIntoGIS(self, path, heights=None):
         """ Lädt den Datensatzes als Layer in QGIS
 
         Args:
-            path: Pfad zum CityGML-Datensatz
+            path: Pfad zum GeoPackage des Datensatzes (Layer der Gebäude und Oberflächen, mit Raumindex)
+            heights: Minimale und maximale Gebäudehöhe aus der Konvertierung, als Tupel
+                Default: None (aus dem Layer abgefragt)
         """
 
-        # Erstellen des Vektorlayers
-        slash = "/" if platform.system() == "Linux" else "\\"
-        name = path[path.rindex(slash) + 1:-4]
-        layer = QgsVectorLayer(path, name, "ogr")
+        # Erstellen der Vektorlayer
+        name = os.path.splitext(os.path.basename(path))[0]
+        surfLayer = QgsVectorLayer(path + "|layername=" + GpkgWriter.surfLayer, name + " (" + GpkgWriter.surfLayer +
+                                   ")", "ogr")
+        layer = QgsVectorLayer(path + "|layername=" + GpkgWriter.bldgLayer, name, "ogr")
 
         # Wenn Layer valide ist: Hinzufügen
         if layer.isValid():
+            if surfLayer.isValid():
+                QgsProject.instance().addMapLayer(surfLayer)
             QgsProject.instance().addMapLayer(layer)
             self.model.dlg.log(self.tr(u'CityGML building model added to QGIS'))
-            self.set3dProperties(layer)
+            self.set3dProperties(layer, heights)
 
         # Wenn Layer invalide ist: Fehlermeldung
         else:
             self.model.dlg.log(self.tr(u'CityGML bulding model could not be added to QGIS'))
 
-    def set3dProperties(self, layer):
+    def set3dProperties(self, layer, heights=None):
         """ Setzt die 3D-Einstellungen, damit der Layer dreidimensional angezeigt werden kann
 
+        Die Stilvorlage wird nur gelesen und angepasst im Speicher auf den Layer angewendet, sodass gleichzeitig
+        abgeschlossene Konvertierungen sich nicht gegenseitig stören.
+
         Args:
             layer: Layer, dessen Einstellungen geändert werden sollen
+            heights: Minimale und maximale Gebäudehöhe, als Tupel
+                Default: None (aus dem Layer abgefragt)
         """
 
         # Stilvorlage einlesen
-        filePath = os.path.dirname(__file__)
-        slash = "/" if platform.system() == "Linux" else "\\"
-        stylePath = filePath[0:filePath.rfind(slash)] + '/resources/3D.qml'
+        stylePath = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "3D.qml")
         qml = etree.parse(stylePath)
         minV, maxV = qml.xpath("//Option[@name='minValue']")[0], qml.xpath("//Option[@name='maxValue']")[0]
 
-        # Minimale und maximale Höhe berechnen und setzen
-        minHeight, maxHeight = sys.maxsize, -sys.maxsize
-        ix = layer.fields().indexFromName('measuredHeight')
-        for feature in layer.getFeatures():
-            height = feature.attributes()[ix]
-            if height < minHeight:
-                minHeight = height
-            if height > maxHeight:
-                maxHeight = height
-        minV.set("value", str(minHeight))
-        maxV.set("value", str(maxHeight))
-
-        # Änderungen speichern
-        qml.write(stylePath, xml_declaration=True, encoding="UTF-8", pretty_print=True)
-
-        # Stil einlesen und Layer aktualisieren
-        layer.loadNamedStyle(stylePath)
+        # Minimale und maximale Höhe setzen (ohne Vorgabe per Abfrage an den Datenanbieter statt über alle Features)
+        if heights is None:
+            ix = layer.fields().indexFromName('measuredHeight')
+            heights = (layer.minimumValue(ix), layer.maximumValue(ix))
+        minV.set("value", str(heights[0]))
+        maxV.set("value", str(heights[1]))
+
+        # Stil aus dem Speicher einlesen und Layer aktualisieren
+        doc = QDomDocument()
+        doc.setContent(etree.tostring(qml, encoding="UTF-8", xml_declaration=True))
+        layer.importNamedStyle(doc)
         layer.triggerRepaint()
 
         # Meldung
@@ -106,6 +106,11 @@ class Model:
         lod = self.dlg.getLod()
         eade = self.dlg.getOptionEade()
         integr = self.dlg.getOptionIntegr()
+        xlink = self.dlg.getOptionXlink()
+        pretty = self.dlg.getOptionPretty()
+        dryRun = self.dlg.getOptionDryRun()
+        level = self.dlg.getCompressionLevel()
+        spaceBounds = self.dlg.getOptionSpaceBounds()
         slash = "/" if platform.system() == "Linux" else "\\"
         self.dlg.log(self.tr(u'Input') + ": " + self.inPath[self.inPath.rindex(slash) + 1:] + ", " + self.tr(
             u'Output') + ": " + self.outPath[self.outPath.rindex(slash) + 1:] + ", LoD: " + str(lod) +
@@ -113,7 +118,8 @@ class Model:
 
         # Konvertieren starten
         self.task = ConvertStarter(self.tr(u"IFC-to-CityGML Conversion"), self, self.inPath, self.outPath, lod, eade,
-                                   integr)
+                                   integr, dryRun=dryRun, xlink=xlink, pretty=pretty, level=level,
+                                   spaceBoundaries=spaceBounds)
         QgsApplication.taskManager().addTask(self.task)
         self.task.progressChanged.connect(lambda t: self.dlg.setProgress(t))
         self.task.logging.connect(lambda t: self.dlg.log(t))